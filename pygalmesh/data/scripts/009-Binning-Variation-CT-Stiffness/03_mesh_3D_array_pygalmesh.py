@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import json
+import hashlib
 import argparse
 import numpy as np
 import matplotlib.pyplot as plt
@@ -142,21 +143,65 @@ def repair_surface(vertices, faces, params):
         "surface_watertight": bool(mesh.is_watertight),
         "surface_winding_consistent": bool(mesh.is_winding_consistent),
         "surface_euler_number": int(mesh.euler_number),
-        "surface_components": int(len(mesh.split(only_watertight=False))),
+        "surface_components": surface_components(mesh.faces)[0],
         **component_filter_info,
         **decimation_info,
     }
 
 
+def surface_components(faces):
+    """
+    Face components as in trimesh.graph.split(only_watertight=False): two faces
+    are connected when they share an edge that occurs exactly twice. Returns
+    (count, label per face, closed per component); closed means, as in
+    Trimesh.is_watertight, that every edge of the component occurs exactly
+    twice within that component.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    following = np.roll(faces, -1, axis=1)
+    stride = int(faces.max(initial=0)) + 1
+    keys = (np.minimum(faces, following) * stride + np.maximum(faces, following)).ravel()
+    order = np.argsort(keys, kind="stable")
+    _, start, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    del keys
+
+    shared = start[counts == 2]
+    first, second = order[shared] // 3, order[shared + 1] // 3
+    linked = first != second
+    graph = coo_matrix(
+        (np.ones(int(linked.sum()), dtype=np.int8), (first[linked], second[linked])),
+        shape=(len(faces), len(faces)),
+    )
+    component_count, labels = connected_components(graph, directed=False)
+
+    # Open edges make their component open. Edges with three or more faces are
+    # counted per component.
+    closed = np.ones(component_count, dtype=bool)
+    closed[labels[order[start[counts == 1]] // 3]] = False
+    crowded = counts > 2
+    if crowded.any():
+        sizes = counts[crowded]
+        offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        rows = order[np.repeat(start[crowded], sizes) + np.arange(sizes.sum()) - offsets]
+        edge = np.repeat(np.arange(int(crowded.sum()), dtype=np.int64), sizes)
+        pair, pair_count = np.unique(labels[rows // 3] * int(crowded.sum()) + edge, return_counts=True)
+        closed[pair[pair_count != 2] // int(crowded.sum())] = False
+    return int(component_count), labels, closed
+
+
 def filter_surface_components(mesh, params):
     import trimesh
 
     min_faces = int(params.get("min_surface_component_faces", 0) or 0)
     min_area = float(params.get("min_surface_component_area", 0.0) or 0.0)
     min_volume = float(params.get("min_surface_component_abs_volume", 0.0) or 0.0)
-    components = list(mesh.split(only_watertight=False))
+    faces = np.asarray(mesh.faces, dtype=np.int64)
+    component_count, labels, closed = surface_components(faces)
     info = {
-        "surface_components_before_filter": int(len(components)),
+        "surface_components_before_filter": component_count,
         "surface_component_min_faces": min_faces,
         "surface_component_min_area": min_area,
         "surface_component_min_abs_volume": min_volume,
@@ -166,47 +211,51 @@ def filter_surface_components(mesh, params):
         "surface_component_abs_volume_removed_by_filter": 0.0,
     }
 
-    if not components or (min_faces <= 0 and min_area <= 0.0 and min_volume <= 0.0):
+    if component_count == 0 or (min_faces <= 0 and min_area <= 0.0 and min_volume <= 0.0):
         info["mesh"] = mesh
         return info
 
-    kept = []
-    removed_faces = 0
-    removed_area = 0.0
-    removed_volume = 0.0
-    for component in components:
-        face_count = len(component.faces)
-        area = float(component.area)
-        abs_volume = abs(float(component.volume)) if component.is_watertight else 0.0
-        remove = (
-            (min_faces > 0 and face_count < min_faces)
-            or (min_area > 0.0 and area < min_area)
-            or (min_volume > 0.0 and abs_volume < min_volume)
-        )
-        if remove:
-            removed_faces += int(face_count)
-            removed_area += area
-            removed_volume += abs_volume
-        else:
-            kept.append(component)
-
-    if not kept:
+    # Statistics of all components at once from the labels, without building submeshes.
+    triangles = np.asarray(mesh.vertices, dtype=np.float64)[faces]
+    crosses = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    face_count = np.bincount(labels, minlength=component_count)
+    area = np.bincount(labels, weights=np.linalg.norm(crosses, axis=1) / 2.0, minlength=component_count)
+    # Divergence theorem as in trimesh.triangles.mass_properties: V = sum(n_x * (x0 + x1 + x2)) / 6
+    volume = np.bincount(labels, weights=crosses[:, 0] * triangles[:, :, 0].sum(axis=1),
+                         minlength=component_count) / 6.0
+    abs_volume = np.where(closed, np.abs(volume), 0.0)
+    del triangles, crosses
+
+    remove = np.zeros(component_count, dtype=bool)
+    if min_faces > 0:
+        remove |= face_count < min_faces
+    if min_area > 0.0:
+        remove |= area < min_area
+    if min_volume > 0.0:
+        remove |= abs_volume < min_volume
+
+    if remove.all():
         raise RuntimeError("Surface component filter removed all components")
 
-    if len(kept) == len(components):
+    if not remove.any():
         filtered = mesh
     else:
-        filtered = trimesh.util.concatenate(kept)
+        filtered = trimesh.Trimesh(
+            vertices=np.asarray(mesh.vertices),
+            faces=faces[~remove[labels]],
+            process=False,
+        )
+        filtered.remove_unreferenced_vertices()
         filtered.merge_vertices()
         trimesh.repair.fix_winding(filtered)
         trimesh.repair.fix_normals(filtered)
 
     info.update({
         "mesh": filtered,
-        "surface_components_removed_by_filter": int(len(components) - len(kept)),
-        "surface_component_faces_removed_by_filter": int(removed_faces),
-        "surface_component_area_removed_by_filter": removed_area,
-        "surface_component_abs_volume_removed_by_filter": removed_volume,
+        "surface_components_removed_by_filter": int(remove.sum()),
+        "surface_component_faces_removed_by_filter": int(face_count[remove].sum()),
+        "surface_component_area_removed_by_filter": float(area[remove].sum()),
+        "surface_component_abs_volume_removed_by_filter": float(abs_volume[remove].sum()),
     })
     return info
 
@@ -291,6 +340,109 @@ def write_off_surface(path, vertices, faces):
             handle.write(f"3 {int(face[0])} {int(face[1])} {int(face[2])}\n")
 
 
+# Bump when marching cubes or the repair change so that the same parameters
+# give a different surface.
+SURFACE_CACHE_VERSION = 1
+
+# Parameters the repaired surface depends on; mesher options are not part of it.
+SURFACE_CACHE_KEYS = (
+    "pad_width",
+    "sdf_sigma_voxels",
+    "level",
+    "marching_cubes_step_size",
+    "fill_holes",
+    "min_surface_component_faces",
+    "min_surface_component_area",
+    "min_surface_component_abs_volume",
+    "surface_decimation_reduction",
+    "surface_decimation_preserve_topology",
+    "surface_decimation_splitting",
+    "surface_decimation_boundary_vertex_deletion",
+)
+
+
+def surface_cache_dir(params, input_path):
+    if not bool(params.get("surface_cache", True)):
+        return None
+    cache_dir = params.get("surface_cache_dir")
+    if not cache_dir:
+        # Next to the input volume, so variants of the same volume share it.
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(input_path)), "sdf_surface_cache")
+    return cache_dir
+
+
+def surface_cache_key(mask, voxel_dim, params):
+    """
+    SHA-256 of the bit-packed mask, voxel size, SURFACE_CACHE_KEYS and
+    SURFACE_CACHE_VERSION; edits elsewhere in this script keep the cache valid.
+    """
+    mask = np.ascontiguousarray(mask, dtype=bool)
+    surface_params = {key: params[key] for key in SURFACE_CACHE_KEYS if key in params}
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {
+            "version": SURFACE_CACHE_VERSION,
+            "shape": list(mask.shape),
+            "voxel_dim": float(voxel_dim),
+            "params": surface_params,
+        },
+        sort_keys=True,
+        default=str,
+    ).encode())
+    digest.update(np.packbits(mask).tobytes())
+    return digest.hexdigest()
+
+
+def save_cached_surface(path, vertices, faces, info):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    face_dtype = np.int32 if len(vertices) <= np.iinfo(np.int32).max else np.int64
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a per-process file and rename, so concurrent sweep variants never
+    # read a half-written entry.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        np.savez(
+            handle,
+            vertices=vertices,
+            faces=np.asarray(faces).astype(face_dtype),
+            info=np.array(json.dumps(info)),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_cached_surface(path):
+    with np.load(path, allow_pickle=False) as data:
+        return data["vertices"], data["faces"].astype(np.int64), json.loads(str(data["info"]))
+
+
+def repaired_sdf_surface(mask, voxel_dim, params, cache_dir=None):
+    """
+    Marching cubes + repair + edge topology, cached: when the key matches, the
+    surface and its audit values are read from <cache_dir>/<key>.npz instead.
+    """
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, surface_cache_key(mask, voxel_dim, params) + ".npz")
+        if os.path.exists(cache_path):
+            try:
+                vertices, faces, surface_info = load_cached_surface(cache_path)
+            except (OSError, ValueError, KeyError) as exc:
+                print(f"⚠️ Unreadable surface cache entry, rebuilding: {cache_path} ({exc})")
+            else:
+                print(f"♻️ Repaired SDF surface loaded from cache: {cache_path}")
+                surface_info.update({"surface_cache_path": cache_path, "surface_cache_hit": True})
+                return vertices, faces, surface_info
+
+    vertices, faces = extract_sdf_surface(mask, voxel_dim, params)
+    vertices, faces, surface_info = repair_surface(vertices, faces, params)
+    surface_info.update(surface_edge_topology(faces))
+    if cache_path:
+        save_cached_surface(cache_path, vertices, faces, surface_info)
+        print(f"Stored repaired SDF surface in cache: {cache_path}")
+    surface_info.update({"surface_cache_path": cache_path, "surface_cache_hit": False})
+    return vertices, faces, surface_info
+
+
 def pygalmesh_kwargs_from_params(params, voxel_dim):
     max_element_size_factor = params.get("max_element_size_factor", 1.0)
     max_facet_distance_factor = params.get("max_facet_distance_factor", 0.1)
@@ -624,8 +776,9 @@ def main():
             f"keep_largest_component={keep_largest}"
         )
 
-        vertices, faces = extract_sdf_surface(material_mask, voxel_dim, params)
-        vertices, faces, surface_info = repair_surface(vertices, faces, params)
+        vertices, faces, surface_info = repaired_sdf_surface(
+            material_mask, voxel_dim, params, surface_cache_dir(params, input_path)
+        )
         gmsh_info = write_sdf_gmsh_mesh(vertices, faces, mesh_output_path, voxel_dim, params)
 
         mesh_metadata["sdf_gmsh_parameters"] = dict(params)
@@ -673,9 +826,9 @@ def main():
             f"require_watertight_surface={require_watertight}"
         )
 
-        vertices, faces = extract_sdf_surface(material_mask, voxel_dim, params)
-        vertices, faces, surface_info = repair_surface(vertices, faces, params)
-        surface_info.update(surface_edge_topology(faces))
+        vertices, faces, surface_info = repaired_sdf_surface(
+            material_mask, voxel_dim, params, surface_cache_dir(params, input_path)
+        )
         surface_report_path = os.path.splitext(mesh_output_path)[0] + "_sdf_surface.topology.txt"
         write_surface_audit(surface_report_path, surface_info)
         print(f"Wrote SDF surface topology audit: {surface_report_path}")
@@ -34,18 +34,31 @@ parser.add_argument("--eps2", type=float, default=None, help="Second eigenvalue
 parser.add_argument("--eps3", type=float, default=None, help="Third eigenvalue of the target diagonal macroscopic strain tensor.")
 parser.add_argument("--yielded-volume-fraction", type=float, default=None, help="Stop once this fraction of the reduced material volume has alpha above tolerance.")
 parser.add_argument("--alpha-yield-tolerance", type=float, default=None, help="Alpha threshold used to classify a cell as yielded.")
+parser.add_argument("--batch", action="store_true", help="Run all loading paths in yield_surface.batch ([{sample_id, eps_mac_eigenvalues}, ...]) back to back with one mesh and one set of function spaces; each path writes to <solver folder>/<sample_id>/.")
 args = parser.parse_args()
 
 material_set = args.material or args.legacy_material or "std"
 loading_direction = (args.loading_direction or args.legacy_loading_direction or "tensor").lower()
 if loading_direction not in {"x", "y", "z", "tensor"}:
     raise ValueError(f"Unsupported loading direction '{loading_direction}'. Use x, y, z, or tensor.")
+if args.batch and loading_direction != "tensor":
+    raise ValueError("--batch runs eps_mac_eigenvalues paths and needs loading direction 'tensor'.")
 
 script_path = os.path.dirname(__file__)
 script_name = os.path.splitext(os.path.basename(__file__))[0]
-logfile_path = alex.os.logfile_full_path(script_path, f"{script_name}_{material_set}_{loading_direction}")
-outputfile_graph_path = alex.os.outputfile_graph_full_path(script_path, f"{script_name}_{material_set}_{loading_direction}")
-outputfile_xdmf_path = alex.os.outputfile_xdmf_full_path(script_path, f"{script_name}_{material_set}_{loading_direction}")
+
+
+def set_output_paths(folder):
+    # Log, Graph, XDMF und die yield_*.json eines Lastpfads landen in `folder`.
+    global output_dir, logfile_path, outputfile_graph_path, outputfile_xdmf_path
+    run_name = f"{script_name}_{material_set}_{loading_direction}"
+    output_dir = folder
+    logfile_path = alex.os.logfile_full_path(folder, run_name)
+    outputfile_graph_path = alex.os.outputfile_graph_full_path(folder, run_name)
+    outputfile_xdmf_path = alex.os.outputfile_xdmf_full_path(folder, run_name)
+
+
+set_output_paths(script_path)
 
 
 def load_optional_config():
@@ -177,6 +190,8 @@ dt_min = float(yield_config.get("dt_min", 1e-11))
 max_mean_strain = float(yield_config.get("max_mean_strain", 0.25))
 
 config_eps = yield_config.get("eps_mac_eigenvalues")
+if args.batch and (args.eps1 is not None or args.eps2 is not None or args.eps3 is not None):
+    raise ValueError("--batch takes the directions from yield_surface.batch, not from --eps1/--eps2/--eps3.")
 if args.eps1 is not None or args.eps2 is not None or args.eps3 is not None:
     if args.eps1 is None or args.eps2 is None or args.eps3 is None:
         raise ValueError("Provide all of --eps1, --eps2, and --eps3, or none of them.")
@@ -548,10 +563,10 @@ def after_last_timestep():
     if rank == 0:
         pp.print_graphs_plot(
             outputfile_graph_path,
-            script_path,
+            output_dir,
             legend_labels=["R_x", "R_y", "R_z"]
         )
-        summary_path = os.path.join(script_path, f"yield_run_{material}_{loading_direction}.json")
+        summary_path = os.path.join(output_dir, f"yield_run_{material}_{loading_direction}.json")
         with open(summary_path, "w") as handle:
             json.dump({
                 "material": material,
@@ -584,31 +599,74 @@ def after_last_timestep():
                 "config_path": config_path,
             }, handle, indent=2)
         print(f"Saved yield run summary to: {summary_path}")
-        averages_path = os.path.join(script_path, f"yield_averages_{material}_{loading_direction}.json")
+        averages_path = os.path.join(output_dir, f"yield_averages_{material}_{loading_direction}.json")
         with open(averages_path, "w") as handle:
             json.dump(averaged_history, handle, indent=2)
         print(f"Saved reduced-volume averages to: {averages_path}")
 
 
-try:
-    sol.solve_with_newton_adaptive_time_stepping(
-        domain,
-        u_fun,
-        Tend,
-        dt_global,
-        before_first_timestep_hook=before_first_time_step,
-        after_last_timestep_hook=after_last_timestep,
-        before_each_timestep_hook=before_each_time_step,
-        get_residuum_and_gateaux=get_residuum_and_gateaux,
-        get_bcs=get_bcs,
-        after_timestep_restart_hook=after_timestep_restart,
-        after_timestep_success_hook=after_timestep_success,
-        comm=comm,
-        print_bool=True,
-        t=t,
-        dt_max=dt_max
-    )
-except StopSimulation:
-    if rank == 0 and stop_reason is None:
-        print("[INFO] Simulation stopped because dt became too small.")
-    after_last_timestep()
+def reset_loading_path(eigenvalues):
+    # Neuer Lastpfad auf demselben Netz: nur Verschiebung, plastischer Zustand,
+    # Zeit und die Aufzeichnung werden zurueckgesetzt. Netz, Funktionsraeume,
+    # Randdofs und Mittelungsgebiet bleiben.
+    global eps_mac_eigenvalues, averaged_history, final_yield_state, stop_reason, yield_states
+    eps_mac_eigenvalues = np.asarray(eigenvalues, dtype=float)
+    for field in (
+        u_fun, um1, urestart, u_D,
+        alpha_n, alpha_tmp,
+        e_p_11_n, e_p_22_n, e_p_33_n, e_p_12_n, e_p_13_n, e_p_23_n,
+        e_p_11_tmp, e_p_22_tmp, e_p_33_tmp, e_p_12_tmp, e_p_13_tmp, e_p_23_tmp,
+    ):
+        field.x.array[:] = 0.0
+    t.value = 0.0
+    dt_global.value = dt_value
+    averaged_history = []
+    final_yield_state = None
+    stop_reason = None
+    yield_states = {}
+
+
+def run_loading_path():
+    try:
+        sol.solve_with_newton_adaptive_time_stepping(
+            domain,
+            u_fun,
+            Tend,
+            dt_global,
+            before_first_timestep_hook=before_first_time_step,
+            after_last_timestep_hook=after_last_timestep,
+            before_each_timestep_hook=before_each_time_step,
+            get_residuum_and_gateaux=get_residuum_and_gateaux,
+            get_bcs=get_bcs,
+            after_timestep_restart_hook=after_timestep_restart,
+            after_timestep_success_hook=after_timestep_success,
+            comm=comm,
+            print_bool=True,
+            t=t,
+            dt_max=dt_max
+        )
+    except StopSimulation:
+        if rank == 0 and stop_reason is None:
+            print("[INFO] Simulation stopped because dt became too small.")
+        after_last_timestep()
+
+
+if args.batch:
+    batch = yield_config.get("batch") or []
+    if not batch:
+        raise ValueError("--batch needs a non-empty yield_surface.batch list in the config.")
+    for index, entry in enumerate(batch):
+        sample_id = entry.get("sample_id") or f"path_{index:03d}"
+        eigenvalues = entry.get("eps_mac_eigenvalues")
+        if eigenvalues is None or len(eigenvalues) != 3:
+            raise ValueError(f"yield_surface.batch[{index}]: eps_mac_eigenvalues must contain exactly three values.")
+        folder = os.path.join(script_path, sample_id)
+        if rank == 0:
+            os.makedirs(folder, exist_ok=True)
+            print(f"[BATCH] Lastpfad {index + 1}/{len(batch)}: {sample_id}, eps = {list(eigenvalues)}")
+        comm.barrier()
+        set_output_paths(folder)
+        reset_loading_path(eigenvalues)
+        run_loading_path()
+else:
+    run_loading_path()
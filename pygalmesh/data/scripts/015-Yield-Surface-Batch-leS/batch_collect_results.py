@@ -206,7 +206,7 @@ def collect_combo(project, pkg, meta, args):
 
     if args.with_logs:
         logs_dir = combo_dir / "logs"
-        for path in sorted(jobs_dir.glob("ys_*/*.out.*")) + sorted(jobs_dir.glob("ys_*/*.err.*")):
+        for path in sorted(jobs_dir.glob("ys*_*/*.out.*")) + sorted(jobs_dir.glob("ys*_*/*.err.*")):
             if path.stat().st_size > args.max_log_bytes:
                 continue
             logs_dir.mkdir(exist_ok=True)
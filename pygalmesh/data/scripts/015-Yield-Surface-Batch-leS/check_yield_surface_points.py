@@ -19,10 +19,13 @@ def infer_sample_id(path, data):
         except OSError:
             pass
 
+    # Letzter Treffer: unter 00_results steht <sample>-<material>-<richtung>/<sample>/.
+    # Batch-Configs (ysb_*) haben keinen sample_id, dort zaehlt nur der Pfad.
+    sample_id = None
     for part in path.parts:
         if part.startswith("ys_"):
-            return part
-    return None
+            sample_id = part
+    return sample_id
 
 
 def dataset_from_config(config):
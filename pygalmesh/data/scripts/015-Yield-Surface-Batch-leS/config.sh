@@ -36,6 +36,10 @@ YIELD_JOB_TIME="${YIELD_JOB_TIME:-3000}"
 YIELD_JOB_PARTITION="${YIELD_JOB_PARTITION:-long}"
 YIELD_SURFACE_POINTS="${YIELD_SURFACE_POINTS:-96}"
 YIELD_SURFACE_STRAIN_RADIUS="${YIELD_SURFACE_STRAIN_RADIUS:-0.25}"
+# Richtungen je Job. 0 = ein Job je Richtung (jeder liest das Netz, partitioniert
+# und kompiliert neu). N > 0: elastoplastic.py --batch rechnet N Richtungen
+# nacheinander auf einem Netz; YIELD_JOB_TIME muss dann fuer alle N reichen.
+YIELD_SURFACE_BATCH_SIZE="${YIELD_SURFACE_BATCH_SIZE:-0}"
 
 # Netzvorbereitung. Der SBATCH-Header in job_prepare_mesh_CLUSTER.sh ist fest;
 # batch_submit_CLUSTER.sh ueberschreibt Zeit und Partition auf der
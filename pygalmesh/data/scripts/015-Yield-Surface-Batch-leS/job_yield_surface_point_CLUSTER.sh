@@ -65,12 +65,13 @@ print(config["01_segment_slice_wise"]["specimen_name"])
 print(config["02b_build_subvolume_arrays"]["subvolume_output_folder"])
 print(" ".join(ys.get("materials", ["std"])))
 print(" ".join(ys.get("loading_directions", ["tensor"])))
-print(ys.get("sample_id", "yield_sample"))
+print(ys.get("sample_id") or ys.get("batch_id") or "yield_sample")
 print(config.get("02d_axis_aligned_cuboid_crop", {}).get("output_filename", "volume_boundary_shell_aniso.npy"))
 dataset_id = config.get("dataset", {}).get("id")
 if not dataset_id:
     dataset_id = config["01_segment_slice_wise"]["specimen_name"].split("_Bin", 1)[0]
 print(dataset_id)
+print(" ".join(entry["sample_id"] for entry in ys.get("batch") or []))
 PYINFO
 )
 
@@ -82,6 +83,14 @@ directions_line="$(echo "$CONFIG_INFO" | sed -n '5p')"
 sample_id="$(echo "$CONFIG_INFO" | sed -n '6p')"
 shell_volume_filename="$(echo "$CONFIG_INFO" | sed -n '7p')"
 dataset_id="$(echo "$CONFIG_INFO" | sed -n '8p')"
+batch_line="$(echo "$CONFIG_INFO" | sed -n '9p')"
+# Batch-Config (setup_yield_surface_jobs.py --batch-size): mehrere Richtungen in
+# einem elastoplastic.py-Lauf, jede schreibt nach <Subvolumen>/<sample_id>/.
+read -r -a BATCH_SAMPLES <<< "$batch_line"
+ELASTOPLASTIC_ARGS=()
+if [[ "${#BATCH_SAMPLES[@]}" -gt 0 ]]; then
+  ELASTOPLASTIC_ARGS+=(--batch)
+fi
 read -r -a MATERIALS <<< "$materials_line"
 read -r -a DIRECTIONS <<< "$directions_line"
 base_subvolume_folder="${base_subvolume_container_path/#\/data/$HPC_SCRATCH/pygalmesh/data}"
@@ -92,6 +101,9 @@ run_root="$working_directory/yield_surface_runs/$dataset_id/$binning_label/$samp
 mkdir -p "$run_root"
 
 echo "Running yield-surface point: $sample_id"
+if [[ "${#BATCH_SAMPLES[@]}" -gt 0 ]]; then
+  echo "Batch: ${#BATCH_SAMPLES[@]} Richtungen auf einem Netz"
+fi
 echo "Dataset: $dataset_id"
 echo "Using config: $CONFIG_PATH"
 echo "Using prepared mesh folder: $base_subvolume_folder"
@@ -120,8 +132,33 @@ for mat in "${MATERIALS[@]}"; do
       run_container 1 "$target" "$SIM_BIND" "$SIM_CONTAINER" \
         python3 "$target/write_yield_surface_parameters.py" --config "$target/config.json" --output "$target/parameters.txt" --material "$mat" --loading-direction "$direction"
       run_container "$sim_ntasks" "$target" "$SIM_BIND" "$SIM_CONTAINER" \
-        python3 "$target/elastoplastic.py" --material "$mat" --loading-direction "$direction" --config "$target/config.json"
+        python3 "$target/elastoplastic.py" --material "$mat" --loading-direction "$direction" --config "$target/config.json" \
+        ${ELASTOPLASTIC_ARGS[@]+"${ELASTOPLASTIC_ARGS[@]}"}
     done
+    if [[ "${#BATCH_SAMPLES[@]}" -gt 0 ]]; then
+      # Gleiche Ablage wie bei einem Punkt-Job je Richtung:
+      # <sample>-<mat>-<richtung>/<sample>/<subvolumen>/yield_run_*.json
+      for sample in "${BATCH_SAMPLES[@]}"; do
+        sample_output_dir="$working_directory/00_results/${dataset_id}/${binning_label}/yield_surface/${sample}-${mat}-${direction}"
+        for sub in "$run_root"/*/; do
+          [ -d "$sub/$sample" ] || continue
+          slim_target="$sample_output_dir/$sample/$(basename "$sub")"
+          mkdir -p "$slim_target"
+          if [[ "${KEEP_FULL_RUN_COPY:-0}" == "1" ]]; then
+            cp -rv "$sub/$sample"/. "$slim_target"/
+          else
+            cp -v "$sub/$sample"/yield_run_*.json     "$slim_target"/ 2>/dev/null || true
+            cp -v "$sub/$sample"/yield_averages_*.json "$slim_target"/ 2>/dev/null || true
+            cp -v "$sub/$sample"/*.txt                "$slim_target"/ 2>/dev/null || true
+            cp -v "$sub/$sample"/*.log                "$slim_target"/ 2>/dev/null || true
+            cp -v "$sub/$sample"/*.png                "$slim_target"/ 2>/dev/null || true
+          fi
+        done
+        cp -v "$CONFIG_HOST_PATH" "$sample_output_dir/config.json" || true
+        cp -v "$run_root"/*/parameters.txt "$sample_output_dir/parameters.txt" 2>/dev/null || true
+      done
+      continue
+    fi
     mkdir -p "$final_output_dir"
     if [[ "${KEEP_FULL_RUN_COPY:-0}" == "1" ]]; then
       # Wie in 014: der komplette Arbeitsordner inklusive Netz und Feldausgabe.
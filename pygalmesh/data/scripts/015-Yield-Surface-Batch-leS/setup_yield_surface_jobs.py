@@ -45,6 +45,56 @@ def sanitize_component(value):
     return f"{value:+.4f}".replace("+", "p").replace("-", "m").replace(".", "p")
 
 
+def write_job(args, project_dir, scratch_root, job_dir, job_id, job_name, config_path):
+    job_path = job_dir / f"job_{job_id}_CLUSTER.sh"
+    config_container_path = (
+        f"/data/scripts/{project_dir.name}/"
+        f"{config_path.relative_to(project_dir).as_posix()}"
+    )
+    sbatch_lines = [
+        f"#SBATCH -J {job_name[:48]}",
+        f"#SBATCH -A {args.job_account}",
+        f"#SBATCH -t {args.job_time}",
+        f"#SBATCH -n {args.job_ntasks}",
+    ]
+    if args.job_partition:
+        sbatch_lines.append(f"#SBATCH -p {args.job_partition}")
+    if args.job_nodes:
+        sbatch_lines.append(f"#SBATCH -N {args.job_nodes}")
+    sbatch_lines.append(f"#SBATCH --mem-per-cpu={args.job_mem_per_cpu}")
+    # Log-Dateien in den Ordner des jeweiligen Punkt-Jobs. SBATCH-Zeilen werden
+    # nicht von der Shell expandiert, der Pfad muss also hier aufgeloest werden;
+    # er zeigt auf den Scratch, weil dort gerechnet wird.
+    if scratch_root:
+        log_dir = (f"{scratch_root}/pygalmesh/data/scripts/{project_dir.name}/"
+                   f"{job_dir.relative_to(project_dir).as_posix()}")
+        sbatch_lines.append(f"#SBATCH -e {log_dir}/%x.err.%j")
+        sbatch_lines.append(f"#SBATCH -o {log_dir}/%x.out.%j")
+    if args.job_constraint:
+        sbatch_lines.append(f"#SBATCH -C {args.job_constraint}")
+    sbatch_lines.append("#SBATCH --mail-type=END")
+    sbatch_header = "\n".join(sbatch_lines)
+
+    job_text = f"""#!/bin/bash
+
+{sbatch_header}
+
+SCRIPT_DIR=\"$HPC_SCRATCH/pygalmesh/data/scripts/{project_dir.name}\"
+bash \"$SCRIPT_DIR/job_yield_surface_point_CLUSTER.sh\" \"{config_container_path}\"
+"""
+    job_path.write_text(job_text)
+    job_path.chmod(0o755)
+    return job_path
+
+
+def submit_line(job_id):
+    return (
+        f"sbatch --error=\"$SCRIPT_DIR/{job_id}/%x.err.%j\" "
+        f"--output=\"$SCRIPT_DIR/{job_id}/%x.out.%j\" "
+        f"\"$SCRIPT_DIR/{job_id}/job_{job_id}_CLUSTER.sh\""
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Create per-direction yield-surface configs and SLURM jobs.")
     parser.add_argument("--points", type=int, default=6, help="Number of directions to sample; minimum/default is 6.")
@@ -80,7 +130,14 @@ def main():
     parser.add_argument("--scratch-root", default=None,
                         help="Wurzel des Scratch-Bereichs fuer die Log-Pfade der Jobs "
                              "(Default: $HPC_SCRATCH)")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="Richtungen je Job. 0 = ein Job je Richtung. Sonst rechnet "
+                             "elastoplastic.py --batch die Richtungen eines Jobs "
+                             "nacheinander auf einem Netz (Ordner ysb_NNN/); --job-time "
+                             "muss dann fuer alle reichen.")
     args = parser.parse_args()
+    if args.batch_size < 0:
+        raise ValueError("--batch-size must be >= 0")
 
     project_dir = Path(args.project_dir).resolve() if args.project_dir else Path(__file__).resolve().parent
     base_config_path = Path(args.base_config)
@@ -109,8 +166,9 @@ def main():
               "#SBATCH -e/-o Zeilen. Beim Einreichen dann --error/--output angeben.")
 
     directions = sample_directions(args.points)
+    sample_method = "cartesian_axes" if args.points == 6 else "fibonacci_sphere"
     manifest_rows = []
-    submit_lines = [
+    submit_header = [
         "#!/usr/bin/env bash",
         f"#SBATCH -J ys-submit-n{args.points:03d}",
         "#SBATCH -A p0023647",
@@ -125,7 +183,16 @@ def main():
         "SCRIPT_DIR=\"$(cd \"$(dirname \"${BASH_SOURCE[0]}\")\" && pwd)\"",
         "",
     ]
+    submit_lines = list(submit_header)
 
+    # Die Submit-Skripte reichen jedes job_*_CLUSTER.sh eine Ebene tiefer ein. Jobs
+    # aus einem frueheren Aufruf im jeweils anderen Modus wuerden sonst doppelt laufen.
+    stale_pattern = "ys_*/job_*_CLUSTER.sh" if args.batch_size else "ysb_*/job_*_CLUSTER.sh"
+    for stale in sorted(output_dir.glob(stale_pattern)):
+        print(f"[INFO] Entferne Job aus frueherem Aufruf: {stale.relative_to(output_dir)}")
+        stale.unlink()
+
+    samples = []
     for index, direction in enumerate(directions):
         dx, dy, dz = direction
         eps = [args.radius * dx, args.radius * dy, args.radius * dz]
@@ -142,7 +209,7 @@ def main():
         ys["sample_count"] = args.points
         ys["sample_direction_unit"] = [dx, dy, dz]
         ys["sample_radius"] = args.radius
-        ys["sample_method"] = "cartesian_axes" if args.points == 6 else "fibonacci_sphere"
+        ys["sample_method"] = sample_method
 
         config_path = sample_dir / "config.json"
         with config_path.open("w") as handle:
@@ -150,54 +217,9 @@ def main():
             handle.write("\n")
         (sample_dir / "parameters.txt").write_text(parameter_text(cfg))
 
-        job_path = sample_dir / f"job_{sample_id}_CLUSTER.sh"
-        config_container_path = (
-            f"/data/scripts/{project_dir.name}/"
-            f"{config_path.relative_to(project_dir).as_posix()}"
-        )
-        job_name = (f"{args.job_name_prefix}-ys{index:03d}"
-                    if args.job_name_prefix else sample_id)
-        sbatch_lines = [
-            f"#SBATCH -J {job_name[:48]}",
-            f"#SBATCH -A {args.job_account}",
-            f"#SBATCH -t {args.job_time}",
-            f"#SBATCH -n {args.job_ntasks}",
-        ]
-        if args.job_partition:
-            sbatch_lines.append(f"#SBATCH -p {args.job_partition}")
-        if args.job_nodes:
-            sbatch_lines.append(f"#SBATCH -N {args.job_nodes}")
-        sbatch_lines.append(f"#SBATCH --mem-per-cpu={args.job_mem_per_cpu}")
-        # Log-Dateien in den Ordner des jeweiligen Punkt-Jobs. SBATCH-Zeilen werden
-        # nicht von der Shell expandiert, der Pfad muss also hier aufgeloest werden;
-        # er zeigt auf den Scratch, weil dort gerechnet wird.
-        if scratch_root:
-            log_dir = (f"{scratch_root}/pygalmesh/data/scripts/{project_dir.name}/"
-                       f"{sample_dir.relative_to(project_dir).as_posix()}")
-            sbatch_lines.append(f"#SBATCH -e {log_dir}/%x.err.%j")
-            sbatch_lines.append(f"#SBATCH -o {log_dir}/%x.out.%j")
-        if args.job_constraint:
-            sbatch_lines.append(f"#SBATCH -C {args.job_constraint}")
-        sbatch_lines.append("#SBATCH --mail-type=END")
-        sbatch_header = "\n".join(sbatch_lines)
-
-        job_text = f"""#!/bin/bash
-
-{sbatch_header}
-
-SCRIPT_DIR=\"$HPC_SCRATCH/pygalmesh/data/scripts/{project_dir.name}\"
-bash \"$SCRIPT_DIR/job_yield_surface_point_CLUSTER.sh\" \"{config_container_path}\"
-"""
-        job_path.write_text(job_text)
-        job_path.chmod(0o755)
-        submit_lines.append(
-            f"sbatch --error=\"$SCRIPT_DIR/{sample_id}/%x.err.%j\" "
-            f"--output=\"$SCRIPT_DIR/{sample_id}/%x.out.%j\" "
-            f"\"$SCRIPT_DIR/{sample_id}/job_{sample_id}_CLUSTER.sh\""
-        )
-        manifest_rows.append({
+        row = {
             "sample_id": sample_id,
-            "job_name": job_name,
+            "job_name": None,
             "sample_index": index,
             "direction_x": dx,
             "direction_y": dy,
@@ -206,9 +228,60 @@ bash \"$SCRIPT_DIR/job_yield_surface_point_CLUSTER.sh\" \"{config_container_path
             "eps_2": eps[1],
             "eps_3": eps[2],
             "config": str(config_path.relative_to(project_dir)),
-            "job": str(job_path.relative_to(project_dir)),
+            "job": None,
+        }
+        if not args.batch_size:
+            job_name = (f"{args.job_name_prefix}-ys{index:03d}"
+                        if args.job_name_prefix else sample_id)
+            job_path = write_job(args, project_dir, scratch_root, sample_dir, sample_id, job_name, config_path)
+            submit_lines.append(submit_line(sample_id))
+            row.update({"job_name": job_name, "job": str(job_path.relative_to(project_dir))})
+        manifest_rows.append(row)
+        samples.append({
+            "sample_id": sample_id,
+            "sample_index": index,
+            "sample_direction_unit": [dx, dy, dz],
+            "eps_mac_eigenvalues": eps,
         })
 
+    # Batch-Jobs: je args.batch_size Richtungen eine Config mit yield_surface.batch.
+    # Die Config bekommt bewusst keinen sample_id - die Auswertung leitet den Punkt
+    # aus dem ys_*-Ordner ab, in den elastoplastic.py --batch jeden Lastpfad schreibt.
+    batch_starts = range(0, len(samples), args.batch_size) if args.batch_size else []
+    for batch_index, first in enumerate(batch_starts):
+        chunk = samples[first:first + args.batch_size]
+        batch_id = f"ysb_{batch_index:03d}"
+        batch_dir = output_dir / batch_id
+        batch_dir.mkdir(parents=True, exist_ok=True)
+
+        cfg = json.loads(json.dumps(base_config))
+        ys = cfg.setdefault("yield_surface", {})
+        ys["loading_directions"] = ["tensor"]
+        ys.pop("eps_mac_eigenvalues", None)
+        ys.pop("sample_id", None)
+        ys["batch_id"] = batch_id
+        ys["batch"] = chunk
+        ys["sample_count"] = args.points
+        ys["sample_radius"] = args.radius
+        ys["sample_method"] = sample_method
+
+        config_path = batch_dir / "config.json"
+        with config_path.open("w") as handle:
+            json.dump(cfg, handle, indent=2)
+            handle.write("\n")
+        (batch_dir / "parameters.txt").write_text(parameter_text(cfg))
+
+        job_name = (f"{args.job_name_prefix}-ysb{batch_index:03d}"
+                    if args.job_name_prefix else batch_id)
+        job_path = write_job(args, project_dir, scratch_root, batch_dir, batch_id, job_name, config_path)
+        submit_lines.append(submit_line(batch_id))
+        for sample in chunk:
+            manifest_rows[sample["sample_index"]].update({
+                "job_name": job_name,
+                "job": str(job_path.relative_to(project_dir)),
+                "batch_id": batch_id,
+            })
+
     manifest_path = output_dir / "manifest.csv"
     with manifest_path.open("w", newline="") as handle:
         writer = csv.DictWriter(handle, fieldnames=list(manifest_rows[0].keys()))
@@ -219,7 +292,11 @@ bash \"$SCRIPT_DIR/job_yield_surface_point_CLUSTER.sh\" \"{config_container_path
     submit_path.write_text("\n".join(submit_lines) + "\n")
     submit_path.chmod(0o755)
 
-    print(f"Wrote {len(manifest_rows)} yield-surface point jobs to {output_dir}")
+    if args.batch_size:
+        print(f"Wrote {len(manifest_rows)} yield-surface points in "
+              f"{len(submit_lines) - len(submit_header)} batch jobs to {output_dir}")
+    else:
+        print(f"Wrote {len(manifest_rows)} yield-surface point jobs to {output_dir}")
     print(f"Manifest: {manifest_path}")
     print(f"Submit all after sync on the cluster with: {submit_path}")
 
@@ -26,6 +26,9 @@ SETUP_ARGS+=(
 if [[ -n "${YIELD_JOB_NAME_PREFIX:-}" ]]; then
   SETUP_ARGS+=(--job-name-prefix "$YIELD_JOB_NAME_PREFIX")
 fi
+if [[ -n "${YIELD_SURFACE_BATCH_SIZE:-}" && "${YIELD_SURFACE_BATCH_SIZE}" != "0" ]]; then
+  SETUP_ARGS+=(--batch-size "$YIELD_SURFACE_BATCH_SIZE")
+fi
 if [[ -n "${YIELD_JOB_SCRATCH_ROOT:-}" ]]; then
   SETUP_ARGS+=(--scratch-root "$YIELD_JOB_SCRATCH_ROOT")
 fi
@@ -3,7 +3,9 @@ import alex.linearelastic
 import alex.phasefield
 import alex.util
 import dolfinx as dlfx
+import dolfinx.fem.petsc
 from mpi4py import MPI
+from petsc4py import PETSc as petsc
 
 import ufl 
 import numpy as np
@@ -24,6 +26,15 @@ parser.add_argument(
     "--material", type=str, choices=["conv", "am", "std"], default="conv",
     help="Material model: 'conv' (default) or 'am' or 'std' "
 )
+parser.add_argument(
+    "--driver", type=str, choices=["batch", "newton"], default="batch",
+    help="'batch' (default): assemble and factorise once, solve all six load cases against it; "
+         "'newton': one pseudo time step per load case via solve_with_newton_adaptive_time_stepping"
+)
+parser.add_argument(
+    "--linear-solver", type=str, choices=["lu", "gamg"], default="lu",
+    help="Batch driver only: 'lu' (MUMPS, default) or 'gamg' (CG + algebraic multigrid)"
+)
 args = parser.parse_args()
 
 # Setup paths
@@ -229,22 +240,106 @@ def after_last_timestep():
         sol.print_runtime(runtime)
         sol.write_runtime_to_newton_logfile(logfile_path, runtime)
 
-sol.solve_with_newton_adaptive_time_stepping(
-    domain,
-    u,
-    Tend,
-    dt,
-    before_first_timestep_hook=before_first_time_step,
-    after_last_timestep_hook=after_last_timestep,
-    before_each_timestep_hook=before_each_time_step,
-    get_residuum_and_gateaux=get_residuum_and_gateaux,
-    get_bcs=get_bcs,
-    after_timestep_restart_hook=after_timestep_restart,
-    after_timestep_success_hook=after_timestep_success,
-    comm=comm,
-    print_bool=True,
-    t=t,
-    dt_never_scale_up=True
-)
+def unit_strain_tensor(case):
+    Eps_Voigt = np.zeros((6,))
+    Eps_Voigt[case] = 1.0
+    return np.array([
+        [Eps_Voigt[0], Eps_Voigt[5] / 2.0, Eps_Voigt[4] / 2.0],
+        [Eps_Voigt[5] / 2.0, Eps_Voigt[1], Eps_Voigt[3] / 2.0],
+        [Eps_Voigt[4] / 2.0, Eps_Voigt[3] / 2.0, Eps_Voigt[2]]
+    ])
+
+def rigid_body_modes():
+    # Near-nullspace for GAMG: three translations and three rotations.
+    modes = [
+        lambda x: np.vstack((np.ones_like(x[0]), np.zeros_like(x[0]), np.zeros_like(x[0]))),
+        lambda x: np.vstack((np.zeros_like(x[0]), np.ones_like(x[0]), np.zeros_like(x[0]))),
+        lambda x: np.vstack((np.zeros_like(x[0]), np.zeros_like(x[0]), np.ones_like(x[0]))),
+        lambda x: np.vstack((-x[1], x[0], np.zeros_like(x[0]))),
+        lambda x: np.vstack((np.zeros_like(x[0]), -x[2], x[1])),
+        lambda x: np.vstack((x[2], np.zeros_like(x[0]), -x[0])),
+    ]
+    vectors = []
+    for mode in modes:
+        f = dlfx.fem.Function(V)
+        f.interpolate(mode)
+        vectors.append(f.vector)
+    dlfx.la.orthonormalize(vectors)
+    return petsc.NullSpace().create(vectors=vectors, comm=comm)
+
+def solve_unit_strain_cases_batch():
+    # The problem is linear and the Dirichlet dofs are the same for all six
+    # load cases, so the stiffness matrix (with the boundary rows eliminated)
+    # and its factorisation / AMG hierarchy are set up once. Per load case only
+    # the boundary values u_D and the lifted right-hand side change. Stresses
+    # and outputs go through after_timestep_success as in the Newton driver.
+    before_first_time_step()
+
+    [_, dResdw] = get_residuum_and_gateaux(dt)
+    a_form = dlfx.fem.form(dResdw)
+    bc_linear_displacement = dlfx.fem.dirichletbc(u_D, dofs_at_boundary)
+    A = dlfx.fem.petsc.assemble_matrix(a_form, bcs=[bc_linear_displacement])
+    A.assemble()
+    zero_load = dlfx.fem.Constant(domain, np.zeros((3,)))
+    b = dlfx.fem.petsc.create_vector(dlfx.fem.form(ufl.inner(zero_load, du) * ufl.dx))
+
+    ksp = petsc.KSP().create(comm)
+    ksp.setOperators(A)
+    pc = ksp.getPC()
+    if args.linear_solver == "gamg":
+        A.setNearNullSpace(rigid_body_modes())
+        ksp.setType(petsc.KSP.Type.CG)
+        pc.setType(petsc.PC.Type.GAMG)
+        ksp.setTolerances(rtol=1.0e-10)
+    else:
+        ksp.setType(petsc.KSP.Type.PREONLY)
+        pc.setType(petsc.PC.Type.LU)
+        pc.setFactorSolverType("mumps")
+    ksp.setFromOptions()
+    ksp.setUp()
+
+    for case in range(6):
+        t.value = float(case + 1)
+        before_each_time_step(t.value, dt.value)
+        eps_mac.value = unit_strain_tensor(case)
+        u_D.interpolate(lambda x, eps=eps_mac.value.copy(): eps @ x)
+
+        with b.localForm() as b_local:
+            b_local.set(0.0)
+        dlfx.fem.petsc.apply_lifting(b, [a_form], bcs=[[bc_linear_displacement]])
+        b.ghostUpdate(addv=petsc.InsertMode.ADD, mode=petsc.ScatterMode.REVERSE)
+        dlfx.fem.petsc.set_bc(b, [bc_linear_displacement])
+
+        ksp.solve(b, u.vector)
+        if ksp.getConvergedReason() < 0:
+            raise RuntimeError(f"Load case {case}: linear solver diverged (reason {ksp.getConvergedReason()})")
+        u.x.scatter_forward()
+        after_timestep_success(t.value, dt.value, max(ksp.getIterationNumber(), 1))
+
+    ksp.destroy()
+    A.destroy()
+    b.destroy()
+    after_last_timestep()
+
+if args.driver == "batch":
+    solve_unit_strain_cases_batch()
+else:
+    sol.solve_with_newton_adaptive_time_stepping(
+        domain,
+        u,
+        Tend,
+        dt,
+        before_first_timestep_hook=before_first_time_step,
+        after_last_timestep_hook=after_last_timestep,
+        before_each_timestep_hook=before_each_time_step,
+        get_residuum_and_gateaux=get_residuum_and_gateaux,
+        get_bcs=get_bcs,
+        after_timestep_restart_hook=after_timestep_restart,
+        after_timestep_success_hook=after_timestep_success,
+        comm=comm,
+        print_bool=True,
+        t=t,
+        dt_never_scale_up=True
+    )
 
 
@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import os
+import sys
 from pathlib import Path
 
 import numpy as np
 from scipy import ndimage as ndi
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from voxel_components import (  # noqa: E402
+    configuration_histogram,
+    label_components,
+    local_topology_metrics,
+    structure_for_connectivity,
+    write_component_mask,
+)
+
 
 DEFAULT_CONFIG = {
     "enabled": False,
@@ -13,6 +25,8 @@ DEFAULT_CONFIG = {
     "output_filename": "volume_topology_cleaned.npy",
     "report_filename": "volume_topology.txt",
     "use_cleaned_for_meshing": False,
+    "slab_thickness": 64,
+    "workers": 0,
     "connectivity": {
         "material": 6,
         "pore": 6,
@@ -46,108 +60,46 @@ def load_config(config_path):
     return deep_update(cfg, full_config.get("02c_voxel_topology_cleanup", {}))
 
 
-def structure_for_connectivity(connectivity):
-    if connectivity == 6:
-        return ndi.generate_binary_structure(3, 1)
-    if connectivity == 18:
-        return ndi.generate_binary_structure(3, 2)
-    if connectivity == 26:
-        return ndi.generate_binary_structure(3, 3)
-    raise ValueError(f"Unsupported 3D connectivity: {connectivity}; expected 6, 18, or 26")
-
-
-def component_stats(mask, connectivity):
-    labels, count = ndi.label(mask, structure=structure_for_connectivity(connectivity))
-    if count == 0:
-        sizes = np.array([], dtype=np.int64)
-    else:
-        sizes = np.bincount(labels.ravel())[1:]
-    return labels, int(count), sizes
-
-
-def border_touching_labels(labels):
-    if labels.size == 0:
-        return np.array([], dtype=np.int64)
-    faces = [
-        labels[0, :, :],
-        labels[-1, :, :],
-        labels[:, 0, :],
-        labels[:, -1, :],
-        labels[:, :, 0],
-        labels[:, :, -1],
-    ]
-    values = np.unique(np.concatenate([face.ravel() for face in faces]))
-    return values[values != 0]
-
-
-def build_ambiguous_block_table():
-    ambiguous = np.zeros(256, dtype=bool)
-    mixed = np.zeros(256, dtype=bool)
-    local6 = structure_for_connectivity(6)
-    local26 = structure_for_connectivity(26)
-    for code in range(256):
-        values = np.array([(code >> bit) & 1 for bit in range(8)], dtype=bool)
-        block = values.reshape((2, 2, 2))
-        n = int(block.sum())
-        if n == 0 or n == 8:
-            continue
-        mixed[code] = True
-        _, n6 = ndi.label(block, structure=local6)
-        _, n26 = ndi.label(block, structure=local26)
-        ambiguous[code] = n26 == 1 and n6 > 1
-    return ambiguous, mixed
-
-
-AMBIGUOUS_BLOCK_TABLE, MIXED_BLOCK_TABLE = build_ambiguous_block_table()
-
-
-def count_local_ambiguous_blocks(mask):
-    mask = np.asarray(mask, dtype=np.uint8)
-    codes = np.zeros(tuple(dim - 1 for dim in mask.shape), dtype=np.uint8)
-    bit = 0
-    for dx in (0, 1):
-        for dy in (0, 1):
-            for dz in (0, 1):
-                codes |= mask[dx : dx + codes.shape[0], dy : dy + codes.shape[1], dz : dz + codes.shape[2]] << bit
-                bit += 1
-    return int(AMBIGUOUS_BLOCK_TABLE[codes].sum()), int(MIXED_BLOCK_TABLE[codes].sum())
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
 
 
 def apply_cleanup(mask, cfg):
     cleanup = cfg["cleanup"]
-    cleaned = mask.copy()
+    slab_thickness = int(cfg.get("slab_thickness", 64))
+    cleaned = np.array(mask, dtype=bool)
     actions = []
 
     if cleanup.get("keep_largest_material_component", False):
-        labels, count, sizes = component_stats(cleaned, 6)
-        if count > 1:
-            keep_label = int(np.argmax(sizes) + 1)
-            removed = int(cleaned.sum() - np.count_nonzero(labels == keep_label))
-            cleaned = labels == keep_label
+        components = label_components(cleaned, 6, slab_thickness=slab_thickness)
+        if components["count"] > 1:
+            drop = np.ones(components["count"], dtype=bool)
+            drop[int(np.argmax(components["sizes"]))] = False
+            removed = write_component_mask(components, drop, cleaned, fill=False)
             actions.append(f"keep_largest_material_component: removed_voxels={removed}")
         else:
             actions.append("keep_largest_material_component: no_action")
 
     min_material = int(cleanup.get("min_material_component_voxels", 0) or 0)
     if min_material > 0:
-        labels, count, sizes = component_stats(cleaned, 6)
-        remove_labels = np.where(sizes < min_material)[0] + 1
-        if len(remove_labels):
-            remove = np.isin(labels, remove_labels)
-            cleaned[remove] = False
-            actions.append(f"remove_small_material_components: threshold={min_material}, components={len(remove_labels)}, voxels={int(remove.sum())}")
+        components = label_components(cleaned, 6, slab_thickness=slab_thickness)
+        remove = components["sizes"] < min_material
+        if remove.any():
+            removed = write_component_mask(components, remove, cleaned, fill=False)
+            actions.append(f"remove_small_material_components: threshold={min_material}, components={int(remove.sum())}, voxels={removed}")
         else:
             actions.append(f"remove_small_material_components: threshold={min_material}, no_action")
 
     fill_max = int(cleanup.get("fill_pore_cavities_max_voxels", 0) or 0)
     if fill_max > 0:
-        pore_labels, count, sizes = component_stats(~cleaned, 6)
-        border = set(int(value) for value in border_touching_labels(pore_labels))
-        fill_labels = [index + 1 for index, size in enumerate(sizes) if size <= fill_max and (index + 1) not in border]
-        if fill_labels:
-            fill = np.isin(pore_labels, fill_labels)
-            cleaned[fill] = True
-            actions.append(f"fill_small_pore_cavities: threshold={fill_max}, components={len(fill_labels)}, voxels={int(fill.sum())}")
+        components = label_components(cleaned, 6, invert=True, slab_thickness=slab_thickness)
+        fill = (components["sizes"] <= fill_max) & ~components["border"]
+        if fill.any():
+            filled = write_component_mask(components, fill, cleaned, fill=True)
+            actions.append(f"fill_small_pore_cavities: threshold={fill_max}, components={int(fill.sum())}, voxels={filled}")
         else:
             actions.append(f"fill_small_pore_cavities: threshold={fill_max}, no_action")
 
@@ -166,27 +118,34 @@ def apply_cleanup(mask, cfg):
     return cleaned, actions
 
 
-def analyze(mask, cfg):
-    material = bool_mask(mask, cfg["material_value"])
-    pore = ~material
-    _, material_6_count, material_6_sizes = component_stats(material, 6)
-    _, material_26_count, material_26_sizes = component_stats(material, 26)
-    pore_6_labels, pore_6_count, pore_6_sizes = component_stats(pore, 6)
-    _, pore_26_count, pore_26_sizes = component_stats(pore, 26)
-
-    border_pores = set(int(value) for value in border_touching_labels(pore_6_labels))
-    enclosed_pore_components = [index + 1 for index in range(len(pore_6_sizes)) if (index + 1) not in border_pores]
-    enclosed_pore_voxels = int(sum(int(pore_6_sizes[index - 1]) for index in enclosed_pore_components))
-
-    material_ambiguous_blocks, mixed_blocks = count_local_ambiguous_blocks(material)
-    pore_ambiguous_blocks, _ = count_local_ambiguous_blocks(pore)
-
+def analyze(volume, cfg):
+    # Components are labelled slab by slab on the (memmapped) volume; no int32 label volume.
+    value = cfg["material_value"]
+    slab_thickness = int(cfg.get("slab_thickness", 64))
+    material_6 = label_components(volume, 6, value=value, slab_thickness=slab_thickness)
+    material_26 = label_components(volume, 26, value=value, slab_thickness=slab_thickness)
+    pore_6 = label_components(volume, 6, value=value, invert=True, slab_thickness=slab_thickness)
+    pore_26 = label_components(volume, 26, value=value, invert=True, slab_thickness=slab_thickness)
+    material_6_count, material_6_sizes = material_6["count"], material_6["sizes"]
+    material_26_count = material_26["count"]
+    pore_6_count, pore_6_sizes = pore_6["count"], pore_6["sizes"]
+    pore_26_count = pore_26["count"]
+
+    enclosed_pores = ~pore_6["border"]
+    enclosed_pore_voxels = int(pore_6_sizes[enclosed_pores].sum())
+
+    # All local metrics come from one streamed 256-bin histogram of 2x2x2 configurations.
+    workers = int(cfg.get("workers", 0) or 0) or available_cpus()
+    local = local_topology_metrics(configuration_histogram(volume, value=value, slab_thickness=slab_thickness, workers=workers))
+
+    total_voxels = int(np.prod(volume.shape))
+    material_voxels = int(material_6_sizes.sum())
     metrics = {
-        "shape": tuple(int(v) for v in material.shape),
-        "total_voxels": int(material.size),
-        "material_voxels": int(material.sum()),
-        "pore_voxels": int(pore.sum()),
-        "relative_density": float(material.mean()),
+        "shape": tuple(int(v) for v in volume.shape),
+        "total_voxels": total_voxels,
+        "material_voxels": material_voxels,
+        "pore_voxels": total_voxels - material_voxels,
+        "relative_density": float(material_voxels / total_voxels) if total_voxels else float("nan"),
         "material_components_6": material_6_count,
         "material_components_26": material_26_count,
         "material_components_joined_only_by_edge_or_corner": max(0, material_6_count - material_26_count),
@@ -195,11 +154,14 @@ def analyze(mask, cfg):
         "pore_components_6": pore_6_count,
         "pore_components_26": pore_26_count,
         "pore_components_joined_only_by_edge_or_corner": max(0, pore_6_count - pore_26_count),
-        "enclosed_pore_components_6": len(enclosed_pore_components),
+        "enclosed_pore_components_6": int(enclosed_pores.sum()),
         "enclosed_pore_voxels_6": enclosed_pore_voxels,
-        "mixed_2x2x2_blocks": mixed_blocks,
-        "material_ambiguous_2x2x2_blocks": material_ambiguous_blocks,
-        "pore_ambiguous_2x2x2_blocks": pore_ambiguous_blocks,
+        "mixed_2x2x2_blocks": local["mixed_2x2x2_blocks"],
+        "material_ambiguous_2x2x2_blocks": local["material_ambiguous_2x2x2_blocks"],
+        "pore_ambiguous_2x2x2_blocks": local["pore_ambiguous_2x2x2_blocks"],
+        "material_euler_number_6": local["euler_6"],
+        "material_euler_number_26": local["euler_26"],
+        "material_surface_area_crofton_voxel_faces": round(local["surface_area"], 3),
     }
     return metrics
 
@@ -249,6 +211,7 @@ def write_report(path, input_path, output_path, before, after, actions, cfg):
             "Interpretation:",
             "  material/pore components joined only by edge or corner indicate digital topology ambiguity.",
             "  ambiguous 2x2x2 blocks are likely sources of non-manifold extracted surfaces.",
+            "  euler number = components - tunnels + cavities; 6 and 26 differ where edge/corner contacts change topology.",
             "  small component removal and small cavity filling are conservative cleanup operations.",
             "  binary opening/closing is stronger and can change density and thin struts; use only after checking the report.",
             "",
@@ -271,7 +234,7 @@ def main():
     output_path = Path(args.output) if args.output else input_path.with_name(cfg["output_filename"])
     report_path = Path(args.report) if args.report else input_path.with_name(cfg["report_filename"])
 
-    volume = np.load(input_path)
+    volume = np.load(input_path, mmap_mode="r")
     before = analyze(volume, cfg)
     cleanup_enabled = bool(cfg["cleanup"].get("enabled", False)) or args.clean
     actions = []
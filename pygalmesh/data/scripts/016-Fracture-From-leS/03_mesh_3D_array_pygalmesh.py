@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import os
+import sys
 import json
+import hashlib
 import argparse
 import numpy as np
 import matplotlib.pyplot as plt
@@ -9,13 +11,16 @@ from datetime import datetime
 from skimage.transform import rescale
 import pygalmesh
 import traceback
-import tempfile
 import math
 import meshio
 from pathlib import Path
 from scipy import ndimage as ndi
 from skimage import measure
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from voxel_components import bounded_map  # noqa: E402
+
 
 def load_config(config_path):
     with open(config_path, "r") as file:
@@ -71,43 +76,362 @@ def build_signed_distance(mask):
     return inside_distance - outside_distance
 
 
-def extract_sdf_surface(mask, voxel_dim, params):
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def narrow_band_chunk_sdf(block, band, sdf_sigma_voxels, core):
+    # Abgeschnittene EDT auf einem Block samt Halo: innerhalb von `band` exakt,
+    # weil der Halo alle dafuer relevanten Phasengrenzen enthaelt.
+    if block.all():
+        sdf = np.full(block.shape, band, dtype=np.float32)
+    elif not block.any():
+        sdf = np.full(block.shape, -band, dtype=np.float32)
+    else:
+        sdf = ndi.distance_transform_edt(block).astype(np.float32)
+        sdf -= ndi.distance_transform_edt(~block).astype(np.float32)
+        np.clip(sdf, -band, band, out=sdf)
+    if sdf_sigma_voxels > 0.0:
+        sdf = ndi.gaussian_filter(sdf, sigma=sdf_sigma_voxels, output=np.float32)
+    return sdf[core]
+
+
+def build_narrow_band_sdf(mask, band, sdf_sigma_voxels, chunk_voxels=128, workers=1):
+    """
+    Signed Distance Field in float32, nur im Band |sdf| <= band exakt, ausserhalb
+    auf +-band begrenzt. Gerechnet wird in ueberlappenden Bloecken, deren Halo das
+    Band und den Gauss-Traeger (4 sigma) abdeckt; die Kerne ergeben daher genau
+    das geglaettete, begrenzte SDF des Gesamtvolumens.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    mask = np.asarray(mask, dtype=bool)
+    band = float(band)
+    halo = int(math.ceil(band)) + int(math.ceil(4.0 * sdf_sigma_voxels)) + 1
+    chunk_voxels = max(1, int(chunk_voxels))
+    sdf = np.empty(mask.shape, dtype=np.float32)
+
+    jobs = []
+    for start in np.ndindex(*(int(math.ceil(n / chunk_voxels)) for n in mask.shape)):
+        lo = [s * chunk_voxels for s in start]
+        hi = [min(l + chunk_voxels, n) for l, n in zip(lo, mask.shape)]
+        outer_lo = [max(0, l - halo) for l in lo]
+        outer_hi = [min(n, h + halo) for h, n in zip(hi, mask.shape)]
+        target = tuple(slice(l, h) for l, h in zip(lo, hi))
+        source = tuple(slice(l, h) for l, h in zip(outer_lo, outer_hi))
+        core = tuple(slice(l - ol, h - ol) for l, h, ol in zip(lo, hi, outer_lo))
+        jobs.append((target, source, core))
+
+    if workers <= 1 or len(jobs) == 1:
+        for target, source, core in jobs:
+            sdf[target] = narrow_band_chunk_sdf(mask[source], band, sdf_sigma_voxels, core)
+        return sdf
+
+    workers = min(workers, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bloecke erst beim Einreichen kopieren: hoechstens `workers` samt Halo unterwegs
+        results = bounded_map(
+            pool,
+            narrow_band_chunk_sdf,
+            ((np.ascontiguousarray(mask[source]), band, sdf_sigma_voxels, core)
+             for _, source, core in jobs),
+            workers,
+            ordered=False,
+        )
+        for i, values in results:
+            sdf[jobs[i][0]] = values
+    return sdf
+
+
+def build_smoothed_sdf(mask, params, min_band_voxels=0.0):
+    # min_band_voxels: Band mindestens so breit (graded_sizing braucht den Abstand
+    # bis zur Saettigung bei max_size_factor, siehe sizing_band_voxels).
     pad_width = int(params.get("pad_width", 1))
     sdf_sigma_voxels = float(params.get("sdf_sigma_voxels", 0.75))
-    level = float(params.get("level", 0.0))
-    step_size = int(params.get("marching_cubes_step_size", 1))
+    sdf_mode = str(params.get("sdf_mode", "full"))
 
     if pad_width > 0:
         mask = np.pad(mask, pad_width, mode="constant", constant_values=False)
+    if sdf_mode == "narrow_band":
+        level = float(params.get("level", 0.0))
+        band = float(params.get("sdf_band_voxels", 0.0) or 0.0)
+        if band <= 0.0:
+            # Glaettungstraeger plus Reserve: an der Isoflaeche identisch zum vollen SDF
+            band = abs(level) + 4.0 * sdf_sigma_voxels + 2.0
+        band = max(band, float(min_band_voxels))
+        workers = int(params.get("sdf_workers", 0) or 0)
+        if workers <= 0:
+            workers = available_cpus()
+        chunk_voxels = int(params.get("sdf_chunk_voxels", 128))
+        print(f"📏 Narrow-Band-SDF: Band {band:g} Voxel, Bloecke {chunk_voxels}^3, "
+              f"{workers} Prozesse (float32)")
+        sdf = build_narrow_band_sdf(mask, band, sdf_sigma_voxels, chunk_voxels, workers)
+        return sdf, pad_width
+    if sdf_mode != "full":
+        raise ValueError(f"Unbekannter sdf_mode {sdf_mode!r}; erwartet 'full' oder 'narrow_band'")
     sdf = build_signed_distance(mask)
     if sdf_sigma_voxels > 0.0:
         sdf = ndi.gaussian_filter(sdf, sigma=sdf_sigma_voxels)
+    return sdf, pad_width
+
 
-    verts, faces, normals, values = measure.marching_cubes(
-        sdf.astype(np.float32, copy=False),
+def marching_cubes_slab(slab, level, step_size):
+    # Index-Koordinaten der Scheibe; normals/values werden sofort verworfen.
+    if not (slab.min() <= level <= slab.max()):
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.int64)
+    verts, faces, _, _ = measure.marching_cubes(
+        slab,
         level=level,
-        spacing=(voxel_dim, voxel_dim, voxel_dim),
         method="lewiner",
         step_size=step_size,
         allow_degenerate=False,
     )
+    return verts, faces.astype(np.int64, copy=False)
+
+
+def tiled_marching_cubes(sdf, level, step_size=1, chunk_voxels=128, workers=1):
+    """
+    Marching Cubes in Scheiben entlang Achse 0, die sich in genau einer
+    Abtastebene ueberlappen. Jede Zelle gehoert zu genau einer Scheibe, die
+    Knoten auf der gemeinsamen Ebene entstehen in beiden Scheiben aus denselben
+    Abtastwerten und werden ueber ihre (y, z)-Koordinaten verschweisst — das
+    Ergebnis ist bis auf die Nummerierung das des monolithischen Aufrufs.
+    Rueckgabe in Index-Koordinaten (float64) und Dreiecke (int64).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    n = sdf.shape[0]
+    chunk = max(step_size, (max(1, int(chunk_voxels)) // step_size) * step_size)
+    bounds = list(range(0, n - 1, chunk)) + [n - 1]
+    if len(bounds) > 2 and bounds[-1] - bounds[-2] < step_size:
+        bounds.pop(-2)
+    slabs = list(zip(bounds[:-1], bounds[1:]))
+
+    def slab_data():
+        for lo, hi in slabs:
+            yield np.ascontiguousarray(sdf[lo : hi + 1], dtype=np.float32)
+
+    if workers <= 1 or len(slabs) == 1:
+        results = (marching_cubes_slab(data, level, step_size) for data in slab_data())
+        return weld_slabs(slabs, results)
+    workers = min(workers, len(slabs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # weld_slabs braucht die Scheiben in Reihenfolge; hoechstens `workers` unterwegs
+        results = bounded_map(
+            pool,
+            marching_cubes_slab,
+            ((data, level, step_size) for data in slab_data()),
+            workers,
+        )
+        return weld_slabs(slabs, (result for _, result in results))
+
+
+def weld_slabs(slabs, results):
+    vertex_blocks = []
+    face_blocks = []
+    offset = 0
+    seam = None  # (y, z)-Schluessel -> globaler Index der Knoten auf der oberen Ebene
+    for (lo, hi), (verts, faces) in zip(slabs, results):
+        verts = np.asarray(verts).reshape(-1, 3)
+        index = np.arange(len(verts), dtype=np.int64) + offset
+        new = np.ones(len(verts), dtype=bool)
+        if seam:
+            for i in np.flatnonzero(verts[:, 0] == 0.0):
+                match = seam.get(verts[i, 1:].tobytes())
+                if match is not None:
+                    index[i] = match
+                    new[i] = False
+            index[new] = offset + np.arange(int(new.sum()), dtype=np.int64)
+        kept = verts[new].astype(np.float64)
+        kept[:, 0] += lo
+        vertex_blocks.append(kept)
+        face_blocks.append(index[faces])
+        seam = {}
+        for i in np.flatnonzero(verts[:, 0] == float(hi - lo)):
+            seam.setdefault(verts[i, 1:].tobytes(), int(index[i]))
+        offset += int(new.sum())
+    vertices = np.concatenate(vertex_blocks) if vertex_blocks else np.empty((0, 3))
+    faces = np.concatenate(face_blocks) if face_blocks else np.empty((0, 3), dtype=np.int64)
+    return vertices, faces
+
+
+def coarse_sdf_samples(sdf, pad_width, shape, step):
+    """SDF-Werte (in Voxeln) auf mask[::step, ::step, ::step], ohne die Polsterung."""
+    core = tuple(slice(pad_width, pad_width + n, step) for n in shape)
+    return np.array(sdf[core], dtype=np.float32)
+
+
+def sizing_sdf_samples(mask, params, step):
+    """
+    SDF-Stichproben fuer graded_sizing ohne Marching Cubes: dasselbe geglaettete
+    SDF wie in extract_sdf_surface(..., sdf_step=step), also dieselben Werte.
+    """
+    sdf, pad_width = build_smoothed_sdf(mask, params, sizing_band_voxels(params))
+    samples = coarse_sdf_samples(sdf, pad_width, mask.shape, step)
+    del sdf
+    return samples
+
+
+def extract_sdf_surface(mask, voxel_dim, params, sdf_step=None):
+    """
+    Oberflaeche des geglaetteten SDF in Netzkoordinaten. Mit `sdf_step` kommen
+    zusaetzlich die SDF-Werte auf jedem sdf_step-ten Voxel zurueck (fuer
+    graded_sizing); im narrow_band-Modus wird das Band dafuer bis zur Saettigung
+    der Groessen verbreitert, die Isoflaeche bleibt dieselbe.
+    """
+    level = float(params.get("level", 0.0))
+    step_size = int(params.get("marching_cubes_step_size", 1))
+    workers = int(params.get("marching_cubes_workers", 1) or 0)
+
+    sdf, pad_width = build_smoothed_sdf(mask, params, sizing_band_voxels(params) if sdf_step else 0.0)
+    samples = None
+    if sdf_step:
+        samples = coarse_sdf_samples(sdf, pad_width, mask.shape, sdf_step)
+
+    if workers == 1:
+        verts, faces, _, _ = measure.marching_cubes(
+            sdf.astype(np.float32, copy=False),
+            level=level,
+            spacing=(voxel_dim, voxel_dim, voxel_dim),
+            method="lewiner",
+            step_size=step_size,
+            allow_degenerate=False,
+        )
+    else:
+        if workers <= 0:
+            workers = available_cpus()
+        chunk_voxels = int(params.get("marching_cubes_chunk_voxels", 128))
+        print(f"🧊 Marching Cubes in Scheiben zu {chunk_voxels} Voxeln, {workers} Prozesse")
+        verts, faces = tiled_marching_cubes(sdf, level, step_size, chunk_voxels, workers)
+        verts *= voxel_dim
+    del sdf
     if pad_width > 0:
         verts -= pad_width * voxel_dim
+    if sdf_step is not None:
+        return verts, faces, samples
     return verts, faces
 
 
-def surface_edge_counts(faces):
-    faces = np.asarray(faces, dtype=np.int64)
-    edges = np.sort(np.vstack((faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]])), axis=1)
-    uniq, inverse, counts = np.unique(edges, axis=0, return_inverse=True, return_counts=True)
-    return uniq, np.asarray(inverse).ravel(), counts
+# Ungerichtete Kante (a, b) als ein int64: min * 2^31 + max.
+EDGE_KEY_STRIDE = np.int64(1) << 31
+
+
+def face_edge_keys(faces):
+    """Kantenschluessel je Flaeche, Form (F, 3): Kanten (0,1), (1,2), (2,0)."""
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    following = np.roll(faces, -1, axis=1)
+    return np.minimum(faces, following) * EDGE_KEY_STRIDE + np.maximum(faces, following)
+
+
+def expand_ranges(starts, sizes):
+    """Alle Indizes start..start+size-1 der Bereiche hintereinander."""
+    sizes = np.asarray(sizes, dtype=np.int64)
+    if sizes.sum() == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return np.repeat(np.asarray(starts, dtype=np.int64), sizes) + np.arange(sizes.sum()) - offsets
+
+
+def duplicate_face_mask(faces):
+    # Wie np.unique(axis=0, return_index=True): das erste Vorkommen bleibt.
+    sorted_faces = np.sort(faces, axis=1)
+    order = np.lexsort(sorted_faces.T[::-1])
+    ordered = sorted_faces[order]
+    duplicate = np.zeros(len(faces), dtype=bool)
+    duplicate[order[1:]] = (ordered[1:] == ordered[:-1]).all(axis=1)
+    return duplicate
+
+
+def boundary_loops(half_edges):
+    """
+    Zerlegt gerichtete Randkanten (u -> v) in einfache Schleifen. An Knoten mit
+    mehreren Randkanten wird die Schleife beim Wiederbesuch abgetrennt; Kanten,
+    die sich nicht schliessen (inkonsistente Orientierung), bleiben uebrig.
+    """
+    outgoing = {}
+    for u, v in half_edges:
+        outgoing.setdefault(u, []).append(v)
+    loops = []
+    while outgoing:
+        path = [next(iter(outgoing))]
+        position = {path[0]: 0}
+        while True:
+            targets = outgoing.get(path[-1])
+            if not targets:
+                break
+            target = targets.pop()
+            if not targets:
+                del outgoing[path[-1]]
+            if target in position:
+                start = position[target]
+                if len(path) - start >= 3:
+                    loops.append(path[start:])
+                for vertex in path[start + 1:]:
+                    del position[vertex]
+                del path[start + 1:]
+            else:
+                position[target] = len(path)
+                path.append(target)
+    return loops
+
+
+def triangulate_loops(loops, positions, first_new_vertex, max_loop_vertices=0):
+    """
+    Schliesst jede Schleife: Dreiecke/Vierecke direkt, groessere Loecher als
+    Faecher um einen neuen Schwerpunktknoten. Die Schleifen sind so orientiert,
+    dass die neuen Flaechen zum Rest der Oberflaeche passen. Offen bleiben
+    Schleifen mit mehr als `max_loop_vertices` Knoten (0 = ohne Grenze) und
+    Flicken, von denen ein Dreieck gegen die Schleifennormale (Newell) kippt -
+    bei grossen oder stark gekruemmten Loechern falten sich Faecher sonst um.
+    Rueckgabe: neue Flaechen, neue Knoten, Zahl der offen gelassenen Schleifen.
+    """
+    new_faces = []
+    new_vertices = []
+    left_open = 0
+    for loop in loops:
+        if max_loop_vertices and len(loop) > max_loop_vertices:
+            left_open += 1
+            continue
+        corners = positions(np.asarray(loop))
+        if len(loop) == 3:
+            patch = np.array([[0, 1, 2]])
+        elif len(loop) == 4:
+            patch = np.array([[0, 1, 2], [0, 2, 3]])
+        else:
+            corners = np.vstack((corners, corners.mean(axis=0)))
+            patch = np.array([[i, (i + 1) % len(loop), len(loop)] for i in range(len(loop))])
+        normal = np.cross(corners[: len(loop)], np.roll(corners[: len(loop)], -1, axis=0)).sum(axis=0)
+        triangles = corners[patch]
+        face_normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        if np.any(face_normals @ normal <= 0.0):
+            left_open += 1
+            continue
+        ids = np.asarray(loop + ([first_new_vertex + len(new_vertices)] if len(loop) > 4 else []))
+        if len(loop) > 4:
+            new_vertices.append(corners[-1])
+        new_faces.extend(ids[patch].tolist())
+    return (
+        np.asarray(new_faces, dtype=np.int64).reshape(-1, 3),
+        np.asarray(new_vertices, dtype=float).reshape(-1, 3),
+        left_open,
+    )
 
 
 def repair_nonmanifold_surface(mesh, params):
     """
     Entfernt doppelte Flaechen und loest nicht-mannigfaltige Kanten auf, indem die
-    dort anliegenden Flaechen entfernt und die entstehenden Loecher geschlossen
-    werden. Greift nur, wenn es solche Defekte gibt.
+    dort anliegenden Flaechen entfernt und die entstehenden Loecher - nur mit
+    `fill_holes` - geschlossen werden (triangulate_loops). Greift nur, wenn es
+    solche Defekte gibt; danach richten fix_winding/fix_normals die Oberflaeche aus.
+
+    Die Kantenzaehlung wird einmal fuer die ganze Oberflaeche aufgebaut und danach
+    nur fuer die ausgeschnittenen bzw. neu eingefuegten Flaechen fortgeschrieben;
+    geprueft werden in jeder weiteren Runde nur die Kanten der neuen Flaechen.
+    Der Aufwand je Runde haengt damit von der Zahl der Defekte ab, nicht von der
+    Groesse der Oberflaeche.
     """
     import trimesh
 
@@ -116,72 +440,171 @@ def repair_nonmanifold_surface(mesh, params):
         "surface_repair_duplicate_faces_removed": 0,
         "surface_repair_faces_removed": 0,
         "surface_repair_iterations": 0,
+        "surface_repair_loops_left_open": 0,
     }
     if not info["surface_repair_enabled"]:
         return mesh, info
     max_iterations = int(params.get("repair_nonmanifold_iterations", 5) or 0)
+    one_ring = bool(params.get("repair_nonmanifold_one_ring", True))
+    fill_holes = bool(params.get("fill_holes", True))
+    max_loop_vertices = int(params.get("repair_nonmanifold_max_loop_vertices", 64) or 0)
+
+    vertices = np.asarray(mesh.vertices, dtype=float)
+    faces = np.asarray(mesh.faces, dtype=np.int64)
+    face_count = len(faces)
+    if face_count == 0:
+        return mesh, info
 
-    def verdict(m):
-        _, _, c = surface_edge_counts(m.faces)
-        return (int((c == 1).sum()), int((c > 2).sum()))
+    # Kantentabelle: sortierte Schluessel, Zaehler, und ueber `order` die Flaechen je Kante.
+    keys = face_edge_keys(faces).ravel()
+    order = np.argsort(keys, kind="stable")
+    edge_keys, edge_start, edge_size = np.unique(keys[order], return_index=True, return_counts=True)
+    edge_count = edge_size.copy()
+    extra_count = {}
+    del keys
+    # Knoten -> Flaechen fuer den Sternbereich
+    vertex_order = np.argsort(faces.ravel(), kind="stable")
+    vertex_sorted = faces.ravel()[vertex_order]
+
+    alive = np.ones(face_count, dtype=bool)
+    added = np.zeros((0, 3), dtype=np.int64)
+    added_alive = np.zeros(0, dtype=bool)
+    added_vertices = []
+
+    def edge_slots(query):
+        slot = np.minimum(np.searchsorted(edge_keys, query), len(edge_keys) - 1)
+        return slot, edge_keys[slot] == query
+
+    def update_counts(query, delta):
+        slot, found = edge_slots(query)
+        np.add.at(edge_count, slot[found], delta)
+        for key in query[~found].tolist():
+            extra_count[key] = extra_count.get(key, 0) + delta
+
+    def counts_of(query):
+        slot, found = edge_slots(query)
+        result = np.zeros(len(query), dtype=np.int64)
+        result[found] = edge_count[slot[found]]
+        result[~found] = [extra_count.get(key, 0) for key in query[~found].tolist()]
+        return result
+
+    def faces_on_edges(query):
+        slot, found = edge_slots(query)
+        slot = slot[found]
+        rows = order[expand_ranges(edge_start[slot], edge_size[slot])] // 3
+        rows = np.unique(rows[alive[rows]])
+        added_rows = np.flatnonzero(added_alive & np.isin(face_edge_keys(added), query).any(axis=1))
+        return rows, added_rows
+
+    def faces_on_vertices(query):
+        lo = np.searchsorted(vertex_sorted, query, side="left")
+        hi = np.searchsorted(vertex_sorted, query, side="right")
+        rows = vertex_order[expand_ranges(lo, hi - lo)] // 3
+        rows = np.unique(rows[alive[rows]])
+        added_rows = np.flatnonzero(added_alive & np.isin(added, query).any(axis=1))
+        return rows, added_rows
+
+    def positions(ids):
+        if not added_vertices:
+            return vertices[ids]
+        extra = np.vstack(added_vertices)
+        return np.where((ids < len(vertices))[:, None],
+                        vertices[np.minimum(ids, len(vertices) - 1)],
+                        extra[np.maximum(ids - len(vertices), 0)])
+
+    def verdict():
+        extra = np.fromiter(extra_count.values(), dtype=np.int64, count=len(extra_count))
+        return (
+            int((edge_count == 1).sum() + (extra == 1).sum()),
+            int((edge_count > 2).sum() + (extra > 2).sum()),
+        )
 
-    before = verdict(mesh)
-    original = mesh.copy()
+    before = verdict()
 
-    faces = np.asarray(mesh.faces, dtype=np.int64)
-    _, first_index, counts = np.unique(np.sort(faces, axis=1), axis=0,
-                                       return_index=True, return_counts=True)
-    if counts.max(initial=1) > 1:
-        keep = np.zeros(len(faces), dtype=bool)
-        keep[first_index] = True
-        info["surface_repair_duplicate_faces_removed"] = int((~keep).sum())
-        mesh.update_faces(keep)
+    duplicate = duplicate_face_mask(faces)
+    if duplicate.any():
+        info["surface_repair_duplicate_faces_removed"] = int(duplicate.sum())
+        alive[duplicate] = False
+        update_counts(face_edge_keys(faces[duplicate]).ravel(), -1)
 
+    bad_edges = edge_keys[edge_count > 2]
     for iteration in range(max_iterations):
-        faces = np.asarray(mesh.faces, dtype=np.int64)
-        if len(faces) == 0:
-            break
-        _, inverse, counts = surface_edge_counts(faces)
-        bad_edges = np.flatnonzero(counts > 2)
         if bad_edges.size == 0:
             break
-        bad_rows = np.flatnonzero(np.isin(inverse, bad_edges))
-        bad_faces = np.unique(bad_rows % len(faces))
-        if iteration > 0 or bool(params.get("repair_nonmanifold_one_ring", True)):
+        rows, added_rows = faces_on_edges(bad_edges)
+        if iteration > 0 or one_ring:
             # Ganzer Sternbereich der beteiligten Knoten: sonst bleibt am Pinch
-            # eine Acht-foermige Lochberandung stehen, die fill_holes nicht schliesst.
-            bad_vertices = np.unique(faces[bad_faces].ravel())
-            bad_faces = np.unique(np.flatnonzero(np.isin(faces, bad_vertices).any(axis=1)))
-        keep = np.ones(len(faces), dtype=bool)
-        keep[bad_faces] = False
-        info["surface_repair_faces_removed"] += int(bad_faces.size)
+            # eine Acht-foermige Lochberandung stehen, die sich nicht schliessen laesst.
+            ring = np.unique(np.concatenate((faces[rows].ravel(), added[added_rows].ravel())))
+            rows, added_rows = faces_on_vertices(ring)
+        removed = np.vstack((faces[rows], added[added_rows]))
+        if len(removed) == 0:
+            break
+        alive[rows] = False
+        added_alive[added_rows] = False
+        removed_keys = face_edge_keys(removed)
+        update_counts(removed_keys.ravel(), -1)
+        info["surface_repair_faces_removed"] += int(len(removed))
         info["surface_repair_iterations"] = iteration + 1
-        mesh.update_faces(keep)
-        mesh.remove_unreferenced_vertices()
-        if params.get("fill_holes", True):
-            trimesh.repair.fill_holes(mesh)
-        trimesh.repair.fix_winding(mesh)
-        trimesh.repair.fix_normals(mesh)
-        mesh.merge_vertices()
+
+        # Lochrand: Kanten der entfernten Flaechen, an denen genau eine Flaeche bleibt.
+        # Die Randkante wird gegen die Richtung dieser Flaeche durchlaufen.
+        rim = np.unique(removed_keys.ravel())
+        rim = rim[counts_of(rim) == 1]
+        rim_rows, rim_added_rows = faces_on_edges(rim)
+        rim_faces = np.vstack((faces[rim_rows], added[rim_added_rows]))
+        rim_mask = np.isin(face_edge_keys(rim_faces), rim)
+        following = np.roll(rim_faces, -1, axis=1)
+        half_edges = zip(following[rim_mask].tolist(), rim_faces[rim_mask].tolist())
+
+        if not fill_holes:
+            # Wie fill_holes = false vor der Reparatur: das Loch bleibt offen.
+            bad_edges = np.zeros(0, dtype=np.int64)
+            continue
+        first_new_vertex = len(vertices) + sum(len(block) for block in added_vertices)
+        new_faces, new_vertices, left_open = triangulate_loops(
+            boundary_loops(half_edges), positions, first_new_vertex, max_loop_vertices)
+        info["surface_repair_loops_left_open"] += left_open
+        if len(new_vertices):
+            added_vertices.append(new_vertices)
+        added = np.vstack((added, new_faces))
+        added_alive = np.concatenate((added_alive, np.ones(len(new_faces), dtype=bool)))
+        new_keys = np.unique(face_edge_keys(new_faces).ravel())
+        update_counts(face_edge_keys(new_faces).ravel(), 1)
+        bad_edges = new_keys[counts_of(new_keys) > 2]
+
+    after = verdict()
+    info["surface_repair_open_edges_before"], info["surface_repair_nonmanifold_before"] = before
+    info["surface_repair_open_edges_after"], info["surface_repair_nonmanifold_after"] = after
 
     max_faces = int(params.get("repair_nonmanifold_max_faces", 0) or 0)
     if max_faces <= 0:
-        max_faces = max(1000, int(0.001 * len(original.faces)))
+        max_faces = max(1000, int(0.001 * face_count))
     if info["surface_repair_faces_removed"] > max_faces:
         info["surface_repair_reverted"] = True
         info["surface_repair_abort_reason"] = (
             f"mehr als {max_faces} Flaechen betroffen — Defekt ist nicht lokal")
-        return original, info
+        return mesh, info
 
-    after = verdict(mesh)
-    info["surface_repair_open_edges_before"], info["surface_repair_nonmanifold_before"] = before
-    info["surface_repair_open_edges_after"], info["surface_repair_nonmanifold_after"] = after
     # Nur uebernehmen, wenn die Reparatur die Oberflaeche nicht verschlechtert hat.
     if sum(after) > sum(before):
         info["surface_repair_reverted"] = True
-        return original, info
+        return mesh, info
     info["surface_repair_reverted"] = False
-    return mesh, info
+    if not duplicate.any() and info["surface_repair_faces_removed"] == 0:
+        return mesh, info
+
+    repaired = trimesh.Trimesh(
+        vertices=np.vstack([vertices] + added_vertices),
+        faces=np.vstack((faces[alive], added[added_alive])),
+        process=False,
+    )
+    repaired.remove_unreferenced_vertices()
+    # Die Flicken sind schon passend orientiert; wie vor der Reparatur dennoch global
+    # ausrichten, falls Schleifen an inkonsistent orientierten Stellen lagen.
+    trimesh.repair.fix_winding(repaired)
+    trimesh.repair.fix_normals(repaired)
+    return repaired, info
 
 
 def repair_surface(vertices, faces, params):
@@ -243,22 +666,62 @@ def repair_surface(vertices, faces, params):
         "surface_watertight": bool(mesh.is_watertight),
         "surface_winding_consistent": bool(mesh.is_winding_consistent),
         "surface_euler_number": int(mesh.euler_number),
-        "surface_components": int(len(mesh.split(only_watertight=False))),
+        "surface_components": surface_components(mesh.faces)[0],
         **nonmanifold_info,
         **component_filter_info,
         **decimation_info,
     }
 
 
+def surface_components(faces):
+    """
+    Flaechenkomponenten wie trimesh.graph.split(only_watertight=False): zwei
+    Flaechen haengen zusammen, wenn sie eine Kante teilen, die genau zweimal
+    vorkommt. Gibt (Anzahl, Label je Flaeche, geschlossen je Komponente) zurueck;
+    geschlossen heisst wie bei Trimesh.is_watertight, dass jede Kante der
+    Komponente innerhalb der Komponente genau zweimal vorkommt.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    keys = face_edge_keys(faces).ravel()
+    order = np.argsort(keys, kind="stable")
+    _, start, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    del keys
+
+    shared = start[counts == 2]
+    first, second = order[shared] // 3, order[shared + 1] // 3
+    linked = first != second
+    graph = coo_matrix(
+        (np.ones(int(linked.sum()), dtype=np.int8), (first[linked], second[linked])),
+        shape=(len(faces), len(faces)),
+    )
+    component_count, labels = connected_components(graph, directed=False)
+
+    # Offene Kanten machen ihre Komponente offen. An Kanten mit drei oder mehr
+    # Flaechen zaehlt, wie oft sie in jeder einzelnen Komponente vorkommen.
+    closed = np.ones(component_count, dtype=bool)
+    closed[labels[order[start[counts == 1]] // 3]] = False
+    crowded = counts > 2
+    if crowded.any():
+        rows = order[expand_ranges(start[crowded], counts[crowded])]
+        edge = np.repeat(np.arange(int(crowded.sum()), dtype=np.int64), counts[crowded])
+        pair, pair_count = np.unique(labels[rows // 3] * int(crowded.sum()) + edge, return_counts=True)
+        closed[pair[pair_count != 2] // int(crowded.sum())] = False
+    return int(component_count), labels, closed
+
+
 def filter_surface_components(mesh, params):
     import trimesh
 
     min_faces = int(params.get("min_surface_component_faces", 0) or 0)
     min_area = float(params.get("min_surface_component_area", 0.0) or 0.0)
     min_volume = float(params.get("min_surface_component_abs_volume", 0.0) or 0.0)
-    components = list(mesh.split(only_watertight=False))
+    faces = np.asarray(mesh.faces, dtype=np.int64)
+    component_count, labels, closed = surface_components(faces)
     info = {
-        "surface_components_before_filter": int(len(components)),
+        "surface_components_before_filter": component_count,
         "surface_component_min_faces": min_faces,
         "surface_component_min_area": min_area,
         "surface_component_min_abs_volume": min_volume,
@@ -268,47 +731,51 @@ def filter_surface_components(mesh, params):
         "surface_component_abs_volume_removed_by_filter": 0.0,
     }
 
-    if not components or (min_faces <= 0 and min_area <= 0.0 and min_volume <= 0.0):
+    if component_count == 0 or (min_faces <= 0 and min_area <= 0.0 and min_volume <= 0.0):
         info["mesh"] = mesh
         return info
 
-    kept = []
-    removed_faces = 0
-    removed_area = 0.0
-    removed_volume = 0.0
-    for component in components:
-        face_count = len(component.faces)
-        area = float(component.area)
-        abs_volume = abs(float(component.volume)) if component.is_watertight else 0.0
-        remove = (
-            (min_faces > 0 and face_count < min_faces)
-            or (min_area > 0.0 and area < min_area)
-            or (min_volume > 0.0 and abs_volume < min_volume)
-        )
-        if remove:
-            removed_faces += int(face_count)
-            removed_area += area
-            removed_volume += abs_volume
-        else:
-            kept.append(component)
-
-    if not kept:
+    # Kennzahlen aller Komponenten auf einmal aus den Labels, ohne Teilnetze zu bauen.
+    triangles = np.asarray(mesh.vertices, dtype=np.float64)[faces]
+    crosses = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    face_count = np.bincount(labels, minlength=component_count)
+    area = np.bincount(labels, weights=np.linalg.norm(crosses, axis=1) / 2.0, minlength=component_count)
+    # Divergenzsatz wie trimesh.triangles.mass_properties: V = sum(n_x * (x0 + x1 + x2)) / 6
+    volume = np.bincount(labels, weights=crosses[:, 0] * triangles[:, :, 0].sum(axis=1),
+                         minlength=component_count) / 6.0
+    abs_volume = np.where(closed, np.abs(volume), 0.0)
+    del triangles, crosses
+
+    remove = np.zeros(component_count, dtype=bool)
+    if min_faces > 0:
+        remove |= face_count < min_faces
+    if min_area > 0.0:
+        remove |= area < min_area
+    if min_volume > 0.0:
+        remove |= abs_volume < min_volume
+
+    if remove.all():
         raise RuntimeError("Surface component filter removed all components")
 
-    if len(kept) == len(components):
+    if not remove.any():
         filtered = mesh
     else:
-        filtered = trimesh.util.concatenate(kept)
+        filtered = trimesh.Trimesh(
+            vertices=np.asarray(mesh.vertices),
+            faces=faces[~remove[labels]],
+            process=False,
+        )
+        filtered.remove_unreferenced_vertices()
         filtered.merge_vertices()
         trimesh.repair.fix_winding(filtered)
         trimesh.repair.fix_normals(filtered)
 
     info.update({
         "mesh": filtered,
-        "surface_components_removed_by_filter": int(len(components) - len(kept)),
-        "surface_component_faces_removed_by_filter": int(removed_faces),
-        "surface_component_area_removed_by_filter": removed_area,
-        "surface_component_abs_volume_removed_by_filter": removed_volume,
+        "surface_components_removed_by_filter": int(remove.sum()),
+        "surface_component_faces_removed_by_filter": int(face_count[remove].sum()),
+        "surface_component_area_removed_by_filter": float(area[remove].sum()),
+        "surface_component_abs_volume_removed_by_filter": float(abs_volume[remove].sum()),
     })
     return info
 
@@ -393,6 +860,162 @@ def write_off_surface(path, vertices, faces):
             handle.write(f"3 {int(face[0])} {int(face[1])} {int(face[2])}\n")
 
 
+# Hochzaehlen, wenn sich Marching Cubes oder die Reparatur so aendern, dass bei
+# gleichen Parametern eine andere Oberflaeche entsteht.
+SURFACE_CACHE_VERSION = 2
+
+# Parameter, von denen die reparierte Oberflaeche abhaengt. Vernetzer-Optionen,
+# Prozesszahlen und Blockgroessen (gleiches Ergebnis) gehoeren nicht dazu.
+SURFACE_CACHE_KEYS = (
+    "pad_width",
+    "sdf_sigma_voxels",
+    "sdf_mode",
+    "sdf_band_voxels",
+    "level",
+    "marching_cubes_step_size",
+    "fill_holes",
+    "repair_nonmanifold",
+    "repair_nonmanifold_iterations",
+    "repair_nonmanifold_one_ring",
+    "repair_nonmanifold_max_faces",
+    "repair_nonmanifold_max_loop_vertices",
+    "min_surface_component_faces",
+    "min_surface_component_area",
+    "min_surface_component_abs_volume",
+    "surface_decimation_reduction",
+    "surface_decimation_preserve_topology",
+    "surface_decimation_splitting",
+    "surface_decimation_boundary_vertex_deletion",
+)
+
+
+def surface_cache_dir(params, input_path):
+    if not bool(params.get("surface_cache", True)):
+        return None
+    cache_dir = params.get("surface_cache_dir")
+    if not cache_dir:
+        # Neben dem Eingabevolumen: Varianten desselben Volumens teilen sich den Cache.
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(input_path)), "sdf_surface_cache")
+    return cache_dir
+
+
+def surface_cache_key(mask, voxel_dim, params):
+    """
+    SHA-256 ueber Maske (bitgepackt), Voxelgroesse, SURFACE_CACHE_KEYS und
+    SURFACE_CACHE_VERSION. Kommentare oder Vernetzer-Code im Skript und andere
+    Prozess-/Blockzahlen verwerfen den Cache damit nicht.
+    """
+    mask = np.ascontiguousarray(mask, dtype=bool)
+    surface_params = {key: params[key] for key in SURFACE_CACHE_KEYS if key in params}
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {
+            "version": SURFACE_CACHE_VERSION,
+            "shape": list(mask.shape),
+            "voxel_dim": float(voxel_dim),
+            "params": surface_params,
+        },
+        sort_keys=True,
+        default=str,
+    ).encode())
+    digest.update(np.packbits(mask).tobytes())
+    return digest.hexdigest()
+
+
+def sdf_samples_entry(params, step):
+    # Name der Stichproben im Cache-Eintrag. Das narrow_band-SDF haengt ueber
+    # sizing_band_voxels auch von graded_sizing ab, das nicht im Schluessel steht.
+    if str(params.get("sdf_mode", "full")) == "narrow_band":
+        return f"sdf_samples_{int(step)}_band{sizing_band_voxels(params):g}"
+    return f"sdf_samples_{int(step)}"
+
+
+def save_cached_surface(path, vertices, faces, info, sdf_samples=None):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    face_dtype = np.int32 if len(vertices) <= np.iinfo(np.int32).max else np.int64
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Erst in eine Prozess-eigene Datei, dann umbenennen: parallele Sweep-Varianten
+    # lesen nie eine halb geschriebene Datei.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        np.savez(
+            handle,
+            vertices=vertices,
+            faces=np.asarray(faces).astype(face_dtype),
+            info=np.array(json.dumps(info)),
+            **(sdf_samples or {}),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_cached_surface(path):
+    with np.load(path, allow_pickle=False) as data:
+        sdf_samples = {name: data[name] for name in data.files if name.startswith("sdf_samples_")}
+        return (data["vertices"], data["faces"].astype(np.int64), json.loads(str(data["info"])),
+                sdf_samples)
+
+
+def repaired_sdf_surface(mask, voxel_dim, params, cache_dir=None, sdf_step=None):
+    """
+    Marching Cubes + Reparatur + Kantentopologie, mit Cache: bei gleichem Schluessel
+    kommen Oberflaeche und Audit-Werte aus <cache_dir>/<schluessel>.npz. Mit
+    `sdf_step` zusaetzlich die SDF-Stichproben aus extract_sdf_surface; sie liegen
+    mit im Cache-Eintrag, ein Treffer liefert also dasselbe Groessenfeld wie ein
+    kalter Lauf. Fehlen sie fuer diesen Schritt, werden sie aus demselben SDF
+    nachgerechnet und ergaenzt.
+    """
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, surface_cache_key(mask, voxel_dim, params) + ".npz")
+        if os.path.exists(cache_path):
+            try:
+                vertices, faces, surface_info, cached_samples = load_cached_surface(cache_path)
+            except (OSError, ValueError, KeyError) as exc:
+                print(f"⚠️ Oberflaechen-Cache unlesbar, rechne neu: {cache_path} ({exc})")
+            else:
+                print(f"♻️ Reparierte SDF-Oberflaeche aus dem Cache: {cache_path}")
+                samples = None
+                if sdf_step:
+                    entry = sdf_samples_entry(params, sdf_step)
+                    samples = cached_samples.get(entry)
+                    if samples is None:
+                        print(f"SDF-Stichproben fuer Schritt {sdf_step} fehlen im Cache, rechne sie nach")
+                        samples = sizing_sdf_samples(mask, params, sdf_step)
+                        cached_samples[entry] = samples
+                        save_cached_surface(cache_path, vertices, faces, surface_info, cached_samples)
+                surface_info.update({"surface_cache_path": cache_path, "surface_cache_hit": True})
+                if sdf_step is not None:
+                    return vertices, faces, surface_info, samples
+                return vertices, faces, surface_info
+
+    vertices, faces, *samples = extract_sdf_surface(mask, voxel_dim, params, sdf_step)
+    samples = samples[0] if samples else None
+    vertices, faces, surface_info = repair_surface(vertices, faces, params)
+    surface_info.update(surface_edge_topology(faces))
+    if cache_path:
+        cached_samples = {sdf_samples_entry(params, sdf_step): samples} if samples is not None else None
+        save_cached_surface(cache_path, vertices, faces, surface_info, cached_samples)
+        print(f"Reparierte SDF-Oberflaeche im Cache abgelegt: {cache_path}")
+    surface_info.update({"surface_cache_path": cache_path, "surface_cache_hit": False})
+    if sdf_step is not None:
+        return vertices, faces, surface_info, samples
+    return vertices, faces, surface_info
+
+
+def pygalmesh_n_threads(params):
+    # Threads fuer die CGAL-Verfeinerung (pygalmesh mit TBB gebaut), Bedeutung wie in
+    # pygalmesh: 0 = alle Kerne, 1 = sequentiell, N = N Threads. null/fehlend:
+    # SLURM_CPUS_PER_TASK des Job-Steps, ausserhalb von SLURM sequentiell. Ohne TBB
+    # rechnet pygalmesh immer sequentiell.
+    value = params.get("n_threads")
+    if value is None:
+        value = os.environ.get("SLURM_CPUS_PER_TASK") or 1
+    n_threads = int(value)
+    if n_threads < 0:
+        raise ValueError(f"n_threads must be >= 0 (0 = all cores), got {value}")
+    return n_threads
+
+
 def pygalmesh_kwargs_from_params(params, voxel_dim):
     max_element_size_factor = params.get("max_element_size_factor", 1.0)
     max_facet_distance_factor = params.get("max_facet_distance_factor", 0.1)
@@ -413,6 +1036,7 @@ def pygalmesh_kwargs_from_params(params, voxel_dim):
         "seed": int(params.get("seed", 0)),
         "exude_time_limit": params.get("exude_time_limit", 0.0),
         "exude_sliver_bound": params.get("exude_sliver_bound", 0.0),
+        "n_threads": pygalmesh_n_threads(params),
     }
 
 
@@ -427,7 +1051,208 @@ def pygalmesh_metadata_from_params(params, voxel_dim):
     }
 
 
-def write_sdf_pygalmesh_mesh(vertices, faces, mesh_output_path, voxel_dim, params):
+GRADED_SIZING_DEFAULTS = {
+    "enabled": False,
+    "min_size_factor": None,
+    "max_size_factor": None,
+    "gradation": 0.5,
+    "grid_step_voxels": 2,
+}
+
+CRACK_BAND_SIZING_DEFAULTS = {
+    "enabled": False,
+    "axis": "y",
+    "center_fraction": 0.5,
+    "half_width_factor": None,
+    "size_factor": None,
+    "gradation": 0.5,
+    "grid_step_voxels": 2,
+}
+
+
+def sizing_config(pygalmesh_params, key, defaults):
+    cfg = dict(defaults)
+    cfg.update(pygalmesh_params.get(key) or {})
+    return cfg
+
+
+def graded_size_factors(cfg, pygalmesh_params):
+    min_factor = float(cfg["min_size_factor"] or pygalmesh_params.get("max_element_size_factor", 1.0))
+    max_factor = float(cfg["max_size_factor"] or 4.0 * min_factor)
+    gradation = float(cfg["gradation"])
+    if max_factor < min_factor:
+        raise ValueError(f"graded_sizing: max_size_factor {max_factor} < min_size_factor {min_factor}")
+    if gradation <= 0.0:
+        raise ValueError(f"graded_sizing: gradation must be positive, got {gradation}")
+    return min_factor, max_factor, gradation
+
+
+def graded_sizes(sdf_samples, step, voxel_dim, cfg, pygalmesh_params):
+    """
+    Groessen auf dem Grobgitter: an der Materialoberflaeche min_size_factor * dx,
+    nach innen (und aussen) um `gradation` je Laengeneinheit Abstand wachsend,
+    begrenzt auf max_size_factor * dx. `sdf_samples` ist das SDF (in Voxeln) auf
+    dem Grobgitter; der Abstand ist um einen Gitterschritt zur Oberflaeche hin
+    verschoben, damit die Vergroeberung nie naeher an die Oberflaeche rueckt als
+    eingestellt.
+    """
+    min_factor, max_factor, gradation = graded_size_factors(cfg, pygalmesh_params)
+    distance = np.maximum(np.abs(sdf_samples) - step, 0.0) * voxel_dim
+    sizes = np.minimum(min_factor * voxel_dim + gradation * distance, max_factor * voxel_dim)
+    del distance
+    return sizes, {
+        "enabled": True,
+        "min_size_factor": min_factor,
+        "max_size_factor": max_factor,
+        "gradation": gradation,
+        "min_size": min_factor * voxel_dim,
+        "max_size": max_factor * voxel_dim,
+    }
+
+
+def crack_band_sizes(mask, shape, step, voxel_dim, cfg):
+    """
+    Groessen entlang der Normalen der erwarteten Rissebene: innerhalb von
+    +-half_width_factor * dx um die Ebene size_factor * dx, ausserhalb um
+    `gradation` je Laengeneinheit wachsend. Die Ebene liegt bei center_fraction
+    der Materialausdehnung entlang `axis` (0.5 = Mittelebene, wie
+    crack_tip_start_location_y in pfmfrac_function.py); 04 skaliert die Box
+    linear, der Anteil bleibt also erhalten. Wie bei graded_sizing ist der
+    Uebergang um einen Gitterschritt nach aussen verschoben. Gibt ein Array zurueck,
+    das gegen `shape` broadcastet.
+    """
+    axis = "xyz".index(str(cfg["axis"]).lower())
+    if cfg["size_factor"] is None or cfg["half_width_factor"] is None:
+        raise ValueError("crack_band_sizing: size_factor and half_width_factor are required")
+    size = float(cfg["size_factor"]) * voxel_dim
+    half_width = float(cfg["half_width_factor"]) * voxel_dim
+    gradation = float(cfg["gradation"])
+    fraction = float(cfg["center_fraction"])
+    if size <= 0.0 or half_width < 0.0:
+        raise ValueError(f"crack_band_sizing: invalid size_factor {cfg['size_factor']} "
+                         f"or half_width_factor {cfg['half_width_factor']}")
+    if gradation <= 0.0:
+        raise ValueError(f"crack_band_sizing: gradation must be positive, got {gradation}")
+
+    other_axes = tuple(index for index in range(3) if index != axis)
+    occupied = np.flatnonzero(np.asarray(mask, dtype=bool).any(axis=other_axes))
+    if occupied.size == 0:
+        raise ValueError("crack_band_sizing: mask contains no material")
+    low, high = float(occupied[0]), float(occupied[-1])
+    center = (low + fraction * (high - low)) * voxel_dim
+
+    coordinate = np.arange(shape[axis]) * (step * voxel_dim)
+    distance = np.maximum(np.abs(coordinate - center) - half_width - step * voxel_dim, 0.0)
+    profile_shape = [1, 1, 1]
+    profile_shape[axis] = shape[axis]
+    return (size + gradation * distance).reshape(profile_shape), {
+        "enabled": True,
+        "axis": "xyz"[axis],
+        "center_fraction": fraction,
+        "center": center,
+        "half_width": half_width,
+        "size_factor": float(cfg["size_factor"]),
+        "half_width_factor": float(cfg["half_width_factor"]),
+        "size": size,
+        "gradation": gradation,
+    }
+
+
+def sizing_grid_step(pygalmesh_params):
+    """Gitterschritt von cell_size_field; None, wenn graded_sizing aus ist (dann braucht es kein SDF)."""
+    graded_cfg = sizing_config(pygalmesh_params, "graded_sizing", GRADED_SIZING_DEFAULTS)
+    if not bool(graded_cfg["enabled"]):
+        return None
+    band_cfg = sizing_config(pygalmesh_params, "crack_band_sizing", CRACK_BAND_SIZING_DEFAULTS)
+    active = [cfg for cfg in (graded_cfg, band_cfg) if bool(cfg["enabled"])]
+    return max(1, min(int(cfg["grid_step_voxels"]) for cfg in active))
+
+
+def sizing_band_voxels(params):
+    """
+    SDF-Abstand (Voxel), ab dem graded_sizing ueberall max_size_factor liefert,
+    plus Glaettungstraeger; 0, wenn graded_sizing aus ist. `params` sind die
+    SDF-Parameter mit pygalmesh_parameters darin.
+    """
+    pygalmesh_params = params.get("pygalmesh_parameters") or {}
+    step = sizing_grid_step(pygalmesh_params)
+    if step is None:
+        return 0.0
+    graded_cfg = sizing_config(pygalmesh_params, "graded_sizing", GRADED_SIZING_DEFAULTS)
+    min_factor, max_factor, gradation = graded_size_factors(graded_cfg, pygalmesh_params)
+    sdf_sigma_voxels = float(params.get("sdf_sigma_voxels", 0.75))
+    return float(math.ceil(step + (max_factor - min_factor) / gradation + 4.0 * sdf_sigma_voxels + 2.0))
+
+
+def cell_size_field(mask, voxel_dim, pygalmesh_params, origin=(0.0, 0.0, 0.0), sdf_samples=None):
+    """
+    max_cell_circumradius als GridSizingField aus graded_sizing und
+    crack_band_sizing. Beide werden auf jedem grid_step_voxels-ten Voxel
+    ausgewertet (kleinster Schritt der aktiven Bloecke) und punktweise per Minimum
+    kombiniert; ohne graded_sizing ist die Groesse ausserhalb des Rissbands
+    max_element_size_factor * dx. `origin` ist die Netzkoordinate von
+    mask[0, 0, 0]. `sdf_samples` ist das SDF auf dem Grobgitter (coarse_sdf_samples
+    mit sizing_grid_step) und fuer graded_sizing Pflicht - eine eigene EDT gibt es
+    hier nicht, damit Cache-Zustand und sdf_mode das Groessenfeld nicht aendern.
+    Gibt (None, info) zurueck, wenn beides aus ist; info hat je Block einen
+    Eintrag fuer die Metadaten.
+    """
+    graded_cfg = sizing_config(pygalmesh_params, "graded_sizing", GRADED_SIZING_DEFAULTS)
+    band_cfg = sizing_config(pygalmesh_params, "crack_band_sizing", CRACK_BAND_SIZING_DEFAULTS)
+    active = [cfg for cfg in (graded_cfg, band_cfg) if bool(cfg["enabled"])]
+    info = {"graded_sizing": {"enabled": False}, "crack_band_sizing": {"enabled": False}}
+    if not active:
+        return None, info
+
+    step = max(1, min(int(cfg["grid_step_voxels"]) for cfg in active))
+    coarse = np.ascontiguousarray(np.asarray(mask, dtype=bool)[::step, ::step, ::step])
+    if bool(graded_cfg["enabled"]):
+        if sdf_samples is None:
+            raise ValueError("graded_sizing needs SDF samples on the sizing grid (coarse_sdf_samples)")
+        if sdf_samples.shape != coarse.shape:
+            raise ValueError(f"graded_sizing: SDF samples {sdf_samples.shape} do not match the grid {coarse.shape}")
+        sizes, info["graded_sizing"] = graded_sizes(sdf_samples, step, voxel_dim, graded_cfg, pygalmesh_params)
+    else:
+        base_size = float(pygalmesh_params.get("max_element_size_factor", 1.0)) * voxel_dim
+        sizes = np.full(coarse.shape, base_size)
+    if bool(band_cfg["enabled"]):
+        band, info["crack_band_sizing"] = crack_band_sizes(mask, coarse.shape, step, voxel_dim, band_cfg)
+        in_band = np.broadcast_to(band <= info["crack_band_sizing"]["size"], coarse.shape)
+        info["crack_band_sizing"]["material_fraction_in_band"] = (
+            float(np.mean(in_band[coarse])) if coarse.any() else None
+        )
+        np.minimum(sizes, band, out=sizes)
+
+    material_sizes = sizes[coarse]
+    for entry in info.values():
+        if entry["enabled"]:
+            entry["grid_step_voxels"] = step
+            entry["grid_shape"] = [int(n) for n in sizes.shape]
+            entry["material_mean_size"] = float(material_sizes.mean()) if material_sizes.size else None
+    if info["graded_sizing"]["enabled"]:
+        max_size = info["graded_sizing"]["max_size"]
+        info["graded_sizing"]["material_fraction_at_max_size"] = (
+            float(np.mean(material_sizes >= max_size)) if material_sizes.size else None
+        )
+    print(f"📐 Elementgroessenfeld: {float(sizes.min()):.4g} .. {float(sizes.max()):.4g} "
+          f"(Gitter {list(sizes.shape)}, Schritt {step} Voxel); "
+          f"Mittel im Material {float(material_sizes.mean()) if material_sizes.size else None}")
+    if info["crack_band_sizing"]["enabled"]:
+        band_info = info["crack_band_sizing"]
+        print(f"   Rissband: {band_info['axis']} = {band_info['center']:.4g} +- {band_info['half_width']:.4g}, "
+              f"Groesse {band_info['size']:.4g}, Materialanteil im Band {band_info['material_fraction_in_band']}")
+    del material_sizes
+    field = pygalmesh.GridSizingField(
+        sizes,
+        tuple(float(value) for value in origin),
+        (step * voxel_dim, step * voxel_dim, step * voxel_dim),
+    )
+    return field, info
+
+
+def build_sdf_pygalmesh_mesh(vertices, faces, mesh_output_path, voxel_dim, params, mask=None, sdf_samples=None):
+    # mask wird nur fuer graded_sizing/crack_band_sizing gebraucht; die Oberflaeche liegt in denselben
+    # Koordinaten wie die Maske (Voxel i bei i * dx). sdf_samples: siehe cell_size_field.
     mesh_output_path = os.path.abspath(mesh_output_path)
     output_dir = os.path.dirname(mesh_output_path)
     os.makedirs(output_dir, exist_ok=True)
@@ -437,21 +1262,69 @@ def write_sdf_pygalmesh_mesh(vertices, faces, mesh_output_path, voxel_dim, param
 
     pygalmesh_params = dict(params.get("pygalmesh_parameters", {}))
     generate_kwargs = pygalmesh_kwargs_from_params(pygalmesh_params, voxel_dim)
+    sizing_info = {"graded_sizing": {"enabled": False}, "crack_band_sizing": {"enabled": False}}
+    if any((pygalmesh_params.get(key) or {}).get("enabled") for key in sizing_info):
+        if mask is None:
+            raise ValueError("graded_sizing/crack_band_sizing need the material mask")
+        cell_size, sizing_info = cell_size_field(mask, voxel_dim, pygalmesh_params, sdf_samples=sdf_samples)
+        generate_kwargs["max_cell_circumradius"] = cell_size
     reorient = bool(params.get("reorient", False))
     mesh = pygalmesh.generate_volume_mesh_from_surface_mesh(
         surface_path,
         **generate_kwargs,
         reorient=reorient,
     )
-    mesh.write(mesh_output_path)
-    return {
+    return mesh, {
+        "direct_sdf": False,
         "surface_off_path": surface_path,
         "reorient": reorient,
         "pygalmesh_parameters": pygalmesh_metadata_from_params(pygalmesh_params, voxel_dim),
+        **sizing_info,
+    }
+
+
+def build_sdf_array_pygalmesh_mesh(mask, mesh_output_path, voxel_dim, params):
+    # Direkt aus dem geglaetteten SDF-Array vernetzen: CGAL wertet die trilineare
+    # Interpolation der Abtastwerte selbst aus. Marching Cubes, Reparatur und
+    # OFF-Datei entfallen.
+    mesh_output_path = os.path.abspath(mesh_output_path)
+    os.makedirs(os.path.dirname(mesh_output_path), exist_ok=True)
+
+    level = float(params.get("level", 0.0))
+    pygalmesh_params = dict(params.get("pygalmesh_parameters", {}))
+    sdf_step = sizing_grid_step(pygalmesh_params)
+    sdf, pad_width = build_smoothed_sdf(mask, params, sizing_band_voxels(params))
+    sdf_samples = None
+    if sdf_step:
+        sdf_samples = coarse_sdf_samples(sdf, pad_width, mask.shape, sdf_step)
+    # build_signed_distance ist im Material positiv, pygalmesh vernetzt sdf < iso_value
+    sdf = sdf.astype(np.float32, copy=False)
+    np.negative(sdf, out=sdf)
+
+    generate_kwargs = pygalmesh_kwargs_from_params(pygalmesh_params, voxel_dim)
+    # Das SDF-Gitter ist um pad_width gepolstert: mask[0, 0, 0] liegt bei pad_width * dx.
+    cell_size, sizing_info = cell_size_field(
+        mask, voxel_dim, pygalmesh_params, origin=(pad_width * voxel_dim,) * 3, sdf_samples=sdf_samples)
+    del sdf_samples
+    if cell_size is not None:
+        generate_kwargs["max_cell_circumradius"] = cell_size
+    mesh = pygalmesh.generate_from_sdf_array(
+        sdf,
+        (voxel_dim, voxel_dim, voxel_dim),
+        iso_value=-level,
+        **generate_kwargs,
+    )
+    del sdf
+    if pad_width > 0:
+        mesh.points -= pad_width * voxel_dim
+    return mesh, {
+        "direct_sdf": True,
+        "pygalmesh_parameters": pygalmesh_metadata_from_params(pygalmesh_params, voxel_dim),
+        **sizing_info,
     }
 
 
-def write_sdf_gmsh_mesh(vertices, faces, mesh_output_path, voxel_dim, params):
+def build_sdf_gmsh_mesh(vertices, faces, mesh_output_path, voxel_dim, params):
     import gmsh
 
     mesh_output_path = os.path.abspath(mesh_output_path)
@@ -512,8 +1385,7 @@ def write_sdf_gmsh_mesh(vertices, faces, mesh_output_path, voxel_dim, params):
         [("tetra", tetra_cells)],
         cell_data={"medit:ref": [np.ones(len(tetra_cells), dtype=np.int32)]},
     )
-    meshio.write(mesh_output_path, out_mesh)
-    return {
+    return out_mesh, {
         "surface_stl_path": stl_path,
         "gmsh_msh_path": msh_path,
         "gmsh_mesh_size_min": mesh_size_min,
@@ -523,19 +1395,12 @@ def write_sdf_gmsh_mesh(vertices, faces, mesh_output_path, voxel_dim, params):
     }
 
 
-def main():
-    script_path = os.path.dirname(__file__)
-    default_config_path = os.path.join(script_path, "config.json")
-
-    parser = argparse.ArgumentParser(description="Generate a 3D mesh from segmented volume slices.")
-    parser.add_argument("--config", type=str, default=default_config_path, help="Path to configuration JSON file")
-    parser.add_argument("--npy", type=str, default=os.path.join(script_path,"volume.npy"), help="Path to the input .npy volume file (overrides config)")
-    parser.add_argument("--mesh", type=str, default=os.path.join(script_path,"mesh.xdmf"), help="Path to save the output mesh file (overrides config)")
-    args = parser.parse_args()
-
-    config_path = args.config
-    config, metadata_output_path = load_config(config_path)
-
+def generate_mesh(config, metadata_output_path, input_path, mesh_output_path, script_path):
+    """
+    Vernetzt das Volumen und gibt (mesh, mesh_metadata) zurueck, ohne das Netz
+    zu schreiben. Zwischendateien der Vernetzer (OFF/STL/MSH) entstehen weiterhin
+    neben mesh_output_path. nanomesh schreibt sein Format selbst; dann ist mesh None.
+    """
     specimen_name = config["specimen_name"]
     x_range = tuple(config.get("x_range", [0, 0]))  # updated after load if needed
     smoothing_sigma = config["smoothing_sigma_factor"]
@@ -544,16 +1409,6 @@ def main():
     scale_factor = config["scale_factor"]
     meshing_method = config.get("meshing_method", "pygalmesh").lower()
 
-    # Use provided npy file or fallback to config
-    if args.npy:
-        input_path = args.npy
-    else:
-        input_folder = config["input_folder"]
-        input_path = os.path.join(input_folder, "segmented_3D_volume.npy")
-
-    # Use provided mesh path or fallback to config
-    mesh_output_path = args.mesh if args.mesh else os.path.join(config["mesh_output_path"])
-
     original_voxel_size = load_original_voxel_size(metadata_output_path)
 
     print(f"📦 Loading volume from: {input_path}")
@@ -608,6 +1463,7 @@ def main():
         max_circumradius_edge_ratio = params.get("max_circumradius_edge_ratio", 0.0)
         seed = int(params.get("seed", 0))
         verbose = bool(params.get("verbose", True))
+        n_threads = pygalmesh_n_threads(params)
 
         vol_pygal = np.array(subvol_seg.image, dtype=np.uint8)
         unique_values, unique_counts = np.unique(vol_pygal, return_counts=True)
@@ -627,9 +1483,18 @@ def main():
             f"max_circumradius_edge_ratio={max_circumradius_edge_ratio}, "
             f"lloyd={lloyd}, odt={odt}, perturb={perturb}, exude={exude}, "
             f"exude_time_limit={exude_time_limit}, "
-            f"exude_sliver_bound={exude_sliver_bound}, seed={seed}"
+            f"exude_sliver_bound={exude_sliver_bound}, seed={seed}, n_threads={n_threads}"
         )
 
+        sizing_mask = vol_pygal != 0
+        sizing_step = sizing_grid_step(params)
+        sizing_samples = None
+        if sizing_step:
+            # Im Bildpfad gibt es kein geglaettetes SDF: ungeglaettetes SDF derselben Maske
+            sizing_samples = coarse_sdf_samples(build_signed_distance(sizing_mask), 0, sizing_mask.shape, sizing_step)
+        cell_size, sizing_info = cell_size_field(sizing_mask, voxel_dim, params, sdf_samples=sizing_samples)
+        del sizing_mask, sizing_samples
+
         try:
             generate_kwargs = {
                 "lloyd": lloyd,
@@ -642,35 +1507,26 @@ def main():
                 "max_cell_circumradius": max_element_size_factor * voxel_dim,
                 "max_facet_distance": max_facet_distance_factor * voxel_dim,
                 "max_circumradius_edge_ratio": max_circumradius_edge_ratio,
+                "exude_time_limit": exude_time_limit,
+                "exude_sliver_bound": exude_sliver_bound,
                 "verbose": verbose,
                 "seed": seed,
+                "n_threads": n_threads,
             }
-            if exude_time_limit or exude_sliver_bound:
-                with tempfile.NamedTemporaryFile(suffix=".inr", delete=False) as handle:
-                    inr_path = handle.name
-                try:
-                    pygalmesh.save_inr(vol_pygal, voxel_size, inr_path)
-                    mesh = pygalmesh.generate_from_inr(
-                        inr_path,
-                        **generate_kwargs,
-                        exude_time_limit=exude_time_limit,
-                        exude_sliver_bound=exude_sliver_bound
-                    )
-                finally:
-                    if os.path.exists(inr_path):
-                        os.remove(inr_path)
-            else:
-                mesh = pygalmesh.generate_from_array(vol_pygal, voxel_size, **generate_kwargs)
-        except ValueError as exc:
-            print("❌ pygalmesh failed while reading the generated temporary mesh.")
-            print("   This often means the generated mesh file was truncated, commonly")
-            print("   because the mesh became too large for the available scratch space,")
-            print("   memory, or wall time. Try a larger reduce factor, coarser")
-            print("   pygalmesh parameters, or smaller/partitioned subvolumes.")
+            if cell_size is not None:
+                generate_kwargs["max_cell_circumradius"] = cell_size
+            # Das Array geht ohne temporaere .inr-Datei und ohne Kopie an CGAL.
+            mesh = pygalmesh.generate_from_array(vol_pygal, voxel_size, **generate_kwargs)
+        except (ValueError, RuntimeError, MemoryError):
+            print("❌ pygalmesh failed while meshing the volume array or converting the")
+            print("   CGAL result to numpy arrays. RuntimeError usually comes from CGAL")
+            print("   (array shape/dtype rejected or meshing aborted), MemoryError means")
+            print("   the mesh became too large for the available memory. Try a larger")
+            print("   reduce factor, coarser pygalmesh parameters, or smaller/partitioned")
+            print("   subvolumes.")
             print("   Original exception:")
             traceback.print_exc()
             raise
-        mesh.write(mesh_output_path)
 
         mesh_metadata["pygalmesh_parameters"] = {
             "max_element_size_factor": max_element_size_factor,
@@ -690,7 +1546,9 @@ def main():
             "exude_time_limit": exude_time_limit,
             "exude_sliver_bound": exude_sliver_bound,
             "seed": seed,
-            "verbose": verbose
+            "n_threads": n_threads,
+            "verbose": verbose,
+            **sizing_info,
         }
 
     elif meshing_method in ("sdf_gmsh", "signed_distance_gmsh"):
@@ -726,9 +1584,10 @@ def main():
             f"keep_largest_component={keep_largest}"
         )
 
-        vertices, faces = extract_sdf_surface(material_mask, voxel_dim, params)
-        vertices, faces, surface_info = repair_surface(vertices, faces, params)
-        gmsh_info = write_sdf_gmsh_mesh(vertices, faces, mesh_output_path, voxel_dim, params)
+        vertices, faces, surface_info = repaired_sdf_surface(
+            material_mask, voxel_dim, params, surface_cache_dir(params, input_path)
+        )
+        mesh, gmsh_info = build_sdf_gmsh_mesh(vertices, faces, mesh_output_path, voxel_dim, params)
 
         mesh_metadata["sdf_gmsh_parameters"] = dict(params)
         mesh_metadata["sdf_gmsh_surface"] = surface_info
@@ -748,6 +1607,7 @@ def main():
         keep_largest = bool(params.get("keep_largest_component", False))
         component_connectivity = int(params.get("component_connectivity", 6))
         require_watertight = bool(params.get("require_watertight_surface", True))
+        direct_sdf = bool(params.get("direct_sdf", False))
 
         segmented = np.array(subvol_seg.image, dtype=np.uint8)
         material_mask = segmented == material_value
@@ -772,31 +1632,11 @@ def main():
             f"sdf_sigma_voxels={params.get('sdf_sigma_voxels', 0.75)}, "
             f"pad_width={params.get('pad_width', 1)}, "
             f"keep_largest_component={keep_largest}, "
-            f"require_watertight_surface={require_watertight}"
+            f"require_watertight_surface={require_watertight}, "
+            f"direct_sdf={direct_sdf}"
         )
 
-        vertices, faces = extract_sdf_surface(material_mask, voxel_dim, params)
-        vertices, faces, surface_info = repair_surface(vertices, faces, params)
-        surface_info.update(surface_edge_topology(faces))
-        surface_report_path = os.path.splitext(mesh_output_path)[0] + "_sdf_surface.topology.txt"
-        write_surface_audit(surface_report_path, surface_info)
-        print(f"Wrote SDF surface topology audit: {surface_report_path}")
-        print(f"SDF surface topology verdict: {surface_verdict(surface_info)}")
-
-        if require_watertight and surface_verdict(surface_info) == "bad":
-            raise RuntimeError(
-                "SDF surface is not watertight/manifold enough for volume meshing; "
-                f"see {surface_report_path}"
-            )
-
-        pygalmesh_info = write_sdf_pygalmesh_mesh(vertices, faces, mesh_output_path, voxel_dim, params)
-
         mesh_metadata["sdf_pygalmesh_parameters"] = dict(params)
-        mesh_metadata["sdf_pygalmesh_surface"] = {
-            **surface_info,
-            "surface_report_path": surface_report_path,
-        }
-        mesh_metadata["sdf_pygalmesh_output"] = pygalmesh_info
         mesh_metadata["sdf_pygalmesh_voxel_cleanup"] = {
             "original_material_voxels": original_material_voxels,
             "used_material_voxels": int(material_mask.sum()),
@@ -806,6 +1646,44 @@ def main():
             "component_connectivity": component_connectivity,
         }
 
+        if direct_sdf:
+            print("🧊 Vernetze direkt aus dem SDF-Array (ohne Marching Cubes/OFF)")
+            if require_watertight:
+                # Ohne Zwischenoberflaeche gibt es kein Oberflaechen-Audit, das geprueft werden koennte.
+                print("⚠️ require_watertight_surface wird mit direct_sdf = true nicht geprueft "
+                      "(kein Oberflaechen-Audit)")
+            mesh, pygalmesh_info = build_sdf_array_pygalmesh_mesh(material_mask, mesh_output_path, voxel_dim, params)
+            mesh_metadata["sdf_pygalmesh_surface"] = {
+                "surface_audit": "skipped (direct_sdf)",
+                "require_watertight_surface_checked": False,
+            }
+            mesh_metadata["sdf_pygalmesh_output"] = pygalmesh_info
+        else:
+            # SDF-Stichproben fuer graded_sizing gleich beim Marching Cubes mitnehmen
+            sdf_step = sizing_grid_step(params.get("pygalmesh_parameters", {})) or 0
+            vertices, faces, surface_info, sdf_samples = repaired_sdf_surface(
+                material_mask, voxel_dim, params, surface_cache_dir(params, input_path), sdf_step=sdf_step
+            )
+            surface_report_path = os.path.splitext(mesh_output_path)[0] + "_sdf_surface.topology.txt"
+            write_surface_audit(surface_report_path, surface_info)
+            print(f"Wrote SDF surface topology audit: {surface_report_path}")
+            print(f"SDF surface topology verdict: {surface_verdict(surface_info)}")
+
+            if require_watertight and surface_verdict(surface_info) == "bad":
+                raise RuntimeError(
+                    "SDF surface is not watertight/manifold enough for volume meshing; "
+                    f"see {surface_report_path}"
+                )
+
+            mesh, pygalmesh_info = build_sdf_pygalmesh_mesh(
+                vertices, faces, mesh_output_path, voxel_dim, params, mask=material_mask, sdf_samples=sdf_samples)
+
+            mesh_metadata["sdf_pygalmesh_surface"] = {
+                **surface_info,
+                "surface_report_path": surface_report_path,
+            }
+            mesh_metadata["sdf_pygalmesh_output"] = pygalmesh_info
+
     elif meshing_method == "nanomesh":
         params = config.get("nanomesh_parameters", {})
         meshing_options = params.get("meshing_options", "-pq")
@@ -814,8 +1692,9 @@ def main():
 
         mesher = nanomesh.Mesher(subvol_seg)
         mesher.generate_contour()
-        mesh = mesher.tetrahedralize(opts=meshing_options)
-        mesh.write(mesh_output_path, file_format=output_format, binary=output_binary)
+        nanomesh_mesh = mesher.tetrahedralize(opts=meshing_options)
+        nanomesh_mesh.write(mesh_output_path, file_format=output_format, binary=output_binary)
+        mesh = None
 
         mesh_metadata["nanomesh_parameters"] = {
             "meshing_options": meshing_options,
@@ -826,6 +1705,10 @@ def main():
     else:
         raise ValueError(f"Unsupported meshing method: {meshing_method}")
 
+    return mesh, mesh_metadata
+
+
+def append_mesh_metadata(metadata_output_path, mesh_metadata):
     # Update metadata
     if not os.path.exists(metadata_output_path):
         raise FileNotFoundError(f"❌ Metadata file not found at: {metadata_output_path}")
@@ -841,5 +1724,34 @@ def main():
     print(f"✅ Mesh and metadata appended to {metadata_output_path}")
 
 
+def main():
+    script_path = os.path.dirname(__file__)
+    default_config_path = os.path.join(script_path, "config.json")
+
+    parser = argparse.ArgumentParser(description="Generate a 3D mesh from segmented volume slices.")
+    parser.add_argument("--config", type=str, default=default_config_path, help="Path to configuration JSON file")
+    parser.add_argument("--npy", type=str, default=os.path.join(script_path,"volume.npy"), help="Path to the input .npy volume file (overrides config)")
+    parser.add_argument("--mesh", type=str, default=os.path.join(script_path,"mesh.xdmf"), help="Path to save the output mesh file (overrides config)")
+    args = parser.parse_args()
+
+    config_path = args.config
+    config, metadata_output_path = load_config(config_path)
+
+    # Use provided npy file or fallback to config
+    if args.npy:
+        input_path = args.npy
+    else:
+        input_folder = config["input_folder"]
+        input_path = os.path.join(input_folder, "segmented_3D_volume.npy")
+
+    # Use provided mesh path or fallback to config
+    mesh_output_path = args.mesh if args.mesh else os.path.join(config["mesh_output_path"])
+
+    mesh, mesh_metadata = generate_mesh(config, metadata_output_path, input_path, mesh_output_path, script_path)
+    if mesh is not None:
+        mesh.write(mesh_output_path)
+    append_mesh_metadata(metadata_output_path, mesh_metadata)
+
+
 if __name__ == "__main__":
     main()
@@ -30,13 +30,29 @@ def load_subvolume_shape(metadata_path):
         raise RuntimeError("❌ Failed to extract 'shape' from first saved subvolume in metadata.") from e
 
 
-def scale_and_translate_mesh(input_path, output_path,
-                             x_min_target, x_max_target,
-                             y_min_target, y_max_target,
-                             z_min_target, z_max_target,
-                             target_center_vox_xy,
-                             dx):
-    mesh = meshio.read(input_path)
+def target_box(metadata_path):
+    """Target bounding box of the first subvolume in physical units, plus dx."""
+    dx = load_voxel_size(metadata_path)
+
+    # Load shape of subvolumes [Nx, Ny, Nz]
+    Nx, Ny, Nz = load_subvolume_shape(metadata_path)
+
+    # Target physical space bounding box
+    return {
+        "x_min_target": 0, "x_max_target": Nx * dx,
+        "y_min_target": 0, "y_max_target": Ny * dx,
+        "z_min_target": 0, "z_max_target": Nz * dx,
+        "dx": dx,
+    }
+
+
+def scale_and_translate_points(mesh,
+                               x_min_target, x_max_target,
+                               y_min_target, y_max_target,
+                               z_min_target, z_max_target,
+                               target_center_vox_xy,
+                               dx):
+    """Scale and translate mesh.points in place and return the mesh."""
     points = mesh.points[:, :3].copy()
 
     # Compute original bounds
@@ -73,6 +89,23 @@ def scale_and_translate_mesh(input_path, output_path,
     points += translation
 
     mesh.points[:, :3] = points
+    return mesh
+
+
+def scale_and_translate_mesh(input_path, output_path,
+                             x_min_target, x_max_target,
+                             y_min_target, y_max_target,
+                             z_min_target, z_max_target,
+                             target_center_vox_xy,
+                             dx):
+    mesh = scale_and_translate_points(
+        meshio.read(input_path),
+        x_min_target, x_max_target,
+        y_min_target, y_max_target,
+        z_min_target, z_max_target,
+        target_center_vox_xy,
+        dx,
+    )
     meshio.write(output_path, mesh)
     print(f"✅ Mesh written to: {output_path}")
 
@@ -94,28 +127,12 @@ def main():
     if not metadata_path or not os.path.isfile(metadata_path):
         raise FileNotFoundError(f"❌ Metadata file not found at: {metadata_path}")
 
-    dx = load_voxel_size(metadata_path)
-
-    # Load shape of subvolumes [Nx, Ny, Nz]
-    Nx, Ny, Nz = load_subvolume_shape(metadata_path)
-
-    # Target physical space bounding box
-    x_min_t, x_max_t = 0, Nx * dx
-    y_min_t, y_max_t = 0, Ny * dx
-    z_min_t, z_max_t = 0, Nz * dx
-
     # Apply transformation
     scale_and_translate_mesh(
         input_path=args.mesh,
         output_path=args.mesh,  # overwrite in-place
-        x_min_target=x_min_t,
-        x_max_target=x_max_t,
-        y_min_target=y_min_t,
-        y_max_target=y_max_t,
-        z_min_target=z_min_t,
-        z_max_target=z_max_t,
         target_center_vox_xy=(args.center_x, args.center_y),
-        dx=dx
+        **target_box(metadata_path),
     )
 
 
@@ -72,26 +72,11 @@ def normalize_switches(switches):
     return switches
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Run TetGen check/optimization/refinement on an existing tetrahedral mesh.")
-    parser.add_argument("--config", required=True, help="Path to config JSON containing optional 05_tetgen_postprocess settings")
-    parser.add_argument("--mesh", required=True, help="Input mesh path, usually mesh.xdmf")
-    parser.add_argument("--output", default=None, help="Output mesh path. Defaults to overwriting --mesh")
-    parser.add_argument("--switches", default=None, help="TetGen switches, e.g. -rCV, -rO2CV, -rq2.0/0O2CV")
-    parser.add_argument("--active-ref", type=int, default=None, help="Only keep tetrahedra with this cell tag value")
-    parser.add_argument("--all-tets", action="store_true", help="Use all tetrahedra even if region tags are present")
-    parser.add_argument("--keep-workdir", action="store_true", help="Keep temporary TetGen files for debugging")
-    args = parser.parse_args()
-
-    cfg = load_config(args.config)
-    mesh_path = Path(args.mesh)
-    output_path = Path(args.output or cfg.get("output_mesh_path") or mesh_path)
-    switches = normalize_switches(args.switches or cfg.get("switches", "-rCV"))
-    active_ref = args.active_ref if args.active_ref is not None else cfg.get("active_ref", 1)
-    all_tets = args.all_tets or bool(cfg.get("all_tets", False))
-
-    print(f"Reading mesh: {mesh_path}")
-    mesh = meshio.read(mesh_path)
+def tetgen_postprocess(mesh, switches, log_path, active_ref=1, all_tets=False, keep_workdir=False):
+    """
+    Run TetGen on the (tag-filtered) tetra block of mesh and return the result
+    as a new mesh; the TetGen output goes to log_path for the quality report.
+    """
     tetra_block_index, tetra_cells = find_tetra_block(mesh)
     tag_name, tetra_tags = find_tetra_tags(mesh, tetra_block_index)
 
@@ -121,7 +106,8 @@ def main():
             check=False,
         )
 
-        log_path = output_path.with_suffix(".tetgen.log")
+        log_path = Path(log_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
         log_path.write_text(result.stdout + ("\n--- stderr ---\n" + result.stderr if result.stderr else ""))
         print(f"TetGen log: {log_path}")
         if result.returncode != 0:
@@ -138,25 +124,55 @@ def main():
             [("tetra", refined_tets)],
             cell_data={"medit:ref": [np.ones(len(refined_tets), dtype=np.int32)]},
         )
-
-        if output_path == mesh_path:
-            backups = backup_mesh(mesh_path)
-            if backups:
-                print("Backed up original mesh files:")
-                for backup in backups:
-                    print(f"  {backup}")
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        meshio.write(output_path, out_mesh)
-        print(f"Wrote TetGen postprocessed mesh: {output_path}")
         print(f"Points: {len(refined.points)}; tetrahedra: {len(refined_tets)}")
 
-        if args.keep_workdir or cfg.get("keep_workdir", False):
+        if keep_workdir:
             print(f"Keeping TetGen workdir: {workdir}")
             tmp_context = None
     finally:
         if tmp_context is not None:
             tmp_context.cleanup()
+    return out_mesh
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run TetGen check/optimization/refinement on an existing tetrahedral mesh.")
+    parser.add_argument("--config", required=True, help="Path to config JSON containing optional 05_tetgen_postprocess settings")
+    parser.add_argument("--mesh", required=True, help="Input mesh path, usually mesh.xdmf")
+    parser.add_argument("--output", default=None, help="Output mesh path. Defaults to overwriting --mesh")
+    parser.add_argument("--switches", default=None, help="TetGen switches, e.g. -rCV, -rO2CV, -rq2.0/0O2CV")
+    parser.add_argument("--active-ref", type=int, default=None, help="Only keep tetrahedra with this cell tag value")
+    parser.add_argument("--all-tets", action="store_true", help="Use all tetrahedra even if region tags are present")
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep temporary TetGen files for debugging")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    mesh_path = Path(args.mesh)
+    output_path = Path(args.output or cfg.get("output_mesh_path") or mesh_path)
+    switches = normalize_switches(args.switches or cfg.get("switches", "-rCV"))
+    active_ref = args.active_ref if args.active_ref is not None else cfg.get("active_ref", 1)
+    all_tets = args.all_tets or bool(cfg.get("all_tets", False))
+
+    print(f"Reading mesh: {mesh_path}")
+    out_mesh = tetgen_postprocess(
+        meshio.read(mesh_path),
+        switches,
+        output_path.with_suffix(".tetgen.log"),
+        active_ref=active_ref,
+        all_tets=all_tets,
+        keep_workdir=args.keep_workdir or cfg.get("keep_workdir", False),
+    )
+
+    if output_path == mesh_path:
+        backups = backup_mesh(mesh_path)
+        if backups:
+            print("Backed up original mesh files:")
+            for backup in backups:
+                print(f"  {backup}")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    meshio.write(output_path, out_mesh)
+    print(f"Wrote TetGen postprocessed mesh: {output_path}")
 
 
 if __name__ == "__main__":
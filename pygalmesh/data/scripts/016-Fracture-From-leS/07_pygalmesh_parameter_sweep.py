@@ -7,8 +7,12 @@ import re
 import shutil
 import subprocess
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 
+import numpy as np
+
 
 DEFAULT_VARIANTS = [
     {
@@ -87,8 +91,9 @@ def load_variants(path):
     return variants
 
 
-def run_command(command, cwd=None, log_path=None):
-    print("+ " + " ".join(str(part) for part in command), flush=True)
+def run_command(command, cwd=None, log_path=None, echo=True):
+    if echo:
+        print("+ " + " ".join(str(part) for part in command), flush=True)
     with subprocess.Popen(
         command,
         cwd=cwd,
@@ -100,7 +105,8 @@ def run_command(command, cwd=None, log_path=None):
         output_lines = []
         with open(log_path, "w") if log_path else open("/dev/null", "w") as log_handle:
             for line in proc.stdout:
-                print(line, end="")
+                if echo:
+                    print(line, end="")
                 log_handle.write(line)
                 output_lines.append(line)
         return_code = proc.wait()
@@ -126,60 +132,87 @@ def parse_tetgen_log(log_path):
     return metrics
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Sweep pygalmesh parameters and compare TetGen quality reports.")
-    parser.add_argument("--config", required=True, help="Base config JSON")
-    parser.add_argument("--npy", required=True, help="Input subvolume volume.npy")
-    parser.add_argument("--output-dir", required=True, help="Directory for sweep outputs")
-    parser.add_argument("--variants", default=None, help="Optional JSON list/object of variants")
-    parser.add_argument("--only", nargs="*", default=None, help="Run only named variants")
-    parser.add_argument("--max-runs", type=int, default=None, help="Limit number of variants to run")
-    parser.add_argument("--skip-existing", action="store_true", help="Skip variants whose TetGen log already exists")
-    args = parser.parse_args()
+def available_memory_gb():
+    try:
+        with open("/proc/meminfo", "r") as handle:
+            for line in handle:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024**2
+    except OSError:
+        pass
+    return None
 
-    script_dir = Path(__file__).resolve().parent
-    base_config_path = Path(args.config)
-    base_config = json.loads(base_config_path.read_text())
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
 
+def estimate_memory_gb(npy_shape, mesh_cfg, params):
+    """
+    Rough peak memory of one variant (03 dominates): the rescaled volume as
+    float64 in three copies (rescale, gaussian, segmented), plus ~1 kB per
+    tetrahedron for the CGAL triangulation and the meshio/TetGen copies. The
+    tetrahedron count assumes cells with max_cell_circumradius filling the box.
+    """
+    scale_factor = float(mesh_cfg.get("scale_factor", 1.0))
+    voxels = float(np.prod(npy_shape)) * scale_factor**3
+    circumradius = max(float(params.get("max_element_size_factor", 1.0)), 0.5)
+    tetrahedra = 2.0 * voxels / circumradius**3
+    return (3 * 8 * voxels + 1000.0 * tetrahedra) / 1024**3
+
+
+def quality_row(name, variant, variant_dir):
+    mesh_path = variant_dir / "mesh.xdmf"
+    tetgen_log_path = variant_dir / "mesh_tetgen_check.tetgen.log"
+    row = {"variant": name}
+    quality_report_path = variant_dir / "mesh_quality.txt"
+    row["quality_report_path"] = str(quality_report_path)
+    if quality_report_path.exists():
+        first_line = quality_report_path.read_text().splitlines()[0]
+        row["quality_verdict"] = first_line.split(":", 1)[1].strip() if ":" in first_line else ""
+    else:
+        row["quality_verdict"] = ""
+    row.update(variant.get("pygalmesh_parameters", {}))
+    row.update(parse_tetgen_log(tetgen_log_path))
+    row["mesh_path"] = str(mesh_path)
+    row["tetgen_log_path"] = str(tetgen_log_path)
+    return row
+
+
+def run_variant(variant, base_config, npy_path, output_dir, skip_existing=False, echo=True):
+    """03 mesh -> 05 TetGen check -> 08 report for one variant; returns its result row."""
+    script_dir = Path(__file__).resolve().parent
     metadata_source = Path(base_config["metadata_output_path"])
-    variants = load_variants(args.variants)
-    if args.only:
-        wanted = set(args.only)
-        variants = [variant for variant in variants if variant["name"] in wanted]
-    if args.max_runs is not None:
-        variants = variants[: args.max_runs]
+    name = variant["name"]
+    variant_dir = Path(output_dir) / name
+    variant_dir.mkdir(parents=True, exist_ok=True)
+    mesh_path = variant_dir / "mesh.xdmf"
+    config_path = variant_dir / "config.json"
+    metadata_path = variant_dir / "metadata.json"
+    mesh_log_path = variant_dir / "mesh_generation.log"
+    tetgen_log_path = variant_dir / "mesh_tetgen_check.tetgen.log"
 
-    rows = []
-    for variant in variants:
-        name = variant["name"]
-        variant_dir = output_dir / name
-        variant_dir.mkdir(parents=True, exist_ok=True)
-        mesh_path = variant_dir / "mesh.xdmf"
-        config_path = variant_dir / "config.json"
-        metadata_path = variant_dir / "metadata.json"
-        mesh_log_path = variant_dir / "mesh_generation.log"
-        tetgen_log_path = variant_dir / "mesh_tetgen_check.tetgen.log"
-
-        if args.skip_existing and tetgen_log_path.exists():
-            print(f"Skipping existing variant: {name}")
+    started = time.time()
+    status, error = "ok", ""
+    if skip_existing and tetgen_log_path.exists():
+        print(f"Skipping existing variant: {name}")
+        status = "skipped"
+    else:
+        config = copy.deepcopy(base_config)
+        config["metadata_output_path"] = str(metadata_path)
+        if metadata_source.exists():
+            shutil.copy2(metadata_source, metadata_path)
         else:
-            config = copy.deepcopy(base_config)
-            config["metadata_output_path"] = str(metadata_path)
-            if metadata_source.exists():
-                shutil.copy2(metadata_source, metadata_path)
-            else:
-                metadata_path.write_text("{}\n")
-
-            mesh_cfg = config["03_mesh_3D_array"]
-            mesh_cfg["meshing_method"] = "pygalmesh"
-            mesh_cfg["mesh_output_path"] = str(mesh_path)
-            pygalmesh_params = mesh_cfg.setdefault("pygalmesh_parameters", {})
-            pygalmesh_params["verbose"] = False
-            pygalmesh_params.update(variant.get("pygalmesh_parameters", {}))
-            config_path.write_text(json.dumps(config, indent=2) + "\n")
+            metadata_path.write_text("{}\n")
+
+        mesh_cfg = config["03_mesh_3D_array"]
+        mesh_cfg["meshing_method"] = "pygalmesh"
+        mesh_cfg["mesh_output_path"] = str(mesh_path)
+        pygalmesh_params = mesh_cfg.setdefault("pygalmesh_parameters", {})
+        pygalmesh_params["verbose"] = False
+        if pygalmesh_params.get("n_threads") is None:
+            # Varianten laufen parallel (--jobs); nicht jede zieht alle CPUs des Steps.
+            pygalmesh_params["n_threads"] = 1
+        pygalmesh_params.update(variant.get("pygalmesh_parameters", {}))
+        config_path.write_text(json.dumps(config, indent=2) + "\n")
 
+        try:
             run_command(
                 [
                     sys.executable,
@@ -187,11 +220,12 @@ def main():
                     "--config",
                     str(config_path),
                     "--npy",
-                    str(args.npy),
+                    str(npy_path),
                     "--mesh",
                     str(mesh_path),
                 ],
                 log_path=mesh_log_path,
+                echo=echo,
             )
             run_command(
                 [
@@ -206,6 +240,7 @@ def main():
                     "--switches=-rCV",
                 ],
                 log_path=variant_dir / "tetgen_postprocess_stdout.log",
+                echo=echo,
             )
             run_command(
                 [
@@ -219,21 +254,126 @@ def main():
                     str(variant_dir / "mesh_quality.txt"),
                 ],
                 log_path=variant_dir / "mesh_quality_stdout.log",
+                echo=echo,
             )
+        except subprocess.CalledProcessError as exc:
+            status = "failed"
+            error = f"{Path(exc.cmd[1]).name} exited with {exc.returncode}; see logs in {variant_dir}"
+
+    row = quality_row(name, variant, variant_dir)
+    row["status"] = status
+    row["error"] = error
+    row["elapsed_s"] = round(time.time() - started, 1)
+    return row
+
 
-        row = {"variant": name}
-        quality_report_path = variant_dir / "mesh_quality.txt"
-        row["quality_report_path"] = str(quality_report_path)
-        if quality_report_path.exists():
-            first_line = quality_report_path.read_text().splitlines()[0]
-            row["quality_verdict"] = first_line.split(":", 1)[1].strip() if ":" in first_line else ""
+def run_sweep(tasks, jobs, max_memory_gb, on_result, **kwargs):
+    """
+    Run (variant, memory_gb) tasks on up to `jobs` workers. A variant only
+    starts while the estimates of all running variants plus its own stay
+    within max_memory_gb; smaller variants may overtake a large one that does
+    not fit yet. A variant larger than the whole budget runs alone.
+    """
+    pending = list(tasks)
+    running = {}
+    in_use = 0.0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            while pending and len(running) < jobs:
+                index = next(
+                    (i for i, (_, memory_gb) in enumerate(pending) if max_memory_gb is None or in_use + memory_gb <= max_memory_gb),
+                    None,
+                )
+                if index is None:
+                    if running:
+                        break
+                    index = 0
+                    print(f"Variant {pending[0][0]['name']} needs ~{pending[0][1]:.1f} GB > --max-memory {max_memory_gb:.1f} GB; running it alone")
+                variant, memory_gb = pending.pop(index)
+                future = pool.submit(run_variant, variant, **kwargs)
+                running[future] = (variant, memory_gb)
+                in_use += memory_gb
+                print(f"Started {variant['name']} (~{memory_gb:.1f} GB; {len(running)} running, ~{in_use:.1f} GB reserved)", flush=True)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                variant, memory_gb = running.pop(future)
+                in_use -= memory_gb
+                try:
+                    row = future.result()
+                except Exception as exc:
+                    row = {"variant": variant["name"], "status": "failed", "error": repr(exc)}
+                row["memory_estimate_gb"] = round(memory_gb, 2)
+                on_result(variant, row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep pygalmesh parameters and compare TetGen quality reports.")
+    parser.add_argument("--config", required=True, help="Base config JSON")
+    parser.add_argument("--npy", required=True, help="Input subvolume volume.npy")
+    parser.add_argument("--output-dir", required=True, help="Directory for sweep outputs")
+    parser.add_argument("--variants", default=None, help="Optional JSON list/object of variants")
+    parser.add_argument("--only", nargs="*", default=None, help="Run only named variants")
+    parser.add_argument("--max-runs", type=int, default=None, help="Limit number of variants to run")
+    parser.add_argument("--skip-existing", action="store_true", help="Skip variants whose TetGen log already exists")
+    parser.add_argument("--jobs", type=int, default=1, help="Variants to run concurrently (each 03/05/08 chain is single-threaded)")
+    parser.add_argument("--max-memory", type=float, default=None, help="Memory budget in GB for all running variants (default: MemAvailable)")
+    parser.add_argument("--memory-per-variant", type=float, default=None, help="Memory estimate in GB for variants without a memory_gb entry (default: estimated from the volume and max_element_size_factor)")
+    parser.add_argument("--results", default=None, help="JSON-lines file appended as each variant finishes (default: <output-dir>/results.jsonl)")
+    args = parser.parse_args()
+
+    base_config_path = Path(args.config)
+    base_config = json.loads(base_config_path.read_text())
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results_path = Path(args.results) if args.results else output_dir / "results.jsonl"
+
+    variants = load_variants(args.variants)
+    if args.only:
+        wanted = set(args.only)
+        variants = [variant for variant in variants if variant["name"] in wanted]
+    if args.max_runs is not None:
+        variants = variants[: args.max_runs]
+
+    npy_shape = np.load(args.npy, mmap_mode="r").shape
+    mesh_cfg = base_config["03_mesh_3D_array"]
+    tasks = []
+    for variant in variants:
+        if "memory_gb" in variant:
+            memory_gb = float(variant["memory_gb"])
+        elif args.memory_per_variant is not None:
+            memory_gb = args.memory_per_variant
         else:
-            row["quality_verdict"] = ""
-        row.update(variant.get("pygalmesh_parameters", {}))
-        row.update(parse_tetgen_log(tetgen_log_path))
-        row["mesh_path"] = str(mesh_path)
-        row["tetgen_log_path"] = str(tetgen_log_path)
-        rows.append(row)
+            params = {**mesh_cfg.get("pygalmesh_parameters", {}), **variant.get("pygalmesh_parameters", {})}
+            memory_gb = estimate_memory_gb(npy_shape, mesh_cfg, params)
+        tasks.append((variant, memory_gb))
+
+    jobs = max(1, args.jobs)
+    max_memory_gb = args.max_memory if args.max_memory is not None else available_memory_gb()
+    if jobs > 1:
+        budget = f"{max_memory_gb:.1f} GB" if max_memory_gb is not None else "unlimited"
+        print(f"Running {len(tasks)} variants on {jobs} workers, memory budget {budget}; logs per variant in {output_dir}")
+
+    rows_by_name = {}
+
+    def on_result(variant, row):
+        rows_by_name[variant["name"]] = row
+        with open(results_path, "a") as handle:
+            handle.write(json.dumps(row) + "\n")
+        print(f"Finished {variant['name']}: {row.get('status')} ({row.get('quality_verdict', '')}, {row.get('elapsed_s', '?')} s) -> {results_path}", flush=True)
+
+    run_sweep(
+        tasks,
+        jobs,
+        max_memory_gb,
+        on_result,
+        base_config=base_config,
+        npy_path=str(args.npy),
+        output_dir=str(output_dir),
+        skip_existing=args.skip_existing,
+        echo=jobs == 1,
+    )
+    rows = [rows_by_name[variant["name"]] for variant in variants if variant["name"] in rows_by_name]
 
     summary_path = output_dir / "summary.csv"
     fieldnames = []
@@ -247,6 +387,10 @@ def main():
         writer.writerows(rows)
     print(f"Wrote sweep summary: {summary_path}")
 
+    failed = [row["variant"] for row in rows if row.get("status") == "failed"]
+    if failed:
+        raise SystemExit(f"Failed variants: {', '.join(failed)}")
+
 
 if __name__ == "__main__":
     main()
@@ -148,6 +148,16 @@ def build_report(metrics, thresholds, log_path):
     return verdict, lines
 
 
+def write_quality_report(log_path, output_path, config_path=None):
+    thresholds = load_thresholds(config_path)
+    metrics = parse_tetgen_log(log_path)
+    verdict, lines = build_report(metrics, thresholds, log_path)
+    Path(output_path).write_text("\n".join(lines))
+    print(f"Wrote mesh quality report: {output_path}")
+    print(f"Mesh quality verdict: {verdict}")
+    return verdict
+
+
 def main():
     parser = argparse.ArgumentParser(description="Classify TetGen mesh quality metrics as good, acceptable, or bad.")
     parser.add_argument("--tetgen-log", required=True, help="TetGen .tetgen.log file")
@@ -157,12 +167,7 @@ def main():
 
     log_path = Path(args.tetgen_log)
     output_path = Path(args.output) if args.output else log_path.with_suffix(".quality.txt")
-    thresholds = load_thresholds(args.config)
-    metrics = parse_tetgen_log(log_path)
-    verdict, lines = build_report(metrics, thresholds, log_path)
-    output_path.write_text("\n".join(lines))
-    print(f"Wrote mesh quality report: {output_path}")
-    print(f"Mesh quality verdict: {verdict}")
+    write_quality_report(log_path, output_path, args.config)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import math
+import tempfile
 from pathlib import Path
 
 import meshio
@@ -19,6 +21,7 @@ DEFAULT_CONFIG = {
     "tiny_volume_relative_to_median": 1.0e-8,
     "face_area_tolerance": 1.0e-14,
     "write_boundary_surface": False,
+    "chunk_tets": 0,
     "repair": {
         "enabled": False,
         "drop_duplicate_tets": True,
@@ -120,28 +123,230 @@ def boundary_edges(faces):
     return edges
 
 
+def packed_keys(rows, n_values):
+    """
+    Pack rows of indices < n_values into as few uint64 words as possible, first
+    column most significant, so the words sort like the rows lexicographically.
+    Faces of meshes below 2**21 points fit into one word, otherwise two.
+    """
+    bits = max(1, int(max(n_values, 1) - 1).bit_length())
+    per_word = max(1, 64 // bits)
+    words = []
+    for start in range(0, rows.shape[1], per_word):
+        word = np.zeros(len(rows), dtype=np.uint64)
+        for column in range(start, min(start + per_word, rows.shape[1])):
+            word <<= np.uint64(bits)
+            word |= rows[:, column].astype(np.uint64)
+        words.append(word)
+    return words
+
+
+def sorted_groups(words):
+    """Stable sort by packed keys; returns the order, group starts (in sorted order) and group sizes."""
+    order = np.argsort(words[0], kind="stable") if len(words) == 1 else np.lexsort(words[::-1])
+    changed = np.zeros(len(order), dtype=bool)
+    if len(order):
+        changed[0] = True
+    for word in words:
+        sorted_word = word[order]
+        changed[1:] |= sorted_word[1:] != sorted_word[:-1]
+    starts = np.flatnonzero(changed)
+    return order, starts, np.diff(np.append(starts, len(order)))
+
+
+def duplicate_table(tets, n_points):
+    """Positions of the first occurrence of every distinct tetrahedron and the number of extra copies."""
+    order, starts, counts = sorted_groups(packed_keys(np.sort(tets, axis=1), n_points))
+    return order[starts], int(np.sum(counts - 1))
+
+
+def face_table(faces, n_points):
+    """
+    One sorted face table for all face checks: faces occurring once form the
+    boundary (original orientation, lexicographic order of the sorted faces),
+    faces shared by more than two tetrahedra are non-manifold.
+    """
+    order, starts, counts = sorted_groups(packed_keys(np.sort(faces, axis=1), n_points))
+    return faces[order[starts[counts == 1]]], int(np.sum(counts > 2))
+
+
+def boundary_edge_counts(boundary_faces, n_points):
+    _, _, counts = sorted_groups(packed_keys(boundary_edges(boundary_faces), n_points))
+    return counts
+
+
 def count_components_from_faces(faces):
     if len(faces) == 0:
         return 0
-    vertices = np.unique(faces.reshape(-1))
-    parent = {int(v): int(v) for v in vertices}
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    vertices, local = np.unique(faces.reshape(-1), return_inverse=True)
+    local = local.reshape(faces.shape)
+    rows = np.concatenate((local[:, 0], local[:, 1]))
+    cols = np.concatenate((local[:, 1], local[:, 2]))
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(vertices), len(vertices)))
+    count, _ = connected_components(graph, directed=False)
+    return int(count)
+
+
+def xdmf_hdf5_datasets(mesh_path):
+    """Locate geometry, tetra topology and cell tags of a single-block tetra XDMF in its HDF5 file(s)."""
+    import xml.etree.ElementTree as ET
+
+    grid = ET.parse(mesh_path).getroot().find(".//Grid")
+    topology = grid.find("Topology") if grid is not None else None
+    topology_type = "" if topology is None else topology.get("TopologyType", topology.get("Type", ""))
+    if topology_type.lower() != "tetrahedron":
+        raise ValueError(f"Chunked audit needs a single tetrahedron block in {mesh_path} (found {topology_type or 'none'}); run with chunk_tets = 0")
+
+    def dataset(element):
+        item = element.find("DataItem")
+        if item is None or item.get("Format") != "HDF":
+            raise ValueError(f"Chunked audit needs HDF5 data items in {mesh_path}")
+        file_name, _, path = item.text.strip().partition(":")
+        return mesh_path.parent / file_name, path
+
+    tags = {attribute.get("Name"): dataset(attribute) for attribute in grid.findall("Attribute") if attribute.get("Center") == "Cell"}
+    return dataset(grid.find("Geometry")), dataset(topology), tags
+
+
+def audit_hdf5_chunked(mesh_path, active_ref, all_tets, chunk_tets, work_dir):
+    """
+    Audit pass over the HDF5 topology in blocks of `chunk_tets` tetrahedra.
+    Sorted faces and tetrahedra are spilled into buckets by their smallest
+    vertex index, so every face/duplicate group lies in exactly one bucket; only
+    one bucket is sorted at a time. Results are identical to the in-memory path.
+    """
+    import h5py
+
+    geometry_item, topology_item, tag_items = xdmf_hdf5_datasets(mesh_path)
+    handles = {}
+
+    def open_dataset(item):
+        if item[0] not in handles:
+            handles[item[0]] = h5py.File(item[0], "r")
+        return handles[item[0]][item[1]]
 
-    def find(x):
-        while parent[x] != x:
-            parent[x] = parent[parent[x]]
-            x = parent[x]
-        return x
+    try:
+        points = np.asarray(open_dataset(geometry_item))[:, :3]
+        topology = open_dataset(topology_item)
+        tag_name = next((name for name in CELL_TAG_CANDIDATES if name in tag_items), next(iter(tag_items), None))
+        tags = open_dataset(tag_items[tag_name]) if tag_name is not None and not all_tets else None
+
+        n_total = int(topology.shape[0])
+        n_points = len(points)
+        n_buckets = min(256, max(1, math.ceil(n_total / chunk_tets)))
+        work = Path(tempfile.mkdtemp(prefix="topology_audit_", dir=work_dir))
+        face_files = [open(work / f"faces_{b}.bin", "wb") for b in range(n_buckets)]
+        tet_files = [open(work / f"tets_{b}.bin", "wb") for b in range(n_buckets)]
+
+        volumes = []
+        n_selected = 0
+        for lo in range(0, n_total, chunk_tets):
+            tets = np.asarray(topology[lo : lo + chunk_tets], dtype=np.int64)
+            if tags is not None:
+                tets = tets[np.asarray(tags[lo : lo + chunk_tets]).reshape(-1) == active_ref]
+            volumes.append(tetra_signed_volumes(points, tets))
+
+            sorted_tets = np.sort(tets, axis=1)
+            indexed = np.column_stack((sorted_tets, np.arange(n_selected, n_selected + len(tets), dtype=np.int64)))
+            faces = tetra_faces(tets)
+            for rows, key, files in ((indexed, sorted_tets[:, 0], tet_files), (faces, faces.min(axis=1), face_files)):
+                bucket = key * n_buckets // max(n_points, 1)
+                for b in np.unique(bucket):
+                    files[b].write(np.ascontiguousarray(rows[bucket == b]).tobytes())
+            n_selected += len(tets)
+
+        for handle in face_files + tet_files:
+            handle.close()
+        if tags is not None and n_selected == 0:
+            raise ValueError(f"No tetrahedra found with {tag_name} == {active_ref}")
+
+        duplicate_keep_mask = np.zeros(n_selected, dtype=bool)
+        duplicate_tetrahedra = 0
+        boundary_faces = []
+        nonmanifold_tetra_faces = 0
+        for b in range(n_buckets):
+            indexed = np.fromfile(work / f"tets_{b}.bin", dtype=np.int64).reshape(-1, 5)
+            keep, extra = duplicate_table(indexed[:, :4], n_points)
+            duplicate_keep_mask[indexed[keep, 4]] = True
+            duplicate_tetrahedra += extra
+            faces, nonmanifold = face_table(np.fromfile(work / f"faces_{b}.bin", dtype=np.int64).reshape(-1, 3), n_points)
+            boundary_faces.append(faces)
+            nonmanifold_tetra_faces += nonmanifold
+            (work / f"tets_{b}.bin").unlink()
+            (work / f"faces_{b}.bin").unlink()
+        work.rmdir()
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+    if tags is not None:
+        selected_note = f"{n_selected} / {n_total} tetrahedra with {tag_name} == {active_ref}"
+    else:
+        selected_note = f"all {n_total} tetrahedra"
+    return {
+        "points": points,
+        "tetrahedra": n_selected,
+        "selected_note": selected_note,
+        "volumes": np.concatenate(volumes) if volumes else np.empty(0),
+        "duplicate_keep_mask": duplicate_keep_mask,
+        "duplicate_tetrahedra": duplicate_tetrahedra,
+        "boundary_faces": np.concatenate(boundary_faces) if boundary_faces else np.empty((0, 3), dtype=np.int64),
+        "nonmanifold_tetra_faces": nonmanifold_tetra_faces,
+    }
 
-    def union(a, b):
-        root_a = find(int(a))
-        root_b = find(int(b))
-        if root_a != root_b:
-            parent[root_b] = root_a
 
-    for face in faces:
-        union(face[0], face[1])
-        union(face[1], face[2])
-    return len({find(int(v)) for v in vertices})
+def audit_in_memory(points, tets):
+    keep, duplicate_tetrahedra = duplicate_table(tets, len(points))
+    duplicate_keep_mask = np.zeros(len(tets), dtype=bool)
+    duplicate_keep_mask[keep] = True
+    boundary_faces, nonmanifold_tetra_faces = face_table(tetra_faces(tets), len(points))
+    return {
+        "points": points,
+        "tetrahedra": len(tets),
+        "volumes": tetra_signed_volumes(points, tets),
+        "duplicate_keep_mask": duplicate_keep_mask,
+        "duplicate_tetrahedra": duplicate_tetrahedra,
+        "boundary_faces": boundary_faces,
+        "nonmanifold_tetra_faces": nonmanifold_tetra_faces,
+    }
+
+
+def audit_metrics(audit, cfg):
+    points = audit["points"]
+    volumes = audit["volumes"]
+    abs_volumes = np.abs(volumes)
+    median_volume = float(np.median(abs_volumes)) if len(abs_volumes) else 0.0
+    tiny_limit = max(float(cfg["tiny_volume_absolute"]), median_volume * float(cfg["tiny_volume_relative_to_median"]))
+    degenerate_mask = abs_volumes <= float(cfg["volume_tolerance"])
+    tiny_mask = (abs_volumes > float(cfg["volume_tolerance"])) & (abs_volumes <= tiny_limit)
+
+    boundary_faces = audit["boundary_faces"]
+    boundary_face_areas = face_areas(points, boundary_faces) if len(boundary_faces) else np.array([])
+    degenerate_boundary_faces = int(np.sum(boundary_face_areas <= float(cfg["face_area_tolerance"])))
+    edge_counts = boundary_edge_counts(boundary_faces, len(points))
+
+    metrics = {
+        "points": int(len(points)),
+        "tetrahedra": int(audit["tetrahedra"]),
+        "duplicate_tetrahedra": audit["duplicate_tetrahedra"],
+        "degenerate_tetrahedra": int(np.sum(degenerate_mask)),
+        "tiny_tetrahedra": int(np.sum(tiny_mask)),
+        "negative_orientation_tetrahedra": int(np.sum(volumes < 0.0)),
+        "smallest_abs_volume": float(np.min(abs_volumes)) if len(abs_volumes) else None,
+        "median_abs_volume": median_volume,
+        "tiny_volume_limit": tiny_limit,
+        "nonmanifold_tetra_faces": audit["nonmanifold_tetra_faces"],
+        "boundary_faces": int(len(boundary_faces)),
+        "degenerate_boundary_faces": degenerate_boundary_faces,
+        "boundary_edges": int(len(edge_counts)),
+        "open_boundary_edges": int(np.sum(edge_counts == 1)),
+        "nonmanifold_boundary_edges": int(np.sum(edge_counts > 2)),
+        "boundary_components": count_components_from_faces(boundary_faces),
+    }
+    return metrics, degenerate_mask, tiny_mask
 
 
 def optional_surface_checks(points, boundary_faces):
@@ -279,91 +484,26 @@ def write_report(output_path, mesh_path, selected_note, metrics, checks, verdict
     output_path.write_text("\n".join(lines))
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Audit tetra mesh topology and boundary manifoldness.")
-    parser.add_argument("--config", default=None, help="Optional config JSON containing 09_mesh_topology_audit")
-    parser.add_argument("--mesh", required=True, help="Input tetrahedral mesh path")
-    parser.add_argument("--output", default=None, help="Output topology report path")
-    parser.add_argument("--repair-output", default=None, help="Write a mechanically repaired tetra mesh to this path")
-    parser.add_argument("--active-ref", type=int, default=None, help="Only keep tetrahedra with this cell tag value")
-    parser.add_argument("--all-tets", action="store_true", help="Use all tetrahedra even if region tags are present")
-    args = parser.parse_args()
-
-    cfg = load_config(args.config)
-    mesh_path = Path(args.mesh)
-    output_path = Path(args.output) if args.output else mesh_path.with_suffix(".topology.txt")
-    active_ref = args.active_ref if args.active_ref is not None else cfg["active_ref"]
-    all_tets = args.all_tets or bool(cfg["all_tets"])
-
-    mesh = meshio.read(mesh_path)
-    points = mesh.points[:, :3]
-    tets, selected_note = select_tetrahedra(mesh, active_ref, all_tets)
-
-    sorted_tets = np.sort(tets, axis=1)
-    _, first_indices, duplicate_inverse, duplicate_counts = np.unique(
-        sorted_tets,
-        axis=0,
-        return_index=True,
-        return_inverse=True,
-        return_counts=True,
-    )
-    duplicate_keep_mask = np.zeros(len(tets), dtype=bool)
-    duplicate_keep_mask[first_indices] = True
-    duplicate_tetrahedra = int(np.sum(duplicate_counts[duplicate_inverse] > 1) - np.sum(duplicate_counts > 1))
-
-    volumes = tetra_signed_volumes(points, tets)
-    abs_volumes = np.abs(volumes)
-    median_volume = float(np.median(abs_volumes)) if len(abs_volumes) else 0.0
-    tiny_limit = max(float(cfg["tiny_volume_absolute"]), median_volume * float(cfg["tiny_volume_relative_to_median"]))
-    degenerate_mask = abs_volumes <= float(cfg["volume_tolerance"])
-    tiny_mask = (abs_volumes > float(cfg["volume_tolerance"])) & (abs_volumes <= tiny_limit)
-
-    faces = tetra_faces(tets)
-    sorted_faces = np.sort(faces, axis=1)
-    unique_faces, unique_face_indices, face_counts = np.unique(
-        sorted_faces,
-        axis=0,
-        return_index=True,
-        return_counts=True,
-    )
-    boundary_faces = faces[unique_face_indices[face_counts == 1]]
-    nonmanifold_tetra_faces = int(np.sum(face_counts > 2))
-
-    boundary_face_areas = face_areas(points, boundary_faces) if len(boundary_faces) else np.array([])
-    degenerate_boundary_faces = int(np.sum(boundary_face_areas <= float(cfg["face_area_tolerance"])))
-
-    edges = boundary_edges(boundary_faces) if len(boundary_faces) else np.empty((0, 2), dtype=np.int64)
-    unique_edges, edge_counts = np.unique(edges, axis=0, return_counts=True) if len(edges) else (np.empty((0, 2), dtype=np.int64), np.array([], dtype=np.int64))
-    open_boundary_edges = int(np.sum(edge_counts == 1))
-    nonmanifold_boundary_edges = int(np.sum(edge_counts > 2))
-
-    metrics = {
-        "points": int(len(points)),
-        "tetrahedra": int(len(tets)),
-        "duplicate_tetrahedra": duplicate_tetrahedra,
-        "degenerate_tetrahedra": int(np.sum(degenerate_mask)),
-        "tiny_tetrahedra": int(np.sum(tiny_mask)),
-        "negative_orientation_tetrahedra": int(np.sum(volumes < 0.0)),
-        "smallest_abs_volume": float(np.min(abs_volumes)) if len(abs_volumes) else None,
-        "median_abs_volume": median_volume,
-        "tiny_volume_limit": tiny_limit,
-        "nonmanifold_tetra_faces": nonmanifold_tetra_faces,
-        "boundary_faces": int(len(boundary_faces)),
-        "degenerate_boundary_faces": degenerate_boundary_faces,
-        "boundary_edges": int(len(unique_edges)),
-        "open_boundary_edges": open_boundary_edges,
-        "nonmanifold_boundary_edges": nonmanifold_boundary_edges,
-        "boundary_components": count_components_from_faces(boundary_faces),
-    }
+def finish_audit(audit, selected_note, tets, cfg, mesh_path, output_path, repair_output=None, active_ref=1, all_tets=False):
+    """
+    Metrics, verdict, optional repair and report for an audit from
+    audit_in_memory/audit_hdf5_chunked. tets may be None (chunked pass); a
+    repair then reloads the connectivity from mesh_path. Returns the verdict.
+    """
+    points = audit["points"]
+    volumes = audit["volumes"]
+    duplicate_keep_mask = audit["duplicate_keep_mask"]
+    boundary_faces = audit["boundary_faces"]
+    metrics, degenerate_mask, tiny_mask = audit_metrics(audit, cfg)
     checks = optional_surface_checks(points, boundary_faces)
     verdict = classify(metrics, cfg)
 
     repair_actions = []
-    repair_output = None
-    repair_output_cfg = cfg["repair"].get("output_mesh_path")
-    repair_requested = bool(cfg["repair"].get("enabled", False)) or args.repair_output
-    if repair_requested:
-        repair_output = Path(args.repair_output or repair_output_cfg or mesh_path.with_name(mesh_path.stem + "_topology_repaired.xdmf"))
+    if repair_output is not None:
+        repair_output = Path(repair_output)
+        if tets is None:
+            # Repair needs the full connectivity; the chunked pass only kept the masks.
+            tets, _ = select_tetrahedra(meshio.read(mesh_path), active_ref, all_tets)
         repaired_points, repaired_tets, repair_actions = repair_tetrahedra(
             points,
             tets,
@@ -392,6 +532,56 @@ def main():
     print(f"Mesh topology verdict: {verdict}")
     if repair_output:
         print(f"Wrote topology repair mesh: {repair_output}")
+    return verdict
+
+
+def default_repair_output(cfg, mesh_path, override=None):
+    """Repair mesh path if a repair is requested (config or override), else None."""
+    if not (bool(cfg["repair"].get("enabled", False)) or override):
+        return None
+    repair_output_cfg = cfg["repair"].get("output_mesh_path")
+    return Path(override or repair_output_cfg or mesh_path.with_name(mesh_path.stem + "_topology_repaired.xdmf"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit tetra mesh topology and boundary manifoldness.")
+    parser.add_argument("--config", default=None, help="Optional config JSON containing 09_mesh_topology_audit")
+    parser.add_argument("--mesh", required=True, help="Input tetrahedral mesh path")
+    parser.add_argument("--output", default=None, help="Output topology report path")
+    parser.add_argument("--repair-output", default=None, help="Write a mechanically repaired tetra mesh to this path")
+    parser.add_argument("--active-ref", type=int, default=None, help="Only keep tetrahedra with this cell tag value")
+    parser.add_argument("--all-tets", action="store_true", help="Use all tetrahedra even if region tags are present")
+    parser.add_argument("--chunk-tets", type=int, default=None, help="Read the XDMF/HDF5 topology in blocks of this many tetrahedra (0 = load the whole mesh)")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    mesh_path = Path(args.mesh)
+    output_path = Path(args.output) if args.output else mesh_path.with_suffix(".topology.txt")
+    active_ref = args.active_ref if args.active_ref is not None else cfg["active_ref"]
+    all_tets = args.all_tets or bool(cfg["all_tets"])
+
+    chunk_tets = args.chunk_tets if args.chunk_tets is not None else int(cfg.get("chunk_tets", 0) or 0)
+
+    if chunk_tets > 0:
+        audit = audit_hdf5_chunked(mesh_path, active_ref, all_tets, chunk_tets, output_path.parent)
+        selected_note = audit["selected_note"]
+        tets = None
+    else:
+        mesh = meshio.read(mesh_path)
+        tets, selected_note = select_tetrahedra(mesh, active_ref, all_tets)
+        audit = audit_in_memory(mesh.points[:, :3], tets)
+
+    finish_audit(
+        audit,
+        selected_note,
+        tets,
+        cfg,
+        mesh_path,
+        output_path,
+        repair_output=default_repair_output(cfg, mesh_path, args.repair_output),
+        active_ref=active_ref,
+        all_tets=all_tets,
+    )
 
 
 if __name__ == "__main__":
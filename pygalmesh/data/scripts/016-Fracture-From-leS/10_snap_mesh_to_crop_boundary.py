@@ -68,26 +68,10 @@ def write_report(path, info):
     Path(path).write_text("\n".join(lines) + "\n")
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Snap mesh nodes near the crop cuboid boundary and remove collapsed tetrahedra.")
-    parser.add_argument("--config", required=True, help="Path to config.json")
-    parser.add_argument("--mesh", required=True, help="Input/output mesh path")
-    parser.add_argument("--output", default=None, help="Optional output mesh path. Defaults to overwrite --mesh")
-    parser.add_argument("--report", default=None, help="Optional text report path")
-    args = parser.parse_args()
-
-    config = load_config(args.config)
-    cfg = config.get("10_snap_mesh_to_crop_boundary", {})
-    if not cfg.get("enabled", False):
-        print("Boundary snapping disabled in config; leaving mesh unchanged.")
-        return
-
-    mesh_path = args.mesh
-    output_path = args.output or args.mesh
-    report_path = args.report or str(Path(output_path).with_suffix(".snap_boundary.txt"))
-
-    mesh = meshio.read(mesh_path)
+def snap_mesh(mesh, cfg):
+    """Snap nodes near the bounding box onto it and drop collapsed tets; returns (mesh, info)."""
     tetra_index = tetra_block_index(mesh)
+
     points = np.asarray(mesh.points[:, :3], dtype=float)
     cells = np.asarray(mesh.cells[tetra_index].data, dtype=np.int64)
 
@@ -149,11 +133,8 @@ def main():
         cell_data=cell_data,
         field_data=mesh.field_data,
     )
-    meshio.write(output_path, out)
 
     info = {
-        "mesh": mesh_path,
-        "output": output_path,
         "bounds_min": bounds_min.tolist(),
         "bounds_max": bounds_max.tolist(),
         "tolerance": tolerance,
@@ -170,8 +151,31 @@ def main():
         "moved_nodes": moved_nodes,
         **{f"snapped_nodes_{key}": value for key, value in snap_counts.items()},
     }
-    write_report(report_path, info)
     print(f"Snapped {moved_nodes} nodes to crop boundary; removed {original_cells - len(compact_cells)} tetrahedra.")
+    return out, info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snap mesh nodes near the crop cuboid boundary and remove collapsed tetrahedra.")
+    parser.add_argument("--config", required=True, help="Path to config.json")
+    parser.add_argument("--mesh", required=True, help="Input/output mesh path")
+    parser.add_argument("--output", default=None, help="Optional output mesh path. Defaults to overwrite --mesh")
+    parser.add_argument("--report", default=None, help="Optional text report path")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    cfg = config.get("10_snap_mesh_to_crop_boundary", {})
+    if not cfg.get("enabled", False):
+        print("Boundary snapping disabled in config; leaving mesh unchanged.")
+        return
+
+    mesh_path = args.mesh
+    output_path = args.output or args.mesh
+    report_path = args.report or str(Path(output_path).with_suffix(".snap_boundary.txt"))
+
+    out, info = snap_mesh(meshio.read(mesh_path), cfg)
+    meshio.write(output_path, out)
+    write_report(report_path, {"mesh": mesh_path, "output": output_path, **info})
     print(f"Wrote mesh: {output_path}")
     print(f"Wrote report: {report_path}")
 
@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import os
+import sys
 from pathlib import Path
 
 import meshio
 import numpy as np
-from scipy.spatial import cKDTree
+
+# Repeating and welding is shared with the utility scripts in utils/alex/process_meshes.py.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "utils", "alex"))
+
+import process_meshes  # noqa: E402
 
 
 def load_config(path):
@@ -35,6 +41,19 @@ def compact_mesh(points, cells):
     return points[used], old_to_new[cells], used
 
 
+def as_list(value):
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def per_axis(value, axis_names, key):
+    values = as_list(value)
+    if len(values) == 1:
+        return values * len(axis_names)
+    if len(values) != len(axis_names):
+        raise ValueError(f"{key} needs one entry per mirror axis {axis_names}: {value}")
+    return values
+
+
 def tolerance_from_config(cfg, lengths):
     absolute = cfg.get("merge_tolerance_absolute", None)
     if absolute is not None:
@@ -43,48 +62,6 @@ def tolerance_from_config(cfg, lengths):
     return fraction * float(np.min(lengths))
 
 
-def mirror_points(points, axis, plane_value):
-    mirrored = points.copy()
-    mirrored[:, axis] = 2.0 * plane_value - mirrored[:, axis]
-    return mirrored
-
-
-def build_mirrored_connectivity(points, mirrored_points, cells, axis, plane_value, tolerance):
-    original_plane_mask = np.abs(points[:, axis] - plane_value) <= tolerance
-    original_plane_indices = np.flatnonzero(original_plane_mask)
-
-    old_to_combined = np.full(len(points), -1, dtype=np.int64)
-    appended_points = []
-    glued_count = 0
-
-    if len(original_plane_indices) > 0:
-        tree = cKDTree(points[original_plane_indices])
-    else:
-        tree = None
-
-    for mirrored_index, point in enumerate(mirrored_points):
-        glued = False
-        if tree is not None and abs(point[axis] - plane_value) <= tolerance:
-            distance, nearest = tree.query(point, distance_upper_bound=tolerance)
-            if np.isfinite(distance) and nearest < len(original_plane_indices):
-                old_to_combined[mirrored_index] = int(original_plane_indices[nearest])
-                glued = True
-                glued_count += 1
-        if not glued:
-            old_to_combined[mirrored_index] = len(points) + len(appended_points)
-            appended_points.append(point)
-
-    if appended_points:
-        combined_points = np.vstack((points, np.asarray(appended_points)))
-    else:
-        combined_points = points.copy()
-
-    mirrored_cells = old_to_combined[cells]
-    mirrored_cells = mirrored_cells[:, [1, 0, 2, 3]]
-    combined_cells = np.vstack((cells, mirrored_cells))
-    return combined_points, combined_cells, glued_count, len(appended_points)
-
-
 def clean_cells(points, cells, volume_tolerance, orient_positive=True):
     volumes = tetra_volumes(points, cells)
     duplicate_vertex_cells = np.any(np.diff(np.sort(cells, axis=1), axis=1) == 0, axis=1)
@@ -116,7 +93,7 @@ def clean_cells(points, cells, volume_tolerance, orient_positive=True):
     }
 
 
-def tetra_cell_data(mesh, tetra_index, original_count, first_keep_mask, second_keep_mask):
+def tetra_cell_data(mesh, tetra_index, original_count, first_keep_mask, second_keep_mask, copies=2):
     cell_data = {}
     combined_keep = None
     if len(second_keep_mask) == int(np.count_nonzero(first_keep_mask)):
@@ -129,10 +106,10 @@ def tetra_cell_data(mesh, tetra_index, original_count, first_keep_mask, second_k
         data = np.asarray(data_list[tetra_index])
         if len(data) != original_count:
             continue
-        doubled = np.concatenate((data, data.copy()))
-        if combined_keep is not None and len(combined_keep) == len(doubled):
-            doubled = doubled[combined_keep]
-        cell_data[name] = [doubled]
+        repeated = np.concatenate([data] * copies)
+        if combined_keep is not None and len(combined_keep) == len(repeated):
+            repeated = repeated[combined_keep]
+        cell_data[name] = [repeated]
     return cell_data
 
 
@@ -143,35 +120,28 @@ def write_report(path, info):
     Path(path).write_text("\n".join(lines) + "\n")
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Mirror-extrude a tetra mesh once and glue it along a selected crop-boundary plane.")
-    parser.add_argument("--config", required=True, help="Path to config.json")
-    parser.add_argument("--mesh", required=True, help="Input/output mesh path")
-    parser.add_argument("--output", default=None, help="Optional output mesh path. Defaults to overwrite --mesh")
-    parser.add_argument("--report", default=None, help="Optional report path")
-    args = parser.parse_args()
-
-    config = load_config(args.config)
-    cfg = config.get("11_mirror_extrude_mesh", {})
-    if not cfg.get("enabled", False):
-        print("Mirror extrusion disabled in config; leaving mesh unchanged.")
-        return
-
-    axis_name = str(cfg.get("axis", "x")).lower()
+def mirror_extrude_mesh(mesh, cfg):
+    """Mirror-extrude and weld the tetra block of mesh; returns (mesh, info)."""
+    # axis/plane/repetitions: single values or lists (one entry per axis);
+    # repetitions counts the copies along the axis including the original.
+    axis_names = [str(name).lower() for name in as_list(cfg.get("axis", "x"))]
     axis_map = {"x": 0, "y": 1, "z": 2}
-    if axis_name not in axis_map:
-        raise ValueError(f"Unsupported mirror axis: {axis_name}; expected x, y, or z")
-    axis = axis_map[axis_name]
+    for axis_name in axis_names:
+        if axis_name not in axis_map:
+            raise ValueError(f"Unsupported mirror axis: {axis_name}; expected x, y, or z")
+    if len(set(axis_names)) != len(axis_names):
+        raise ValueError(f"Mirror axes must be distinct: {axis_names}")
+    axes = [axis_map[name] for name in axis_names]
+
+    planes = [str(plane).lower() for plane in per_axis(cfg.get("plane", None), axis_names, "plane")]
+    planes = [plane if plane != "none" else f"{name}min" for plane, name in zip(planes, axis_names)]
+    for plane, axis_name in zip(planes, axis_names):
+        if plane not in (f"{axis_name}min", f"{axis_name}max"):
+            raise ValueError(f"Unsupported mirror plane: {plane}; expected {axis_name}min or {axis_name}max")
+    repetitions = [int(n) for n in per_axis(cfg.get("repetitions", 2), axis_names, "repetitions")]
+    if any(n < 1 for n in repetitions):
+        raise ValueError(f"Mirror repetitions must be >= 1: {repetitions}")
 
-    plane = str(cfg.get("plane", f"{axis_name}min")).lower()
-    if plane not in (f"{axis_name}min", f"{axis_name}max"):
-        raise ValueError(f"Unsupported mirror plane: {plane}; expected {axis_name}min or {axis_name}max")
-
-    mesh_path = args.mesh
-    output_path = args.output or args.mesh
-    report_path = args.report or str(Path(output_path).with_suffix(".mirror_extrude.txt"))
-
-    mesh = meshio.read(mesh_path)
     tetra_index = tetra_block_index(mesh)
     points = np.asarray(mesh.points[:, :3], dtype=float)
     cells = np.asarray(mesh.cells[tetra_index].data, dtype=np.int64)
@@ -181,21 +151,35 @@ def main():
     if np.any(lengths <= 0.0):
         raise ValueError(f"Invalid mesh bounds for mirror extrusion: min={original_bounds_min}, max={original_bounds_max}")
 
-    plane_value = float(original_bounds_min[axis] if plane.endswith("min") else original_bounds_max[axis])
+    plane_values = [
+        float(original_bounds_min[axis] if plane.endswith("min") else original_bounds_max[axis])
+        for axis, plane in zip(axes, planes)
+    ]
     tolerance = tolerance_from_config(cfg, lengths)
     volume_tolerance = float(cfg.get("volume_tolerance", 1e-14))
     orient_positive = bool(cfg.get("orient_tets_positive", True))
 
-    mirrored = mirror_points(points, axis, plane_value)
-    combined_points, combined_cells, glued_nodes, appended_nodes = build_mirrored_connectivity(
-        points, mirrored, cells, axis, plane_value, tolerance
+    # Copies grow away from the mesh (xmin -> -x, xmax -> +x); cells stay in
+    # copy order, so tetra cell data is simply repeated per copy.
+    merged = process_meshes.mirror_and_merge_repeated(
+        meshio.Mesh(points, {"tetra": cells}),
+        mirror_directions=axes,
+        repetitions=repetitions,
+        merging_tolerance=tolerance,
+        mirror_plane_values=plane_values,
     )
+    combined_points = np.asarray(merged.points, dtype=float)
+    combined_cells = np.asarray(merged.cells[0].data, dtype=np.int64)
+    copies = int(np.prod(repetitions))
+    glued_nodes = copies * len(points) - len(combined_points)
+    appended_nodes = len(combined_points) - len(points)
+
     compact_points, compact_cells, used_indices, cleanup = clean_cells(
         combined_points, combined_cells, volume_tolerance, orient_positive=orient_positive
     )
 
     cell_data = tetra_cell_data(
-        mesh, tetra_index, len(cells), cleanup["first_keep_mask"], cleanup["second_keep_mask"]
+        mesh, tetra_index, len(cells), cleanup["first_keep_mask"], cleanup["second_keep_mask"], copies=copies
     )
     cleanup.pop("first_keep_mask")
     cleanup.pop("second_keep_mask")
@@ -206,16 +190,14 @@ def main():
         cell_data=cell_data,
         field_data=mesh.field_data,
     )
-    meshio.write(output_path, out)
 
     final_bounds_min = compact_points.min(axis=0)
     final_bounds_max = compact_points.max(axis=0)
     info = {
-        "mesh": mesh_path,
-        "output": output_path,
-        "axis": axis_name,
-        "plane": plane,
-        "plane_value": plane_value,
+        "axis": ",".join(axis_names),
+        "plane": ",".join(planes),
+        "plane_value": plane_values[0] if len(plane_values) == 1 else plane_values,
+        "repetitions": repetitions[0] if len(repetitions) == 1 else repetitions,
         "merge_tolerance": tolerance,
         "volume_tolerance": volume_tolerance,
         "original_bounds_min": original_bounds_min.tolist(),
@@ -227,13 +209,36 @@ def main():
         "appended_mirrored_nodes": int(appended_nodes),
         "final_points": int(len(compact_points)),
         "original_tetrahedra": int(len(cells)),
-        "mirrored_tetrahedra_before_cleanup": int(len(cells)),
+        "mirrored_tetrahedra_before_cleanup": int(len(cells) * (copies - 1)),
         "combined_tetrahedra_before_cleanup": int(len(combined_cells)),
         "final_tetrahedra": int(len(compact_cells)),
         **cleanup,
     }
-    write_report(report_path, info)
-    print(f"Mirror-extruded mesh along {plane}; glued {glued_nodes} nodes; final tets: {len(compact_cells)}")
+    print(f"Mirror-extruded mesh along {','.join(planes)} ({copies} copies); glued {glued_nodes} nodes; final tets: {len(compact_cells)}")
+    return out, info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror-extrude a tetra mesh (optionally repeatedly and along several axes) and glue the copies along the mirror planes.")
+    parser.add_argument("--config", required=True, help="Path to config.json")
+    parser.add_argument("--mesh", required=True, help="Input/output mesh path")
+    parser.add_argument("--output", default=None, help="Optional output mesh path. Defaults to overwrite --mesh")
+    parser.add_argument("--report", default=None, help="Optional report path")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    cfg = config.get("11_mirror_extrude_mesh", {})
+    if not cfg.get("enabled", False):
+        print("Mirror extrusion disabled in config; leaving mesh unchanged.")
+        return
+
+    mesh_path = args.mesh
+    output_path = args.output or args.mesh
+    report_path = args.report or str(Path(output_path).with_suffix(".mirror_extrude.txt"))
+
+    out, info = mirror_extrude_mesh(meshio.read(mesh_path), cfg)
+    meshio.write(output_path, out)
+    write_report(report_path, {"mesh": mesh_path, "output": output_path, **info})
     print(f"Wrote mesh: {output_path}")
     print(f"Wrote report: {report_path}")
 
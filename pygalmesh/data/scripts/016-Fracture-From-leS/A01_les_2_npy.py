@@ -40,6 +40,13 @@ Auflösung reduzieren
     any        Block wird Aluminium, sobald ein Untervoxel Aluminium ist
     all        Block wird Aluminium, nur wenn alle Untervoxel Aluminium sind
 
+Mehrere Faktoren (`--reduce 2 4 8`) erzeugen alle Stufen in **einem** Durchlauf:
+jeder Quader wird einmal gelesen und dekodiert, auf das kgV der Faktoren
+gruppiert und dann für jede Stufe reduziert. Der Ausschnitt wird dafür auf ein
+Vielfaches des kgV gekürzt. Jede Stufe bekommt ihre eigene .npy samt Sidecar:
+`{reduce}` in `--output`/`--metadata`/`--pipeline-metadata` wird durch den
+Faktor ersetzt, ohne Platzhalter landet jede Stufe im Unterordner `reduce-<N>`.
+
 Optional `--smooth-sigma S` (Default 0 = aus): Gauß-Glättung des
 Belegungsanteils **im reduzierten Gitter** vor dem Schwellwert. Für reduce ≤ 2
 in der Regel unnötig — die eigentliche Oberflächenglättung passiert in Schritt 03
@@ -50,6 +57,22 @@ Speicher
 Streaming über np.lib.format.open_memmap: der RAM-Bedarf ist unabhängig von der
 Volumengröße (Standard-Lesepuffer 64 MB).
 
+Binär-Cache
+-----------
+Beim ersten Lauf wird die ASCII-Datei einmalig in `<name>.lesbin.npy`
+(bitgepackte Labels, eine Zeile pro Voxelsäule) plus `<name>.lesbin.json`
+(Header, Voxelgröße, SHA-256 der Quelle) umgewandelt. Folgeläufe mit anderem
+`--x-range`, `--reduce` oder `--reduce-mode` lesen nur noch per memmap aus dem
+Cache; A02/A03 nutzen ihn ebenfalls. Steuerung über `--les-cache` und
+`--cache-dir` (z.B. wenn der Ressourcenordner schreibgeschützt ist).
+
+`--workers N` teilt die äußeren Zeilen (x bei C-Order) in durch `--reduce`
+teilbare Abschnitte und verarbeitet sie in N Prozessen; jeder Prozess liest per
+seek nur seinen Bytebereich und schreibt seinen reduzierten Abschnitt direkt in
+die gemeinsame .npy. Bounding-Box-Flags und Labelzählungen werden am Ende
+zusammengeführt — das Ergebnis ist bitgleich zum seriellen Lauf. RAM-Bedarf
+≈ N × Lesepuffer.
+
 Aufrufe
 -------
     # Cluster/Container, gesteuert über die Projekt-Config
@@ -57,22 +80,32 @@ Aufrufe
 
     # frei, ohne Config
     python3 A01_les_2_npy.py --input /data/resources/A01_segmented \
-        --output /tmp/volume.npy --reduce 4 --x-range 300 700
+        --output /tmp/volume.npy --reduce 4 --x-range 300 700 --workers 8
+
+    # drei Stufen in einem Durchlauf
+    python3 A01_les_2_npy.py --input /data/resources/A01_segmented \
+        --output /tmp/tiers/r{reduce}/volume.npy --reduce 2 4 8
 """
 
 import argparse
 import glob
+import hashlib
 import json
 import math
 import os
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 
 PROJECT_CONTAINER_DIR = "/data/scripts/015-Yield-Surface-Batch-leS"
 CONFIG_SECTION = "A01_les_2_npy"
 DEFAULT_OUTPUT_FILENAME = "segmented_3D_volume.npy"
+# Abschnitte pro Worker bei --workers > 1 (kleinere Abschnitte gleichen Lastunterschiede aus)
+WORKER_TASKS_PER_PROCESS = 4
+# Version des Binär-Caches (<name>.lesbin.npy/.json), bei Formatänderung erhöhen
+LES_CACHE_FORMAT = "lesbin-1"
 
 # Reihenfolge, in der ohne --input/--config nach der .leS-Datei gesucht wird.
 DEFAULT_INPUT_CANDIDATES = (
@@ -192,6 +225,173 @@ def parse_generic(handle, header_bytes, nz, line_start, n_lines, z_slice, lines_
         remaining -= take
 
 
+def parse_cache(store, bits, nz, line_start, n_lines, z_slice, lines_per_block=65536):
+    """Wie parse_fast, aber aus dem Binär-Cache (memmap, siehe build_les_cache)."""
+    remaining = n_lines
+    line = line_start
+    while remaining > 0:
+        take = min(lines_per_block, remaining)
+        packed = store[line : line + take]
+        if bits == 1:
+            values = np.unpackbits(packed, axis=1, count=nz)
+        else:
+            values = np.asarray(packed)
+        yield values[:, z_slice]
+        line += take
+        remaining -= take
+
+
+# --------------------------------------------------------------------------- #
+# Binär-Cache der .leS-Datei
+# --------------------------------------------------------------------------- #
+def cache_paths(input_path, cache_dir=None):
+    """(<name>.lesbin.npy, <name>.lesbin.json) neben der .leS-Datei oder in cache_dir."""
+    folder = cache_dir or os.path.dirname(os.path.abspath(input_path))
+    stem = os.path.join(folder, os.path.splitext(os.path.basename(input_path))[0])
+    return stem + ".lesbin.npy", stem + ".lesbin.json"
+
+
+def file_sha256(path, chunk_mb=64.0):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(int(chunk_mb * 1024 * 1024)), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cache_info(input_path, cache_dir=None, verify=False):
+    """
+    Liefert die Cache-Metadaten, wenn der Cache zur .leS-Datei passt, sonst None.
+    Gleiche Größe und mtime gelten als Treffer; bei abweichender mtime (z.B. nach
+    dem Kopieren) oder mit verify=True entscheidet der SHA-256 des Inhalts.
+    """
+    store_path, info_path = cache_paths(input_path, cache_dir)
+    if not (os.path.isfile(store_path) and os.path.isfile(info_path)):
+        return None
+    with open(info_path) as handle:
+        info = json.load(handle)
+    if info.get("format") != LES_CACHE_FORMAT:
+        return None
+    stat = os.stat(input_path)
+    if info.get("source_size") != stat.st_size:
+        return None
+    if verify or info.get("source_mtime_ns") != stat.st_mtime_ns:
+        if file_sha256(input_path) != info.get("source_sha256"):
+            return None
+    info["store_path"] = store_path
+    return info
+
+
+def build_les_cache(input_path, header, bytes_per_line, cache_dir=None, chunk_mb=64.0,
+                    lines_per_block=4096):
+    """
+    Einmalige Konvertierung der ASCII-.leS in einen kompakten Binärspeicher:
+
+    * `<name>.lesbin.npy`  — (nx*ny, ceil(nz/8)) uint8, jede Zeile eine bitgepackte
+      Voxelsäule (np.packbits entlang z). Die Zeilen liegen in Dateireihenfolge,
+      jede äußere Zeile (ny bzw. nx Säulen) ist damit ein zusammenhängender Chunk,
+      den ein Crop gezielt per memmap liest. Labels > 1 werden ungepackt (8 bit)
+      gespeichert.
+    * `<name>.lesbin.json` — Header, Voxelgröße, Packung, Größe/mtime/SHA-256 der Quelle.
+    """
+    nx, ny, nz, voxel_size, header_bytes = header
+    n_lines = nx * ny
+    store_path, info_path = cache_paths(input_path, cache_dir)
+    os.makedirs(os.path.dirname(store_path), exist_ok=True)
+    partial_path = store_path + ".partial.npy"
+    stat = os.stat(input_path)
+
+    for bits in (1, 8):
+        width = (nz + 7) // 8 if bits == 1 else nz
+        store = np.lib.format.open_memmap(partial_path, mode="w+", dtype=np.uint8,
+                                          shape=(n_lines, width))
+        with open(input_path, "rb") as handle:
+            if bytes_per_line:
+                blocks = parse_fast(handle, header_bytes, bytes_per_line, nz, 0, n_lines,
+                                    slice(0, nz), chunk_mb=chunk_mb)
+            else:
+                blocks = parse_generic(handle, header_bytes, nz, 0, n_lines, slice(0, nz),
+                                       lines_per_block=lines_per_block)
+            line = 0
+            binary = True
+            for values in blocks:
+                if bits == 1:
+                    if values.max(initial=0) > 1:
+                        binary = False
+                        break
+                    store[line : line + values.shape[0]] = np.packbits(values, axis=1)
+                else:
+                    store[line : line + values.shape[0]] = values
+                line += values.shape[0]
+        store.flush()
+        del store
+        if binary:
+            break
+        print("   Labels > 1 gefunden — Cache wird ungepackt (8 bit) geschrieben.")
+
+    info = {
+        "format": LES_CACHE_FORMAT,
+        "source_file": os.path.abspath(input_path),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_sha256": file_sha256(input_path, chunk_mb=chunk_mb),
+        "les_header": {"nx": nx, "ny": ny, "nz": nz, "voxel_size": voxel_size},
+        "bits": bits,
+        "layout": "lines (l = Zeilenindex der .leS) x z, np.packbits entlang z"
+                  if bits == 1 else "lines (l = Zeilenindex der .leS) x z, uint8",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    os.replace(partial_path, store_path)
+    with open(info_path, "w") as handle:
+        json.dump(info, handle, indent=2)
+    info["store_path"] = store_path
+    return info
+
+
+def prepare_les_cache(input_path, header, bytes_per_line, args):
+    """Cache nach --les-cache auflösen: (info oder None) für die Konvertierung."""
+    mode = args.les_cache
+    if mode == "off":
+        return None
+    info = None
+    if mode != "rebuild":
+        info = load_cache_info(input_path, args.cache_dir, verify=(mode == "verify"))
+    if info is not None:
+        print(f"🗄  Cache   : {info['store_path']} ({info['bits']} bit, SHA-256 {info['source_sha256'][:12]}…)")
+        return info
+    store_path, _ = cache_paths(input_path, args.cache_dir)
+    folder = os.path.dirname(store_path)
+    if mode == "auto" and os.path.isdir(folder) and not os.access(folder, os.W_OK):
+        print(f"🗄  Cache   : {folder} nicht beschreibbar — lese die Textdatei (--cache-dir setzen)")
+        return None
+    print(f"🗄  Cache   : einmalige Konvertierung nach {store_path} …", flush=True)
+    t_start = time.time()
+    info = build_les_cache(input_path, header, bytes_per_line, args.cache_dir,
+                           chunk_mb=args.chunk_mb, lines_per_block=args.lines_per_block)
+    size_mb = os.path.getsize(store_path) / 1024 ** 2
+    print(f"🗄  Cache   : fertig ({size_mb:.1f} MB, {info['bits']} bit, {time.time() - t_start:.1f} s)")
+    return info
+
+
+def read_cache_volume(input_path, cache_dir=None, line_order="C", lines_per_block=65536):
+    """Ganzes Labelvolumen (x, y, z) uint8 aus dem Cache, z.B. für A02."""
+    info = load_cache_info(input_path, cache_dir)
+    if info is None:
+        raise FileNotFoundError(f"Kein gültiger Cache für {input_path} — erst A01 laufen lassen.")
+    header = info["les_header"]
+    nx, ny, nz = header["nx"], header["ny"], header["nz"]
+    store = np.load(info["store_path"], mmap_mode="r")
+    lines = np.empty((nx * ny, nz), dtype=np.uint8)
+    start = 0
+    for block in parse_cache(store, info["bits"], nz, 0, nx * ny, slice(0, nz),
+                             lines_per_block=lines_per_block):
+        lines[start : start + block.shape[0]] = block
+        start += block.shape[0]
+    if line_order == "C":
+        return lines.reshape(nx, ny, nz), info
+    return lines.reshape(ny, nx, nz).transpose(1, 0, 2), info
+
+
 # --------------------------------------------------------------------------- #
 # Blockbildung
 # --------------------------------------------------------------------------- #
@@ -259,10 +459,137 @@ def reduce_block(material, factor, mode, threshold):
     return reduced, fraction
 
 
+# --------------------------------------------------------------------------- #
+# Zeilenbereich verarbeiten (seriell oder in einem Worker)
+# --------------------------------------------------------------------------- #
+def process_outer_rows(input_path, layout, outer_lo, outer_hi, src_row, targets, options, report=None):
+    """
+    Liest die äußeren Zeilen [outer_lo, outer_hi) (x bei C-Order, y bei F-Order),
+    reduziert jeden Quader einmal pro Faktor und schreibt das Ergebnis in die
+    Ziele der Stufen. `src_row` ist die Lage von `outer_lo` im Ausschnitt; jede
+    Stufe schreibt ab Zeile src_row // factor.
+
+    targets: je Faktor ein Paar (Volumen, Belegungsanteil oder None)
+    Rückgabe: (raw_counts, [(any_axis0, any_axis1, any_axis2) je Faktor]) —
+    any_axis0 gilt nur für den eigenen Abschnitt, die übrigen Flags für das
+    ganze Ausgabegitter der Stufe.
+    """
+    factors = options["reduce_factors"]
+    inner_len, inner_lo, inner_hi = layout["inner_len"], layout["inner_lo"], layout["inner_hi"]
+    z_slice = layout["z_slice"]
+    raw_counts = np.zeros(256, dtype=np.int64)
+    flags = [
+        (
+            np.zeros((outer_hi - outer_lo) // factor, dtype=bool),
+            np.zeros((inner_hi - inner_lo) // factor, dtype=bool),
+            np.zeros((z_slice.stop - z_slice.start) // factor, dtype=bool),
+        )
+        for factor in factors
+    ]
+
+    row = 0
+    with open(input_path, "rb") as handle:
+        line_start = outer_lo * inner_len
+        n_lines = (outer_hi - outer_lo) * inner_len
+        if layout["cache_path"]:
+            store = np.load(layout["cache_path"], mmap_mode="r")
+            blocks = parse_cache(store, layout["cache_bits"], layout["nz"], line_start, n_lines,
+                                 z_slice)
+        elif layout["bytes_per_line"]:
+            blocks = parse_fast(handle, layout["header_bytes"], layout["bytes_per_line"], layout["nz"],
+                                line_start, n_lines, z_slice, chunk_mb=options["chunk_mb"])
+        else:
+            blocks = parse_generic(handle, layout["header_bytes"], layout["nz"], line_start, n_lines,
+                                   z_slice, lines_per_block=options["lines_per_block"])
+        cubes = outer_row_cubes(blocks, inner_len, inner_lo, inner_hi)
+        # Gruppiert wird auf das kgV der Faktoren, damit jeder Quader für alle Stufen passt.
+        for cube in grouped_cubes(cubes, options["group"]):
+            raw_counts += np.bincount(cube.reshape(-1), minlength=256)
+            material = cube == options["les_material_value"]
+            for factor, (target, target_fraction), (any_axis0, any_axis1, any_axis2) in zip(
+                factors, targets, flags
+            ):
+                reduced, fraction = reduce_block(material, factor, options["reduce_mode"],
+                                                 options["reduce_threshold"])
+                k = reduced.shape[0]
+                out_row = (src_row + row) // factor
+                local = row // factor
+                if target_fraction is not None:
+                    target_fraction[out_row : out_row + k] = fraction
+                values = np.where(reduced, np.uint8(options["material_out"]), np.uint8(options["pore_out"]))
+                target[out_row : out_row + k] = values
+                any_axis0[local : local + k] |= reduced.any(axis=(1, 2))
+                any_axis1 |= reduced.any(axis=(0, 2))
+                any_axis2 |= reduced.any(axis=(0, 1))
+            row += cube.shape[0]
+            if report is not None:
+                report(int(np.prod(cube.shape)))
+    return raw_counts, flags
+
+
+def _row_order_views(volume, fraction_map, line_order):
+    """Ausgabe so ansprechen, dass Achse 0 die äußere Zeilenachse der Datei ist."""
+    if line_order == "C":
+        return volume, fraction_map
+    return volume.transpose(1, 0, 2), None if fraction_map is None else fraction_map.transpose(1, 0, 2)
+
+
+def convert_worker(task):
+    """Worker für --workers: öffnet die gemeinsamen Ausgaben per memmap und füllt seinen Abschnitt."""
+    maps = []
+    targets = []
+    for output_path, fraction_path in task["outputs"]:
+        volume = np.load(output_path, mmap_mode="r+")
+        fraction_map = np.load(fraction_path, mmap_mode="r+") if fraction_path else None
+        maps.extend(m for m in (volume, fraction_map) if m is not None)
+        targets.append(_row_order_views(volume, fraction_map, task["line_order"]))
+    result = process_outer_rows(task["input_path"], task["layout"], task["outer_lo"], task["outer_hi"],
+                                task["src_row"], targets, task["options"])
+    for array in maps:
+        array.flush()
+    return task, result
+
+
+def split_outer_rows(outer_lo, outer_hi, group, n_parts):
+    """Teilt [outer_lo, outer_hi) in zusammenhängende, durch `group` teilbare Abschnitte."""
+    n_groups = (outer_hi - outer_lo) // group
+    n_parts = max(1, min(n_parts, n_groups))
+    bounds = [outer_lo + (n_groups * i // n_parts) * group for i in range(n_parts + 1)]
+    return [(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+
+def parse_reduce_factors(value):
+    """--reduce als Zahl oder Liste -> Liste eindeutiger Faktoren ≥ 1 in Eingabereihenfolge."""
+    values = value if isinstance(value, (list, tuple)) else [value]
+    factors = []
+    for item in values:
+        factor = max(1, int(item))
+        if factor not in factors:
+            factors.append(factor)
+    return factors
+
+
+def tier_path(path, factor, n_tiers):
+    """
+    Pfad einer Reduktionsstufe: `{reduce}` im Pfad wird ersetzt; ohne Platzhalter
+    bekommt bei mehreren Stufen der Ordner der Datei den Unterordner `reduce-<N>`.
+    """
+    if "{reduce}" in path:
+        return path.format(reduce=factor)
+    if n_tiers == 1:
+        return path
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f"reduce-{factor}", name)
+
+
 # --------------------------------------------------------------------------- #
 # Konvertierung
 # --------------------------------------------------------------------------- #
 def convert(args):
+    """
+    Konvertiert die .leS-Datei; mit mehreren --reduce-Faktoren entstehen alle
+    Stufen in einem Durchlauf. Rückgabe: Metadaten der Stufe (bzw. Liste davon).
+    """
     input_path = resolve_input(args.input)
     nx, ny, nz, header_voxel_size, header_bytes = read_header(input_path)
     n_lines_total = nx * ny
@@ -271,7 +598,10 @@ def convert(args):
     if voxel_size is None:
         raise ValueError("Keine Voxelgröße im Header — bitte --voxel-size angeben.")
 
-    reduce_factor = max(1, int(args.reduce))
+    factors = parse_reduce_factors(args.reduce)
+    group = 1
+    for factor in factors:
+        group = group * factor // math.gcd(group, factor)
     x0, x1 = args.x_range if args.x_range else (0, nx)
     y0, y1 = args.y_range if args.y_range else (0, ny)
     z0, z1 = args.z_range if args.z_range else (0, nz)
@@ -279,23 +609,20 @@ def convert(args):
         if not (0 <= lo < hi <= full):
             raise ValueError(f"Ungültiger --{name}-range {lo} {hi} (gültig: 0 .. {full}).")
 
-    # Auf Vielfache des Reduktionsfaktors kürzen (Rest am oberen Ende verwerfen)
+    # Auf Vielfache des (gemeinsamen) Reduktionsfaktors kürzen (Rest am oberen Ende verwerfen)
     dropped = {}
     for name, lo, hi in (("x", x0, x1), ("y", y0, y1), ("z", z0, z1)):
-        rest = (hi - lo) % reduce_factor
+        rest = (hi - lo) % group
         if rest:
             dropped[name] = rest
-    x1 -= (x1 - x0) % reduce_factor
-    y1 -= (y1 - y0) % reduce_factor
-    z1 -= (z1 - z0) % reduce_factor
+    x1 -= (x1 - x0) % group
+    y1 -= (y1 - y0) % group
+    z1 -= (z1 - z0) % group
     if min(x1 - x0, y1 - y0, z1 - z0) <= 0:
         raise ValueError("Ausschnitt ist kleiner als der Reduktionsfaktor.")
 
     src_shape = (x1 - x0, y1 - y0, z1 - z0)
-    out_shape = tuple(dim // reduce_factor for dim in src_shape)
     n_voxels_src = int(np.prod(src_shape))
-    n_voxels_out = int(np.prod(out_shape))
-    out_voxel_size = voxel_size * reduce_factor
 
     if args.phase_convention == "pipeline":
         material_out, pore_out = 0, 1
@@ -306,13 +633,19 @@ def convert(args):
     print(f"📐 Header  : nx={nx} ny={ny} nz={nz}  voxel_size={voxel_size:.6e} m ({voxel_size * 1e6:.3f} µm)")
     print(f"✂️  Ausschnitt: x[{x0}:{x1}] y[{y0}:{y1}] z[{z0}:{z1}] = {src_shape}"
           + (f"  (verworfener Rest: {dropped})" if dropped else ""))
-    print(f"🔻 Reduktion: Faktor {reduce_factor} ({args.reduce_mode}"
-          + (f", Schwelle {args.reduce_threshold}" if args.reduce_mode in ("majority", "threshold") else "")
-          + (f", smooth_sigma {args.smooth_sigma}" if args.smooth_sigma > 0 else "")
-          + f") -> Shape {out_shape} ({n_voxels_out / 1e6:.1f} MVoxel, "
-            f"{n_voxels_out / 1e9:.3f} GB als uint8)")
-    print(f"📏 Voxelgröße nach Reduktion: {out_voxel_size:.6e} m ({out_voxel_size * 1e6:.3f} µm, "
-          f"{out_voxel_size * 1e3:.6f} mm)")
+    if len(factors) > 1:
+        print(f"🔻 Stufen  : Faktoren {factors} in einem Durchlauf (Gruppierung auf kgV {group})")
+    for factor in factors:
+        out_shape = tuple(dim // factor for dim in src_shape)
+        n_voxels_out = int(np.prod(out_shape))
+        out_voxel_size = voxel_size * factor
+        print(f"🔻 Reduktion: Faktor {factor} ({args.reduce_mode}"
+              + (f", Schwelle {args.reduce_threshold}" if args.reduce_mode in ("majority", "threshold") else "")
+              + (f", smooth_sigma {args.smooth_sigma}" if args.smooth_sigma > 0 else "")
+              + f") -> Shape {out_shape} ({n_voxels_out / 1e6:.1f} MVoxel, "
+                f"{n_voxels_out / 1e9:.3f} GB als uint8)")
+        print(f"📏 Voxelgröße nach Reduktion: {out_voxel_size:.6e} m ({out_voxel_size * 1e6:.3f} µm, "
+              f"{out_voxel_size * 1e3:.6f} mm)")
     print(f"🔢 Zeilenordnung: {args.line_order}-Order "
           f"({'l = ix*ny + iy' if args.line_order == 'C' else 'l = iy*nx + ix'})")
     print(f"🧪 Phasenkonvention: {args.phase_convention} -> Aluminium = {material_out}, Pore = {pore_out}"
@@ -323,70 +656,159 @@ def convert(args):
     if args.force_generic:
         bytes_per_line = None
     print(f"⚙️  Parser  : {'fast (feste Zeilenbreite)' if bytes_per_line else 'generic (split, langsam)'}")
+    workers = max(1, int(args.workers))
+    if workers > 1:
+        print(f"🧵 Worker  : {workers} Prozesse über die {'x' if args.line_order == 'C' else 'y'}-Zeilen"
+              + ("" if bytes_per_line else "  (generic: jeder Worker überspringt seine Vorzeilen zeilenweise)"))
 
     if args.dry_run:
         print("🛑 --dry-run: es wird nichts geschrieben.")
         return None
 
-    output_path = os.path.abspath(args.output)
-    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    volume = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.uint8, shape=out_shape)
-
-    fraction_path = None
-    fraction_map = None
-    if args.smooth_sigma > 0.0 and reduce_factor > 1:
-        fraction_path = os.path.splitext(output_path)[0] + ".fraction.tmp.npy"
-        fraction_map = np.lib.format.open_memmap(
-            fraction_path, mode="w+", dtype=np.float32, shape=out_shape
-        )
+    cache = prepare_les_cache(input_path, (nx, ny, nz, header_voxel_size, header_bytes),
+                              bytes_per_line, args)
+
+    tiers = []
+    for factor in factors:
+        out_shape = tuple(dim // factor for dim in src_shape)
+        output_path = os.path.abspath(tier_path(args.output, factor, len(factors)))
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        volume = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.uint8, shape=out_shape)
+        fraction_path = None
+        fraction_map = None
+        if args.smooth_sigma > 0.0 and factor > 1:
+            fraction_path = os.path.splitext(output_path)[0] + ".fraction.tmp.npy"
+            fraction_map = np.lib.format.open_memmap(
+                fraction_path, mode="w+", dtype=np.float32, shape=out_shape
+            )
+        tiers.append({
+            "factor": factor,
+            "out_shape": out_shape,
+            "output_path": output_path,
+            "volume": volume,
+            "fraction_path": fraction_path,
+            "fraction_map": fraction_map,
+            "any_axis0": np.zeros(out_shape[0] if args.line_order == "C" else out_shape[1], dtype=bool),
+            "any_axis1": np.zeros(out_shape[1] if args.line_order == "C" else out_shape[0], dtype=bool),
+            "any_axis2": np.zeros(out_shape[2], dtype=bool),
+        })
 
     z_slice = slice(z0, z1)
     if args.line_order == "C":
         outer_lo, outer_hi, inner_len, inner_lo, inner_hi = x0, x1, ny, y0, y1
-        target = volume
-        target_fraction = fraction_map
     else:
         outer_lo, outer_hi, inner_len, inner_lo, inner_hi = y0, y1, nx, x0, x1
-        target = volume.transpose(1, 0, 2)
-        target_fraction = None if fraction_map is None else fraction_map.transpose(1, 0, 2)
+    layout = {
+        "header_bytes": header_bytes,
+        "bytes_per_line": bytes_per_line,
+        "cache_path": cache["store_path"] if cache else None,
+        "cache_bits": cache["bits"] if cache else None,
+        "nz": nz,
+        "z_slice": z_slice,
+        "inner_len": inner_len,
+        "inner_lo": inner_lo,
+        "inner_hi": inner_hi,
+    }
+    options = {
+        "reduce_factors": factors,
+        "group": group,
+        "reduce_mode": args.reduce_mode,
+        "reduce_threshold": args.reduce_threshold,
+        "les_material_value": args.les_material_value,
+        "material_out": material_out,
+        "pore_out": pore_out,
+        "chunk_mb": args.chunk_mb,
+        "lines_per_block": args.lines_per_block,
+    }
 
     raw_counts = np.zeros(256, dtype=np.int64)
-    any_axis0 = np.zeros(out_shape[0] if args.line_order == "C" else out_shape[1], dtype=bool)
-    any_axis1 = np.zeros(out_shape[1] if args.line_order == "C" else out_shape[0], dtype=bool)
-    any_axis2 = np.zeros(out_shape[2], dtype=bool)
-
     t_start = time.time()
     written = 0
-    out_row = 0
-    with open(input_path, "rb") as handle:
-        line_start = outer_lo * inner_len
-        n_lines = (outer_hi - outer_lo) * inner_len
-        if bytes_per_line:
-            blocks = parse_fast(handle, header_bytes, bytes_per_line, nz, line_start,
-                                n_lines, z_slice, chunk_mb=args.chunk_mb)
-        else:
-            blocks = parse_generic(handle, header_bytes, nz, line_start, n_lines, z_slice,
-                                   lines_per_block=args.lines_per_block)
-        cubes = outer_row_cubes(blocks, inner_len, inner_lo, inner_hi)
-        for cube in grouped_cubes(cubes, reduce_factor):
-            raw_counts += np.bincount(cube.reshape(-1), minlength=256)
-            material = cube == args.les_material_value
-            reduced, fraction = reduce_block(material, reduce_factor, args.reduce_mode,
-                                             args.reduce_threshold)
-            k = reduced.shape[0]
-            if target_fraction is not None:
-                target_fraction[out_row : out_row + k] = fraction
-            values = np.where(reduced, np.uint8(material_out), np.uint8(pore_out))
-            target[out_row : out_row + k] = values
-            any_axis0[out_row : out_row + k] |= reduced.any(axis=(1, 2))
-            any_axis1 |= reduced.any(axis=(0, 2))
-            any_axis2 |= reduced.any(axis=(0, 1))
-            out_row += k
-            written += int(np.prod(cube.shape))
-            frac = written / max(1, n_voxels_src)
-            elapsed = time.time() - t_start
-            print(f"   … {frac * 100:5.1f} %  ({written / 1e6:8.1f} MVoxel gelesen, "
-                  f"{elapsed:6.1f} s, ETA {elapsed / max(frac, 1e-9) - elapsed:6.1f} s)", flush=True)
+
+    def report(n_voxels):
+        nonlocal written
+        written += n_voxels
+        frac = written / max(1, n_voxels_src)
+        elapsed = time.time() - t_start
+        print(f"   … {frac * 100:5.1f} %  ({written / 1e6:8.1f} MVoxel gelesen, "
+              f"{elapsed:6.1f} s, ETA {elapsed / max(frac, 1e-9) - elapsed:6.1f} s)", flush=True)
+
+    parts = split_outer_rows(outer_lo, outer_hi, group, workers * WORKER_TASKS_PER_PROCESS)
+    if workers == 1 or len(parts) == 1:
+        targets = [_row_order_views(tier["volume"], tier["fraction_map"], args.line_order)
+                   for tier in tiers]
+        results = [(0, process_outer_rows(input_path, layout, outer_lo, outer_hi, 0,
+                                          targets, options, report))]
+    else:
+        # Jeder Worker schreibt in einen eigenen, disjunkten Zeilenbereich der
+        # gemeinsamen Ausgaben; Flags und Labelzählungen werden danach zusammengeführt.
+        for tier in tiers:
+            tier["volume"].flush()
+            if tier["fraction_map"] is not None:
+                tier["fraction_map"].flush()
+        tasks = [
+            {
+                "input_path": input_path,
+                "outputs": [(tier["output_path"], tier["fraction_path"]) for tier in tiers],
+                "line_order": args.line_order,
+                "layout": layout,
+                "options": options,
+                "outer_lo": lo,
+                "outer_hi": hi,
+                "src_row": lo - outer_lo,
+            }
+            for lo, hi in parts
+        ]
+        results = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for task, result in pool.map(convert_worker, tasks):
+                results.append((task["src_row"], result))
+                report((task["outer_hi"] - task["outer_lo"]) * (inner_hi - inner_lo) * (z1 - z0))
+
+    for src_row, (counts, flags) in results:
+        raw_counts += counts
+        for tier, (flags0, flags1, flags2) in zip(tiers, flags):
+            row = src_row // tier["factor"]
+            tier["any_axis0"][row : row + flags0.size] |= flags0
+            tier["any_axis1"] |= flags1
+            tier["any_axis2"] |= flags2
+
+    raw_label_counts = {int(v): int(c) for v, c in enumerate(raw_counts) if c}
+    material_raw = raw_label_counts.get(args.les_material_value, 0)
+    fraction_raw = material_raw / n_voxels_src if n_voxels_src else float("nan")
+    print(f"📊 Aluminium vor Reduktion : {fraction_raw * 100:.3f} %  (Porosität {100 - fraction_raw * 100:.3f} %)")
+
+    common = {
+        "input_path": input_path,
+        "cache": cache,
+        "header": {"nx": nx, "ny": ny, "nz": nz, "voxel_size": header_voxel_size},
+        "crop": {"x_range": [x0, x1], "y_range": [y0, y1], "z_range": [z0, z1],
+                 "dropped_for_reduce": dropped},
+        "src_shape": src_shape,
+        "voxel_size": voxel_size,
+        "material_out": material_out,
+        "pore_out": pore_out,
+        "raw_label_counts": raw_label_counts,
+        "fraction_raw": fraction_raw,
+        "workers": workers,
+        "factors": factors,
+        "t_start": t_start,
+    }
+    metadata = [finish_tier(args, tier, common) for tier in tiers]
+    return metadata[0] if len(metadata) == 1 else metadata
+
+
+def finish_tier(args, tier, common):
+    """Glättung, Bounding-Box, Sidecar und Pipeline-Metadaten einer Reduktionsstufe."""
+    factor = tier["factor"]
+    out_shape = tier["out_shape"]
+    output_path = tier["output_path"]
+    volume = tier["volume"]
+    fraction_map = tier["fraction_map"]
+    material_out, pore_out = common["material_out"], common["pore_out"]
+    n_voxels_out = int(np.prod(out_shape))
+    out_voxel_size = common["voxel_size"] * factor
+    any_axis0, any_axis1, any_axis2 = tier["any_axis0"], tier["any_axis1"], tier["any_axis2"]
 
     # Optionale Glättung des Belegungsanteils im reduzierten Gitter
     smoothing_applied = False
@@ -402,10 +824,11 @@ def convert(args):
         smoothed_any = (reduced.any(axis=(1, 2)), reduced.any(axis=(0, 2)), reduced.any(axis=(0, 1)))
         smoothing_applied = True
         del smoothed, fraction_map
-        os.remove(fraction_path)
+        tier["fraction_map"] = None
+        os.remove(tier["fraction_path"])
 
     volume.flush()
-    elapsed = time.time() - t_start
+    elapsed = time.time() - common["t_start"]
 
     if args.line_order == "F":
         any_x, any_y = any_axis1, any_axis0
@@ -437,67 +860,76 @@ def convert(args):
     else:
         used_bounds = full_bounds
 
-    raw_label_counts = {int(v): int(c) for v, c in enumerate(raw_counts) if c}
-    material_raw = raw_label_counts.get(args.les_material_value, 0)
-    fraction_raw = material_raw / n_voxels_src if n_voxels_src else float("nan")
+    fraction_raw = common["fraction_raw"]
     material_out_count = int(np.count_nonzero(np.asarray(volume) == material_out))
     fraction_out = material_out_count / n_voxels_out if n_voxels_out else float("nan")
 
     print(f"✅ Geschrieben: {output_path}  Shape {out_shape}  dtype uint8  ({elapsed:.1f} s)")
-    print(f"📊 Aluminium vor Reduktion : {fraction_raw * 100:.3f} %  (Porosität {100 - fraction_raw * 100:.3f} %)")
     print(f"📊 Aluminium nach Reduktion: {fraction_out * 100:.3f} %  (Porosität {100 - fraction_out * 100:.3f} %)")
-    if reduce_factor > 1:
+    if factor > 1:
         delta = (fraction_out - fraction_raw) * 100
         print(f"📊 Änderung der relativen Dichte durch die Reduktion: {delta:+.3f} Prozentpunkte")
     print(f"📦 Bounding-Box des Aluminiums (reduziertes Gitter): {material_bbox}")
 
+    cache = common["cache"]
+    crop = common["crop"]
     metadata = {
-        "source_file": os.path.abspath(input_path),
+        "source_file": os.path.abspath(common["input_path"]),
+        "source_cache": cache["store_path"] if cache else None,
+        "source_sha256": cache["source_sha256"] if cache else None,
         "output_file": output_path,
         "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
-        "les_header": {"nx": nx, "ny": ny, "nz": nz, "voxel_size": header_voxel_size},
+        "les_header": common["header"],
         "line_order": args.line_order,
         "axis_order": "x, y, z",
-        "crop": {"x_range": [x0, x1], "y_range": [y0, y1], "z_range": [z0, z1],
-                 "dropped_for_reduce": dropped},
+        "crop": crop,
         "reduce": {
-            "factor": reduce_factor,
+            "factor": factor,
             "mode": args.reduce_mode,
             "threshold": args.reduce_threshold,
             "smooth_sigma": args.smooth_sigma,
             "smoothing_applied": smoothing_applied,
+            "tiers": common["factors"],
         },
-        "source_shape": list(src_shape),
+        "source_shape": list(common["src_shape"]),
         "output_shape": list(out_shape),
         "dtype": "uint8",
         "phase_convention": args.phase_convention,
         "les_material_value": args.les_material_value,
         "array_material_value": material_out,
         "array_pore_value": pore_out,
-        "voxel_size_source_m": voxel_size,
+        "voxel_size_source_m": common["voxel_size"],
         "voxel_size_m": out_voxel_size,
         "voxel_size_mm": out_voxel_size * 1e3,
         "voxel_size_um": out_voxel_size * 1e6,
-        "raw_label_counts": raw_label_counts,
+        "raw_label_counts": common["raw_label_counts"],
         "material_volume_fraction_source": fraction_raw,
         "material_volume_fraction_output": fraction_out,
         "porosity_output": 1.0 - fraction_out,
         "material_bounds_material": material_bbox,
         "material_bounds_full": full_bounds,
         "bounds_mode": args.bounds_mode,
+        "workers": common["workers"],
         "runtime_seconds": elapsed,
     }
-    sidecar_path = args.metadata or (os.path.splitext(output_path)[0] + ".json")
+    n_tiers = len(common["factors"])
+    if args.metadata:
+        sidecar_path = tier_path(args.metadata, factor, n_tiers)
+    else:
+        sidecar_path = os.path.splitext(output_path)[0] + ".json"
     with open(sidecar_path, "w") as handle:
         json.dump(metadata, handle, indent=2)
     print(f"🧾 Sidecar-Metadaten: {sidecar_path}")
 
     if args.pipeline_metadata:
-        write_pipeline_metadata(args, metadata, out_voxel_size, out_shape, used_bounds, reduce_factor)
+        pipeline_path = tier_path(args.pipeline_metadata, factor, n_tiers)
+        write_pipeline_metadata(args, metadata, out_voxel_size, out_shape, used_bounds, factor,
+                                path=pipeline_path)
     return metadata
 
 
-def write_pipeline_metadata(args, metadata, out_voxel_size, out_shape, used_bounds, reduce_factor):
+def write_pipeline_metadata(args, metadata, out_voxel_size, out_shape, used_bounds, reduce_factor,
+                            path=None):
     """
     Schreibt die Einträge, die die nachfolgenden Pipeline-Schritte erwarten:
 
@@ -506,7 +938,7 @@ def write_pipeline_metadata(args, metadata, out_voxel_size, out_shape, used_boun
       (input_path, material_value, material_bounds)
     """
     scale = {"m": 1.0, "mm": 1e3, "um": 1e6}[args.pipeline_unit]
-    path = args.pipeline_metadata
+    path = path or args.pipeline_metadata
     payload = {}
     if os.path.exists(path):
         with open(path) as handle:
@@ -572,6 +1004,9 @@ def apply_config(args, config_path):
     take("bounds_mode", section.get("bounds_mode"))
     take("voxel_size", section.get("voxel_size"))
     take("pipeline_unit", section.get("voxel_size_unit"))
+    take("workers", section.get("workers"))
+    take("les_cache", section.get("les_cache"))
+    take("cache_dir", section.get("cache_dir"))
 
     crop = section.get("crop", {}) or {}
     for axis in ("x", "y", "z"):
@@ -617,8 +1052,9 @@ def build_parser():
     parser.add_argument("--x-range", nargs=2, type=int, metavar=("X0", "X1"), default=None)
     parser.add_argument("--y-range", nargs=2, type=int, metavar=("Y0", "Y1"), default=None)
     parser.add_argument("--z-range", nargs=2, type=int, metavar=("Z0", "Z1"), default=None)
-    parser.add_argument("--reduce", type=int, default=1,
-                        help="Kantenlänge der zusammengefassten Voxelblöcke (1 = keine Reduktion)")
+    parser.add_argument("--reduce", type=int, nargs="+", default=[1],
+                        help="Kantenlänge der zusammengefassten Voxelblöcke (1 = keine Reduktion); "
+                             "mehrere Faktoren erzeugen alle Stufen in einem Durchlauf")
     parser.add_argument("--reduce-mode", default="majority",
                         choices=["majority", "threshold", "any", "all"])
     parser.add_argument("--reduce-threshold", type=float, default=0.5,
@@ -639,6 +1075,13 @@ def build_parser():
     parser.add_argument("--lines-per-block", type=int, default=4096,
                         help="Zeilen pro Block im generischen Parser")
     parser.add_argument("--force-generic", action="store_true", help="Fast-Path deaktivieren")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Prozesse, auf die die äußeren Zeilen aufgeteilt werden (Ergebnis identisch zu 1)")
+    parser.add_argument("--les-cache", default="auto", choices=["auto", "verify", "rebuild", "off"],
+                        help="Binär-Cache der .leS: auto = nutzen bzw. einmalig anlegen, "
+                             "verify = zusätzlich SHA-256 prüfen, rebuild = neu anlegen, off = Textdatei lesen")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Ordner des Binär-Caches (Default: Ordner der .leS-Datei)")
     parser.add_argument("--dry-run", action="store_true", help="Nur Header/Layout prüfen")
     return parser
 
@@ -18,6 +18,11 @@ Vor Schritt 03 gilt im Repository **0 = Aluminium, 1 = Pore**
 Mit `--config` wird der Wert aus dem Abschnitt `A01_les_2_npy` übernommen,
 mit `--auto-material-value` aus der Sidecar-JSON neben der .npy-Datei.
 
+`--npy` darf auch direkt auf eine .leS-Datei zeigen, wenn A01 dafür schon den
+Binär-Cache (`<name>.lesbin.npy`) angelegt hat: das Volumen wird dann per
+memmap aus dem Cache gelesen, mit den Rohlabels der Quelle (Default
+`--material-value 1`) und der Voxelgröße aus dem Header.
+
 Beispiele
 ---------
     # Ergebnis der .leS-Konvertierung ansehen (Pipeline-Konvention)
@@ -26,11 +31,15 @@ Beispiele
 
     # Vernetzungs-Input (nach 02d) mit gröberer Vorschau
     python3 A02_preview_voxel_volume.py --npy .../volume_boundary_shell_aniso.npy --preview-reduce 2
+
+    # .leS-Quelle über den Binär-Cache aus A01
+    python3 A02_preview_voxel_volume.py --npy /data/resources/A01_segmented/JM-25-77.leS --preview-reduce 4
 """
 
 import argparse
 import json
 import os
+import sys
 
 import numpy as np
 
@@ -39,6 +48,10 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt  # noqa: E402
 from scipy.ndimage import gaussian_filter, rotate  # noqa: E402
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import A01_les_2_npy as les  # noqa: E402  Binär-Cache der .leS-Dateien
+
 
 def block_reduce_max_fraction(mask, factor):
     """Boxfilter + 50 %-Schwelle, nur für die Vorschau."""
@@ -76,6 +89,8 @@ def depth_render(mask, azim, elev, fog=0.28, light=(-0.45, 0.35, 0.8)):
 
 
 def resolve_material_value(args):
+    if args.material_value is not None:
+        return args.material_value
     if args.config:
         with open(args.config) as handle:
             config = json.load(handle)
@@ -90,7 +105,7 @@ def resolve_material_value(args):
                 meta = json.load(handle)
             if "array_material_value" in meta:
                 return int(meta["array_material_value"])
-    return args.material_value
+    return 0
 
 
 def main():
@@ -98,8 +113,9 @@ def main():
     parser.add_argument("--npy", required=True, help="Pfad zum Voxelvolumen (.npy, uint8)")
     parser.add_argument("--output-dir", default=None, help="Default: Ordner der .npy-Datei")
     parser.add_argument("--prefix", default=None, help="Default: Dateiname ohne Endung")
-    parser.add_argument("--material-value", type=int, default=0,
-                        help="Arraywert des Aluminiums (Pipeline-Konvention: 0)")
+    parser.add_argument("--material-value", type=int, default=None,
+                        help="Arraywert des Aluminiums (Default: 0 = Pipeline-Konvention, "
+                             "bei .leS-Quellen 1)")
     parser.add_argument("--auto-material-value", action="store_true",
                         help="Wert aus der Sidecar-JSON neben der .npy-Datei lesen")
     parser.add_argument("--config", default=None, help="Projekt-Config, um die Phasenkonvention zu lesen")
@@ -111,16 +127,28 @@ def main():
                         help="Volumen für die Vorschau zusätzlich gröber machen (Faktor)")
     parser.add_argument("--views", nargs="*", type=float, default=[-40, 22, 55, 18],
                         help="Paare aus Azimut und Elevation in Grad")
+    parser.add_argument("--line-order", default="C", choices=["C", "F"],
+                        help="Zeilenordnung einer .leS-Quelle (wie in A01)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Ordner des .leS-Binär-Caches (wie in A01)")
     parser.add_argument("--dpi", type=int, default=190)
     args = parser.parse_args()
 
-    volume = np.load(args.npy, mmap_mode="r")
-    material_value = resolve_material_value(args)
+    cache_voxel_mm = None
+    if args.npy.lower().endswith(".les"):
+        volume, info = les.read_cache_volume(args.npy, args.cache_dir, line_order=args.line_order)
+        print(f"🗄  Cache: {info['store_path']}")
+        material_value = 1 if args.material_value is None else args.material_value
+        if info["les_header"]["voxel_size"] is not None:
+            cache_voxel_mm = info["les_header"]["voxel_size"] * 1e3
+    else:
+        volume = np.load(args.npy, mmap_mode="r")
+        material_value = resolve_material_value(args)
     mask = np.asarray(volume) == material_value
     print(f"📦 {args.npy}  Shape {mask.shape}  Aluminium = Arraywert {material_value}")
     print(f"📊 relative Dichte: {mask.mean() * 100:.3f} %  (Porosität {100 - mask.mean() * 100:.3f} %)")
 
-    voxel_mm = args.voxel_size_mm
+    voxel_mm = args.voxel_size_mm if args.voxel_size_mm is not None else cache_voxel_mm
     if voxel_mm is None and args.metadata and os.path.exists(args.metadata):
         with open(args.metadata) as handle:
             meta = json.load(handle)
@@ -8,7 +8,7 @@ Umweg über die Pipeline und ohne VTK/OpenGL (nur numpy/scipy/matplotlib).
 Das Skript setzt nur zusammen, was schon da ist:
 
 * Einlesen, Reduktion und Ausschnitt kommen aus `A01_les_2_npy.py`
-  (gleiche Optionen, gleiche Verifikation),
+  (gleiche Optionen, gleiche Verifikation, gleicher Binär-Cache),
 * die Darstellung aus `A02_preview_voxel_volume.py`
   (First-Hit-Tiefenpuffer mit Lambert-Shading).
 
@@ -59,6 +59,8 @@ def load_les(args, output_path):
     a01.les_material_value = args.les_material_value
     a01.phase_convention = "raw"      # fürs Bild ist 1 = Aluminium bequemer
     a01.pipeline_metadata = None
+    a01.les_cache = args.les_cache
+    a01.cache_dir = args.cache_dir
     metadata = les.convert(a01)
     return np.load(output_path), metadata
 
@@ -85,6 +87,11 @@ def main():
     parser.add_argument("--z-range", nargs=2, type=int, default=None)
     parser.add_argument("--line-order", default="C", choices=["C", "F"])
     parser.add_argument("--les-material-value", type=int, default=1)
+    parser.add_argument("--les-cache", default="auto", choices=["auto", "verify", "rebuild", "off"],
+                        help="Binär-Cache der .leS (wie in A01); ab dem zweiten Aufruf "
+                             "entfällt das Parsen der Textdatei")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Ordner des Binär-Caches (Default: Ordner der .leS-Datei)")
     parser.add_argument("--views", nargs="*", type=float, default=[-40, 22, 55, 18],
                         help="Paare aus Azimut und Elevation in Grad")
     parser.add_argument("--slices", action="store_true",
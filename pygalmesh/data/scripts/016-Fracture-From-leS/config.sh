@@ -85,7 +85,7 @@ LES_BOUNDARY_SHELL_Y="${LES_BOUNDARY_SHELL_Y:-}"
 LES_BOUNDARY_SHELL_ELEMENTS="${LES_BOUNDARY_SHELL_ELEMENTS:-3}"
 
 # --- Aufloesungsfamilie -------------------------------------------------------
-# Je Zeile:  <tier>|<reduce>|<max_element_size_um>
+# Je Zeile:  <tier>|<reduce>|<max_element_size_um>[|<rissband_elemente_je_epsilon>]
 #
 # Bewusst deutlich groeber als 015 (dort 75 um bei reduce=2). Massgeblich fuer
 # den Phasenfeld-Bruch ist nicht die Voxelgroesse, sondern die Regularisierungs-
@@ -101,6 +101,12 @@ LES_BOUNDARY_SHELL_ELEMENTS="${LES_BOUNDARY_SHELL_ELEMENTS:-3}"
 #      der Generator rechnet mit dem Wert aus dem .leS-Header.)
 #
 # Zum Vergleich: 011/012 rechneten mit 199 um Elementen, 015 mit 75 um.
+#
+# Rissband (optionale vierte Spalte): nur ein Band um die erwartete Rissebene
+# (y-Mittelebene, dort setzt pfmfrac_function.py den Anfangsriss) wird auf
+# epsilon / N verfeinert; max_element_size_um gilt dann nur noch ausserhalb.
+# Beispiel gleiche Rissaufloesung wie "fine", aussen doppelt so grob:
+#   "fine|4|400|5"
 MESH_TIERS=(
   "coarse|8|400"
   "medium|4|267"
@@ -115,6 +121,12 @@ ONLY_TIERS="${ONLY_TIERS:-}"
 # direkt aufgerufen). Leer = aus der Tabelle.
 LES_REDUCE_FACTOR="${LES_REDUCE_FACTOR:-}"
 LES_MAX_ELEMENT_SIZE_UM="${LES_MAX_ELEMENT_SIZE_UM:-}"
+# Rissband fuer alle Stufen erzwingen (Elemente je epsilon), leer = aus der Tabelle.
+FRACTURE_CRACK_BAND_ELEMENTS_PER_EPSILON="${FRACTURE_CRACK_BAND_ELEMENTS_PER_EPSILON:-}"
+# Halbe Bandbreite in Vielfachen von epsilon. Der Anfangsriss liegt bei
+# +-0,02 Ly (0,16 epsilon bei eps_factor 8); 2 epsilon lassen Platz fuer das
+# Phasenfeldprofil und leichtes Auswandern des Risses.
+FRACTURE_CRACK_BAND_HALF_WIDTH_EPSILON="${FRACTURE_CRACK_BAND_HALF_WIDTH_EPSILON:-2.0}"
 
 # --- Bruchsimulation ----------------------------------------------------------
 # Gelesen von job_run_simulation_CLUSTER.sh und an 00_template/script.py
@@ -141,6 +153,10 @@ FRACTURE_ELEMENT_ORDER="${FRACTURE_ELEMENT_ORDER:-1}"
 # Speicher. Uebernommen aus 015/012.
 MESH_JOB_TIME="${MESH_JOB_TIME:-1440}"
 MESH_JOB_PARTITION="${MESH_JOB_PARTITION:-mem}"
+# CPUs des einen Tasks (srun -n 1 -c N). Leer = alle CPUs des Jobs (SLURM_NTASKS),
+# 1 = ein Kern wie frueher. 03 nimmt sie fuer die CGAL-Threads
+# (pygalmesh_parameters.n_threads = null) und fuer sdf_workers/marching_cubes_workers = 0.
+MESH_STEP_CPUS="${MESH_STEP_CPUS:-}"
 # Bruchsimulation: laeuft ueber Tage, deshalb Partition long.
 SIM_JOB_NTASKS="${SIM_JOB_NTASKS:-96}"
 SIM_JOB_MEM_PER_CPU="${SIM_JOB_MEM_PER_CPU:-4000}"
@@ -78,6 +78,37 @@ def axis_length_mm(rng, n, voxel_size_m):
     return count * voxel_size_m * 1e3
 
 
+def crack_band_sizing(args, epsilon_mm, voxel_um):
+    """
+    crack_band_sizing-Block fuer 03: Elementgroesse epsilon / N im Band
+    +-half_width * epsilon um die y-Mittelebene, auf der pfmfrac_function.py den
+    Anfangsriss setzt und entlang x weiterlaufen laesst. Ausserhalb waechst die
+    Groesse bis auf max_element_size_factor. Faktoren wie ueblich in Vielfachen
+    der (reduzierten) Voxelgroesse.
+    """
+    block = {
+        "enabled": False,
+        "axis": "y",
+        "center_fraction": 0.5,
+        "half_width_factor": None,
+        "size_factor": None,
+        "gradation": args.crack_band_gradation,
+        "grid_step_voxels": 2,
+    }
+    if not args.crack_band_elements_per_epsilon:
+        return block
+    if not epsilon_mm:
+        print("WARNUNG: Rissband braucht epsilon und damit --grid; bleibt aus.", file=sys.stderr)
+        return block
+    epsilon_um = epsilon_mm * 1000.0
+    block.update({
+        "enabled": True,
+        "half_width_factor": args.crack_band_half_width_epsilon * epsilon_um / voxel_um,
+        "size_factor": epsilon_um / float(args.crack_band_elements_per_epsilon) / voxel_um,
+    })
+    return block
+
+
 def build_parser():
     parser = les.build_parser()
     parser.set_defaults(
@@ -120,6 +151,14 @@ def build_parser():
     group.add_argument("--boundary-shell-elements", type=float, default=3.0,
                        help="Zieldicke der Randschale in Elementen; daraus wird die "
                             "Dicke in Voxeln gerechnet, wenn --boundary-shell-xz/-y fehlen")
+    group.add_argument("--crack-band-elements-per-epsilon", type=float, default=None,
+                       help="Rissband einschalten: nur ein Band um die Rissebene (y-Mittelebene) "
+                            "wird auf epsilon / N verfeinert, ausserhalb gilt "
+                            "--max-element-size-um. Leer = gleichmaessiges Netz")
+    group.add_argument("--crack-band-half-width-epsilon", type=float, default=2.0,
+                       help="Halbe Breite des Rissbands in Vielfachen von epsilon")
+    group.add_argument("--crack-band-gradation", type=float, default=0.5,
+                       help="Zuwachs der Elementgroesse je Laengeneinheit Abstand vom Band")
     return parser
 
 
@@ -184,8 +223,15 @@ def main():
 
     element_um = float(args.max_element_size_um) if args.max_element_size_um else None
     epsilon_mm = (y_len / args.eps_factor) if y_len else None
+    crack_band = crack_band_sizing(args, epsilon_mm, voxel_um)
+    for block in (config["03_mesh_3D_array"].get("pygalmesh_parameters"),
+                  config["03_mesh_3D_array"].get("sdf_pygalmesh_parameters", {}).get("pygalmesh_parameters")):
+        if isinstance(block, dict):
+            block["crack_band_sizing"] = dict(crack_band)
+    # Massgeblich fuer den Bruch ist die Elementgroesse im Rissband, sofern aktiv.
+    crack_element_um = crack_band["size_factor"] * voxel_um if crack_band["enabled"] else element_um
     elements_per_epsilon = (
-        (epsilon_mm * 1000.0) / element_um if (epsilon_mm and element_um) else None
+        (epsilon_mm * 1000.0) / crack_element_um if (epsilon_mm and crack_element_um) else None
     )
 
     config["fracture"] = {
@@ -225,9 +271,16 @@ def main():
         ),
         "bar_extent_mm": {"x": x_len or None, "y": y_len or None, "z": z_len or None},
         "epsilon_mm": epsilon_mm,
-        "element_size_um": element_um,
+        "element_size_um": crack_element_um,
         "elements_per_epsilon": elements_per_epsilon,
         "crack_start_x_fraction": 0.2,
+        "crack_band": {
+            "enabled": crack_band["enabled"],
+            "half_width_mm": (
+                crack_band["half_width_factor"] * voxel_um / 1000.0 if crack_band["enabled"] else None
+            ),
+            "outside_element_size_um": element_um if crack_band["enabled"] else None,
+        },
         "boundary_shell_voxels": {
             "xz": args.boundary_shell_xz,
             "y": args.boundary_shell_y,
@@ -263,6 +316,10 @@ def main():
           f"{config['03_mesh_3D_array'].get('max_element_size_um', float('nan')):.1f} um "
           f"(Faktor {pg['max_element_size_factor']:.4f} x dx)")
     print(f"  Randschale (Voxel) : x/z = {seal['x_min']}, y = {seal['y_min']}")
+    if crack_band["enabled"]:
+        print(f"  Rissband           : y-Mitte +- "
+              f"{config['fracture_geometry_check']['crack_band']['half_width_mm']:.3f} mm, "
+              f"{crack_element_um:.1f} um (aussen {element_um:.1f} um)")
     if epsilon_mm:
         print(f"  epsilon            : {epsilon_mm:.3f} mm (Ly / {args.eps_factor:g})")
         print(f"  Elemente je epsilon: {elements_per_epsilon:.2f}"
@@ -54,18 +54,25 @@ keep_args=()
 
 # --- Stufen durchgehen -------------------------------------------------------
 for entry in "${MESH_TIERS[@]}"; do
-  IFS='|' read -r tier reduce element_um <<< "$entry"
+  IFS='|' read -r tier reduce element_um band_per_eps <<< "$entry"
   if [[ -n "$ONLY_TIERS" ]] && ! grep -qw "$tier" <<< "$ONLY_TIERS"; then
     continue
   fi
   [[ -n "$LES_REDUCE_FACTOR" ]] && reduce="$LES_REDUCE_FACTOR"
   [[ -n "$LES_MAX_ELEMENT_SIZE_UM" ]] && element_um="$LES_MAX_ELEMENT_SIZE_UM"
+  [[ -n "$FRACTURE_CRACK_BAND_ELEMENTS_PER_EPSILON" ]] && band_per_eps="$FRACTURE_CRACK_BAND_ELEMENTS_PER_EPSILON"
+
+  band_args=()
+  if [[ -n "${band_per_eps:-}" ]]; then
+    band_args=(--crack-band-elements-per-epsilon "$band_per_eps"
+               --crack-band-half-width-epsilon "$FRACTURE_CRACK_BAND_HALF_WIDTH_EPSILON")
+  fi
 
   dataset_id="${SPECIMEN_NAME}_les_fracture_${tier}"
   output="config-fracture-${SPECIMEN_NAME}-${tier}.json"
 
   echo
-  echo "=== Stufe $tier: reduce=$reduce, Elementgroesse=${element_um} um ==="
+  echo "=== Stufe $tier: reduce=$reduce, Elementgroesse=${element_um} um${band_per_eps:+, Rissband $band_per_eps Elemente je epsilon} ==="
   python3 "$SCRIPT_DIR/create_fracture_config.py" \
     --base-config "$LES_BASE_CONFIG" \
     --output "$output" \
@@ -94,7 +101,7 @@ for entry in "${MESH_TIERS[@]}"; do
     --fracture-materials $FRACTURE_MATERIALS \
     --fracture-directions $FRACTURE_DIRECTIONS \
     "${grid_args[@]}" "${voxel_args[@]}" "${bar_args[@]}" \
-    "${shell_args[@]}" "${keep_args[@]}"
+    "${shell_args[@]}" "${keep_args[@]}" "${band_args[@]}"
 done
 
 echo
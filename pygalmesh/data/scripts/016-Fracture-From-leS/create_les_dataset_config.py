@@ -115,6 +115,8 @@ def build_config(base, args):
             "threshold": args.reduce_threshold,
             "smooth_sigma": args.smooth_sigma,
         },
+        "les_cache": args.les_cache,
+        "cache_dir": args.cache_dir,
         "comment": (
             "Ersetzt 00_dicom_2_npy, 01_segment_slice_wise, 02_build3D_segmented_array "
             "und 02a_rotate_pic_to_align_with_axis. Schreibt segmented_3D_volume.npy in "
@@ -258,6 +260,10 @@ def build_parser():
                         help="Voxelgröße in m überschreiben (sonst aus dem .leS-Header)")
     parser.add_argument("--voxel-size-unit", default="mm", choices=["m", "mm", "um"],
                         help="Einheit, in der SliceThickness in die metadata.json geschrieben wird")
+    parser.add_argument("--les-cache", default="auto", choices=["auto", "verify", "rebuild", "off"],
+                        help="Binär-Cache der .leS-Datei für A01/A02/A03")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Ordner des Binär-Caches (Default: Ordner der .leS-Datei)")
     parser.add_argument("--binning-label", default=None,
                         help="Label für die Ergebnisordner (Default: leS-reduce-<N>)")
     parser.add_argument("--xy-divisions", type=int, default=None)
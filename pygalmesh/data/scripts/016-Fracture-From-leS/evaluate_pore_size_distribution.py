@@ -9,7 +9,10 @@ import sys
 from pathlib import Path
 
 import numpy as np
-from scipy import ndimage
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from voxel_components import label_components  # noqa: E402
 
 
 CASE_RE = re.compile(r"^(.+)_Bin(?P<bin>[0-9]+)_reduce-(?P<reduce>[^_]+)_segmented$")
@@ -102,38 +105,6 @@ def discover_cases(results_dir):
     return sorted(rows, key=lambda row: (row["bin"], reduce_priority(row["reduce"])), reverse=True)
 
 
-def connectivity_structure(connectivity):
-    if connectivity == 6:
-        return ndimage.generate_binary_structure(3, 1)
-    if connectivity == 18:
-        structure = ndimage.generate_binary_structure(3, 2)
-        structure[0, 0, 0] = False
-        structure[0, 0, 2] = False
-        structure[0, 2, 0] = False
-        structure[0, 2, 2] = False
-        structure[2, 0, 0] = False
-        structure[2, 0, 2] = False
-        structure[2, 2, 0] = False
-        structure[2, 2, 2] = False
-        return structure
-    if connectivity == 26:
-        return ndimage.generate_binary_structure(3, 3)
-    raise ValueError("Connectivity must be one of 6, 18, or 26.")
-
-
-def boundary_labels(labels):
-    faces = [
-        labels[0, :, :],
-        labels[-1, :, :],
-        labels[:, 0, :],
-        labels[:, -1, :],
-        labels[:, :, 0],
-        labels[:, :, -1],
-    ]
-    ids = np.unique(np.concatenate([face.ravel() for face in faces]))
-    return ids[ids != 0]
-
-
 def parallel_snow_partitioning(pore_mask, max_volume=1_000_000, cores=None):
     try:
         import porespy
@@ -191,35 +162,23 @@ def pore_data_from_porespy(volume_path, pore_value, max_volume, cores):
     }
 
 
-def pore_data_from_connected_components(volume_path, pore_value, connectivity, exclude_boundary_connected):
-    volume = np.load(volume_path)
-    pore_mask = volume == pore_value
-    labels, pore_count = ndimage.label(pore_mask, structure=connectivity_structure(connectivity))
-    sizes = np.bincount(labels.ravel(), minlength=pore_count + 1)[1:].astype(np.int64)
-    kept_labels = np.arange(1, pore_count + 1, dtype=np.int64)
+def pore_data_from_connected_components(volume_path, pore_value, connectivity, exclude_boundary_connected,
+                                        slab_thickness=64):
+    volume = np.load(volume_path, mmap_mode="r")
+    components = label_components(volume, connectivity, value=pore_value, slab_thickness=slab_thickness,
+                                  centroids=True)
+    pore_count = components["count"]
+    keep = np.ones(pore_count, dtype=bool)
 
     excluded_count = 0
     if exclude_boundary_connected and pore_count:
-        boundary_ids = boundary_labels(labels)
-        excluded_count = len(boundary_ids)
-        if excluded_count:
-            keep = np.ones(len(sizes), dtype=bool)
-            keep[boundary_ids - 1] = False
-            sizes = sizes[keep]
-            kept_labels = kept_labels[keep]
-
-    objects = ndimage.find_objects(labels)
+        excluded_count = int(components["border"].sum())
+        keep &= ~components["border"]
+
     pore_rows = []
-    for label, size in zip(kept_labels, sizes):
-        slices = objects[label - 1]
-        if slices is None:
-            continue
-        coords = np.argwhere(labels[slices] == label)
-        centroid_local = coords.mean(axis=0)
-        z_cent = centroid_local[0] + slices[0].start
-        y_cent = centroid_local[1] + slices[1].start
-        x_cent = centroid_local[2] + slices[2].start
-        pore_rows.append([label, int(size), 0, int(x_cent), int(y_cent), int(z_cent)])
+    for index in np.flatnonzero(keep):
+        z_cent, y_cent, x_cent = components["centroids"][index]
+        pore_rows.append([index + 1, int(components["sizes"][index]), 0, int(x_cent), int(y_cent), int(z_cent)])
 
     return np.asarray(pore_rows, dtype=np.int64), {
         "volume_shape": "x".join(map(str, volume.shape)),
@@ -345,6 +304,7 @@ def process_case(case, args):
             pore_value=pore_value,
             connectivity=args.connectivity,
             exclude_boundary_connected=args.exclude_boundary_connected,
+            slab_thickness=args.slab_thickness,
         )
     pore_sizes_voxels = pore_rows[:, 1] if len(pore_rows) else np.asarray([], dtype=np.int64)
     pore_diameters_um = voxel_volume_to_diameter(pore_sizes_voxels, voxel_size_um)
@@ -426,6 +386,8 @@ def run_case_subprocess(case, args):
         str(args.connectivity),
         "--bins",
         str(args.bins),
+        "--slab-thickness",
+        str(args.slab_thickness),
     ]
     if args.porespy_cores is not None:
         cmd.extend(["--porespy-cores", str(args.porespy_cores)])
@@ -485,6 +447,8 @@ def main():
     parser.add_argument("--porespy-cores", type=int, default=None)
     parser.add_argument("--connectivity", type=int, default=26, choices=[6, 18, 26])
     parser.add_argument("--pore-value", type=int, default=0)
+    parser.add_argument("--slab-thickness", type=int, default=64,
+                        help="Slices per slab for the out-of-core connected-component labelling.")
     parser.add_argument("--exclude-boundary-connected", action="store_true")
     parser.add_argument("--include-bin1-reduce-null", action="store_true")
     parser.add_argument("--bins", type=int, default=50)
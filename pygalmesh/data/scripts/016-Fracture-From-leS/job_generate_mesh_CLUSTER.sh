@@ -4,9 +4,10 @@
 #SBATCH -A p0023647
 #SBATCH -t 1440
 #SBATCH -p mem
-# Es arbeitet nur EIN Task (run_container 1 = srun -n 1); die Zuteilung dient
-# dem Speicher. 32 x 45000 MB = 1,44 TB - dieselbe Groesse, mit der die
-# Netzvorbereitung in 015 erfolgreich lief.
+# Es arbeitet nur EIN Task (run_container 1 = srun -n 1 -c 32); er nutzt die 32
+# CPUs fuer die CGAL-Threads und Prozesspools in 03 (MESH_STEP_CPUS in config.sh).
+# 32 x 45000 MB = 1,44 TB - dieselbe Groesse, mit der die Netzvorbereitung in
+# 015 erfolgreich lief.
 #SBATCH --nodes=1
 #SBATCH -n 32
 #SBATCH --mem-per-cpu=45000
@@ -18,11 +19,17 @@
 # Stufe 1 der zweistufigen Bruchpipeline (Aufteilung wie in 012):
 # .leS -> Voxelvolumen -> Netz -> DolfinX-Netz. KEINE Simulation.
 #
-# Usage: sbatch job_generate_mesh_CLUSTER.sh [config-file.json]
+# Usage: sbatch job_generate_mesh_CLUSTER.sh [--force] [config-file.json]
 #        (ohne Argument: die Default-Stufe aus config.sh)
+#        --force rechnet alle Stufen neu, statt unveraenderte aus dem
+#        Stufen-Cache zu uebernehmen (einzelne Stufen: FORCE_STAGES=mesh,09).
 
 set -euo pipefail
 
+if [[ "${1:-}" == "--force" ]]; then
+  export FORCE_STAGES=all
+  shift
+fi
 SCRIPT_DIR="$HPC_SCRATCH/pygalmesh/data/scripts/016-Fracture-From-leS"
 source "$SCRIPT_DIR/config.sh"
 bash "$SCRIPT_DIR/run_generate_mesh_CLUSTER.sh" \
@@ -5,13 +5,16 @@ import meshio
 import numpy as np
 import os
 import ufl
-import copy
 import argparse
+import xml.etree.ElementTree as ET
 
 # --- MPI communicator ---
 comm = MPI.COMM_WORLD
 rank = comm.Get_rank()
 
+# Pygalmesh writes medit:ref; nanomesh writes tetgen:ref.
+REF_TAG_NAMES = ("medit:ref", "tetgen:ref", "gmsh:physical")
+
 # --- Parse CLI arguments ---
 parser = argparse.ArgumentParser(description="Convert mesh files to DolfinX format in-place.")
 parser.add_argument("input_path", type=str, help="Path to the directory containing mesh files")
@@ -19,11 +22,95 @@ parser.add_argument(
     "--mesh-filenames", "-f", nargs="+", default=["mesh_output.xdmf"],
     help="Name(s) of the mesh file(s) to process (default: mesh_output.xdmf)"
 )
+parser.add_argument(
+    "--serial-read", action="store_true",
+    help="Read the whole mesh with meshio on rank 0 instead of per-rank HDF5 slices"
+)
 args = parser.parse_args()
 
 input_folder = args.input_path
 target_mesh_filenames = set(args.mesh_filenames)
 
+
+def rank_slice(n, comm):
+    """Contiguous block [lo, hi) of n rows owned by this rank."""
+    return n * comm.rank // comm.size, n * (comm.rank + 1) // comm.size
+
+
+def xdmf_hdf5_datasets(xdmf_path):
+    """
+    (file, dataset) of geometry, tetra topology and ref tag of a single-block
+    tetra XDMF, or None if the file has another layout (mixed cell blocks,
+    XML data items) and has to be read with meshio.
+    """
+    grid = ET.parse(xdmf_path).getroot().find(".//Grid")
+    topology = grid.find("Topology") if grid is not None else None
+    if topology is None or topology.get("TopologyType", topology.get("Type", "")).lower() != "tetrahedron":
+        return None
+
+    def dataset(element):
+        item = element.find("DataItem") if element is not None else None
+        if item is None or item.get("Format") != "HDF":
+            return None
+        file_name, _, path = item.text.strip().partition(":")
+        return os.path.join(os.path.dirname(xdmf_path), file_name), path
+
+    tags = {
+        attribute.get("Name"): dataset(attribute)
+        for attribute in grid.findall("Attribute")
+        if attribute.get("Center") == "Cell"
+    }
+    ref_name = next((name for name in REF_TAG_NAMES if name in tags), None)
+    ref_tag = tags[ref_name] if ref_name is not None else None
+    geometry, topology = dataset(grid.find("Geometry")), dataset(topology)
+    if geometry is None or topology is None or (ref_name is not None and ref_tag is None):
+        return None
+    return geometry, topology, ref_tag
+
+
+def read_hdf5_slice(item, comm):
+    import h5py
+
+    file_name, path = item
+    with h5py.File(file_name, "r") as h5:
+        data = h5[path]
+        lo, hi = rank_slice(data.shape[0], comm)
+        return np.asarray(data[lo:hi])
+
+
+def read_distributed(xdmf_path, comm):
+    """
+    Every rank reads its own slice of topology, ref tag and geometry. Cells
+    keep global point indices; dolfinx numbers the geometry rows by rank order,
+    which is the file order again.
+    """
+    datasets = xdmf_hdf5_datasets(xdmf_path)
+    if datasets is None:
+        return None
+    geometry, topology, ref_tag = datasets
+    cells = read_hdf5_slice(topology, comm).astype(np.int64, copy=False)
+    if ref_tag is not None:
+        cells = cells[read_hdf5_slice(ref_tag, comm).reshape(-1) != 0]
+    points = np.ascontiguousarray(read_hdf5_slice(geometry, comm)[:, :3])
+    return cells, points
+
+
+def read_serial(xdmf_path, comm):
+    """Whole mesh through meshio on rank 0; the other ranks contribute empty arrays."""
+    if comm.rank != 0:
+        return np.empty((0, 4), dtype=np.int64), np.empty((0, 3), dtype=np.float64)
+    meshio_data = meshio.read(xdmf_path)
+    tetra_cells = meshio_data.cells_dict.get("tetra")
+    if tetra_cells is None:
+        raise ValueError(f"No tetra cells found in {xdmf_path}")
+    cell_data = meshio_data.cell_data_dict
+    cells_id = next((cell_data[name]["tetra"] for name in REF_TAG_NAMES if "tetra" in cell_data.get(name, {})), None)
+    cells = np.asarray(tetra_cells, dtype=np.int64)
+    if cells_id is not None:
+        cells = cells[np.asarray(cells_id).reshape(-1) != 0]
+    return cells, np.ascontiguousarray(meshio_data.points[:, :3], dtype=np.float64)
+
+
 # --- Find mesh files in input folder ---
 mesh_files = []
 for file in os.listdir(input_folder):
@@ -36,35 +123,17 @@ for file in os.listdir(input_folder):
 for input_file, output_file in mesh_files:
     if rank == 0:
         print(f"Processing mesh: {input_file}")
-        meshio_data = meshio.read(input_file)
-
-        # Adjust point orientation
-        points_tmp = meshio_data.points[:, :3]
-        points = copy.deepcopy(points_tmp)
-        points[:, 0] = points_tmp[:, 0]
-        points[:, 1] = points_tmp[:, 1]
-
-        # Filter active tetrahedral cells. Pygalmesh writes medit:ref; nanomesh writes tetgen:ref.
-        tetra_cells = meshio_data.cells_dict.get("tetra")
-        cell_data = meshio_data.cell_data_dict
-        if "medit:ref" in cell_data and "tetra" in cell_data["medit:ref"]:
-            cells_id = cell_data["medit:ref"]["tetra"]
-        elif "tetgen:ref" in cell_data and "tetra" in cell_data["tetgen:ref"]:
-            cells_id = cell_data["tetgen:ref"]["tetra"]
-        elif "gmsh:physical" in cell_data and "tetra" in cell_data["gmsh:physical"]:
-            cells_id = cell_data["gmsh:physical"]["tetra"]
-        else:
-            cells_id = None
-
-        if tetra_cells is None:
-            raise ValueError(f"No tetra cells found in {input_file}")
-        if cells_id is None:
-            active_cells = tetra_cells
-        else:
-            active_cells = [cell for idx, cell in enumerate(tetra_cells) if cells_id[idx] != 0]
+
+    distributed = None if args.serial_read else read_distributed(input_file, comm)
+    if distributed is None:
+        if rank == 0 and not args.serial_read:
+            print("  no single-block tetra XDMF/HDF5 layout; reading with meshio on rank 0")
+        active_cells, points = read_serial(input_file, comm)
     else:
-        points = None
-        active_cells = None
+        active_cells, points = distributed
+    n_active = comm.allreduce(len(active_cells), op=MPI.SUM)
+    if rank == 0:
+        print(f"  active tetrahedra: {n_active} on {comm.size} rank(s)")
 
     # Create mesh
     cell = ufl.Cell('tetrahedron', geometric_dimension=3)
@@ -77,6 +146,3 @@ for input_file, output_file in mesh_files:
         print(f"Writing converted mesh to: {output_file}")
     with dlfx.io.XDMFFile(comm, output_file, "w") as xdmf:
         xdmf.write_mesh(domain)
-
-
-
@@ -12,9 +12,22 @@
 #   $HPC_SCRATCH/pygalmesh/data/resources/generated_meshes/<specimen>/<label>/<run_name>/
 # Zwischenarrays und QA-Reports bleiben im Arbeitsverzeichnis und lassen sich
 # durch einen erneuten Lauf wiederherstellen.
+#
+# Stufen-Cache (stage_cache.py): jede Stufe merkt sich in metadata.json einen
+# Hash aus Eingabedateien, Skripten und gelesenen Config-Abschnitten und wird
+# uebersprungen, solange er passt. Neu rechnen erzwingen:
+#   run_generate_mesh_CLUSTER.sh --force [config]      (alle Stufen)
+#   FORCE_STAGES=mesh,09 run_generate_mesh_CLUSTER.sh  (nur diese Stufen)
+# Stufennamen: voxel 02c 02e 02d 02f mesh 08 09 dlfx
 
 set -euo pipefail
 
+FORCE_STAGES="${FORCE_STAGES:-}"
+if [[ "${1:-}" == "--force" ]]; then
+  FORCE_STAGES=all
+  shift
+fi
+
 working_directory="$HPC_SCRATCH/pygalmesh/data/scripts/016-Fracture-From-leS"
 source "$working_directory/config.sh"
 
@@ -47,6 +60,12 @@ run_container() {
   local container="$4"
   shift 4
   local srun_args=(-n "$ntasks")
+  # Der einzelne Task bekommt die CPUs des Jobs: CGAL-Threads (n_threads = null
+  # liest SLURM_CPUS_PER_TASK) und die Prozesspools in 03.
+  local step_cpus="${MESH_STEP_CPUS:-${SLURM_NTASKS:-1}}"
+  if [[ "$ntasks" == 1 && "$step_cpus" -gt 1 ]]; then
+    srun_args+=(-c "$step_cpus")
+  fi
   if [[ -n "$chdir" ]]; then
     srun_args+=(--chdir="$chdir")
   fi
@@ -100,6 +119,7 @@ print(config["03_mesh_3D_array"]["specimen_name"])
 print(config["binning"]["label"])
 print(config.get("dataset", {}).get("specimen", config["dataset"]["id"]))
 print(config["A01_les_2_npy"]["input"])
+print(config["metadata_output_path"])
 PYINFO
 )
 base_subvolume_container_path="$(echo "$CONFIG_INFO" | sed -n '1p')"
@@ -107,8 +127,30 @@ run_name="$(echo "$CONFIG_INFO" | sed -n '2p')"
 binning_label="$(echo "$CONFIG_INFO" | sed -n '3p')"
 specimen="$(echo "$CONFIG_INFO" | sed -n '4p')"
 resource_container_path="$(echo "$CONFIG_INFO" | sed -n '5p')"
+metadata_container_path="$(echo "$CONFIG_INFO" | sed -n '6p')"
 base_subvolume_folder="${base_subvolume_container_path/#\/data/$HPC_SCRATCH/pygalmesh/data}"
 resource_host_path="${resource_container_path/#\/data/$HPC_SCRATCH/pygalmesh/data}"
+metadata_host_path="${metadata_container_path/#\/data/$HPC_SCRATCH/pygalmesh/data}"
+
+# stage_cached <stufe> <schluessel> [stage_cache.py-Argumente]: Exit 0 = Treffer
+stage_cached() {
+  local name="$1" key="$2"
+  shift 2
+  local force_flag=""
+  if [[ "$FORCE_STAGES" == "all" || ",$FORCE_STAGES," == *",$name,"* ]]; then
+    force_flag="--force"
+  fi
+  python3 "$working_directory/stage_cache.py" check --config "$CONFIG_HOST_PATH" --metadata "$metadata_host_path" \
+    --stage "$key" $force_flag "$@"
+}
+
+# stage_record <schluessel> [stage_cache.py-Argumente inkl. --outputs]
+stage_record() {
+  local key="$1"
+  shift
+  python3 "$working_directory/stage_cache.py" record --config "$CONFIG_HOST_PATH" --metadata "$metadata_host_path" \
+    --stage "$key" "$@"
+}
 
 # --- Eingabe pruefen, bevor Rechenzeit verbrannt wird ------------------------
 if [[ ! -e "$resource_host_path" ]]; then
@@ -131,10 +173,19 @@ echo ".leS-Eingabe: $resource_host_path"
 echo "Riegel      : $(config_value_default fracture_geometry_check.bar_extent_mm.x '?') x $(config_value_default fracture_geometry_check.bar_extent_mm.y '?') x $(config_value_default fracture_geometry_check.bar_extent_mm.z '?') mm"
 echo "Elementgroesse: $(config_value_default mesh_resolution.max_element_size_um '?') um"
 
-for script in A01_les_2_npy.py 02b_build_subvolume_arrays.py; do
-  run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-    python3 "$working_directory/$script" --config "$CONFIG_PATH"
-done
+# A01 und 02b als eine Stufe: ihre Ausgaben sind die volume.npy der Teilvolumen.
+voxel_cache_args=(
+  --sections A01_les_2_npy 02a_rotate_pic_to_align_with_axis 02b_build_subvolume_arrays metadata_output_path
+  --scripts A01_les_2_npy.py 02b_build_subvolume_arrays.py
+  --inputs "$resource_host_path"
+)
+if ! stage_cached voxel voxel "${voxel_cache_args[@]}"; then
+  for script in A01_les_2_npy.py 02b_build_subvolume_arrays.py; do
+    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+      python3 "$working_directory/$script" --config "$CONFIG_PATH"
+  done
+  stage_record voxel "${voxel_cache_args[@]}" --outputs "$base_subvolume_folder"/subvolume_x*_y*/"$VOLUME_FILENAME"
+fi
 
 for subfolder in "$base_subvolume_folder"/subvolume_x*_y*/; do
   [ -d "$subfolder" ] || continue
@@ -150,11 +201,16 @@ for subfolder in "$base_subvolume_folder"/subvolume_x*_y*/; do
   fi
   meshing_npy_file="$npy_file"
 
+  # Voxelstufen: gleiches Muster, Eingabe ist jeweils das aktuelle Meshing-Volumen.
   if [[ "$(config_bool 02c_voxel_topology_cleanup.enabled)" == "1" ]]; then
     cleaned_npy_file="$subfolder/$(config_value_default 02c_voxel_topology_cleanup.output_filename volume_topology_cleaned.npy)"
     voxel_report_file="$subfolder/$(config_value_default 02c_voxel_topology_cleanup.report_filename volume_topology.txt)"
-    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-      python3 "$working_directory/02c_voxel_topology_cleanup.py" --config "$CONFIG_PATH" --npy "$npy_file" --output "$cleaned_npy_file" --report "$voxel_report_file"
+    cache_args=(--sections 02c_voxel_topology_cleanup --scripts 02c_voxel_topology_cleanup.py voxel_components.py --inputs "$npy_file")
+    if ! stage_cached 02c "$folder_name/02c" "${cache_args[@]}"; then
+      run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+        python3 "$working_directory/02c_voxel_topology_cleanup.py" --config "$CONFIG_PATH" --npy "$npy_file" --output "$cleaned_npy_file" --report "$voxel_report_file"
+      stage_record "$folder_name/02c" "${cache_args[@]}" --outputs "$cleaned_npy_file" "$voxel_report_file"
+    fi
     if [[ "$(config_bool 02c_voxel_topology_cleanup.use_cleaned_for_meshing)" == "1" ]]; then
       meshing_npy_file="$cleaned_npy_file"
     fi
@@ -165,8 +221,12 @@ for subfolder in "$base_subvolume_folder"/subvolume_x*_y*/; do
   if [[ "$(config_bool 02e_mirror_extrude_voxel.enabled)" == "1" ]]; then
     mirrored_npy_file="$subfolder/$(config_value_default 02e_mirror_extrude_voxel.output_filename volume_mirrored_x.npy)"
     mirrored_report_file="$subfolder/$(config_value_default 02e_mirror_extrude_voxel.report_filename volume_mirrored_x.txt)"
-    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-      python3 "$working_directory/02e_mirror_extrude_voxel.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --output "$mirrored_npy_file" --report "$mirrored_report_file"
+    cache_args=(--sections 02e_mirror_extrude_voxel --scripts 02e_mirror_extrude_voxel.py --inputs "$meshing_npy_file")
+    if ! stage_cached 02e "$folder_name/02e" "${cache_args[@]}"; then
+      run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+        python3 "$working_directory/02e_mirror_extrude_voxel.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --output "$mirrored_npy_file" --report "$mirrored_report_file"
+      stage_record "$folder_name/02e" "${cache_args[@]}" --outputs "$mirrored_npy_file" "$mirrored_report_file"
+    fi
     if [[ "$(config_bool 02e_mirror_extrude_voxel.use_mirrored_for_meshing)" == "1" ]]; then
       meshing_npy_file="$mirrored_npy_file"
     fi
@@ -175,8 +235,12 @@ for subfolder in "$base_subvolume_folder"/subvolume_x*_y*/; do
   if [[ "$(config_bool 02d_axis_aligned_cuboid_crop.enabled)" == "1" ]]; then
     cuboid_npy_file="$subfolder/$(config_value_default 02d_axis_aligned_cuboid_crop.output_filename volume_cuboid.npy)"
     cuboid_report_file="$subfolder/$(config_value_default 02d_axis_aligned_cuboid_crop.report_filename volume_cuboid.txt)"
-    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-      python3 "$working_directory/02d_axis_aligned_cuboid_crop.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --output "$cuboid_npy_file" --report "$cuboid_report_file"
+    cache_args=(--sections 02d_axis_aligned_cuboid_crop --scripts 02d_axis_aligned_cuboid_crop.py --inputs "$meshing_npy_file")
+    if ! stage_cached 02d "$folder_name/02d" "${cache_args[@]}"; then
+      run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+        python3 "$working_directory/02d_axis_aligned_cuboid_crop.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --output "$cuboid_npy_file" --report "$cuboid_report_file"
+      stage_record "$folder_name/02d" "${cache_args[@]}" --outputs "$cuboid_npy_file" "$cuboid_report_file"
+    fi
     if [[ "$(config_bool 02d_axis_aligned_cuboid_crop.use_cuboid_for_meshing)" == "1" ]]; then
       meshing_npy_file="$cuboid_npy_file"
     fi
@@ -185,46 +249,108 @@ for subfolder in "$base_subvolume_folder"/subvolume_x*_y*/; do
   if [[ "$(config_bool 02f_add_voxel_shell.enabled)" == "1" ]]; then
     shelled_npy_file="$subfolder/$(config_value_default 02f_add_voxel_shell.output_filename volume_additive_shell.npy)"
     shelled_report_file="$subfolder/$(config_value_default 02f_add_voxel_shell.report_filename volume_additive_shell.txt)"
-    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-      python3 "$working_directory/02f_add_voxel_shell.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --output "$shelled_npy_file" --report "$shelled_report_file"
+    cache_args=(--sections 02f_add_voxel_shell --scripts 02f_add_voxel_shell.py --inputs "$meshing_npy_file")
+    if ! stage_cached 02f "$folder_name/02f" "${cache_args[@]}"; then
+      run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+        python3 "$working_directory/02f_add_voxel_shell.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --output "$shelled_npy_file" --report "$shelled_report_file"
+      stage_record "$folder_name/02f" "${cache_args[@]}" --outputs "$shelled_npy_file" "$shelled_report_file"
+    fi
     if [[ "$(config_bool 02f_add_voxel_shell.use_shell_for_meshing)" == "1" ]]; then
       meshing_npy_file="$shelled_npy_file"
     fi
   fi
 
-  run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-    python3 "$working_directory/03_mesh_3D_array_pygalmesh.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --mesh "$mesh_output"
-  run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-    python3 "$working_directory/04_scale_and_translate_mesh_mod.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --center_x "$center_x" --center_y "$center_y"
-
-  if [[ "$(config_bool 10_snap_mesh_to_crop_boundary.enabled)" == "1" ]]; then
-    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-      python3 "$working_directory/10_snap_mesh_to_crop_boundary.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --report "${mesh_output%.xdmf}.snap_boundary.txt"
-  fi
-  if [[ "$(config_bool 11_mirror_extrude_mesh.enabled)" == "1" ]]; then
-    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-      python3 "$working_directory/11_mirror_extrude_mesh.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --report "${mesh_output%.xdmf}.mirror_extrude.txt"
+  # Netz (03 -> 04 -> [10] -> [11] -> [05]) ist eine Cache-Stufe; 08 und 09 lesen
+  # nur und haben eigene Stufen, damit Aenderungen dort kein Neuvernetzen ausloesen.
+  mesh_base="${mesh_output%.xdmf}"
+  mesh_cache_args=(
+    --sections 03_mesh_3D_array 10_snap_mesh_to_crop_boundary 11_mirror_extrude_mesh 05_tetgen_postprocess mesh_stage_runner
+    --metadata-sections 00_dicom2npy 02b_build_subvolume_arrays.py
+    --scripts 03_mesh_3D_array_pygalmesh.py 04_scale_and_translate_mesh_mod.py 10_snap_mesh_to_crop_boundary.py
+              11_mirror_extrude_mesh.py 05_tetgen_postprocess_mesh.py run_mesh_stages.py
+    --inputs "$meshing_npy_file"
+  )
+  quality_cache_args=(--sections 08_mesh_quality_report --scripts 08_mesh_quality_report.py --inputs "$mesh_base.tetgen.log")
+  topology_cache_args=(--sections 09_mesh_topology_audit --scripts 09_mesh_topology_audit.py --inputs "$mesh_output" "$mesh_base.h5")
+  quality_outputs=(--outputs "$mesh_base.quality.txt")
+  topology_outputs=(--outputs "$mesh_base.topology.txt" "${mesh_base}_topology_repaired.xdmf" "${mesh_base}_topology_repaired.h5")
+  run_quality=0
+  if [[ "$(config_bool 05_tetgen_postprocess.enabled)" == "1" && "$(config_bool 08_mesh_quality_report.enabled)" == "1" ]]; then
+    run_quality=1
   fi
 
-  if [[ "$(config_bool 05_tetgen_postprocess.enabled)" == "1" ]]; then
-    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-      python3 "$working_directory/05_tetgen_postprocess_mesh.py" --config "$CONFIG_PATH" --mesh "$mesh_output"
-    if [[ "$(config_bool 08_mesh_quality_report.enabled)" == "1" ]]; then
+  if ! stage_cached mesh "$folder_name/mesh" "${mesh_cache_args[@]}"; then
+    # Mit mesh_stage_runner.enabled laufen 03 -> 04 -> [10] -> [11] -> [05 -> 08] -> [09]
+    # in einem Prozess; das Netz bleibt dazwischen im Speicher (Checkpoints per Config).
+    if [[ "$(config_bool mesh_stage_runner.enabled)" == "1" ]]; then
+      run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+        python3 "$working_directory/run_mesh_stages.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --mesh "$mesh_output" --center_x "$center_x" --center_y "$center_y"
+    else
+      run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+        python3 "$working_directory/03_mesh_3D_array_pygalmesh.py" --config "$CONFIG_PATH" --npy "$meshing_npy_file" --mesh "$mesh_output"
+      run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+        python3 "$working_directory/04_scale_and_translate_mesh_mod.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --center_x "$center_x" --center_y "$center_y"
+
+      if [[ "$(config_bool 10_snap_mesh_to_crop_boundary.enabled)" == "1" ]]; then
+        run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+          python3 "$working_directory/10_snap_mesh_to_crop_boundary.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --report "$mesh_base.snap_boundary.txt"
+      fi
+      if [[ "$(config_bool 11_mirror_extrude_mesh.enabled)" == "1" ]]; then
+        run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+          python3 "$working_directory/11_mirror_extrude_mesh.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --report "$mesh_base.mirror_extrude.txt"
+      fi
+
+      if [[ "$(config_bool 05_tetgen_postprocess.enabled)" == "1" ]]; then
+        run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+          python3 "$working_directory/05_tetgen_postprocess_mesh.py" --config "$CONFIG_PATH" --mesh "$mesh_output"
+        if [[ "$run_quality" == "1" ]]; then
+          run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+            python3 "$working_directory/08_mesh_quality_report.py" --config "$CONFIG_PATH" --tetgen-log "$mesh_base.tetgen.log" --output "$mesh_base.quality.txt"
+        fi
+      fi
+      if [[ "$(config_bool 09_mesh_topology_audit.enabled)" == "1" ]]; then
+        run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+          python3 "$working_directory/09_mesh_topology_audit.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --output "$mesh_base.topology.txt"
+      fi
+    fi
+    stage_record "$folder_name/mesh" "${mesh_cache_args[@]}" \
+      --outputs "$mesh_output" "$mesh_base.h5" "$mesh_base.tetgen.log" "$mesh_base.snap_boundary.txt" \
+                "$mesh_base.mirror_extrude.txt" "${mesh_base}_sdf_surface.topology.txt"
+    # Die Reports sind in diesem Lauf mitentstanden.
+    if [[ "$run_quality" == "1" ]]; then
+      stage_record "$folder_name/08" "${quality_cache_args[@]}" "${quality_outputs[@]}"
+    fi
+    if [[ "$(config_bool 09_mesh_topology_audit.enabled)" == "1" ]]; then
+      stage_record "$folder_name/09" "${topology_cache_args[@]}" "${topology_outputs[@]}"
+    fi
+  else
+    # Netz unveraendert: nur Reports neu erzeugen, deren Config/Skript sich geaendert hat.
+    if [[ "$run_quality" == "1" ]] && ! stage_cached 08 "$folder_name/08" "${quality_cache_args[@]}"; then
       run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-        python3 "$working_directory/08_mesh_quality_report.py" --config "$CONFIG_PATH" --tetgen-log "${mesh_output%.xdmf}.tetgen.log" --output "${mesh_output%.xdmf}.quality.txt"
+        python3 "$working_directory/08_mesh_quality_report.py" --config "$CONFIG_PATH" --tetgen-log "$mesh_base.tetgen.log" --output "$mesh_base.quality.txt"
+      stage_record "$folder_name/08" "${quality_cache_args[@]}" "${quality_outputs[@]}"
+    fi
+    if [[ "$(config_bool 09_mesh_topology_audit.enabled)" == "1" ]] && ! stage_cached 09 "$folder_name/09" "${topology_cache_args[@]}"; then
+      run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
+        python3 "$working_directory/09_mesh_topology_audit.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --output "$mesh_base.topology.txt"
+      stage_record "$folder_name/09" "${topology_cache_args[@]}" "${topology_outputs[@]}"
     fi
-  fi
-  if [[ "$(config_bool 09_mesh_topology_audit.enabled)" == "1" ]]; then
-    run_container 1 "" "$BIND_PATHS" "$CONTAINER_PATH" \
-      python3 "$working_directory/09_mesh_topology_audit.py" --config "$CONFIG_PATH" --mesh "$mesh_output" --output "${mesh_output%.xdmf}.topology.txt"
   fi
 done
 
+# Die Konvertierung liest Topologie/Geometrie je Rank scheibenweise aus dem HDF5;
+# mit mehreren Tasks sinkt der Speicher pro Prozess. DLFX_CONVERT_NTASKS=1 = seriell.
+DLFX_CONVERT_NTASKS="${DLFX_CONVERT_NTASKS:-${SLURM_NTASKS:-1}}"
 for subfolder in "$base_subvolume_folder"/*/; do
   [ -d "$subfolder" ] || continue
   if [ -f "$subfolder/mesh.xdmf" ]; then
-    run_container 1 "" "$SIM_BIND" "$SIM_CONTAINER" \
-      python3 "$working_directory/make_mesh_dlfx_compatible_cluster.py" "$subfolder" -f mesh.xdmf
+    folder_name="$(basename "$subfolder")"
+    cache_args=(--scripts make_mesh_dlfx_compatible_cluster.py --inputs "$subfolder/mesh.xdmf" "$subfolder/mesh.h5")
+    if ! stage_cached dlfx "$folder_name/dlfx" "${cache_args[@]}"; then
+      run_container "$DLFX_CONVERT_NTASKS" "" "$SIM_BIND" "$SIM_CONTAINER" \
+        python3 "$working_directory/make_mesh_dlfx_compatible_cluster.py" "$subfolder" -f mesh.xdmf
+      stage_record "$folder_name/dlfx" "${cache_args[@]}" --outputs "$subfolder/dlfx_mesh.xdmf" "$subfolder/dlfx_mesh.h5"
+    fi
   fi
 done
 
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Netzstufen 03 -> 04 -> [10] -> [11] -> [05 -> 08] -> [09] in einem Prozess.
+
+Statt jede Stufe als eigenes Skript zu starten (XDMF/HDF5 schreiben, im
+naechsten Skript wieder lesen), werden die Stufenfunktionen der nummerierten
+Skripte importiert und das Netz als meshio.Mesh (Punkte, Tetraeder, cell_data)
+im Speicher weitergereicht. Geschrieben werden nur
+
+  - das Endnetz nach --mesh,
+  - Zwischenstaende der Stufen aus mesh_stage_runner.checkpoints
+    (z. B. ["03", "11"] -> mesh.after_03.xdmf, mesh.after_11.xdmf),
+  - die Reports der Stufen unter denselben Namen wie bei den Einzelskripten.
+
+Die Einzelskripte bleiben unveraendert aufrufbar und nutzen dieselben
+Funktionen. Unterschiede zur Skriptkette: 05 legt keine mesh.pre_tetgen.*-
+Sicherung an (dafuer den Checkpoint der Stufe davor setzen), und 09 prueft das
+Netz im Speicher, 09_mesh_topology_audit.chunk_tets gilt nur fuer den
+Einzelaufruf. meshing_method "nanomesh" schreibt sein Format selbst und wird
+hier nicht unterstuetzt.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+
+import meshio
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CONFIG = {
+    "enabled": False,
+    "checkpoints": [],
+}
+
+
+def load_module(filename):
+    # Unter dem Dateinamen in sys.modules eintragen: die Prozesspools der Stufen
+    # (z. B. sdf_workers/marching_cubes_workers in 03) picklen ihre Funktionen per
+    # Modulname, und SCRIPT_DIR liegt fuer Kindprozesse auf sys.path.
+    name = Path(filename).stem
+    if name in sys.modules:
+        return sys.modules[name]
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    path = os.path.join(SCRIPT_DIR, filename)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def load_config(config_path):
+    with open(config_path, "r") as handle:
+        config = json.load(handle)
+    cfg = dict(DEFAULT_CONFIG)
+    cfg.update(config.get("mesh_stage_runner", {}))
+    return config, cfg
+
+
+def stage_enabled(config, key):
+    return bool(config.get(key, {}).get("enabled", False))
+
+
+def with_suffix(mesh_path, suffix):
+    # Gleiche Namen wie "${mesh_output%.xdmf}<suffix>" in run_generate_mesh_CLUSTER.sh
+    return mesh_path.with_name(mesh_path.stem + suffix)
+
+
+def write_checkpoint(mesh, mesh_path, stage, checkpoints):
+    if stage not in checkpoints:
+        return
+    path = with_suffix(mesh_path, f".after_{stage}{mesh_path.suffix}")
+    meshio.write(path, mesh)
+    print(f"Checkpoint nach Stufe {stage}: {path}")
+
+
+def run_stages(config_path, npy_path, mesh_path, center_x, center_y):
+    config, cfg = load_config(config_path)
+    checkpoints = {str(stage) for stage in cfg.get("checkpoints") or []}
+    mesh_path = Path(mesh_path)
+
+    # 03: Vernetzung
+    stage03 = load_module("03_mesh_3D_array_pygalmesh.py")
+    mesh_cfg, metadata_output_path = stage03.load_config(config_path)
+    mesh, mesh_metadata = stage03.generate_mesh(mesh_cfg, metadata_output_path, npy_path, str(mesh_path), SCRIPT_DIR)
+    if mesh is None:
+        raise ValueError("meshing_method nanomesh writes its own mesh file; run the per-script chain instead")
+    stage03.append_mesh_metadata(metadata_output_path, mesh_metadata)
+    write_checkpoint(mesh, mesh_path, "03", checkpoints)
+
+    # 04: Skalieren/Verschieben auf die Subvolumen-Box
+    stage04 = load_module("04_scale_and_translate_mesh_mod.py")
+    mesh = stage04.scale_and_translate_points(
+        mesh,
+        target_center_vox_xy=(center_x, center_y),
+        **stage04.target_box(metadata_output_path),
+    )
+    write_checkpoint(mesh, mesh_path, "04", checkpoints)
+
+    if stage_enabled(config, "10_snap_mesh_to_crop_boundary"):
+        stage10 = load_module("10_snap_mesh_to_crop_boundary.py")
+        mesh, info = stage10.snap_mesh(mesh, config["10_snap_mesh_to_crop_boundary"])
+        report_path = with_suffix(mesh_path, ".snap_boundary.txt")
+        stage10.write_report(report_path, {"mesh": str(mesh_path), "output": str(mesh_path), **info})
+        print(f"Wrote report: {report_path}")
+        write_checkpoint(mesh, mesh_path, "10", checkpoints)
+
+    if stage_enabled(config, "11_mirror_extrude_mesh"):
+        stage11 = load_module("11_mirror_extrude_mesh.py")
+        mesh, info = stage11.mirror_extrude_mesh(mesh, config["11_mirror_extrude_mesh"])
+        report_path = with_suffix(mesh_path, ".mirror_extrude.txt")
+        stage11.write_report(report_path, {"mesh": str(mesh_path), "output": str(mesh_path), **info})
+        print(f"Wrote report: {report_path}")
+        write_checkpoint(mesh, mesh_path, "11", checkpoints)
+
+    if stage_enabled(config, "05_tetgen_postprocess"):
+        stage05 = load_module("05_tetgen_postprocess_mesh.py")
+        tetgen_cfg = stage05.load_config(config_path)
+        tetgen_output = Path(tetgen_cfg.get("output_mesh_path") or mesh_path)
+        log_path = tetgen_output.with_suffix(".tetgen.log")
+        tetgen_mesh = stage05.tetgen_postprocess(
+            mesh,
+            stage05.normalize_switches(tetgen_cfg.get("switches", "-rCV")),
+            log_path,
+            active_ref=tetgen_cfg.get("active_ref", 1),
+            all_tets=bool(tetgen_cfg.get("all_tets", False)),
+            keep_workdir=bool(tetgen_cfg.get("keep_workdir", False)),
+        )
+        if tetgen_output == mesh_path:
+            mesh = tetgen_mesh
+            write_checkpoint(mesh, mesh_path, "05", checkpoints)
+        else:
+            # Wie beim Einzelskript: eigener Ausgabepfad, die Kette laeuft mit dem Netz davor weiter.
+            tetgen_output.parent.mkdir(parents=True, exist_ok=True)
+            meshio.write(tetgen_output, tetgen_mesh)
+            print(f"Wrote TetGen postprocessed mesh: {tetgen_output}")
+        del tetgen_mesh
+
+        if stage_enabled(config, "08_mesh_quality_report"):
+            stage08 = load_module("08_mesh_quality_report.py")
+            stage08.write_quality_report(log_path, with_suffix(mesh_path, ".quality.txt"), config_path)
+
+    mesh_path.parent.mkdir(parents=True, exist_ok=True)
+    meshio.write(mesh_path, mesh)
+    print(f"Wrote mesh: {mesh_path}")
+
+    if stage_enabled(config, "09_mesh_topology_audit"):
+        stage09 = load_module("09_mesh_topology_audit.py")
+        audit_cfg = stage09.load_config(config_path)
+        active_ref = audit_cfg["active_ref"]
+        all_tets = bool(audit_cfg["all_tets"])
+        tets, selected_note = stage09.select_tetrahedra(mesh, active_ref, all_tets)
+        audit = stage09.audit_in_memory(mesh.points[:, :3], tets)
+        stage09.finish_audit(
+            audit,
+            selected_note,
+            tets,
+            audit_cfg,
+            mesh_path,
+            with_suffix(mesh_path, ".topology.txt"),
+            repair_output=stage09.default_repair_output(audit_cfg, mesh_path),
+            active_ref=active_ref,
+            all_tets=all_tets,
+        )
+    return mesh
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run mesh stages 03/04/10/11/05/08/09 in one process, passing the mesh in memory.")
+    parser.add_argument("--config", required=True, help="Path to config.json")
+    parser.add_argument("--npy", required=True, help="Input .npy volume for 03")
+    parser.add_argument("--mesh", required=True, help="Final mesh path; checkpoints and reports are written next to it")
+    parser.add_argument("--center_x", type=float, required=True, help="Target center X for 04 (in voxel coordinates)")
+    parser.add_argument("--center_y", type=float, required=True, help="Target center Y for 04 (in voxel coordinates)")
+    args = parser.parse_args()
+
+    run_stages(args.config, args.npy, args.mesh, args.center_x, args.center_y)
+
+
+if __name__ == "__main__":
+    main()
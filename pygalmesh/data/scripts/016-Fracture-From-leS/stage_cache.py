@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Inhaltsadressierter Cache fuer die Stufen in run_generate_mesh_CLUSTER.sh.
+
+Je Stufe wird ein Hash aus
+
+  - dem Inhalt der Eingabedateien (--inputs, Verzeichnisse rekursiv),
+  - dem Inhalt der Stufenskripte (--scripts, relativ zu diesem Ordner),
+  - den gelesenen Config-Abschnitten (--sections) und
+  - den gelesenen metadata.json-Eintraegen (--metadata-sections)
+
+gebildet und nach erfolgreichem Lauf unter "stage_cache" in metadata.json
+abgelegt, zusammen mit Groesse/mtime der Ausgaben. Ein spaeterer Lauf ueberspringt
+die Stufe, wenn der Hash gleich ist und alle Ausgaben unveraendert vorliegen.
+
+    stage_cache.py check  --config C --metadata M --stage KEY [...] [--force]
+        Exit 0: Treffer, Stufe ueberspringen. Exit 1: neu rechnen.
+    stage_cache.py record --config C --metadata M --stage KEY [...] --outputs ...
+
+Laeuft auf dem Host (nur Standardbibliothek). Dateihashes werden mit
+Groesse/mtime gemerkt, damit unveraenderte GB-Volumen nicht jedes Mal neu
+gelesen werden; schreibt eine Stufe byte-gleiche Ausgaben neu, bleibt der Hash
+der Folgestufe trotzdem gleich.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_KEY = "stage_cache"
+CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def load_json(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r") as handle:
+        return json.load(handle)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [int(stat.st_size), int(stat.st_mtime_ns)]
+
+
+def file_digest(path, memo):
+    path = os.path.abspath(path)
+    signature = file_signature(path)
+    known = memo.get(path)
+    if known and known.get("signature") == signature:
+        return known["sha256"]
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_BYTES), b""):
+            digest.update(chunk)
+    memo[path] = {"signature": signature, "sha256": digest.hexdigest()}
+    return memo[path]["sha256"]
+
+
+def input_digest(path, memo):
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(file_digest(file_path, memo).encode())
+        return digest.hexdigest()
+    if os.path.exists(path):
+        return file_digest(path, memo)
+    return None
+
+
+def stage_hash(args, config, metadata, memo):
+    payload = {
+        "sections": {name: config.get(name) for name in args.sections},
+        "metadata_sections": {name: metadata.get(name) for name in args.metadata_sections},
+        "scripts": {name: input_digest(os.path.join(SCRIPT_DIR, name), memo) for name in args.scripts},
+        "inputs": [[os.path.abspath(path), input_digest(path, memo)] for path in args.inputs],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def outputs_unchanged(entry):
+    for path, signature in entry.get("outputs", {}).items():
+        if not os.path.exists(path) or file_signature(path) != signature:
+            return False
+    return True
+
+
+def write_metadata(path, metadata):
+    os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as handle:
+        json.dump(metadata, handle, indent=2)
+    os.replace(tmp_path, path)
+
+
+def check(args):
+    if args.force:
+        print(f"[cache] {args.stage}: erzwungen (--force)")
+        return 1
+    metadata = load_json(args.metadata)
+    cache = metadata.get(CACHE_KEY, {})
+    entry = cache.get("stages", {}).get(args.stage)
+    if not entry:
+        print(f"[cache] {args.stage}: kein Eintrag")
+        return 1
+    memo = cache.setdefault("files", {})
+    known = json.dumps(memo, sort_keys=True)
+    current = stage_hash(args, load_json(args.config), metadata, memo)
+    if json.dumps(memo, sort_keys=True) != known:
+        # Neu gehashte Dateien merken, auch wenn die Stufe danach laeuft.
+        write_metadata(args.metadata, metadata)
+    if entry.get("hash") != current:
+        print(f"[cache] {args.stage}: Eingaben oder Config geaendert")
+        return 1
+    if not outputs_unchanged(entry):
+        print(f"[cache] {args.stage}: Ausgaben fehlen oder wurden veraendert")
+        return 1
+    print(f"[cache] {args.stage}: unveraendert, uebersprungen")
+    return 0
+
+
+def record(args):
+    # Erst nach dem Lauf lesen: die Stufe selbst kann metadata.json erweitert haben.
+    metadata = load_json(args.metadata)
+    cache = metadata.setdefault(CACHE_KEY, {})
+    memo = cache.setdefault("files", {})
+    outputs = {
+        os.path.abspath(path): file_signature(path)
+        for path in args.outputs
+        if os.path.isfile(path)
+    }
+    cache.setdefault("stages", {})[args.stage] = {
+        "hash": stage_hash(args, load_json(args.config), metadata, memo),
+        "outputs": outputs,
+        "timestamp": datetime.now().isoformat(),
+    }
+    # Ausgaben sind die Eingaben der naechsten Stufe - nur Dateien merken, die noch existieren.
+    cache["files"] = {path: value for path, value in memo.items() if os.path.exists(path)}
+    write_metadata(args.metadata, metadata)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed skip/record for pipeline stages (hashes in metadata.json).")
+    parser.add_argument("action", choices=("check", "record"))
+    parser.add_argument("--config", required=True, help="Host path of the config JSON")
+    parser.add_argument("--metadata", required=True, help="Host path of metadata.json (holds the cache)")
+    parser.add_argument("--stage", required=True, help="Cache key, e.g. voxel or subvolume_x0_y0/mesh")
+    parser.add_argument("--sections", nargs="*", default=[], help="Config sections the stage reads")
+    parser.add_argument("--metadata-sections", nargs="*", default=[], help="metadata.json entries the stage reads")
+    parser.add_argument("--scripts", nargs="*", default=[], help="Stage scripts, relative to this folder")
+    parser.add_argument("--inputs", nargs="*", default=[], help="Input files or folders")
+    parser.add_argument("--outputs", nargs="*", default=[], help="Output files (record only; missing optional outputs are ignored)")
+    parser.add_argument("--force", action="store_true", help="check: always report a miss")
+    args = parser.parse_args()
+    return check(args) if args.action == "check" else record(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import importlib.util
+import pathlib
+
+import numpy as np
+import pytest
+
+for name in ("meshio", "pygalmesh", "nanomesh", "skimage", "matplotlib"):
+    pytest.importorskip(name)
+
+this_dir = pathlib.Path(__file__).resolve().parent
+
+
+def load_runner():
+    spec = importlib.util.spec_from_file_location("run_mesh_stages", this_dir.parent / "run_mesh_stages.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def sphere_mask(n=40, radius=12):
+    z, y, x = np.mgrid[:n, :n, :n]
+    c = (n - 1) / 2
+    return (x - c) ** 2 + (y - c) ** 2 + (z - c) ** 2 < radius**2
+
+
+def test_stage_pools_with_workers():
+    # Wie in config-A01-les-base.json: Narrow-Band-SDF und Marching Cubes mit Prozesspools.
+    stage03 = load_runner().load_module("03_mesh_3D_array_pygalmesh.py")
+    params = {
+        "sdf_mode": "narrow_band",
+        "sdf_chunk_voxels": 16,
+        "marching_cubes_chunk_voxels": 16,
+    }
+    mask = sphere_mask()
+
+    serial_verts, serial_faces = stage03.extract_sdf_surface(
+        mask, 0.5, {**params, "sdf_workers": 1, "marching_cubes_workers": 1}
+    )
+    verts, faces = stage03.extract_sdf_surface(
+        mask, 0.5, {**params, "sdf_workers": 2, "marching_cubes_workers": 2}
+    )
+
+    assert len(verts) == len(serial_verts)
+    assert len(faces) == len(serial_faces)
+    assert np.allclose(np.sort(verts, axis=0), np.sort(serial_verts, axis=0), atol=1e-5)
+
+
+def test_load_module_is_cached():
+    runner = load_runner()
+    first = runner.load_module("04_scale_and_translate_mesh_mod.py")
+    assert runner.load_module("04_scale_and_translate_mesh_mod.py") is first
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+voxel_components.py — Zusammenhangskomponenten großer Voxelvolumen, scheibenweise.
+
+Gemeinsame Labelling-Engine für `02c_voxel_topology_cleanup.py` und
+`evaluate_pore_size_distribution.py`. Statt `ndi.label` auf dem ganzen Volumen
+(int32-Labelarray = 4 Byte je Voxel, plus Kopien) wird das Volumen in Scheiben
+entlang Achse 0 gelabelt; Komponenten, die sich über eine Scheibengrenze
+fortsetzen, werden per Union-Find zusammengeführt. Gleichzeitig im Speicher
+liegen nur eine Scheibe und die letzte Ebene der vorherigen — das Volumen darf
+ein memmap (`np.load(..., mmap_mode="r")`) sein.
+
+Die Komponenten sind wie bei `ndi.label` nach ihrem ersten Voxel in C-Order
+nummeriert, Größen, Randflags und Schwerpunkte stimmen also eins zu eins mit
+dem Ganzvolumen-Labelling überein.
+
+    result = label_components(volume, connectivity=6, value=1)
+    result["sizes"], result["border"]           # je Komponente, Index = Label - 1
+    write_component_mask(result, result["sizes"] < 100, out)   # zweiter Durchlauf
+"""
+
+import numpy as np
+from scipy import ndimage as ndi
+
+DEFAULT_SLAB_THICKNESS = 64
+
+
+def structure_for_connectivity(connectivity):
+    if connectivity == 6:
+        return ndi.generate_binary_structure(3, 1)
+    if connectivity == 18:
+        return ndi.generate_binary_structure(3, 2)
+    if connectivity == 26:
+        return ndi.generate_binary_structure(3, 3)
+    raise ValueError(f"Unsupported 3D connectivity: {connectivity}; expected 6, 18, or 26")
+
+
+def _slab_mask(volume, lo, hi, value, invert):
+    slab = np.asarray(volume[lo:hi])
+    mask = slab == value if value is not None else slab.astype(bool, copy=False)
+    return ~mask if invert else mask
+
+
+def _seam_offsets(connectivity):
+    # Nachbarn über die Scheibengrenze hinweg (dx = 1) als (dy, dz)
+    if connectivity == 6:
+        return [(0, 0)]
+    if connectivity == 18:
+        return [(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)]
+    return [(dy, dz) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+
+
+def _seam_pairs(previous, current, connectivity):
+    """Paare (globales Label oben, globales Label unten), die sich über die Naht berühren."""
+    ny, nz = previous.shape
+    pairs = []
+    for dy, dz in _seam_offsets(connectivity):
+        a = previous[max(0, -dy) : ny - max(0, dy), max(0, -dz) : nz - max(0, dz)]
+        b = current[max(0, dy) : ny - max(0, -dy), max(0, dz) : nz - max(0, -dz)]
+        touching = (a > 0) & (b > 0)
+        if touching.any():
+            pairs.append(np.stack([a[touching], b[touching]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def _find(parent, label):
+    while parent[label] != label:
+        parent[label] = parent[parent[label]]
+        label = parent[label]
+    return label
+
+
+def label_components(volume, connectivity=6, value=None, invert=False,
+                     slab_thickness=DEFAULT_SLAB_THICKNESS, centroids=False):
+    """
+    Labelt `volume == value` (bzw. `volume` als bool, `invert` für das
+    Komplement) scheibenweise und liefert ein dict:
+
+    * count      Anzahl Komponenten
+    * sizes      int64 je Komponente (Index = Label - 1, Reihenfolge wie ndi.label)
+    * border     bool je Komponente: berührt eine der sechs Volumenseiten
+    * centroids  (count, 3) float64 in Indexkoordinaten (nur mit centroids=True)
+
+    Die übrigen Einträge braucht `write_component_mask` für den zweiten Durchlauf.
+    """
+    shape = volume.shape
+    structure = structure_for_connectivity(connectivity)
+    slab_thickness = max(1, int(slab_thickness))
+    bounds = [(lo, min(lo + slab_thickness, shape[0])) for lo in range(0, shape[0], slab_thickness)]
+
+    sizes = []
+    border = []
+    coordinate_sums = []
+    offsets = []
+    pairs = []
+    previous_plane = None
+    n_global = 0
+    for lo, hi in bounds:
+        mask = _slab_mask(volume, lo, hi, value, invert)
+        labels, count = ndi.label(mask, structure=structure)
+        offsets.append(n_global)
+        counts = np.bincount(labels.ravel(), minlength=count + 1)[1:].astype(np.int64)
+        sizes.append(counts)
+
+        touches = np.zeros(count + 1, dtype=bool)
+        for face in (labels[:, 0, :], labels[:, -1, :], labels[:, :, 0], labels[:, :, -1]):
+            touches[face.ravel()] = True
+        if lo == 0:
+            touches[labels[0].ravel()] = True
+        if hi == shape[0]:
+            touches[labels[-1].ravel()] = True
+        border.append(touches[1:])
+
+        if centroids:
+            flat = labels.ravel()
+            sums = np.zeros((count, 3), dtype=np.float64)
+            for axis in range(3):
+                coordinate = np.arange(labels.shape[axis], dtype=np.float64)
+                if axis == 0:
+                    coordinate += lo
+                view = [1, 1, 1]
+                view[axis] = -1
+                weights = np.broadcast_to(coordinate.reshape(view), labels.shape).ravel()
+                sums[:, axis] = np.bincount(flat, weights=weights, minlength=count + 1)[1:]
+            coordinate_sums.append(sums)
+
+        global_labels = np.where(labels > 0, labels.astype(np.int64) + n_global, 0)
+        if previous_plane is not None:
+            pairs.append(_seam_pairs(previous_plane, global_labels[0], connectivity))
+        previous_plane = global_labels[-1].copy()
+        n_global += count
+        del labels, global_labels, mask
+
+    # Union-Find über die Nahtpaare; Wurzel ist stets das kleinste globale Label,
+    # damit die Komponentenreihenfolge der von ndi.label entspricht.
+    parent = np.arange(n_global + 1, dtype=np.int64)
+    for a, b in (np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)):
+        root_a, root_b = _find(parent, int(a)), _find(parent, int(b))
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    # parent[i] <= i: Zeigersprünge bis zur Wurzel, vektorisiert
+    roots = parent
+    while True:
+        jumped = roots[roots]
+        if np.array_equal(jumped, roots):
+            break
+        roots = jumped
+    unique_roots, component = np.unique(roots[1:], return_inverse=True)
+    count = len(unique_roots)
+
+    all_sizes = np.concatenate(sizes) if sizes else np.empty(0, dtype=np.int64)
+    all_border = np.concatenate(border) if border else np.empty(0, dtype=bool)
+    result = {
+        "count": int(count),
+        "sizes": np.bincount(component, weights=all_sizes, minlength=count).astype(np.int64),
+        "border": np.bincount(component, weights=all_border, minlength=count) > 0,
+        "volume": volume,
+        "connectivity": connectivity,
+        "value": value,
+        "invert": invert,
+        "bounds": bounds,
+        "offsets": offsets,
+        "component": component,
+    }
+    if centroids:
+        all_sums = np.concatenate(coordinate_sums) if coordinate_sums else np.empty((0, 3))
+        totals = np.stack(
+            [np.bincount(component, weights=all_sums[:, axis], minlength=count) for axis in range(3)],
+            axis=1,
+        )
+        result["centroids"] = totals / np.maximum(result["sizes"], 1)[:, None]
+    return result
+
+
+def component_mask_slabs(result, selected):
+    """
+    Zweiter Durchlauf: liefert (lo, hi, bool-Scheibe) mit den Voxeln der
+    Komponenten, für die `selected` (bool je Komponente) gesetzt ist.
+    """
+    selected = np.asarray(selected, dtype=bool)
+    structure = structure_for_connectivity(result["connectivity"])
+    for (lo, hi), offset in zip(result["bounds"], result["offsets"]):
+        mask = _slab_mask(result["volume"], lo, hi, result["value"], result["invert"])
+        labels, count = ndi.label(mask, structure=structure)
+        lookup = np.zeros(count + 1, dtype=bool)
+        lookup[1:] = selected[result["component"][offset : offset + count]]
+        yield lo, hi, lookup[labels]
+
+
+def write_component_mask(result, selected, out, fill=True):
+    """Setzt `out[...] = fill` für alle Voxel der ausgewählten Komponenten; Rückgabe: Anzahl Voxel."""
+    changed = 0
+    for lo, hi, mask in component_mask_slabs(result, selected):
+        if mask.any():
+            out[lo:hi][mask] = fill
+            changed += int(mask.sum())
+    return changed
+
+
+def bounded_map(pool, fn, args, window, ordered=True):
+    """
+    Wie `pool.map(fn, *zip(*args))`, aber mit begrenztem Vorlauf: ein Argument-
+    tupel (z. B. eine Scheibe als Array) wird erst beim Einreichen aus `args`
+    erzeugt, und eingereichte plus fertige, noch nicht abgeholte Aufgaben sind
+    nie mehr als `window`. Liefert (Index, Ergebnis); mit `ordered` in
+    Eingabereihenfolge, sonst sobald fertig.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    args = iter(args)
+    window = max(1, int(window))
+    pending = {}
+    finished = {}
+    submitted = 0
+    next_index = 0
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) + len(finished) < window:
+            item = next(args, None)
+            if item is None:
+                exhausted = True
+                break
+            pending[pool.submit(fn, *item)] = submitted
+            submitted += 1
+        if ordered and next_index in finished:
+            yield next_index, finished.pop(next_index)
+            next_index += 1
+            continue
+        if not ordered and finished:
+            index = next(iter(finished))
+            yield index, finished.pop(index)
+            continue
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            finished[pending.pop(future)] = future.result()
+
+
+# ---------------------------------------------------------------------------
+# Lokale Topologie: Histogramm der 256 möglichen 2x2x2-Konfigurationen
+# ---------------------------------------------------------------------------
+# Bit einer Konfiguration: 4 * dx + 2 * dy + dz (Reihenfolge wie früher in 02c).
+
+# Die 13 Richtungen des 2x2x2-Blocks mit Crofton-Gewichten (Voronoi-Anteile
+# auf der Einheitssphäre, Ohser & Mücklich) und dem Anteil, mit dem ein
+# Voxelpaar dieser Richtung einem Block zugerechnet wird (Achsen: 4 Blöcke,
+# Flächendiagonalen: 2, Raumdiagonalen: 1).
+_CROFTON_DIRECTIONS = (
+    [((1, 0, 0), 0.04577789120476, 0.25), ((0, 1, 0), 0.04577789120476, 0.25), ((0, 0, 1), 0.04577789120476, 0.25)]
+    + [(d, 0.03698062787608, 0.5) for d in ((1, 1, 0), (1, -1, 0), (1, 0, 1), (1, 0, -1), (0, 1, 1), (0, 1, -1))]
+    + [(d, 0.03519563978232, 1.0) for d in ((1, 1, 1), (1, 1, -1), (1, -1, 1), (1, -1, -1))]
+)
+
+
+def _build_configuration_tables():
+    local6 = structure_for_connectivity(6)
+    local26 = structure_for_connectivity(26)
+    mixed = np.zeros(256, dtype=bool)
+    ambiguous = np.zeros(256, dtype=bool)
+    euler6 = np.zeros(256, dtype=np.int64)
+    euler26 = np.zeros(256, dtype=np.int64)
+    area = np.zeros(256, dtype=np.float64)
+    for code in range(256):
+        block = np.array([(code >> bit) & 1 for bit in range(8)], dtype=bool).reshape((2, 2, 2))
+        n = int(block.sum())
+        if 0 < n < 8:
+            mixed[code] = True
+            _, n6 = ndi.label(block, structure=local6)
+            _, n26 = ndi.label(block, structure=local26)
+            ambiguous[code] = n26 == 1 and n6 > 1
+
+        # Euler-Beiträge * 8 (ganzzahlig). 6er-Zusammenhang: Komplex mit den
+        # Voxelmittelpunkten als Ecken (Voxel in 8, Kanten in 4, Quadrate in 2,
+        # Würfel in 1 Block).
+        edges = int((block[0] & block[1]).sum() + (block[:, 0] & block[:, 1]).sum() + (block[:, :, 0] & block[:, :, 1]).sum())
+        squares = int(block.all(axis=(1, 2)).sum() + block.all(axis=(0, 2)).sum() + block.all(axis=(0, 1)).sum())
+        euler6[code] = n - 2 * edges + 4 * squares - 8 * int(n == 8)
+        # 26er-Zusammenhang: Vereinigung geschlossener Voxelwürfel, Beitrag der
+        # Gitterecke in der Blockmitte (6 Kanten, 12 Flächen, 8 Würfel an ihr).
+        lattice_edges = int(block.any(axis=(1, 2)).sum() + block.any(axis=(0, 2)).sum() + block.any(axis=(0, 1)).sum())
+        faces = int((block[0] | block[1]).sum() + (block[:, 0] | block[:, 1]).sum() + (block[:, :, 0] | block[:, :, 1]).sum())
+        euler26[code] = 8 * int(n > 0) - 4 * lattice_edges + 2 * faces - n
+
+        for direction, weight, share in _CROFTON_DIRECTIONS:
+            transitions = 0
+            for start in np.ndindex(2, 2, 2):
+                end = tuple(s + d for s, d in zip(start, direction))
+                if all(0 <= e <= 1 for e in end) and block[start] != block[end]:
+                    transitions += 1
+            area[code] += 4.0 * weight * share * transitions / np.linalg.norm(direction)
+    return {"mixed": mixed, "ambiguous": ambiguous, "euler6": euler6, "euler26": euler26, "area": area}
+
+
+CONFIGURATION_TABLES = _build_configuration_tables()
+
+
+def _configuration_chunk(planes, first, last):
+    """
+    Histogramm eines Plattenstücks. `planes` (k + 1, ny, nz) uint8 enthält die
+    Ebenen der k Blockreihen inklusive Nullrand in x; y/z werden hier gepolstert.
+    Zusätzlich zählt es die Blöcke, die den Nullrand berühren (`first`/`last`:
+    das Stück enthält die erste bzw. letzte Blockreihe in x).
+    """
+    planes = np.pad(planes, ((0, 0), (1, 1), (1, 1)))
+    k, ny, nz = planes.shape[0] - 1, planes.shape[1] - 1, planes.shape[2] - 1
+    codes = np.zeros((k, ny, nz), dtype=np.uint8)
+    bit = 0
+    for dx in (0, 1):
+        for dy in (0, 1):
+            for dz in (0, 1):
+                codes |= planes[dx : dx + k, dy : dy + ny, dz : dz + nz] << bit
+                bit += 1
+    histogram = np.bincount(codes.ravel(), minlength=256)
+    shell = np.zeros(256, dtype=np.int64)
+    shell_faces = [codes[:, 0], codes[:, -1], codes[:, 1:-1, 0], codes[:, 1:-1, -1]]
+    inner = codes[:, 1:-1, 1:-1]
+    if first:
+        shell_faces.append(inner[0])
+    if last:
+        shell_faces.append(inner[-1])
+    for face in shell_faces:
+        shell += np.bincount(face.ravel(), minlength=256)
+    return histogram, shell
+
+
+def configuration_histogram(volume, value=None, invert=False, slab_thickness=DEFAULT_SLAB_THICKNESS, workers=1):
+    """
+    Zählt in einem Durchlauf die 2x2x2-Konfigurationen von `volume == value`
+    (Auswahl wie bei `label_components`). Außerhalb des Volumens gilt alles als
+    nicht ausgewählt; gezählt wird über das um einen Voxel gepolsterte Volumen.
+
+    * histogram  int64[256] aller (nx+1)(ny+1)(nz+1) Blöcke — für Euler und Fläche
+    * interior   int64[256] nur der (nx-1)(ny-1)(nz-1) Blöcke im Volumen
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    nx = volume.shape[0]
+    slab_thickness = max(1, int(slab_thickness))
+    # Blockreihe i (i = -1 .. nx-1) liest die Ebenen i und i + 1.
+    rows = [(lo, min(lo + slab_thickness, nx)) for lo in range(-1, nx, slab_thickness)]
+
+    def chunk_planes(lo, hi):
+        planes = _slab_mask(volume, max(lo, 0), min(hi + 1, nx), value, invert).astype(np.uint8)
+        return np.pad(planes, ((int(lo < 0), int(hi + 1 > nx)), (0, 0), (0, 0)))
+
+    histogram = np.zeros(256, dtype=np.int64)
+    shell = np.zeros(256, dtype=np.int64)
+    if workers <= 1 or len(rows) == 1:
+        results = (_configuration_chunk(chunk_planes(lo, hi), lo < 0, hi == nx) for lo, hi in rows)
+        for chunk_histogram, chunk_shell in results:
+            histogram += chunk_histogram
+            shell += chunk_shell
+    else:
+        workers = min(workers, len(rows))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Je Prozess nur ein Plattenstück unterwegs, nicht das ganze Volumen als uint8.
+            results = bounded_map(
+                pool,
+                _configuration_chunk,
+                ((chunk_planes(lo, hi), lo < 0, hi == nx) for lo, hi in rows),
+                workers,
+                ordered=False,
+            )
+            for _, (chunk_histogram, chunk_shell) in results:
+                histogram += chunk_histogram
+                shell += chunk_shell
+    return {"histogram": histogram, "interior": histogram - shell}
+
+
+def local_topology_metrics(histograms):
+    """
+    Alle lokalen Kennzahlen aus den beiden Histogrammen von
+    `configuration_histogram`:
+
+    * mixed/material_ambiguous/pore_ambiguous  Blöcke im Volumen (wie bisher 02c)
+    * euler_6, euler_26   Eulerzahl der Auswahl bei 6er- bzw. 26er-Zusammenhang
+    * surface_area        Crofton-Schätzung der Oberfläche in Voxelflächen
+    """
+    tables = CONFIGURATION_TABLES
+    interior = histograms["interior"]
+    histogram = histograms["histogram"]
+    complement = np.arange(256) ^ 255
+    return {
+        "mixed_2x2x2_blocks": int(interior[tables["mixed"]].sum()),
+        "material_ambiguous_2x2x2_blocks": int(interior[tables["ambiguous"]].sum()),
+        "pore_ambiguous_2x2x2_blocks": int(interior[tables["ambiguous"][complement]].sum()),
+        "euler_6": int(histogram @ tables["euler6"]) // 8,
+        "euler_26": int(histogram @ tables["euler26"]) // 8,
+        "surface_area": float(histogram @ tables["area"]),
+    }
@@ -110,6 +110,73 @@ def mirror_and_merge(original_mesh, mirror_direction = 0, merging_tolerance = 0.
     return merged_mesh
 
 
+def mirror_and_merge_repeated(original_mesh, mirror_directions=(0,), repetitions=2, merging_tolerance=0.0, mirror_plane_values=0.0):
+    """
+    Mirrors a tetra mesh repeatedly along one or more axes in one pass and welds all copies at once.
+
+    Parameters:
+    original_mesh (meshio.Mesh): mesh with a tetra cell block.
+    mirror_directions (sequence of int): axes to mirror along (0 = x, 1 = y, 2 = z).
+    repetitions (int or sequence of int): copies along each axis including the original (2 = mirror once).
+    merging_tolerance (float): points of different copies closer than this at a mirror plane are merged.
+    mirror_plane_values (float or sequence of float): coordinate of the first mirror plane per axis;
+        copies are appended towards the side of the plane that is away from the mesh.
+
+    Returns:
+    meshio.Mesh: the welded mesh; copies with an odd number of mirrorings get reoriented cells.
+    """
+    from itertools import product
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    points, cells = get_points_and_cells_from_mesh(original_mesh)
+    points = np.asarray(points, dtype=float)
+    mirror_directions = list(np.atleast_1d(mirror_directions))
+    repetitions = list(np.broadcast_to(repetitions, len(mirror_directions)))
+    plane_values = list(np.broadcast_to(mirror_plane_values, len(mirror_directions)).astype(float))
+    lengths = [float(np.ptp(points[:, d])) for d in mirror_directions]
+    # copies go away from the mesh: below the plane if the mesh lies above it and vice versa
+    signs = [-1.0 if np.mean(points[:, d]) >= p else 1.0 for d, p in zip(mirror_directions, plane_values)]
+
+    # 1. all copies (copy k along an axis: shifted by k*L for even k, mirrored and shifted by (k-1)*L for odd k)
+    copies = list(product(*(range(n) for n in repetitions)))
+    all_points = []
+    all_cells = []
+    for copy_number, ks in enumerate(copies):
+        moved = points.copy()
+        for d, p, sign, length, k in zip(mirror_directions, plane_values, signs, lengths, ks):
+            if k % 2:
+                moved[:, d] = 2.0 * p - moved[:, d] + sign * (k - 1) * length
+            else:
+                moved[:, d] += sign * k * length
+        shifted = cells + copy_number * len(points)
+        all_cells.append(shifted[:, [1, 0, 2, 3]] if sum(ks) % 2 else shifted)
+        all_points.append(moved)
+    all_points = np.vstack(all_points)
+    all_cells = np.vstack(all_cells)
+    copy_of_point = np.repeat(np.arange(len(copies)), len(points))
+
+    # 2. single weld: one KD-tree over all points on a mirror plane, pairs of different copies are merged
+    on_plane = np.zeros(len(all_points), dtype=bool)
+    for d, p, sign, length, n in zip(mirror_directions, plane_values, signs, lengths, repetitions):
+        for k in range(n - 1):
+            on_plane |= np.abs(all_points[:, d] - (p + sign * k * length)) <= merging_tolerance
+    candidates = np.flatnonzero(on_plane)
+    target = np.arange(len(all_points))
+    if len(candidates) > 1:
+        pairs = cKDTree(all_points[candidates]).query_pairs(merging_tolerance, output_type="ndarray")
+        pairs = pairs[copy_of_point[candidates[pairs[:, 0]]] != copy_of_point[candidates[pairs[:, 1]]]]
+        graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(candidates), len(candidates)))
+        _, labels = connected_components(graph, directed=False)
+        lowest = np.full(labels.max() + 1, len(all_points))
+        np.minimum.at(lowest, labels, candidates)
+        target[candidates] = lowest[labels]
+
+    kept = target == np.arange(len(all_points))
+    new_index = np.cumsum(kept) - 1
+    return meshio.Mesh(all_points[kept], {"tetra": new_index[target][all_cells]})
+
+
 def mirror_mesh(mesh,mirror_direction = 0,mirror_plane_value=0.0):
     mirrored_mesh = copy_mesh(mesh)
     if mirror_direction == 0: # x
@@ -122,8 +189,7 @@ def mirror_mesh(mesh,mirror_direction = 0,mirror_plane_value=0.0):
     mirrored_mesh.points[:,mirror_direction] += 2.0*mirror_plane_value
     
     points, cells = get_points_and_cells_from_mesh(mirrored_mesh)
-    for j in range(len(cells)):
-            cells[j] = np.flip(cells[j])
+    cells[:] = cells[:, ::-1].copy()
     return mirrored_mesh
 
 
@@ -162,67 +228,49 @@ def merge_mesh(mesh1, mesh2, merge_direction = 0, merging_tolerance = 0.0, merge
     return meshio.Mesh(merged_vertices, {"tetra": merged_cells})
 
 def apply_offset_to_cells(cells, offset,indices_of_removed_points):
-        adjusted_cells = cells.copy()
-        for j in range(len(adjusted_cells)):
-            # adjusted_cells[j] = np.flip(adjusted_cells[j]) # reverse the order in each mirrored cell -> so ordering is correct for fem?
-            for i, point in enumerate(adjusted_cells[j]):
-                if point in indices_of_removed_points:
-                    continue
-                else:
-                    adjusted_cells[j][i] = point + int(offset[point])
-        return np.array(adjusted_cells)
+        cells = np.asarray(cells)
+        # removed points keep their index (-> point of the first mesh), all others are shifted
+        removed = np.isin(cells, np.asarray(indices_of_removed_points, dtype=np.int64))
+        return np.where(removed, cells, cells + offset[cells].astype(np.int64))
     
     
 def apply_offset_to_cells_and_reverse_point_ordering(cells, offset,indices_of_duplicate_points):
-        adjusted_cells = cells.copy()
-        for j in range(len(adjusted_cells)):
-            adjusted_cells[j] = np.flip(adjusted_cells[j]) # reverse the order in each mirrored cell -> so ordering is correct for fem?
-            for i, point in enumerate(adjusted_cells[j]):
-                if point in indices_of_duplicate_points:
-                    continue
-                else:
-                    adjusted_cells[j][i] = point + int(offset[point])
-        return np.array(adjusted_cells)
+        # reverse the order in each mirrored cell -> so ordering is correct for fem?
+        return apply_offset_to_cells(np.asarray(cells)[:, ::-1], offset, indices_of_duplicate_points)
+
+def _removed_mask(number_of_vertices, indices_of_vertices_to_remove):
+    removed = np.zeros(number_of_vertices, dtype=bool)
+    indices = np.asarray(indices_of_vertices_to_remove, dtype=np.int64).reshape(-1)
+    removed[indices[indices < number_of_vertices]] = True
+    return removed
 
 def remove_vertices_and_compute_offset_mirror(number_of_vertices_orig_mesh, vertices, indices_of_vertices_to_remove):
-    vertices_filtered = []
-    # number_of_vertices = len(vertices)
-    offset = np.full(number_of_vertices_orig_mesh,number_of_vertices_orig_mesh,dtype=np.uint)
-    
-    for i, pt in enumerate(vertices):
-        if i not in indices_of_vertices_to_remove:
-            vertices_filtered.append(pt)
-        else:
-            offset[i+1:] -= 1
-    return vertices_filtered,offset
+    vertices = np.asarray(vertices)
+    removed = _removed_mask(len(vertices), indices_of_vertices_to_remove)
+    # offset[i] = n_orig - (number of removed vertices before i)
+    removed_before = np.searchsorted(np.flatnonzero(removed), np.arange(number_of_vertices_orig_mesh), side="left")
+    offset = (number_of_vertices_orig_mesh - removed_before).astype(np.uint)
+    return vertices[~removed],offset
 
 def remove_vertices_and_compute_offset_2( vertices, indices_of_vertices_to_remove):
-    vertices_filtered = []
-    number_of_vertices = len(vertices)
-    offset = np.full(number_of_vertices,0,dtype=np.int64)
-    
-    for i, pt in enumerate(vertices):
-        if i not in indices_of_vertices_to_remove:
-            vertices_filtered.append(pt)
-        else:
-            offset[i+1:] -= 1
-    return vertices_filtered,offset
+    vertices = np.asarray(vertices)
+    removed = _removed_mask(len(vertices), indices_of_vertices_to_remove)
+    offset = -(np.cumsum(removed) - removed).astype(np.int64)
+    return vertices[~removed],offset
 
 def filter_duplicate_points_at_mirror_plane(original_mesh, tolerance, indices_of_duplicate_points, mirror_plane_direction: int = 0, mirror_plane_value: float = 0.0):
-    filtered_indices = [i for i in indices_of_duplicate_points if np.isclose(original_mesh.points[i, mirror_plane_direction], mirror_plane_value, atol=tolerance)]
-    filtered_indices_of_duplicate_points = np.array(filtered_indices)
-    indices_of_duplicate_points = filtered_indices_of_duplicate_points
-    return indices_of_duplicate_points
+    indices_of_duplicate_points = np.asarray(indices_of_duplicate_points, dtype=np.int64).reshape(-1)
+    on_plane = np.isclose(original_mesh.points[indices_of_duplicate_points, mirror_plane_direction], mirror_plane_value, atol=tolerance)
+    return indices_of_duplicate_points[on_plane]
 
 def find_indices_of_duplicate_points(original_mesh, mirrored_vertices, tolerance):
     tree = cKDTree(original_mesh.points)
     # Find duplicates within the specified tolerance
     distances, indices = tree.query(np.concatenate((original_mesh.points,mirrored_vertices)), distance_upper_bound=2.0*tolerance)
     
-    # Dictionary to store the pairs (id of removed point in mirrored mesh, id of identical point in original mesh)
-    duplicate_map = {i: idx for i, idx in enumerate(indices) if distances[i] <= tolerance and i != idx}
-
-    indices_of_duplicate_points = np.array(list(duplicate_map.values()))
+    # ids of points in the original mesh that have a (different) point within the tolerance
+    is_duplicate = (distances <= tolerance) & (np.arange(len(indices)) != indices)
+    indices_of_duplicate_points = indices[is_duplicate]
     return tolerance,indices_of_duplicate_points
 
 
@@ -8,6 +8,7 @@ from _pygalmesh import (
     DomainBase,
     Ellipsoid,
     Extrude,
+    GridSizingField,
     HalfSpace,
     Intersection,
     Polygon2D,
@@ -27,6 +28,7 @@ from .main import (
     generate_2d,
     generate_from_array,
     generate_from_inr,
+    generate_from_sdf_array,
     generate_mesh,
     generate_periodic_mesh,
     generate_surface_mesh,
@@ -61,6 +63,8 @@ __all__ = [
     "Polygon2D",
     "RingExtrude",
     #
+    "GridSizingField",
+    #
     "generate_mesh",
     "generate_2d",
     "generate_periodic_mesh",
@@ -68,6 +72,7 @@ __all__ = [
     "generate_volume_mesh_from_surface_mesh",
     "generate_from_array",
     "generate_from_inr",
+    "generate_from_sdf_array",
     "remesh_surface",
     "save_inr",
 ]
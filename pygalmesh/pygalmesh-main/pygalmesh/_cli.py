@@ -69,6 +69,7 @@ def inr(args):
         max_circumradius_edge_ratio=args.max_circumradius_edge_ratio,
         max_cell_circumradius=args.max_cell_circumradius,
         verbose=not args.quiet,
+        n_threads=args.n_threads,
     )
     meshio.write(args.outfile, mesh)
 
@@ -158,6 +159,13 @@ def _cli_inr(parser):
         help="maximum cell circumradius (default: 0.0)",
     )
 
+    parser.add_argument(
+        "--n-threads",
+        type=int,
+        default=1,
+        help="number of threads, 0 for all cores; needs TBB (default: 1)",
+    )
+
     parser.add_argument(
         "--quiet",
         "-q",
@@ -245,6 +253,7 @@ def volume_from_surface(args):
         max_cell_circumradius=args.max_cell_circumradius,
         reorient=args.reorient,
         verbose=not args.quiet,
+        n_threads=args.n_threads,
     )
     meshio.write(args.outfile, mesh)
 
@@ -342,6 +351,13 @@ def _cli_volume_from_surface(parser):
         help="automatically fix face orientation (default: False)",
     )
 
+    parser.add_argument(
+        "--n-threads",
+        type=int,
+        default=1,
+        help="number of threads, 0 for all cores; needs TBB (default: 1)",
+    )
+
     parser.add_argument(
         "--quiet",
         "-q",
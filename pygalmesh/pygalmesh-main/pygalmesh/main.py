@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import math
+import numbers
 import os
 import tempfile
 from typing import Callable
@@ -8,11 +9,15 @@ from typing import Callable
 import meshio
 import numpy as np
 from _pygalmesh import (
+    GridSizingField,
     SizingFieldBase,
     _generate_2d,
+    _generate_from_array,
+    _generate_from_array_with_subdomain_sizing,
     _generate_from_inr,
     _generate_from_inr_with_subdomain_sizing,
     _generate_from_off,
+    _generate_from_sdf_array,
     _generate_mesh,
     _generate_periodic_mesh,
     _generate_surface_mesh,
@@ -29,6 +34,47 @@ class Wrapper(SizingFieldBase):
         return self.f(x)
 
 
+def _select(obj, n_threads: int = 1):
+    # split a sizing parameter into a constant and a field; plain ints and numpy
+    # scalars are constants, too
+    if isinstance(obj, numbers.Real):
+        return float(obj), None
+    # never calls back into Python, so fine for parallel meshing
+    if isinstance(obj, GridSizingField):
+        return -1.0, obj
+    if n_threads != 1:
+        raise ValueError(
+            "Parallel meshing (n_threads != 1) only supports constant sizes and "
+            "GridSizingField, not Python sizing functions."
+        )
+    if isinstance(obj, SizingFieldBase):
+        return -1.0, obj
+    assert callable(obj)
+    return -1.0, Wrapper(obj)
+
+
+def _transpose_field(field):
+    # a sizing field for the mesh with the x and z axes swapped, cf. _as_image_array()
+    if field is None:
+        return None
+    if isinstance(field, GridSizingField):
+        return field.transpose()
+    return Wrapper(lambda x: field.eval(x[::-1]))
+
+
+def _mesh_from_arrays(points, tetra, tetra_ref, triangles, triangle_ref):
+    # same cells and medit:ref labels as reading CGAL's medit output with meshio
+    # (see mesh_arrays.hpp); the medit vertex references are not reproduced
+    cells = []
+    refs = []
+    if len(triangles) > 0:
+        cells.append(("triangle", triangles))
+        refs.append(triangle_ref)
+    cells.append(("tetra", tetra))
+    refs.append(tetra_ref)
+    return meshio.Mesh(points, cells, cell_data={"medit:ref": refs})
+
+
 def generate_mesh(
     domain,
     extra_feature_edges: list | None = None,
@@ -47,6 +93,7 @@ def generate_mesh(
     exude_sliver_bound: float = 0.0,
     verbose: bool = True,
     seed: int = 0,
+    facets: bool = True,
 ):
     """
     From <https://doc.cgal.org/latest/Mesh_3/classCGAL_1_1Mesh__criteria__3.html>:
@@ -69,17 +116,16 @@ def generate_mesh(
     max_cell_circumradius:
         a scalar field (resp. a constant) describing a space varying (resp. a uniform)
         upper-bound for the circumradii of the mesh tetrahedra.
-    """
-    extra_feature_edges = [] if extra_feature_edges is None else extra_feature_edges
 
-    fh, outfile = tempfile.mkstemp(suffix=".mesh")
-    os.close(fh)
+    Scalar fields are Python functions of a point, or GridSizingField(values, origin,
+    spacing) for a field sampled on a regular grid and interpolated in C++.
 
-    def _select(obj):
-        if isinstance(obj, float):
-            return obj, None
-        assert callable(obj)
-        return -1.0, Wrapper(obj)
+    The mesh is handed over from CGAL in memory. As in CGAL's medit output, the
+    subdomain labels are renumbered 1, 2, ... and every boundary/interface facet
+    is listed twice, with the smaller and the larger adjacent label. Set
+    `facets=False` to skip these triangles if only the tetrahedra are needed.
+    """
+    extra_feature_edges = [] if extra_feature_edges is None else extra_feature_edges
 
     (
         max_edge_size_at_feature_edges_value,
@@ -104,9 +150,8 @@ def generate_mesh(
     #         "No feature edges. The max_edge_size_at_feature_edges argument has no effect."
     #     )
 
-    _generate_mesh(
+    arrays = _generate_mesh(
         domain,
-        outfile,
         extra_feature_edges=extra_feature_edges,
         bounding_sphere_radius=bounding_sphere_radius,
         lloyd=lloyd,
@@ -127,10 +172,10 @@ def generate_mesh(
         exude_sliver_bound=exude_sliver_bound,
         verbose=verbose,
         seed=seed,
+        facets=facets,
     )
 
-    mesh = meshio.read(outfile)
-    os.remove(outfile)
+    mesh = _mesh_from_arrays(*arrays)
     return mesh
 
 
@@ -244,48 +289,61 @@ def generate_volume_mesh_from_surface_mesh(
     exude: bool = True,
     max_edge_size_at_feature_edges: float = 0.0,
     min_facet_angle: float = 0.0,
-    max_radius_surface_delaunay_ball: float = 0.0,
-    max_facet_distance: float = 0.0,
+    max_radius_surface_delaunay_ball: float | SizingFieldBase = 0.0,
+    max_facet_distance: float | SizingFieldBase = 0.0,
     max_circumradius_edge_ratio: float = 0.0,
-    max_cell_circumradius: float = 0.0,
+    max_cell_circumradius: float | SizingFieldBase = 0.0,
     exude_time_limit: float = 0.0,
     exude_sliver_bound: float = 0.0,
     verbose: bool = True,
     reorient: bool = False,
     seed: int = 0,
+    facets: bool = True,
+    n_threads: int = 1,
 ):
+    (
+        max_radius_surface_delaunay_ball_value,
+        max_radius_surface_delaunay_ball_field,
+    ) = _select(max_radius_surface_delaunay_ball, n_threads)
+    max_facet_distance_value, max_facet_distance_field = _select(
+        max_facet_distance, n_threads
+    )
+    max_cell_circumradius_value, max_cell_circumradius_field = _select(
+        max_cell_circumradius, n_threads
+    )
+
     mesh = meshio.read(filename)
 
     fh, off_file = tempfile.mkstemp(suffix=".off")
     os.close(fh)
     meshio.write(off_file, mesh)
 
-    fh, outfile = tempfile.mkstemp(suffix=".mesh")
-    os.close(fh)
-
-    _generate_from_off(
+    arrays = _generate_from_off(
         off_file,
-        outfile,
         lloyd=lloyd,
         odt=odt,
         perturb=perturb,
         exude=exude,
         max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
         min_facet_angle=min_facet_angle,
-        max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
-        max_facet_distance=max_facet_distance,
+        max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball_value,
+        max_radius_surface_delaunay_ball_field=max_radius_surface_delaunay_ball_field,
+        max_facet_distance=max_facet_distance_value,
+        max_facet_distance_field=max_facet_distance_field,
         max_circumradius_edge_ratio=max_circumradius_edge_ratio,
-        max_cell_circumradius=max_cell_circumradius,
+        max_cell_circumradius=max_cell_circumradius_value,
+        max_cell_circumradius_field=max_cell_circumradius_field,
         exude_time_limit=exude_time_limit,
         exude_sliver_bound=exude_sliver_bound,
         verbose=verbose,
         reorient=reorient,
         seed=seed,
+        facets=facets,
+        n_threads=n_threads,
     )
 
-    mesh = meshio.read(outfile)
+    mesh = _mesh_from_arrays(*arrays)
     os.remove(off_file)
-    os.remove(outfile)
     return mesh
 
 
@@ -297,68 +355,83 @@ def generate_from_inr(
     exude: bool = True,
     max_edge_size_at_feature_edges: float = 0.0,
     min_facet_angle: float = 0.0,
-    max_radius_surface_delaunay_ball: float = 0.0,
-    max_facet_distance: float = 0.0,
+    max_radius_surface_delaunay_ball: float | SizingFieldBase = 0.0,
+    max_facet_distance: float | SizingFieldBase = 0.0,
     max_circumradius_edge_ratio: float = 0.0,
-    max_cell_circumradius: float | dict[int | str, float] = 0.0,
+    max_cell_circumradius: float | dict[int | str, float] | SizingFieldBase = 0.0,
     exude_time_limit: float = 0.0,
     exude_sliver_bound: float = 0.0,
     verbose: bool = True,
     seed: int = 0,
+    facets: bool = True,
+    n_threads: int = 1,
 ):
-    fh, outfile = tempfile.mkstemp(suffix=".mesh")
-    os.close(fh)
+    (
+        max_radius_surface_delaunay_ball_value,
+        max_radius_surface_delaunay_ball_field,
+    ) = _select(max_radius_surface_delaunay_ball, n_threads)
+    max_facet_distance_value, max_facet_distance_field = _select(
+        max_facet_distance, n_threads
+    )
+
+    if isinstance(max_cell_circumradius, dict):
+        if "default" in max_cell_circumradius.keys():
+            default_max_cell_circumradius = max_cell_circumradius.pop("default")
+        else:
+            default_max_cell_circumradius = 0.0
+
+        max_cell_circumradiuss = list(max_cell_circumradius.values())
+        subdomain_labels = list(max_cell_circumradius.keys())
 
-    if isinstance(max_cell_circumradius, float):
-        _generate_from_inr(
+        arrays = _generate_from_inr_with_subdomain_sizing(
             inr_filename,
-            outfile,
+            default_max_cell_circumradius,
+            max_cell_circumradiuss,
+            subdomain_labels,
             lloyd=lloyd,
             odt=odt,
             perturb=perturb,
             exude=exude,
             max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
             min_facet_angle=min_facet_angle,
-            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
-            max_facet_distance=max_facet_distance,
+            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball_value,
+            max_radius_surface_delaunay_ball_field=max_radius_surface_delaunay_ball_field,
+            max_facet_distance=max_facet_distance_value,
+            max_facet_distance_field=max_facet_distance_field,
             max_circumradius_edge_ratio=max_circumradius_edge_ratio,
-            max_cell_circumradius=max_cell_circumradius,
-            exude_time_limit=exude_time_limit,
-            exude_sliver_bound=exude_sliver_bound,
             verbose=verbose,
             seed=seed,
+            facets=facets,
+            n_threads=n_threads,
         )
     else:
-        assert isinstance(max_cell_circumradius, dict)
-        if "default" in max_cell_circumradius.keys():
-            default_max_cell_circumradius = max_cell_circumradius.pop("default")
-        else:
-            default_max_cell_circumradius = 0.0
-
-        max_cell_circumradiuss = list(max_cell_circumradius.values())
-        subdomain_labels = list(max_cell_circumradius.keys())
-
-        _generate_from_inr_with_subdomain_sizing(
+        max_cell_circumradius_value, max_cell_circumradius_field = _select(
+            max_cell_circumradius, n_threads
+        )
+        arrays = _generate_from_inr(
             inr_filename,
-            outfile,
-            default_max_cell_circumradius,
-            max_cell_circumradiuss,
-            subdomain_labels,
             lloyd=lloyd,
             odt=odt,
             perturb=perturb,
             exude=exude,
             max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
             min_facet_angle=min_facet_angle,
-            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball,
-            max_facet_distance=max_facet_distance,
+            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball_value,
+            max_radius_surface_delaunay_ball_field=max_radius_surface_delaunay_ball_field,
+            max_facet_distance=max_facet_distance_value,
+            max_facet_distance_field=max_facet_distance_field,
             max_circumradius_edge_ratio=max_circumradius_edge_ratio,
+            max_cell_circumradius=max_cell_circumradius_value,
+            max_cell_circumradius_field=max_cell_circumradius_field,
+            exude_time_limit=exude_time_limit,
+            exude_sliver_bound=exude_sliver_bound,
             verbose=verbose,
             seed=seed,
+            facets=facets,
+            n_threads=n_threads,
         )
 
-    mesh = meshio.read(outfile)
-    os.remove(outfile)
+    mesh = _mesh_from_arrays(*arrays)
     return mesh
 
 
@@ -426,9 +499,9 @@ def save_inr(vol, voxel_size: tuple[float, float, float], fname: str):
             f"TYPE={btype}",
             f"PIXSIZE={bitlen} bits",
             "CPU=decm",
-            f"VX={voxel_size[0]:f}",
-            f"VY={voxel_size[1]:f}",
-            f"VZ={voxel_size[2]:f}",
+            f"VX={float(voxel_size[0])!r}",
+            f"VY={float(voxel_size[1])!r}",
+            f"VZ={float(voxel_size[2])!r}",
         ]
     )
     header += "\n"
@@ -439,6 +512,29 @@ def save_inr(vol, voxel_size: tuple[float, float, float], fname: str):
     fid.write(vol.tobytes(order="F"))
 
 
+def _as_image_array(vol, voxel_size: tuple[float, float, float]):
+    """
+    CGAL images store x fastest, i.e., in Fortran order. C-contiguous arrays (and
+    memmaps) are handed over transposed, which is a view, not a copy; the x and z axes
+    then have to be swapped back in the resulting mesh.
+    """
+    voxel_size = tuple(float(h) for h in voxel_size)
+    if vol.flags.f_contiguous:
+        return vol, voxel_size, False
+    if vol.flags.c_contiguous:
+        return vol.T, voxel_size[::-1], True
+    return np.asfortranarray(vol), voxel_size, False
+
+
+def _swap_xz(mesh):
+    # mirroring at the x=z plane flips the orientation of all cells
+    mesh.points = np.ascontiguousarray(mesh.points[:, ::-1])
+    for cell_block in mesh.cells:
+        if cell_block.data.shape[1] >= 3:
+            cell_block.data[:, [1, 2]] = cell_block.data[:, [2, 1]]
+    return mesh
+
+
 def generate_from_array(
     vol,
     voxel_size: tuple[float, float, float],
@@ -448,31 +544,178 @@ def generate_from_array(
     exude: bool = True,
     max_edge_size_at_feature_edges: float = 0.0,
     min_facet_angle: float = 0.0,
-    max_radius_surface_delaunay_ball: float = 0.0,
-    max_cell_circumradius: float | dict[int | str, float] = 0.0,
-    max_facet_distance: float = 0.0,
+    max_radius_surface_delaunay_ball: float | SizingFieldBase = 0.0,
+    max_cell_circumradius: float | dict[int | str, float] | SizingFieldBase = 0.0,
+    max_facet_distance: float | SizingFieldBase = 0.0,
     max_circumradius_edge_ratio: float = 0.0,
+    exude_time_limit: float = 0.0,
+    exude_sliver_bound: float = 0.0,
     verbose: bool = True,
     seed: int = 0,
+    facets: bool = True,
+    n_threads: int = 1,
 ):
+    """
+    Mesh a labeled 3D image given as a numpy array (or memmap) of shape (nx, ny, nz).
+    The array buffer is handed to CGAL directly, without a temporary INR file and
+    without a copy as long as the array is C- or Fortran-contiguous.
+
+    The facet and cell sizes can vary in space, given as a
+    `GridSizingField(values, origin, spacing)` in the coordinates of the mesh; the
+    grid is interpolated in C++. A dict `max_cell_circumradius` sets sizes per
+    subdomain label instead.
+
+    With `n_threads != 1`, CGAL refines the mesh in parallel (`0` uses all cores). This
+    requires pygalmesh to be built with TBB, see `_pygalmesh._WITH_TBB`; otherwise
+    meshing silently stays sequential. Parallel results are not reproducible from
+    `seed` alone.
+    """
     assert vol.dtype in ["uint8", "uint16"]
-    fh, inr_filename = tempfile.mkstemp(suffix=".inr")
-    os.close(fh)
-    save_inr(vol, voxel_size, inr_filename)
-    mesh = generate_from_inr(
-        inr_filename,
-        lloyd,
-        odt,
-        perturb,
-        exude,
-        max_edge_size_at_feature_edges,
-        min_facet_angle,
-        max_radius_surface_delaunay_ball,
-        max_facet_distance,
-        max_circumradius_edge_ratio,
-        max_cell_circumradius,
-        verbose,
-        seed,
+    vol, voxel_size, swapped = _as_image_array(vol, voxel_size)
+
+    (
+        max_radius_surface_delaunay_ball_value,
+        max_radius_surface_delaunay_ball_field,
+    ) = _select(max_radius_surface_delaunay_ball, n_threads)
+    max_facet_distance_value, max_facet_distance_field = _select(
+        max_facet_distance, n_threads
     )
-    os.remove(inr_filename)
+    if swapped:
+        max_radius_surface_delaunay_ball_field = _transpose_field(
+            max_radius_surface_delaunay_ball_field
+        )
+        max_facet_distance_field = _transpose_field(max_facet_distance_field)
+
+    if isinstance(max_cell_circumradius, dict):
+        max_cell_circumradius = dict(max_cell_circumradius)
+        default_max_cell_circumradius = max_cell_circumradius.pop("default", 0.0)
+
+        arrays = _generate_from_array_with_subdomain_sizing(
+            vol,
+            voxel_size,
+            default_max_cell_circumradius,
+            list(max_cell_circumradius.values()),
+            list(max_cell_circumradius.keys()),
+            lloyd=lloyd,
+            odt=odt,
+            perturb=perturb,
+            exude=exude,
+            max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
+            min_facet_angle=min_facet_angle,
+            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball_value,
+            max_radius_surface_delaunay_ball_field=max_radius_surface_delaunay_ball_field,
+            max_facet_distance=max_facet_distance_value,
+            max_facet_distance_field=max_facet_distance_field,
+            max_circumradius_edge_ratio=max_circumradius_edge_ratio,
+            exude_time_limit=exude_time_limit,
+            exude_sliver_bound=exude_sliver_bound,
+            verbose=verbose,
+            seed=seed,
+            facets=facets,
+            n_threads=n_threads,
+        )
+    else:
+        max_cell_circumradius_value, max_cell_circumradius_field = _select(
+            max_cell_circumradius, n_threads
+        )
+        if swapped:
+            max_cell_circumradius_field = _transpose_field(max_cell_circumradius_field)
+
+        arrays = _generate_from_array(
+            vol,
+            voxel_size,
+            lloyd=lloyd,
+            odt=odt,
+            perturb=perturb,
+            exude=exude,
+            max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
+            min_facet_angle=min_facet_angle,
+            max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball_value,
+            max_radius_surface_delaunay_ball_field=max_radius_surface_delaunay_ball_field,
+            max_facet_distance=max_facet_distance_value,
+            max_facet_distance_field=max_facet_distance_field,
+            max_circumradius_edge_ratio=max_circumradius_edge_ratio,
+            max_cell_circumradius=max_cell_circumradius_value,
+            max_cell_circumradius_field=max_cell_circumradius_field,
+            exude_time_limit=exude_time_limit,
+            exude_sliver_bound=exude_sliver_bound,
+            verbose=verbose,
+            seed=seed,
+            facets=facets,
+            n_threads=n_threads,
+        )
+
+    mesh = _mesh_from_arrays(*arrays)
+    if swapped:
+        _swap_xz(mesh)
     return mesh
+
+
+def generate_from_sdf_array(
+    sdf,
+    voxel_size: tuple[float, float, float],
+    iso_value: float = 0.0,
+    lloyd: bool = False,
+    odt: bool = False,
+    perturb: bool = True,
+    exude: bool = True,
+    max_edge_size_at_feature_edges: float = 0.0,
+    min_facet_angle: float = 0.0,
+    max_radius_surface_delaunay_ball: float | SizingFieldBase = 0.0,
+    max_cell_circumradius: float | SizingFieldBase = 0.0,
+    max_facet_distance: float | SizingFieldBase = 0.0,
+    max_circumradius_edge_ratio: float = 0.0,
+    exude_time_limit: float = 0.0,
+    exude_sliver_bound: float = 0.0,
+    verbose: bool = True,
+    seed: int = 0,
+    facets: bool = True,
+    n_threads: int = 1,
+):
+    """
+    Mesh the region `sdf < iso_value` of a (signed distance) function sampled on a grid,
+    given as a float32 or float64 numpy array of shape (nx, ny, nz) with the sample
+    (i, j, k) at (i, j, k) * voxel_size. CGAL evaluates the trilinear interpolant of the
+    samples directly, so there is no need for an intermediate surface mesh. The array
+    is read in place, whatever its memory layout.
+    """
+    sdf = np.asarray(sdf)
+    if sdf.dtype not in [np.float32, np.float64]:
+        sdf = sdf.astype(np.float32)
+
+    (
+        max_radius_surface_delaunay_ball_value,
+        max_radius_surface_delaunay_ball_field,
+    ) = _select(max_radius_surface_delaunay_ball, n_threads)
+    max_facet_distance_value, max_facet_distance_field = _select(
+        max_facet_distance, n_threads
+    )
+    max_cell_circumradius_value, max_cell_circumradius_field = _select(
+        max_cell_circumradius, n_threads
+    )
+
+    arrays = _generate_from_sdf_array(
+        sdf,
+        tuple(float(h) for h in voxel_size),
+        iso_value=iso_value,
+        lloyd=lloyd,
+        odt=odt,
+        perturb=perturb,
+        exude=exude,
+        max_edge_size_at_feature_edges=max_edge_size_at_feature_edges,
+        min_facet_angle=min_facet_angle,
+        max_radius_surface_delaunay_ball=max_radius_surface_delaunay_ball_value,
+        max_radius_surface_delaunay_ball_field=max_radius_surface_delaunay_ball_field,
+        max_facet_distance=max_facet_distance_value,
+        max_facet_distance_field=max_facet_distance_field,
+        max_circumradius_edge_ratio=max_circumradius_edge_ratio,
+        max_cell_circumradius=max_cell_circumradius_value,
+        max_cell_circumradius_field=max_cell_circumradius_field,
+        exude_time_limit=exude_time_limit,
+        exude_sliver_bound=exude_sliver_bound,
+        verbose=verbose,
+        seed=seed,
+        facets=facets,
+        n_threads=n_threads,
+    )
+    return _mesh_from_arrays(*arrays)
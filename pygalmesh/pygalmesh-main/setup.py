@@ -3,6 +3,23 @@ import os
 from pybind11.setup_helpers import Pybind11Extension, build_ext
 from setuptools import setup
 
+# Parallel mesh refinement (n_threads != 1) needs TBB. It is used if its headers are
+# found; set PYGALMESH_WITH_TBB=0 or 1 to override.
+tbb_include_dirs = [
+    os.environ.get("TBB_INCLUDE_DIR", "/usr/include"),
+    # macos/brew:
+    "/usr/local/include",
+    "/opt/homebrew/include",
+]
+with_tbb = os.environ.get("PYGALMESH_WITH_TBB")
+if with_tbb is None:
+    with_tbb = any(
+        os.path.isfile(os.path.join(d, "tbb", "global_control.h"))
+        for d in tbb_include_dirs
+    )
+else:
+    with_tbb = with_tbb not in ["", "0"]
+
 # https://github.com/pybind/python_example/
 ext_modules = [
     Pybind11Extension(
@@ -27,7 +44,8 @@ ext_modules = [
             "/usr/local/include/eigen3",
         ],
         # no CGAL libraries necessary from CGAL 5.0 onwards
-        libraries=["gmp", "mpfr"],
+        libraries=["gmp", "mpfr"] + (["tbb"] if with_tbb else []),
+        define_macros=[("CGAL_LINKED_WITH_TBB", None)] if with_tbb else [],
     )
 ]
 
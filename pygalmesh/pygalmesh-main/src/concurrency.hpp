@@ -0,0 +1,50 @@
+#ifndef CONCURRENCY_HPP
+#define CONCURRENCY_HPP
+
+#include <memory>
+
+#include <CGAL/tags.h>
+
+#ifdef CGAL_LINKED_WITH_TBB
+  #include <tbb/global_control.h>
+#endif
+
+namespace pygalmesh {
+
+inline
+bool
+with_tbb()
+{
+#ifdef CGAL_LINKED_WITH_TBB
+  return true;
+#else
+  return false;
+#endif
+}
+
+// Call `f(tag)` with CGAL::Parallel_tag if `n_threads != 1` and pygalmesh was
+// built against TBB, with CGAL::Sequential_tag otherwise. `n_threads == 0`
+// leaves the number of worker threads to TBB (all cores), `n_threads > 1` caps
+// it for the duration of the call.
+template <typename F>
+auto
+with_concurrency_tag(const int n_threads, F f)
+{
+#ifdef CGAL_LINKED_WITH_TBB
+  if (n_threads != 1) {
+    std::unique_ptr<tbb::global_control> control;
+    if (n_threads > 1) {
+      control.reset(new tbb::global_control(
+        tbb::global_control::max_allowed_parallelism,
+        n_threads
+      ));
+    }
+    return f(CGAL::Parallel_tag());
+  }
+#endif
+  return f(CGAL::Sequential_tag());
+}
+
+} // namespace pygalmesh
+
+#endif // CONCURRENCY_HPP
@@ -0,0 +1,88 @@
+#ifndef CRITERIA_HPP
+#define CRITERIA_HPP
+
+#include <memory>
+
+#include <CGAL/number_utils.h>
+
+#include "sizing_field.hpp"
+
+namespace pygalmesh {
+
+// Adapts a SizingFieldBase to the sizing field interface of CGAL's mesh criteria.
+class SizingFieldFunctor
+{
+  public:
+  explicit SizingFieldFunctor(const std::shared_ptr<SizingFieldBase> & field):
+    field_(field)
+  {
+  }
+
+  template <typename Point_3, typename Index>
+  double
+  operator()(const Point_3 & p, const int, const Index &) const
+  {
+    return field_->eval({
+      CGAL::to_double(p.x()),
+      CGAL::to_double(p.y()),
+      CGAL::to_double(p.z())
+    });
+  }
+
+  private:
+  const std::shared_ptr<SizingFieldBase> field_;
+};
+
+// Facet criteria with a constant or a field for each of the size and distance
+// bounds, see <https://github.com/CGAL/cgal/issues/5044#issuecomment-705526982>.
+// A constant 0 switches the bound off; a field may not do that.
+template <typename Facet_criteria>
+Facet_criteria
+make_facet_criteria(
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball_value,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
+    const double max_facet_distance_value,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field
+    )
+{
+  if (max_radius_surface_delaunay_ball_field) {
+    const SizingFieldFunctor size(max_radius_surface_delaunay_ball_field);
+    return max_facet_distance_field ?
+      Facet_criteria(min_facet_angle, size, SizingFieldFunctor(max_facet_distance_field)) :
+      Facet_criteria(min_facet_angle, size, max_facet_distance_value);
+  }
+  return max_facet_distance_field ?
+    Facet_criteria(
+      min_facet_angle,
+      max_radius_surface_delaunay_ball_value,
+      SizingFieldFunctor(max_facet_distance_field)
+    ) :
+    Facet_criteria(
+      min_facet_angle,
+      max_radius_surface_delaunay_ball_value,
+      max_facet_distance_value
+    );
+}
+
+// `max_cell_circumradius` is a constant or a CGAL sizing field; a
+// `max_cell_circumradius_field` takes precedence.
+template <typename Cell_criteria, typename Cell_size>
+Cell_criteria
+make_cell_criteria(
+    const double max_circumradius_edge_ratio,
+    const Cell_size & max_cell_circumradius,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field
+    )
+{
+  return max_cell_circumradius_field ?
+    Cell_criteria(
+      max_circumradius_edge_ratio,
+      SizingFieldFunctor(max_cell_circumradius_field)
+    ) :
+    Cell_criteria(max_circumradius_edge_ratio, max_cell_circumradius);
+}
+
+} // namespace pygalmesh
+
+#endif // CRITERIA_HPP
@@ -45,10 +45,9 @@ translate_feature_edges(
   return polylines;
 }
 
-void
+Mesh_arrays
 generate_mesh(
     const std::shared_ptr<pygalmesh::DomainBase> & domain,
-    const std::string & outfile,
     const std::vector<std::vector<std::array<double, 3>>> & extra_feature_edges,
     const double bounding_sphere_radius,
     const bool lloyd,
@@ -76,7 +75,8 @@ generate_mesh(
     const double exude_sliver_bound,
     //
     const bool verbose,
-    const int seed
+    const int seed,
+    const bool facets
     )
 {
   CGAL::get_default_random() = CGAL::Random(seed);
@@ -180,12 +180,7 @@ generate_mesh(
     std::cerr.clear();
   }
 
-  // Output
-  std::ofstream medit_file(outfile);
-  c3t3.output_to_medit(medit_file);
-  medit_file.close();
-
-  return;
+  return c3t3_to_arrays(c3t3, facets);
 }
 
 } // namespace pygalmesh
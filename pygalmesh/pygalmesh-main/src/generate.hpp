@@ -9,11 +9,13 @@
 #include <string>
 #include <vector>
 
+#include "mesh_arrays.hpp"
+
 namespace pygalmesh {
 
-void generate_mesh(
+Mesh_arrays
+generate_mesh(
     const std::shared_ptr<pygalmesh::DomainBase> & domain,
-    const std::string & outfile,
     const std::vector<std::vector<std::array<double, 3>>> & extra_feature_edges = {},
     const double bounding_sphere_radius = 0.0,
     const bool lloyd = false,
@@ -41,7 +43,8 @@ void generate_mesh(
     const double exude_sliver_bound = 0.0,
     //
     const bool verbose = true,
-    const int seed = 0
+    const int seed = 0,
+    const bool facets = true
     );
 
 } // namespace pygalmesh
@@ -1,11 +1,19 @@
 #define CGAL_MESH_3_VERBOSE 1
 
 #include "generate_from_inr.hpp"
+#include "concurrency.hpp"
+#include "criteria.hpp"
 
+#include <algorithm>
 #include <cassert>
+#include <cstddef>
+#include <functional>
+#include <sstream>
+#include <stdexcept>
 
 #include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
 #include <CGAL/Image_3.h>
+#include <CGAL/ImageIO.h>
 
 #include <CGAL/Mesh_triangulation_3.h>
 #include <CGAL/Mesh_complex_3_in_triangulation_3.h>
@@ -21,22 +29,188 @@ typedef CGAL::Exact_predicates_inexact_constructions_kernel K;
 
 typedef CGAL::Labeled_mesh_domain_3<K> Mesh_domain;
 
-// Triangulation
-typedef CGAL::Mesh_triangulation_3<Mesh_domain>::type Tr;
-typedef CGAL::Mesh_complex_3_in_triangulation_3<Tr> C3t3;
-
-// Mesh Criteria
-typedef CGAL::Mesh_criteria_3<Tr> Mesh_criteria;
-typedef Mesh_criteria::Facet_criteria Facet_criteria;
-typedef Mesh_criteria::Cell_criteria Cell_criteria;
+// The triangulation, complex and criteria types depend on the concurrency tag
+// and are defined in generate_from_domain().
 
 typedef CGAL::Mesh_constant_domain_field_3<Mesh_domain::R,
                                            Mesh_domain::Index> Sizing_field_cell;
 
-void
-generate_from_inr(
-    const std::string & inr_filename,
-    const std::string & outfile,
+CGAL::Image_3
+read_inr(const std::string & inr_filename)
+{
+  CGAL::Image_3 image;
+  const bool success = image.read(inr_filename.c_str());
+  if (!success) {
+    throw "Could not read image file";
+  }
+  return image;
+}
+
+// Wrap the buffer of a Fortran-contiguous numpy array in a CGAL::Image_3
+// without copying. The image does not own the data; the array has to outlive
+// the image (and every mesh domain built from it).
+CGAL::Image_3
+image_from_array(
+    const pybind11::array & vol,
+    const std::array<double, 3> & voxel_size
+    )
+{
+  if (vol.ndim() != 3) {
+    std::stringstream msg;
+    msg << "Expected a 3D array, got " << vol.ndim() << " dimensions" << std::endl;
+    throw std::runtime_error(msg.str());
+  }
+  if (!(vol.flags() & pybind11::array::f_style)) {
+    throw std::runtime_error("Expected a Fortran-contiguous (x fastest) array");
+  }
+
+  const pybind11::dtype dtype = vol.dtype();
+  WORD_KIND word_kind;
+  SIGN sign;
+  switch (dtype.kind()) {
+    case 'u':
+      word_kind = WK_FIXED;
+      sign = SGN_UNSIGNED;
+      break;
+    case 'i':
+      word_kind = WK_FIXED;
+      sign = SGN_SIGNED;
+      break;
+    default:
+      std::stringstream msg;
+      msg << "Unsupported array dtype kind '" << dtype.kind() << "'" << std::endl;
+      throw std::runtime_error(msg.str());
+  }
+
+  _image* im = _initImage();
+  im->xdim = vol.shape(0);
+  im->ydim = vol.shape(1);
+  im->zdim = vol.shape(2);
+  im->vdim = 1;
+  im->vx = voxel_size[0];
+  im->vy = voxel_size[1];
+  im->vz = voxel_size[2];
+  im->wdim = dtype.itemsize();
+  im->wordKind = word_kind;
+  im->sign = sign;
+  im->vectMode = VM_SCALAR;
+  // CGAL only reads from the image while meshing
+  im->data = const_cast<void*>(vol.data());
+
+  return CGAL::Image_3(im, CGAL::Image_3::DO_NOT_OWN_THE_DATA);
+}
+
+// Trilinear interpolation of the samples of a 3D numpy array at
+// (i, j, k) * voxel_size, minus the iso value. The buffer is read in place via
+// the array's strides, so any memory layout works without a copy; the array has
+// to outlive the function.
+template <typename T>
+class Grid_function
+{
+  public:
+  Grid_function(
+      const pybind11::array & vol,
+      const std::array<double, 3> & voxel_size,
+      const double iso_value
+      ):
+    data_(static_cast<const char*>(vol.data())),
+    shape_{{
+      static_cast<std::size_t>(vol.shape(0)),
+      static_cast<std::size_t>(vol.shape(1)),
+      static_cast<std::size_t>(vol.shape(2))
+    }},
+    strides_{{vol.strides(0), vol.strides(1), vol.strides(2)}},
+    voxel_size_(voxel_size),
+    iso_value_(iso_value)
+  {
+  }
+
+  double
+  operator()(const K::Point_3 & p) const
+  {
+    const std::array<double, 3> x = {p.x(), p.y(), p.z()};
+    std::array<std::size_t, 3> i0;
+    std::array<double, 3> t;
+    for (std::size_t d = 0; d < 3; d++) {
+      const double s = std::min(
+        std::max(x[d] / voxel_size_[d], 0.0),
+        static_cast<double>(shape_[d] - 1)
+      );
+      i0[d] = std::min(static_cast<std::size_t>(s), shape_[d] - 2);
+      t[d] = s - i0[d];
+    }
+
+    double value = 0.0;
+    for (int c = 0; c < 8; c++) {
+      std::ptrdiff_t offset = 0;
+      for (std::size_t d = 0; d < 3; d++) {
+        const std::size_t i = i0[d] + ((c >> d) & 1);
+        offset += static_cast<std::ptrdiff_t>(i) * strides_[d];
+      }
+      const double w =
+        (c & 1 ? t[0] : 1.0 - t[0]) *
+        (c & 2 ? t[1] : 1.0 - t[1]) *
+        (c & 4 ? t[2] : 1.0 - t[2]);
+      value += w * static_cast<double>(*reinterpret_cast<const T*>(data_ + offset));
+    }
+    return value - iso_value_;
+  }
+
+  private:
+  const char* data_;
+  const std::array<std::size_t, 3> shape_;
+  const std::array<std::ptrdiff_t, 3> strides_;
+  const std::array<double, 3> voxel_size_;
+  const double iso_value_;
+};
+
+// Implicit domain {sdf < iso_value} of a float array of samples of a signed
+// distance function.
+Mesh_domain
+domain_from_sdf_array(
+    const pybind11::array & sdf,
+    const std::array<double, 3> & voxel_size,
+    const double iso_value
+    )
+{
+  if (sdf.ndim() != 3) {
+    std::stringstream msg;
+    msg << "Expected a 3D array, got " << sdf.ndim() << " dimensions" << std::endl;
+    throw std::runtime_error(msg.str());
+  }
+  for (int d = 0; d < 3; d++) {
+    if (sdf.shape(d) < 2) {
+      throw std::runtime_error("Expected at least two samples along each axis");
+    }
+  }
+
+  std::function<double(const K::Point_3 &)> function;
+  const pybind11::dtype dtype = sdf.dtype();
+  if (dtype.kind() == 'f' && dtype.itemsize() == 4) {
+    function = Grid_function<float>(sdf, voxel_size, iso_value);
+  } else if (dtype.kind() == 'f' && dtype.itemsize() == 8) {
+    function = Grid_function<double>(sdf, voxel_size, iso_value);
+  } else {
+    throw std::runtime_error("Expected a float32 or float64 array");
+  }
+
+  const K::Iso_cuboid_3 bbox(
+      0.0, 0.0, 0.0,
+      (sdf.shape(0) - 1) * voxel_size[0],
+      (sdf.shape(1) - 1) * voxel_size[1],
+      (sdf.shape(2) - 1) * voxel_size[2]
+      );
+  return Mesh_domain::create_implicit_mesh_domain(function, bbox);
+}
+
+// Refine a labeled domain with the given concurrency tag.
+// `max_cell_circumradius` is either a constant or a CGAL sizing field.
+template <typename Concurrency_tag, typename Cell_size>
+Mesh_arrays
+generate_from_domain(
+    const Mesh_domain & cgal_domain,
+    const Cell_size & max_cell_circumradius,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field,
     const bool lloyd,
     const bool odt,
     const bool perturb,
@@ -44,31 +218,39 @@ generate_from_inr(
     const double max_edge_size_at_feature_edges,
     const double min_facet_angle,
     const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
     const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
     const double max_circumradius_edge_ratio,
-    const double max_cell_circumradius,
     const double exude_time_limit,
     const double exude_sliver_bound,
     const bool verbose,
-    const int seed
+    const bool facets
     )
 {
-  CGAL::get_default_random() = CGAL::Random(seed);
-
-  CGAL::Image_3 image;
-  const bool success = image.read(inr_filename.c_str());
-  if (!success) {
-    throw "Could not read image file";
-  }
-  Mesh_domain cgal_domain = Mesh_domain::create_labeled_image_mesh_domain(image);
+  typedef typename CGAL::Mesh_triangulation_3<
+    Mesh_domain, CGAL::Default, Concurrency_tag
+    >::type Tr;
+  typedef CGAL::Mesh_complex_3_in_triangulation_3<Tr> C3t3;
+  typedef CGAL::Mesh_criteria_3<Tr> Mesh_criteria;
+  typedef typename Mesh_criteria::Edge_criteria Edge_criteria;
+  typedef typename Mesh_criteria::Facet_criteria Facet_criteria;
+  typedef typename Mesh_criteria::Cell_criteria Cell_criteria;
 
-  Mesh_criteria criteria(
-      CGAL::parameters::edge_size=max_edge_size_at_feature_edges,
-      CGAL::parameters::facet_angle=min_facet_angle,
-      CGAL::parameters::facet_size=max_radius_surface_delaunay_ball,
-      CGAL::parameters::facet_distance=max_facet_distance,
-      CGAL::parameters::cell_radius_edge_ratio=max_circumradius_edge_ratio,
-      CGAL::parameters::cell_size=max_cell_circumradius
+  const Mesh_criteria criteria(
+      Edge_criteria(max_edge_size_at_feature_edges),
+      make_facet_criteria<Facet_criteria>(
+        min_facet_angle,
+        max_radius_surface_delaunay_ball,
+        max_radius_surface_delaunay_ball_field,
+        max_facet_distance,
+        max_facet_distance_field
+      ),
+      make_cell_criteria<Cell_criteria>(
+        max_circumradius_edge_ratio,
+        max_cell_circumradius,
+        max_cell_circumradius_field
+      )
       );
 
   // Mesh generation
@@ -93,18 +275,63 @@ generate_from_inr(
     std::cerr.clear();
   }
 
-  // Output
-  std::ofstream medit_file(outfile);
-  c3t3.output_to_medit(medit_file);
-  medit_file.close();
-  return;
+  return c3t3_to_arrays(c3t3, facets);
 }
 
 
-void
-generate_from_inr_with_subdomain_sizing(
-    const std::string & inr_filename,
-    const std::string & outfile,
+Mesh_arrays
+generate_from_image(
+    const CGAL::Image_3 & image,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
+    const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
+    const double max_circumradius_edge_ratio,
+    const double max_cell_circumradius,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    const int seed,
+    const bool facets,
+    const int n_threads
+    )
+{
+  CGAL::get_default_random() = CGAL::Random(seed);
+
+  Mesh_domain cgal_domain = Mesh_domain::create_labeled_image_mesh_domain(image);
+
+  return with_concurrency_tag(n_threads, [&](auto tag) {
+    return generate_from_domain<decltype(tag)>(
+        cgal_domain,
+        max_cell_circumradius,
+        max_cell_circumradius_field,
+        lloyd, odt, perturb, exude,
+        max_edge_size_at_feature_edges,
+        min_facet_angle,
+        max_radius_surface_delaunay_ball,
+        max_radius_surface_delaunay_ball_field,
+        max_facet_distance,
+        max_facet_distance_field,
+        max_circumradius_edge_ratio,
+        exude_time_limit,
+        exude_sliver_bound,
+        verbose,
+        facets
+        );
+  });
+}
+
+
+Mesh_arrays
+generate_from_image_with_subdomain_sizing(
+    const CGAL::Image_3 & image,
     const double default_max_cell_circumradius,
     const std::vector<double> & max_cell_circumradiuss,
     const std::vector<int> & cell_labels,
@@ -115,21 +342,20 @@ generate_from_inr_with_subdomain_sizing(
     const double max_edge_size_at_feature_edges,
     const double min_facet_angle,
     const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
     const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
     const double max_circumradius_edge_ratio,
     const double exude_time_limit,
     const double exude_sliver_bound,
     const bool verbose,
-    const int seed
+    const int seed,
+    const bool facets,
+    const int n_threads
     )
 {
   CGAL::get_default_random() = CGAL::Random(seed);
 
-  CGAL::Image_3 image;
-  const bool success = image.read(inr_filename.c_str());
-  if (!success) {
-    throw "Could not read image file";
-  }
   Mesh_domain cgal_domain = Mesh_domain::create_labeled_image_mesh_domain(image);
 
   Sizing_field_cell max_cell_circumradius(default_max_cell_circumradius);
@@ -137,42 +363,266 @@ generate_from_inr_with_subdomain_sizing(
   for(std::vector<double>::size_type i(0); i < max_cell_circumradiuss.size(); ++i)
     max_cell_circumradius.set_size(max_cell_circumradiuss[i], ndimensions, cgal_domain.index_from_subdomain_index(cell_labels[i]));
 
-  Mesh_criteria criteria(
-      CGAL::parameters::edge_size=max_edge_size_at_feature_edges,
-      CGAL::parameters::facet_angle=min_facet_angle,
-      CGAL::parameters::facet_size=max_radius_surface_delaunay_ball,
-      CGAL::parameters::facet_distance=max_facet_distance,
-      CGAL::parameters::cell_radius_edge_ratio=max_circumradius_edge_ratio,
-      CGAL::parameters::cell_size=max_cell_circumradius
+  return with_concurrency_tag(n_threads, [&](auto tag) {
+    return generate_from_domain<decltype(tag)>(
+        cgal_domain,
+        max_cell_circumradius,
+        nullptr,
+        lloyd, odt, perturb, exude,
+        max_edge_size_at_feature_edges,
+        min_facet_angle,
+        max_radius_surface_delaunay_ball,
+        max_radius_surface_delaunay_ball_field,
+        max_facet_distance,
+        max_facet_distance_field,
+        max_circumradius_edge_ratio,
+        exude_time_limit,
+        exude_sliver_bound,
+        verbose,
+        facets
+        );
+  });
+}
+
+Mesh_arrays
+generate_from_inr(
+    const std::string & inr_filename,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
+    const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
+    const double max_circumradius_edge_ratio,
+    const double max_cell_circumradius,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    const int seed,
+    const bool facets,
+    const int n_threads
+    )
+{
+  return generate_from_image(
+      read_inr(inr_filename),
+      lloyd, odt, perturb, exude,
+      max_edge_size_at_feature_edges,
+      min_facet_angle,
+      max_radius_surface_delaunay_ball,
+      max_radius_surface_delaunay_ball_field,
+      max_facet_distance,
+      max_facet_distance_field,
+      max_circumradius_edge_ratio,
+      max_cell_circumradius,
+      max_cell_circumradius_field,
+      exude_time_limit,
+      exude_sliver_bound,
+      verbose,
+      seed,
+      facets,
+      n_threads
       );
+}
 
-  // Mesh generation
-  if (!verbose) {
-    // suppress output
-    std::cerr.setstate(std::ios_base::failbit);
-  }
-  C3t3 c3t3 = CGAL::make_mesh_3<C3t3>(
-      cgal_domain,
-      criteria,
-      lloyd ? CGAL::parameters::lloyd() : CGAL::parameters::no_lloyd(),
-      odt ? CGAL::parameters::odt() : CGAL::parameters::no_odt(),
-      perturb ? CGAL::parameters::perturb() : CGAL::parameters::no_perturb(),
-      exude ?
-        CGAL::parameters::exude(
-          CGAL::parameters::time_limit = exude_time_limit,
-          CGAL::parameters::sliver_bound = exude_sliver_bound
-        ) :
-        CGAL::parameters::no_exude()
+
+Mesh_arrays
+generate_from_inr_with_subdomain_sizing(
+    const std::string & inr_filename,
+    const double default_max_cell_circumradius,
+    const std::vector<double> & max_cell_circumradiuss,
+    const std::vector<int> & cell_labels,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
+    const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
+    const double max_circumradius_edge_ratio,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    const int seed,
+    const bool facets,
+    const int n_threads
+    )
+{
+  return generate_from_image_with_subdomain_sizing(
+      read_inr(inr_filename),
+      default_max_cell_circumradius,
+      max_cell_circumradiuss,
+      cell_labels,
+      lloyd, odt, perturb, exude,
+      max_edge_size_at_feature_edges,
+      min_facet_angle,
+      max_radius_surface_delaunay_ball,
+      max_radius_surface_delaunay_ball_field,
+      max_facet_distance,
+      max_facet_distance_field,
+      max_circumradius_edge_ratio,
+      exude_time_limit,
+      exude_sliver_bound,
+      verbose,
+      seed,
+      facets,
+      n_threads
       );
-  if (!verbose) {
-    std::cerr.clear();
-  }
+}
+
+
+Mesh_arrays
+generate_from_array(
+    const pybind11::array & vol,
+    const std::array<double, 3> & voxel_size,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
+    const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
+    const double max_circumradius_edge_ratio,
+    const double max_cell_circumradius,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    const int seed,
+    const bool facets,
+    const int n_threads
+    )
+{
+  return generate_from_image(
+      image_from_array(vol, voxel_size),
+      lloyd, odt, perturb, exude,
+      max_edge_size_at_feature_edges,
+      min_facet_angle,
+      max_radius_surface_delaunay_ball,
+      max_radius_surface_delaunay_ball_field,
+      max_facet_distance,
+      max_facet_distance_field,
+      max_circumradius_edge_ratio,
+      max_cell_circumradius,
+      max_cell_circumradius_field,
+      exude_time_limit,
+      exude_sliver_bound,
+      verbose,
+      seed,
+      facets,
+      n_threads
+      );
+}
+
+
+Mesh_arrays
+generate_from_array_with_subdomain_sizing(
+    const pybind11::array & vol,
+    const std::array<double, 3> & voxel_size,
+    const double default_max_cell_circumradius,
+    const std::vector<double> & max_cell_circumradiuss,
+    const std::vector<int> & cell_labels,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
+    const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
+    const double max_circumradius_edge_ratio,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    const int seed,
+    const bool facets,
+    const int n_threads
+    )
+{
+  return generate_from_image_with_subdomain_sizing(
+      image_from_array(vol, voxel_size),
+      default_max_cell_circumradius,
+      max_cell_circumradiuss,
+      cell_labels,
+      lloyd, odt, perturb, exude,
+      max_edge_size_at_feature_edges,
+      min_facet_angle,
+      max_radius_surface_delaunay_ball,
+      max_radius_surface_delaunay_ball_field,
+      max_facet_distance,
+      max_facet_distance_field,
+      max_circumradius_edge_ratio,
+      exude_time_limit,
+      exude_sliver_bound,
+      verbose,
+      seed,
+      facets,
+      n_threads
+      );
+}
+
+
+Mesh_arrays
+generate_from_sdf_array(
+    const pybind11::array & sdf,
+    const std::array<double, 3> & voxel_size,
+    const double iso_value,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
+    const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
+    const double max_circumradius_edge_ratio,
+    const double max_cell_circumradius,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    const int seed,
+    const bool facets,
+    const int n_threads
+    )
+{
+  CGAL::get_default_random() = CGAL::Random(seed);
+
+  Mesh_domain cgal_domain = domain_from_sdf_array(sdf, voxel_size, iso_value);
 
-  // Output
-  std::ofstream medit_file(outfile);
-  c3t3.output_to_medit(medit_file);
-  medit_file.close();
-  return;
+  return with_concurrency_tag(n_threads, [&](auto tag) {
+    return generate_from_domain<decltype(tag)>(
+        cgal_domain,
+        max_cell_circumradius,
+        max_cell_circumradius_field,
+        lloyd, odt, perturb, exude,
+        max_edge_size_at_feature_edges,
+        min_facet_angle,
+        max_radius_surface_delaunay_ball,
+        max_radius_surface_delaunay_ball_field,
+        max_facet_distance,
+        max_facet_distance_field,
+        max_circumradius_edge_ratio,
+        exude_time_limit,
+        exude_sliver_bound,
+        verbose,
+        facets
+        );
+  });
 }
 
 } // namespace pygalmesh
@@ -1,14 +1,21 @@
 #ifndef GENERATE_FROM_INR_HPP
 #define GENERATE_FROM_INR_HPP
 
+#include <array>
+#include <memory>
 #include <string>
 #include <vector>
 
+#include <pybind11/numpy.h>
+
+#include "mesh_arrays.hpp"
+#include "sizing_field.hpp"
+
 namespace pygalmesh {
 
-void generate_from_inr(
+Mesh_arrays
+generate_from_inr(
     const std::string & inr_filename,
-    const std::string & outfile,
     const bool lloyd = false,
     const bool odt = false,
     const bool perturb = true,
@@ -16,19 +23,23 @@ void generate_from_inr(
     const double max_edge_size_at_feature_edges = 0.0,  // std::numeric_limits<double>::max(),
     const double min_facet_angle = 0.0,
     const double max_radius_surface_delaunay_ball = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field = nullptr,
     const double max_facet_distance = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field = nullptr,
     const double max_circumradius_edge_ratio = 0.0,
     const double max_cell_circumradius = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field = nullptr,
     const double exude_time_limit = 0.0,
     const double exude_sliver_bound = 0.0,
     const bool verbose = true,
-    const int seed = 0
+    const int seed = 0,
+    const bool facets = true,
+    const int n_threads = 1
     );
 
-void
+Mesh_arrays
 generate_from_inr_with_subdomain_sizing(
     const std::string & inr_filename,
-    const std::string & outfile,
     const double default_max_cell_circumradius,
     const std::vector<double> & max_cell_circumradiuss,
     const std::vector<int> & cell_labels,
@@ -39,12 +50,93 @@ generate_from_inr_with_subdomain_sizing(
     const double max_edge_size_at_feature_edges = 0.0,
     const double min_facet_angle = 0.0,
     const double max_radius_surface_delaunay_ball = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field = nullptr,
     const double max_facet_distance = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field = nullptr,
     const double max_circumradius_edge_ratio = 0.0,
     const double exude_time_limit = 0.0,
     const double exude_sliver_bound = 0.0,
     const bool verbose = true,
-    const int seed = 0
+    const int seed = 0,
+    const bool facets = true,
+    const int n_threads = 1
+    );
+
+Mesh_arrays
+generate_from_array(
+    const pybind11::array & vol,
+    const std::array<double, 3> & voxel_size,
+    const bool lloyd = false,
+    const bool odt = false,
+    const bool perturb = true,
+    const bool exude = true,
+    const double max_edge_size_at_feature_edges = 0.0,
+    const double min_facet_angle = 0.0,
+    const double max_radius_surface_delaunay_ball = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field = nullptr,
+    const double max_facet_distance = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field = nullptr,
+    const double max_circumradius_edge_ratio = 0.0,
+    const double max_cell_circumradius = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field = nullptr,
+    const double exude_time_limit = 0.0,
+    const double exude_sliver_bound = 0.0,
+    const bool verbose = true,
+    const int seed = 0,
+    const bool facets = true,
+    const int n_threads = 1
+    );
+
+Mesh_arrays
+generate_from_array_with_subdomain_sizing(
+    const pybind11::array & vol,
+    const std::array<double, 3> & voxel_size,
+    const double default_max_cell_circumradius,
+    const std::vector<double> & max_cell_circumradiuss,
+    const std::vector<int> & cell_labels,
+    const bool lloyd = false,
+    const bool odt = false,
+    const bool perturb  = true,
+    const bool exude = true,
+    const double max_edge_size_at_feature_edges = 0.0,
+    const double min_facet_angle = 0.0,
+    const double max_radius_surface_delaunay_ball = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field = nullptr,
+    const double max_facet_distance = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field = nullptr,
+    const double max_circumradius_edge_ratio = 0.0,
+    const double exude_time_limit = 0.0,
+    const double exude_sliver_bound = 0.0,
+    const bool verbose = true,
+    const int seed = 0,
+    const bool facets = true,
+    const int n_threads = 1
+    );
+
+Mesh_arrays
+generate_from_sdf_array(
+    const pybind11::array & sdf,
+    const std::array<double, 3> & voxel_size,
+    const double iso_value = 0.0,
+    const bool lloyd = false,
+    const bool odt = false,
+    const bool perturb = true,
+    const bool exude = true,
+    const double max_edge_size_at_feature_edges = 0.0,
+    const double min_facet_angle = 0.0,
+    const double max_radius_surface_delaunay_ball = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field = nullptr,
+    const double max_facet_distance = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field = nullptr,
+    const double max_circumradius_edge_ratio = 0.0,
+    const double max_cell_circumradius = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field = nullptr,
+    const double exude_time_limit = 0.0,
+    const double exude_sliver_bound = 0.0,
+    const bool verbose = true,
+    const int seed = 0,
+    const bool facets = true,
+    const int n_threads = 1
     );
 
 } // namespace pygalmesh
@@ -1,4 +1,6 @@
 #include "generate_from_off.hpp"
+#include "concurrency.hpp"
+#include "criteria.hpp"
 
 #include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
 #include <CGAL/Mesh_complex_3_in_triangulation_3.h>
@@ -35,20 +37,87 @@ typedef CGAL::Polyhedral_mesh_domain_3<Polyhedron, K> Mesh_domain;
 //typedef CGAL::Polyhedral_mesh_domain_with_features_3<K> Mesh_domain;
 //typedef CGAL::Mesh_polyhedron_3<K>::type Polyhedron;
 
-// Triangulation
-typedef CGAL::Mesh_triangulation_3<Mesh_domain>::type Tr;
+// To avoid verbose function and named parameters call
+using namespace CGAL::parameters;
 
-typedef CGAL::Mesh_complex_3_in_triangulation_3<Tr> C3t3;
+template <typename Concurrency_tag>
+Mesh_arrays
+generate_from_polyhedral_domain(
+    const Mesh_domain & cgal_domain,
+    const bool lloyd,
+    const bool odt,
+    const bool perturb,
+    const bool exude,
+    const double max_edge_size_at_feature_edges,
+    const double min_facet_angle,
+    const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
+    const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
+    const double max_circumradius_edge_ratio,
+    const double max_cell_circumradius,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field,
+    const double exude_time_limit,
+    const double exude_sliver_bound,
+    const bool verbose,
+    const bool facets
+) {
+  // Triangulation
+  typedef typename CGAL::Mesh_triangulation_3<
+    Mesh_domain, CGAL::Default, Concurrency_tag
+    >::type Tr;
 
-// Criteria
-typedef CGAL::Mesh_criteria_3<Tr> Mesh_criteria;
+  typedef CGAL::Mesh_complex_3_in_triangulation_3<Tr> C3t3;
 
-// To avoid verbose function and named parameters call
-using namespace CGAL::parameters;
+  // Criteria
+  typedef CGAL::Mesh_criteria_3<Tr> Mesh_criteria;
+  typedef typename Mesh_criteria::Edge_criteria Edge_criteria;
+  typedef typename Mesh_criteria::Facet_criteria Facet_criteria;
+  typedef typename Mesh_criteria::Cell_criteria Cell_criteria;
+
+  // Mesh criteria
+  const Mesh_criteria criteria(
+      Edge_criteria(max_edge_size_at_feature_edges),
+      make_facet_criteria<Facet_criteria>(
+        min_facet_angle,
+        max_radius_surface_delaunay_ball,
+        max_radius_surface_delaunay_ball_field,
+        max_facet_distance,
+        max_facet_distance_field
+      ),
+      make_cell_criteria<Cell_criteria>(
+        max_circumradius_edge_ratio,
+        max_cell_circumradius,
+        max_cell_circumradius_field
+      ));
+
+  // Mesh generation
+  if (!verbose) {
+    // suppress output
+    std::cerr.setstate(std::ios_base::failbit);
+  }
+  C3t3 c3t3 = CGAL::make_mesh_3<C3t3>(
+      cgal_domain, criteria,
+      lloyd ? CGAL::parameters::lloyd() : CGAL::parameters::no_lloyd(),
+      odt ? CGAL::parameters::odt() : CGAL::parameters::no_odt(),
+      perturb ? CGAL::parameters::perturb() : CGAL::parameters::no_perturb(),
+      exude ?
+        CGAL::parameters::exude(
+          CGAL::parameters::time_limit = exude_time_limit,
+          CGAL::parameters::sliver_bound = exude_sliver_bound
+        ) :
+        CGAL::parameters::no_exude()
+      );
+  if (!verbose) {
+    std::cerr.clear();
+  }
+
+  return c3t3_to_arrays(c3t3, facets);
+}
 
-void generate_from_off(
+Mesh_arrays
+generate_from_off(
     const std::string& infile,
-    const std::string& outfile,
     const bool lloyd,
     const bool odt,
     const bool perturb,
@@ -56,14 +125,19 @@ void generate_from_off(
     const double max_edge_size_at_feature_edges,
     const double min_facet_angle,
     const double max_radius_surface_delaunay_ball,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field,
     const double max_facet_distance,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field,
     const double max_circumradius_edge_ratio,
     const double max_cell_circumradius,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field,
     const double exude_time_limit,
     const double exude_sliver_bound,
     const bool verbose,
     const bool reorient,
-    const int seed
+    const int seed,
+    const bool facets,
+    const int n_threads
 ) {
   CGAL::get_default_random() = CGAL::Random(seed);
 
@@ -117,43 +191,25 @@ void generate_from_off(
   // Get sharp features
   // cgal_domain.detect_features();
 
-
-  // Mesh criteria
-  Mesh_criteria criteria(
-      CGAL::parameters::edge_size = max_edge_size_at_feature_edges,
-      CGAL::parameters::facet_angle = min_facet_angle,
-      CGAL::parameters::facet_size = max_radius_surface_delaunay_ball,
-      CGAL::parameters::facet_distance = max_facet_distance,
-      CGAL::parameters::cell_radius_edge_ratio = max_circumradius_edge_ratio,
-      CGAL::parameters::cell_size = max_cell_circumradius);
-
-  // Mesh generation
-  if (!verbose) {
-    // suppress output
-    std::cerr.setstate(std::ios_base::failbit);
-  }
-  C3t3 c3t3 = CGAL::make_mesh_3<C3t3>(
-      cgal_domain, criteria,
-      lloyd ? CGAL::parameters::lloyd() : CGAL::parameters::no_lloyd(),
-      odt ? CGAL::parameters::odt() : CGAL::parameters::no_odt(),
-      perturb ? CGAL::parameters::perturb() : CGAL::parameters::no_perturb(),
-      exude ?
-        CGAL::parameters::exude(
-          CGAL::parameters::time_limit = exude_time_limit,
-          CGAL::parameters::sliver_bound = exude_sliver_bound
-        ) :
-        CGAL::parameters::no_exude()
-      );
-  if (!verbose) {
-    std::cerr.clear();
-  }
-
-  // Output
-  std::ofstream medit_file(outfile);
-  c3t3.output_to_medit(medit_file);
-  medit_file.close();
-
-  return;
+  return with_concurrency_tag(n_threads, [&](auto tag) {
+    return generate_from_polyhedral_domain<decltype(tag)>(
+        cgal_domain,
+        lloyd, odt, perturb, exude,
+        max_edge_size_at_feature_edges,
+        min_facet_angle,
+        max_radius_surface_delaunay_ball,
+        max_radius_surface_delaunay_ball_field,
+        max_facet_distance,
+        max_facet_distance_field,
+        max_circumradius_edge_ratio,
+        max_cell_circumradius,
+        max_cell_circumradius_field,
+        exude_time_limit,
+        exude_sliver_bound,
+        verbose,
+        facets
+        );
+  });
 }
 
 }  // namespace pygalmesh
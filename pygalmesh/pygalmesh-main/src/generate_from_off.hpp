@@ -1,15 +1,18 @@
 #ifndef GENERATE_FROM_OFF_HPP
 #define GENERATE_FROM_OFF_HPP
 
+#include <memory>
 #include <string>
 #include <vector>
 
+#include "mesh_arrays.hpp"
+#include "sizing_field.hpp"
+
 namespace pygalmesh {
 
-void
+Mesh_arrays
 generate_from_off(
     const std::string & infile,
-    const std::string & outfile,
     const bool lloyd = false,
     const bool odt = false,
     const bool perturb = true,
@@ -17,14 +20,19 @@ generate_from_off(
     const double max_edge_size_at_feature_edges = 0.0,  // std::numeric_limits<double>::max(),
     const double min_facet_angle = 0.0,
     const double max_radius_surface_delaunay_ball = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_radius_surface_delaunay_ball_field = nullptr,
     const double max_facet_distance = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_facet_distance_field = nullptr,
     const double max_circumradius_edge_ratio = 0.0,
     const double max_cell_circumradius = 0.0,
+    const std::shared_ptr<SizingFieldBase> & max_cell_circumradius_field = nullptr,
     const double exude_time_limit = 0.0,
     const double exude_sliver_bound = 0.0,
     const bool verbose = true,
     const bool reorient = false,
-    const int seed = 0
+    const int seed = 0,
+    const bool facets = true,
+    const int n_threads = 1
     );
 
 } // namespace pygalmesh
@@ -0,0 +1,139 @@
+#ifndef MESH_ARRAYS_HPP
+#define MESH_ARRAYS_HPP
+
+#include <algorithm>
+#include <cstdint>
+#include <map>
+#include <tuple>
+#include <unordered_map>
+#include <utility>
+
+#include <pybind11/numpy.h>
+
+namespace pygalmesh {
+
+// points, tetra, tetra labels, triangles, triangle labels
+typedef std::tuple<
+  pybind11::array_t<double>,
+  pybind11::array_t<std::int64_t>,
+  pybind11::array_t<int>,
+  pybind11::array_t<std::int64_t>,
+  pybind11::array_t<int>
+  > Mesh_arrays;
+
+// Export a C3t3 straight into numpy arrays. This replaces the round-trip through
+// an ASCII medit file and follows what `c3t3.output_to_medit(os)` wrote (rebind,
+// no surface patches, see CGAL/IO/File_medit.h):
+//
+//  * the points are all finite vertices of the triangulation;
+//  * the subdomain indices of the cells are rebound to 1, 2, ... in increasing
+//    order (Rebind_cell_pmap), cells outside the complex count as -1;
+//  * every facet in the complex is written twice: first with the smaller label
+//    of the two adjacent cells, then reversed with the larger one
+//    (No_patch_facet_pmap_first/second); an outside cell takes the label of the
+//    other side. The facet is oriented from the cell with the smaller subdomain
+//    index.
+//
+// The medit vertex references are not reproduced. With `facets == false`, the
+// triangle arrays are returned empty.
+template <typename C3t3>
+Mesh_arrays
+c3t3_to_arrays(const C3t3 & c3t3, const bool facets)
+{
+  typedef typename C3t3::Triangulation Tr;
+  typedef typename Tr::Vertex_handle Vertex_handle;
+  typedef typename Tr::Cell_handle Cell_handle;
+  typedef typename C3t3::Subdomain_index Subdomain_index;
+
+  const Tr & tr = c3t3.triangulation();
+
+  const std::size_t num_points = tr.number_of_vertices();
+  pybind11::array_t<double> points({num_points, std::size_t(3)});
+  auto p = points.template mutable_unchecked<2>();
+  std::unordered_map<Vertex_handle, std::int64_t> vertex_index;
+  vertex_index.reserve(num_points);
+  std::int64_t k = 0;
+  for (auto vit = tr.finite_vertices_begin(); vit != tr.finite_vertices_end(); ++vit) {
+    const auto & pt = vit->point();
+    p(k, 0) = CGAL::to_double(pt.x());
+    p(k, 1) = CGAL::to_double(pt.y());
+    p(k, 2) = CGAL::to_double(pt.z());
+    vertex_index[vit] = k;
+    k++;
+  }
+
+  std::map<Subdomain_index, int> rebind;
+  for (auto cit = c3t3.cells_in_complex_begin(); cit != c3t3.cells_in_complex_end(); ++cit) {
+    rebind.emplace(c3t3.subdomain_index(cit), 0);
+  }
+  int label = 1;
+  for (auto & entry: rebind) {
+    entry.second = label++;
+  }
+  const auto cell_label = [&](const Cell_handle & c) {
+    const auto it = rebind.find(c3t3.subdomain_index(c));
+    return it == rebind.end() ? -1 : it->second;
+  };
+
+  const std::size_t num_cells = c3t3.number_of_cells_in_complex();
+  pybind11::array_t<std::int64_t> tetra({num_cells, std::size_t(4)});
+  pybind11::array_t<int> tetra_ref(num_cells);
+  auto t = tetra.template mutable_unchecked<2>();
+  auto tref = tetra_ref.template mutable_unchecked<1>();
+  k = 0;
+  for (auto cit = c3t3.cells_in_complex_begin(); cit != c3t3.cells_in_complex_end(); ++cit) {
+    for (int j = 0; j < 4; j++) {
+      t(k, j) = vertex_index[cit->vertex(j)];
+    }
+    tref(k) = cell_label(cit);
+    k++;
+  }
+
+  const std::size_t num_triangles = facets ? 2 * c3t3.number_of_facets_in_complex() : 0;
+  pybind11::array_t<std::int64_t> triangles({num_triangles, std::size_t(3)});
+  pybind11::array_t<int> triangle_ref(num_triangles);
+  if (facets) {
+    auto f = triangles.template mutable_unchecked<2>();
+    auto fr = triangle_ref.template mutable_unchecked<1>();
+    k = 0;
+    for (auto fit = c3t3.facets_in_complex_begin(); fit != c3t3.facets_in_complex_end(); ++fit) {
+      auto facet = *fit;
+      if (c3t3.subdomain_index(facet.first) > c3t3.subdomain_index(facet.first->neighbor(facet.second))) {
+        facet = tr.mirror_facet(facet);
+      }
+      const int i = facet.second;
+      std::int64_t v1 = vertex_index[facet.first->vertex((i + 1) % 4)];
+      std::int64_t v2 = vertex_index[facet.first->vertex((i + 2) % 4)];
+      std::int64_t v3 = vertex_index[facet.first->vertex((i + 3) % 4)];
+      if (i % 2 != 0) {
+        std::swap(v2, v3);
+      }
+
+      int label1 = cell_label(fit->first);
+      int label2 = cell_label(fit->first->neighbor(fit->second));
+      if (label1 == 0 || label1 == -1) {
+        label1 = label2;
+      }
+      if (label2 == 0 || label2 == -1) {
+        label2 = label1;
+      }
+
+      f(k, 0) = v1;
+      f(k, 1) = v2;
+      f(k, 2) = v3;
+      fr(k) = std::min(label1, label2);
+      k++;
+      f(k, 0) = v3;
+      f(k, 1) = v2;
+      f(k, 2) = v1;
+      fr(k) = std::max(label1, label2);
+      k++;
+    }
+  }
+
+  return std::make_tuple(points, tetra, tetra_ref, triangles, triangle_ref);
+}
+
+} // namespace pygalmesh
+
+#endif // MESH_ARRAYS_HPP
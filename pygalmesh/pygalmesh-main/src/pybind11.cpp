@@ -1,3 +1,4 @@
+#include "concurrency.hpp"
 #include "domain.hpp"
 #include "generate.hpp"
 #include "generate_2d.hpp"
@@ -12,6 +13,7 @@
 
 #include <CGAL/version.h>
 
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -77,6 +79,33 @@ PYBIND11_MODULE(_pygalmesh, m) {
       .def(py::init<>())
       .def("eval", &SizingFieldBase::eval);
 
+    py::class_<GridSizingField, SizingFieldBase, std::shared_ptr<GridSizingField>>(m, "GridSizingField")
+      .def(py::init([](
+          const py::array_t<double, py::array::c_style | py::array::forcecast> & values,
+          const std::array<double, 3> & origin,
+          const std::array<double, 3> & spacing
+          ) {
+            if (values.ndim() != 3) {
+              throw std::runtime_error("Expected a 3D array of grid values");
+            }
+            return std::make_shared<GridSizingField>(
+                std::vector<double>(values.data(), values.data() + values.size()),
+                std::array<std::size_t, 3>{
+                  static_cast<std::size_t>(values.shape(0)),
+                  static_cast<std::size_t>(values.shape(1)),
+                  static_cast<std::size_t>(values.shape(2))
+                },
+                origin,
+                spacing
+                );
+          }),
+          py::arg("values"),
+          py::arg("origin"),
+          py::arg("spacing")
+          )
+      .def("eval", &GridSizingField::eval)
+      .def("transpose", &GridSizingField::transpose);
+
     // Domain transformations
     py::class_<Translate, DomainBase, std::shared_ptr<Translate>>(m, "Translate")
           .def(py::init<
@@ -269,7 +298,6 @@ PYBIND11_MODULE(_pygalmesh, m) {
     m.def(
         "_generate_mesh", &generate_mesh,
         py::arg("domain"),
-        py::arg("outfile"),
         py::arg("extra_feature_edges") = std::vector<std::vector<std::array<double, 3>>>(),
         py::arg("bounding_sphere_radius") = 0.0,
         py::arg("lloyd") = false,
@@ -289,7 +317,8 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("exude_time_limit") = 0.0,
         py::arg("exude_sliver_bound") = 0.0,
         py::arg("verbose") = true,
-        py::arg("seed") = 0
+        py::arg("seed") = 0,
+        py::arg("facets") = true
         );
     m.def(
         "_generate_periodic_mesh", &generate_periodic_mesh,
@@ -324,7 +353,6 @@ PYBIND11_MODULE(_pygalmesh, m) {
     m.def(
         "_generate_from_off", &generate_from_off,
         py::arg("infile"),
-        py::arg("outfile"),
         py::arg("lloyd") = false,
         py::arg("odt") = false,
         py::arg("perturb") = true,
@@ -332,19 +360,23 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("max_edge_size_at_feature_edges") = 0.0,  // std::numeric_limits<double>::max(),
         py::arg("min_facet_angle") = 0.0,
         py::arg("max_radius_surface_delaunay_ball") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball_field") = nullptr,
         py::arg("max_facet_distance") = 0.0,
+        py::arg("max_facet_distance_field") = nullptr,
         py::arg("max_circumradius_edge_ratio") = 0.0,
         py::arg("max_cell_circumradius") = 0.0,
+        py::arg("max_cell_circumradius_field") = nullptr,
         py::arg("exude_time_limit") = 0.0,
         py::arg("exude_sliver_bound") = 0.0,
         py::arg("verbose") = true,
         py::arg("reorient") = false,
-        py::arg("seed") = 0
+        py::arg("seed") = 0,
+        py::arg("facets") = true,
+        py::arg("n_threads") = 1
         );
     m.def(
         "_generate_from_inr", &generate_from_inr,
         py::arg("inr_filename"),
-        py::arg("outfile"),
         py::arg("lloyd") = false,
         py::arg("odt") = false,
         py::arg("perturb") = true,
@@ -352,18 +384,22 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("max_edge_size_at_feature_edges") = 0.0,
         py::arg("min_facet_angle") = 0.0,
         py::arg("max_radius_surface_delaunay_ball") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball_field") = nullptr,
         py::arg("max_facet_distance") = 0.0,
+        py::arg("max_facet_distance_field") = nullptr,
         py::arg("max_circumradius_edge_ratio") = 0.0,
         py::arg("max_cell_circumradius") = 0.0,
+        py::arg("max_cell_circumradius_field") = nullptr,
         py::arg("exude_time_limit") = 0.0,
         py::arg("exude_sliver_bound") = 0.0,
         py::arg("verbose") = true,
-        py::arg("seed") = 0
+        py::arg("seed") = 0,
+        py::arg("facets") = true,
+        py::arg("n_threads") = 1
         );
     m.def(
         "_generate_from_inr_with_subdomain_sizing", &generate_from_inr_with_subdomain_sizing,
         py::arg("inr_filename"),
-        py::arg("outfile"),
         py::arg("default_max_cell_circumradius"),
         py::arg("max_cell_circumradiuss"),
         py::arg("cell_labels"),
@@ -374,12 +410,90 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("max_edge_size_at_feature_edges") = 0.0,
         py::arg("min_facet_angle") = 0.0,
         py::arg("max_radius_surface_delaunay_ball") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball_field") = nullptr,
         py::arg("max_facet_distance") = 0.0,
+        py::arg("max_facet_distance_field") = nullptr,
         py::arg("max_circumradius_edge_ratio") = 0.0,
         py::arg("exude_time_limit") = 0.0,
         py::arg("exude_sliver_bound") = 0.0,
         py::arg("verbose") = true,
-        py::arg("seed") = 0
+        py::arg("seed") = 0,
+        py::arg("facets") = true,
+        py::arg("n_threads") = 1
+        );
+    m.def(
+        "_generate_from_array", &generate_from_array,
+        py::arg("vol"),
+        py::arg("voxel_size"),
+        py::arg("lloyd") = false,
+        py::arg("odt") = false,
+        py::arg("perturb") = true,
+        py::arg("exude") = true,
+        py::arg("max_edge_size_at_feature_edges") = 0.0,
+        py::arg("min_facet_angle") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball_field") = nullptr,
+        py::arg("max_facet_distance") = 0.0,
+        py::arg("max_facet_distance_field") = nullptr,
+        py::arg("max_circumradius_edge_ratio") = 0.0,
+        py::arg("max_cell_circumradius") = 0.0,
+        py::arg("max_cell_circumradius_field") = nullptr,
+        py::arg("exude_time_limit") = 0.0,
+        py::arg("exude_sliver_bound") = 0.0,
+        py::arg("verbose") = true,
+        py::arg("seed") = 0,
+        py::arg("facets") = true,
+        py::arg("n_threads") = 1
+        );
+    m.def(
+        "_generate_from_array_with_subdomain_sizing", &generate_from_array_with_subdomain_sizing,
+        py::arg("vol"),
+        py::arg("voxel_size"),
+        py::arg("default_max_cell_circumradius"),
+        py::arg("max_cell_circumradiuss"),
+        py::arg("cell_labels"),
+        py::arg("lloyd") = false,
+        py::arg("odt") = false,
+        py::arg("perturb") = true,
+        py::arg("exude") = true,
+        py::arg("max_edge_size_at_feature_edges") = 0.0,
+        py::arg("min_facet_angle") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball_field") = nullptr,
+        py::arg("max_facet_distance") = 0.0,
+        py::arg("max_facet_distance_field") = nullptr,
+        py::arg("max_circumradius_edge_ratio") = 0.0,
+        py::arg("exude_time_limit") = 0.0,
+        py::arg("exude_sliver_bound") = 0.0,
+        py::arg("verbose") = true,
+        py::arg("seed") = 0,
+        py::arg("facets") = true,
+        py::arg("n_threads") = 1
+        );
+    m.def(
+        "_generate_from_sdf_array", &generate_from_sdf_array,
+        py::arg("sdf"),
+        py::arg("voxel_size"),
+        py::arg("iso_value") = 0.0,
+        py::arg("lloyd") = false,
+        py::arg("odt") = false,
+        py::arg("perturb") = true,
+        py::arg("exude") = true,
+        py::arg("max_edge_size_at_feature_edges") = 0.0,
+        py::arg("min_facet_angle") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball") = 0.0,
+        py::arg("max_radius_surface_delaunay_ball_field") = nullptr,
+        py::arg("max_facet_distance") = 0.0,
+        py::arg("max_facet_distance_field") = nullptr,
+        py::arg("max_circumradius_edge_ratio") = 0.0,
+        py::arg("max_cell_circumradius") = 0.0,
+        py::arg("max_cell_circumradius_field") = nullptr,
+        py::arg("exude_time_limit") = 0.0,
+        py::arg("exude_sliver_bound") = 0.0,
+        py::arg("verbose") = true,
+        py::arg("seed") = 0,
+        py::arg("facets") = true,
+        py::arg("n_threads") = 1
         );
     m.def(
         "_remesh_surface", &remesh_surface,
@@ -393,4 +507,5 @@ PYBIND11_MODULE(_pygalmesh, m) {
         py::arg("seed") = 0
         );
     m.attr("_CGAL_VERSION_STR") = CGAL_VERSION_STR;
+    m.attr("_WITH_TBB") = with_tbb();
 }
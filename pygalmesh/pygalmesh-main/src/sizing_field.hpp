@@ -1,8 +1,13 @@
 #ifndef SIZING_FIELD_HPP
 #define SIZING_FIELD_HPP
 
+#include <algorithm>
 #include <array>
+#include <cmath>
+#include <cstddef>
 #include <memory>
+#include <stdexcept>
+#include <vector>
 
 namespace pygalmesh {
 
@@ -19,5 +24,100 @@ class SizingFieldBase
   double val = -1.0;
 };
 
+// Sizing field sampled on a regular grid, values[(i * ny + j) * nz + k] at
+// origin + (i, j, k) * spacing. Evaluated by trilinear interpolation; outside of
+// the grid, the value at the closest point of the grid is used. Since it never
+// calls back into Python, it is safe to use in parallel meshing.
+class GridSizingField: public SizingFieldBase
+{
+  public:
+  GridSizingField(
+      const std::vector<double> & values,
+      const std::array<std::size_t, 3> & shape,
+      const std::array<double, 3> & origin,
+      const std::array<double, 3> & spacing
+      ):
+    values_(values),
+    shape_(shape),
+    origin_(origin),
+    spacing_(spacing)
+  {
+    if (values_.size() != shape_[0] * shape_[1] * shape_[2] || values_.empty()) {
+      throw std::runtime_error("Grid values do not match the grid shape");
+    }
+    for (std::size_t d = 0; d < 3; d++) {
+      if (!(spacing_[d] > 0.0)) {
+        throw std::runtime_error("Grid spacing must be positive");
+      }
+    }
+  }
+
+  virtual ~GridSizingField() = default;
+
+  double
+  eval(const std::array<double, 3> & x) const override
+  {
+    std::array<std::size_t, 3> i0, i1;
+    std::array<double, 3> t;
+    for (std::size_t d = 0; d < 3; d++) {
+      const double s = (x[d] - origin_[d]) / spacing_[d];
+      const double s_max = static_cast<double>(shape_[d] - 1);
+      if (!(s > 0.0)) {
+        i0[d] = 0;
+        t[d] = 0.0;
+      } else if (s >= s_max) {
+        i0[d] = shape_[d] - 1;
+        t[d] = 0.0;
+      } else {
+        i0[d] = static_cast<std::size_t>(std::floor(s));
+        t[d] = s - i0[d];
+      }
+      i1[d] = std::min(i0[d] + 1, shape_[d] - 1);
+    }
+
+    double value = 0.0;
+    for (int c = 0; c < 8; c++) {
+      const std::size_t i = (c & 1) ? i1[0] : i0[0];
+      const std::size_t j = (c & 2) ? i1[1] : i0[1];
+      const std::size_t k = (c & 4) ? i1[2] : i0[2];
+      const double w =
+        ((c & 1) ? t[0] : 1.0 - t[0]) *
+        ((c & 2) ? t[1] : 1.0 - t[1]) *
+        ((c & 4) ? t[2] : 1.0 - t[2]);
+      value += w * values_[(i * shape_[1] + j) * shape_[2] + k];
+    }
+    return value;
+  }
+
+  // The same field with the x and z axes swapped
+  GridSizingField
+  transpose() const
+  {
+    const std::size_t nx = shape_[0];
+    const std::size_t ny = shape_[1];
+    const std::size_t nz = shape_[2];
+    std::vector<double> values(values_.size());
+    for (std::size_t i = 0; i < nx; i++) {
+      for (std::size_t j = 0; j < ny; j++) {
+        for (std::size_t k = 0; k < nz; k++) {
+          values[(k * ny + j) * nx + i] = values_[(i * ny + j) * nz + k];
+        }
+      }
+    }
+    return GridSizingField(
+        values,
+        {nz, ny, nx},
+        {origin_[2], origin_[1], origin_[0]},
+        {spacing_[2], spacing_[1], spacing_[0]}
+        );
+  }
+
+  private:
+  const std::vector<double> values_;
+  const std::array<std::size_t, 3> shape_;
+  const std::array<double, 3> origin_;
+  const std::array<double, 3> spacing_;
+};
+
 } // namespace pygalmesh
 #endif // SIZING_FIELD_HPP
@@ -1,5 +1,6 @@
 import helpers
 import numpy as np
+import pytest
 
 import pygalmesh
 
@@ -70,3 +71,119 @@ def test_from_array_with_subdomain_sizing():
     # Debian needs 2.0e-2 here.
     # <https://github.com/nschloe/pygalmesh/issues/60>
     assert abs(vol - ref) < ref * 2.0e-2
+
+
+def test_from_array_medit_labels():
+    # Labels as written by CGAL's output_to_medit: subdomains rebound to 1, 2, ...,
+    # every facet twice with the smaller and the larger adjacent label.
+    n = 40
+    h = (1.0 / n, 1.0 / n, 1.0 / n)
+    x = (np.arange(n) + 0.5) / n - 0.5
+    xx, yy, zz = np.meshgrid(x, x, x, indexing="ij")
+    r2 = xx**2 + yy**2 + zz**2
+    vol = np.zeros((n, n, n), dtype=np.uint8)
+    vol[r2 < 0.45**2] = 3
+    vol[r2 < 0.2**2] = 7
+
+    mesh = pygalmesh.generate_from_array(
+        vol,
+        h,
+        max_cell_circumradius=5 * min(h),
+        max_facet_distance=min(h),
+        verbose=False,
+    )
+
+    tetra = mesh.get_cells_type("tetra")
+    tetra_ref = mesh.cell_data_dict["medit:ref"]["tetra"]
+    assert set(np.unique(tetra_ref)) == {1, 2}
+    center = np.full(3, 0.5)
+    dist = np.linalg.norm(mesh.points[tetra].mean(axis=1) - center, axis=1)
+    assert dist[tetra_ref == 2].max() < dist[tetra_ref == 1].min() + 2 * min(h)
+
+    triangles = mesh.get_cells_type("triangle")
+    triangle_ref = mesh.cell_data_dict["medit:ref"]["triangle"]
+    assert len(triangles) % 2 == 0
+    assert np.all(triangles[1::2] == triangles[::2, ::-1])
+    pairs = set(zip(triangle_ref[::2].tolist(), triangle_ref[1::2].tolist()))
+    assert pairs == {(1, 1), (1, 2)}
+
+    interface = triangles[::2][triangle_ref[1::2] == 2]
+    area = sum(helpers.compute_triangle_areas(mesh.points, interface))
+    ref = 4.0 * np.pi * 0.2**2
+    assert abs(area - ref) < 0.1 * ref
+
+
+def test_from_array_memory_layout(tmp_path):
+    # a box that is longer in x than in z, so swapped axes would show
+    shape = (40, 30, 20)
+    h = (0.1, 0.1, 0.05)
+    vol = np.zeros(shape, dtype=np.uint8)
+    vol[5:35, 5:25, 5:15] = 1
+
+    ref = 3.0 * 2.0 * 0.5
+    for arr in [
+        vol,
+        np.asfortranarray(vol),
+        np.lib.format.open_memmap(
+            tmp_path / "vol.npy", mode="w+", dtype=vol.dtype, shape=vol.shape
+        ),
+    ]:
+        arr[...] = vol
+        mesh = pygalmesh.generate_from_array(
+            arr,
+            h,
+            max_cell_circumradius=0.2,
+            max_facet_distance=0.05,
+            verbose=False,
+        )
+        extent = mesh.points.max(axis=0) - mesh.points.min(axis=0)
+        assert np.all(np.abs(extent - [3.0, 2.0, 0.5]) < 2 * np.array(h))
+
+        tetra = mesh.get_cells_type("tetra")
+        # all cells must be positively oriented, also after swapping back x and z
+        cell_coords = mesh.points[tetra]
+        omega = np.einsum(
+            "ij,ij->i",
+            cell_coords[:, 1] - cell_coords[:, 0],
+            np.cross(
+                cell_coords[:, 2] - cell_coords[:, 0],
+                cell_coords[:, 3] - cell_coords[:, 0],
+            ),
+        )
+        assert np.all(omega > 0.0)
+
+        vol_mesh = sum(helpers.compute_volumes(mesh.points, tetra))
+        assert abs(vol_mesh - ref) < ref * 2.0e-2
+
+
+def test_save_inr_voxel_size_precision(tmp_path):
+    vol = np.zeros((2, 2, 2), dtype=np.uint8)
+    fname = tmp_path / "vol.inr"
+    pygalmesh.save_inr(vol, (1.67e-5, 1.67e-5, 1.67e-5), str(fname))
+    header = fname.read_bytes()[:256].decode("ascii")
+    assert "VX=1.67e-05" in header
+
+
+@pytest.mark.parametrize("n_threads", [0, 2])
+def test_from_array_parallel(n_threads):
+    n = 100
+    shape = (n, n, n)
+    h = (1.0 / shape[0], 1.0 / shape[1], 1.0 / shape[2])
+    vol = np.zeros(shape, dtype=np.uint8)
+    i, j, k = np.arange(shape[0]), np.arange(shape[1]), np.arange(shape[2])
+    ii, jj, kk = np.meshgrid(i, j, k)
+    vol[ii * ii + jj * jj + kk * kk < n**2] = 1
+
+    # falls back to sequential meshing without TBB
+    mesh = pygalmesh.generate_from_array(
+        vol,
+        h,
+        max_cell_circumradius=100 * min(h),
+        max_facet_distance=min(h),
+        verbose=False,
+        n_threads=n_threads,
+    )
+
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 1.0 / 6.0 * np.pi
+    assert abs(vol - ref) < ref * 2.0e-2
@@ -0,0 +1,54 @@
+import helpers
+import numpy as np
+import pytest
+
+import pygalmesh
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_ball(dtype):
+    n = 61
+    h = (2.0 / (n - 1),) * 3
+    x_ = np.linspace(-1.0, 1.0, n)
+    x, y, z = np.meshgrid(x_, x_, x_, indexing="ij")
+    sdf = (np.sqrt(x**2 + y**2 + z**2) - 0.8).astype(dtype)
+
+    mesh = pygalmesh.generate_from_sdf_array(
+        sdf,
+        h,
+        max_cell_circumradius=0.1,
+        max_facet_distance=0.01,
+        verbose=False,
+    )
+
+    # the grid starts at 0
+    center = np.array([1.0, 1.0, 1.0])
+    r = np.sqrt(np.sum((mesh.points - center) ** 2, axis=1))
+    assert np.max(r) < 0.8 + h[0]
+
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 4.0 / 3.0 * np.pi * 0.8**3
+    assert abs(vol - ref) < ref * 1.0e-2
+
+
+def test_iso_value_and_layout():
+    n = 41
+    h = (1.0 / (n - 1), 2.0 / (n - 1), 0.5 / (n - 1))
+    x_ = np.linspace(0.0, 1.0, n)
+    # a slab x < 0.5 in a Fortran-ordered, non-contiguous view
+    sdf = np.asfortranarray(np.broadcast_to(x_[:, None, None], (n, n, n)))[:, ::-1, :]
+    assert not sdf.flags.c_contiguous and not sdf.flags.f_contiguous
+
+    mesh = pygalmesh.generate_from_sdf_array(
+        sdf,
+        h,
+        iso_value=0.5,
+        max_cell_circumradius=0.1,
+        max_facet_distance=0.01,
+        verbose=False,
+    )
+
+    assert abs(np.max(mesh.points[:, 0]) - 0.5) < 1.0e-2
+    vol = sum(helpers.compute_volumes(mesh.points, mesh.get_cells_type("tetra")))
+    ref = 0.5 * 2.0 * 0.5
+    assert abs(vol - ref) < ref * 2.0e-2
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import pygalmesh
+
+
+def test_eval():
+    x_ = np.linspace(0.0, 1.0, 3)
+    y_ = np.linspace(0.0, 2.0, 5)
+    z_ = np.linspace(0.0, 3.0, 7)
+    x, y, z = np.meshgrid(x_, y_, z_, indexing="ij")
+    # trilinear interpolation reproduces linear functions
+    values = 1.0 + x + 2 * y + 3 * z
+    field = pygalmesh.GridSizingField(values, [0.0, 0.0, 0.0], [0.5, 0.5, 0.5])
+
+    assert abs(field.eval([0.3, 1.1, 2.7]) - 11.6) < 1.0e-12
+    assert abs(field.eval([1.0, 2.0, 3.0]) - 15.0) < 1.0e-12
+    # clamped outside of the grid
+    assert abs(field.eval([-1.0, 0.5, 0.5]) - 3.5) < 1.0e-12
+    assert abs(field.eval([5.0, 5.0, 5.0]) - 15.0) < 1.0e-12
+
+    transposed = field.transpose()
+    assert abs(transposed.eval([2.7, 1.1, 0.3]) - 11.6) < 1.0e-12
+
+
+def test_from_array():
+    n = 40
+    h = (1.0 / n, 1.0 / n, 1.0 / n)
+    vol = np.ones((n, n, n), dtype=np.uint8)
+
+    # fine cells for x < 0.5, coarse ones above
+    values = np.array([0.05, 0.05, 0.2, 0.2])[:, None, None] * np.ones((4, 2, 2))
+    field = pygalmesh.GridSizingField(values, [0.0, 0.0, 0.0], [1.0 / 3, 1.0, 1.0])
+
+    mesh = pygalmesh.generate_from_array(
+        vol,
+        h,
+        max_cell_circumradius=field,
+        max_facet_distance=min(h),
+        verbose=False,
+    )
+
+    x = mesh.points[:, 0]
+    assert np.sum(x < 0.3) > 2 * np.sum(x > 0.7)
+
+
+def test_parallel_python_function():
+    vol = np.ones((10, 10, 10), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        pygalmesh.generate_from_array(
+            vol,
+            (0.1, 0.1, 0.1),
+            max_cell_circumradius=lambda x: 0.1,
+            verbose=False,
+            n_threads=2,
+        )
+
+
+@pytest.mark.parametrize("value", [1, np.int64(1), np.float32(0.5), 0.5])
+def test_constant_sizes(value):
+    # ints and numpy scalars are passed to C++ as constants, like floats
+    from pygalmesh.main import _select
+
+    assert _select(value) == (float(value), None)
+    assert _select(value, n_threads=2) == (float(value), None)
+
+    vol = np.ones((10, 10, 10), dtype=np.uint8)
+    mesh = pygalmesh.generate_from_array(
+        vol,
+        (0.1, 0.1, 0.1),
+        max_cell_circumradius=value,
+        max_facet_distance=value,
+        verbose=False,
+    )
+    assert len(mesh.get_cells_type("tetra")) > 0
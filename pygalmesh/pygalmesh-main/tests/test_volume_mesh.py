@@ -19,6 +19,24 @@ def test_ball():
     assert abs(vol - 4.0 / 3.0 * np.pi) < 0.15
 
 
+def test_ball_facets():
+    s = pygalmesh.Ball([0.0, 0.0, 0.0], 1.0)
+    mesh = pygalmesh.generate_mesh(s, max_cell_circumradius=0.2, verbose=False)
+    triangles = mesh.get_cells_type("triangle")
+    assert len(triangles) > 0
+    # as in CGAL's medit output, every facet comes twice with opposite orientation
+    assert np.all(triangles[1::2] == triangles[::2, ::-1])
+    areas = helpers.compute_triangle_areas(mesh.points, triangles[::2])
+    assert abs(sum(areas) - 4.0 * np.pi) < 0.2
+    assert np.all(mesh.cell_data_dict["medit:ref"]["triangle"] == 1)
+    assert np.all(mesh.cell_data_dict["medit:ref"]["tetra"] == 1)
+
+    mesh = pygalmesh.generate_mesh(
+        s, max_cell_circumradius=0.2, verbose=False, facets=False
+    )
+    assert [cell_block.type for cell_block in mesh.cells] == ["tetra"]
+
+
 def test_balls_union():
     radius = 1.0
     displacement = 0.5